@@ -0,0 +1,181 @@
+#!/usr/bin/env python
+"""
+Capture Benchmark - packet capture analysis throughput and memory
+
+Writes a synthetic pcap of the requested size (HTTP, HTTPS and DNS
+conversations built by encapsulation.FrameBuilder, with a spread of payload
+sizes), then analyzes it with capture.py in a fresh interpreter, the same
+way the CLI and /api/captures do. --dissect adds the application-layer
+dissectors to the pipeline.
+
+Reports:
+  * throughput        packets/s and MB/s through the whole pipeline
+  * memory            RSS before the run, peak RSS, and the growth between
+                      them; the growth should not depend on the file size
+
+The --max-* / --min-* options turn it into a regression gate: the exit
+status is 1 if any limit is exceeded.
+
+Usage:
+    python benchmarks/captures.py
+    python benchmarks/captures.py --megabytes 512 --max-rss-growth-mb 64
+    python benchmarks/captures.py --dissect
+    python benchmarks/captures.py --capture lab1.pcapng --json
+"""
+
+import argparse
+import itertools
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+
+SIMULATOR_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(SIMULATOR_DIR))
+
+from gates import check_gates  # noqa: E402
+
+HTTP_REQUEST = b'GET /index.html HTTP/1.1\r\nHost: lab.example\r\n\r\n'
+HTTP_RESPONSE = b'HTTP/1.1 200 OK\r\nContent-Type: text/html\r\nContent-Length: 3600\r\n\r\n' + b'x' * 3600
+DNS_QUESTION = b'\x03lab\x07example\x00\x00\x01\x00\x01'
+DNS_QUERY = b'\x12\x34\x01\x00\x00\x01\x00\x00\x00\x00\x00\x00' + DNS_QUESTION
+DNS_RESPONSE = (b'\x12\x34\x81\x80\x00\x01\x00\x01\x00\x00\x00\x00' + DNS_QUESTION
+                + b'\xc0\x0c\x00\x01\x00\x01\x00\x00\x01\x2c\x00\x04\x0a\x00\x00\x50')
+
+# (transport, src port, dst port, payloads cycled through); an empty payload is a bare ACK
+FLOWS = (
+    ('tcp', 51000, 80, (HTTP_REQUEST, b'', b'')),
+    ('tcp', 80, 51000, tuple(HTTP_RESPONSE[start:start + 1400] for start in range(0, len(HTTP_RESPONSE), 1400))),
+    ('tcp', 443, 51001, (b'x' * 1400, b'x' * 1400, b'x' * 900)),
+    ('udp', 40000, 53, (DNS_QUERY,)),
+    ('udp', 53, 40000, (DNS_RESPONSE,)),
+)
+FRAMES_PER_BATCH = 2000
+
+GATES = (
+    ('max_rss_growth_mb', 'rss_growth_mb', 'RSS growth (MB)', 1),
+    ('min_packets_per_s', 'packets_per_s', 'packets/s', -1),
+)
+
+
+def synthetic_frames(builders, payloads):
+    """Frames of every flow, interleaved the way a capture would see them, forever"""
+    cycles = [itertools.cycle(flow) for flow in payloads]
+    while True:
+        flows = [builder.build_many([next(cycle) for _ in range(FRAMES_PER_BATCH // len(builders))])[1]
+                 for builder, cycle in zip(builders, cycles)]
+        for group in zip(*flows):
+            yield from group
+
+
+def write_capture(path, megabytes):
+    """A pcap of at least this many megabytes"""
+    from capture import write_pcap
+    from encapsulation import FrameBuilder
+
+    builders = [FrameBuilder(transport, src_port=src, dst_port=dst) for transport, src, dst, _ in FLOWS]
+    payloads = [payloads for _, _, _, payloads in FLOWS]
+    target = megabytes * 1024 * 1024
+    with open(path, 'wb') as file:
+        frames = synthetic_frames(builders, payloads)
+        written = 0
+        while file.tell() < target:
+            write_pcap(file, itertools.islice(frames, FRAMES_PER_BATCH), start=written * 0.0001, interval=0.0001,
+                       header=written == 0)
+            written += FRAMES_PER_BATCH
+
+
+def resident_memory_kb():
+    """Resident set size of this process in KB"""
+    with open('/proc/self/status') as status:
+        for line in status:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1])
+    return 0
+
+
+def analyze_file(path, verify, dissect):
+    """Run the full pipeline over a file; runs in the child interpreter"""
+    from capture import Capture, analyze, open_classifier
+
+    classifier = open_classifier()
+    before = resident_memory_kb()
+    started = time.perf_counter()
+    with Capture(path) as capture:
+        for event in analyze(capture, classifier, verify=verify, dissect=dissect):
+            # Serialize like the endpoint does, so summaries are not free
+            json.dumps(event)
+            if event['type'] == 'done':
+                done = event
+    elapsed = time.perf_counter() - started
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({
+        'packets': done['packets'],
+        'malformed': done['malformed'],
+        'messages': sum(count for kinds in done['messages'].values() for count in kinds.values()),
+        'seconds': round(elapsed, 2),
+        'rss_before_mb': round(before / 1024, 1),
+        'rss_peak_mb': round(peak / 1024, 1),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark pcap analysis throughput and memory')
+    parser.add_argument('--megabytes', type=int, default=64, help='size of the synthetic capture (default 64)')
+    parser.add_argument('--capture', help='analyze this file instead of a synthetic capture')
+    parser.add_argument('--no-verify', action='store_true', help='skip checksum verification')
+    parser.add_argument('--dissect', action='store_true', help='parse application-layer messages too')
+    parser.add_argument('--max-rss-growth-mb', type=float, help='fail above this RSS growth')
+    parser.add_argument('--min-packets-per-s', type=float, help='fail below this throughput')
+    parser.add_argument('--json', action='store_true', help='print machine-readable results')
+    parser.add_argument('--analyze', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.analyze:
+        analyze_file(args.analyze, not args.no_verify, args.dissect)
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = args.capture
+        if path is None:
+            path = os.path.join(directory, 'synthetic.pcap')
+            write_capture(path, args.megabytes)
+        command = [sys.executable, __file__, '--analyze', path]
+        command += ['--no-verify'] * args.no_verify + ['--dissect'] * args.dissect
+        result = subprocess.run(command, capture_output=True, text=True, check=True)
+        report = json.loads(result.stdout)
+        report['file_mb'] = round(os.path.getsize(path) / 1024 / 1024, 1)
+
+    report['packets_per_s'] = round(report['packets'] / report['seconds'])
+    report['mb_per_s'] = round(report['file_mb'] / report['seconds'], 1)
+    report['rss_growth_mb'] = round(report['rss_peak_mb'] - report['rss_before_mb'], 1)
+    failures = check_gates(report, args, GATES)
+    report['gate_failures'] = failures
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print("=" * 64)
+        print(f"Capture analysis: {report['file_mb']:,} MB, {report['packets']:,} packets"
+              f"{' (checksums not verified)' if args.no_verify else ''}{', dissected' if args.dissect else ''}")
+        print("=" * 64)
+        print(f"{'time (s)':<28}{report['seconds']:>12}")
+        print(f"{'packets/s':<28}{report['packets_per_s']:>12,}")
+        print(f"{'MB/s':<28}{report['mb_per_s']:>12}")
+        if args.dissect:
+            print(f"{'messages':<28}{report['messages']:>12,}")
+        print(f"{'RSS before (MB)':<28}{report['rss_before_mb']:>12}")
+        print(f"{'RSS peak (MB)':<28}{report['rss_peak_mb']:>12}")
+        print(f"{'RSS growth (MB)':<28}{report['rss_growth_mb']:>12}")
+        for failure in failures:
+            print(f'FAIL {failure}')
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,389 @@
+#!/usr/bin/env python
+"""
+Classroom Load Test - concurrent sessions and participants against the session hub
+
+Runs the app (HTTP server and session hub) in its own process and drives it
+over real local sockets, the way a class start does: for each of N
+classrooms a presenter creates a session, then M participants verify it,
+open a WebSocket and join, all at once. Every presenter then sends chat
+messages and animation steps, and every participant timestamps what it
+receives.
+
+Reports:
+  * join latency          verify-session request + WebSocket handshake + join confirmation
+  * fan-out latency       send_message until it reaches each other participant
+  * animation latency     broadcast_animation step until its animation_update arrives
+                          (includes up to one 50 ms coalescing tick by design)
+  * memory per connection server RSS growth divided by the sockets joined
+  * dropped events        chat messages that never arrived, sockets the hub closed
+
+The --max-* options turn it into a regression gate: the exit status is 1
+if any limit is exceeded.
+
+Usage:
+    python benchmarks/classrooms.py
+    python benchmarks/classrooms.py --classrooms 40 --participants 40 --backend sqlite
+    python benchmarks/classrooms.py --max-join-p95 500 --max-fanout-p99 100 --max-dropped 0
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import logging
+import os
+import resource
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+
+SIMULATOR_DIR = Path(__file__).resolve().parent.parent
+HOST = '127.0.0.1'
+
+GATES = (
+    ('max_join_p95', 'join_ms', 'p95', 'join p95 (ms)'),
+    ('max_fanout_p99', 'fanout_ms', 'p99', 'fan-out p99 (ms)'),
+    ('max_animation_p99', 'animation_ms', 'p99', 'animation p99 (ms)'),
+    ('max_kb_per_connection', 'kb_per_connection', None, 'KB per connection'),
+    ('max_dropped', 'dropped', None, 'dropped events'),
+)
+
+
+def raise_file_limit():
+    """Allow as many open sockets as the hard limit permits"""
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+
+def resident_memory_kb(pid):
+    """Resident set size of a process in KB"""
+    with open(f'/proc/{pid}/status') as status:
+        for line in status:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1])
+    return 0
+
+
+def percentiles(samples):
+    """p50/p95/p99/max of a list of seconds, in milliseconds"""
+    if not samples:
+        return {'count': 0, 'p50': None, 'p95': None, 'p99': None, 'max': None}
+    ordered = sorted(samples)
+
+    def at(fraction):
+        return round(ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] * 1000, 2)
+
+    return {'count': len(ordered), 'p50': at(0.50), 'p95': at(0.95), 'p99': at(0.99), 'max': at(1.0)}
+
+
+# Minimal clients
+
+async def http_get(port, path):
+    """GET a JSON endpoint; returns (status, payload)"""
+    reader, writer = await asyncio.open_connection(HOST, port)
+    writer.write(f'GET {path} HTTP/1.1\r\nHost: {HOST}:{port}\r\nConnection: close\r\n\r\n'.encode('ascii'))
+    response = await reader.read()
+    writer.close()
+    head, _, body = response.partition(b'\r\n\r\n')
+    return int(head.split(b' ', 2)[1]), json.loads(body)
+
+
+def client_frame(event, data):
+    """A masked text frame carrying one event"""
+    payload = json.dumps({'event': event, 'data': data}).encode('utf-8')
+    mask = os.urandom(4)
+    length = len(payload)
+    if length < 126:
+        header = struct.pack('!BB', 0x81, 0x80 | length)
+    else:
+        header = struct.pack('!BBH', 0x81, 0x80 | 126, length)
+    key = (mask * (length // 4 + 1))[:length]
+    masked = (int.from_bytes(payload, 'big') ^ int.from_bytes(key, 'big')).to_bytes(length, 'big')
+    return header + mask + masked
+
+
+async def read_event(reader):
+    """Next event envelope from the hub, or None when it closes the socket"""
+    while True:
+        first, second = await reader.readexactly(2)
+        length = second & 0x7F
+        if length == 126:
+            length, = struct.unpack('!H', await reader.readexactly(2))
+        elif length == 127:
+            length, = struct.unpack('!Q', await reader.readexactly(8))
+        payload = await reader.readexactly(length)
+        opcode = first & 0x0F
+        if opcode == 0x8:
+            return None
+        if opcode == 0x1:
+            return json.loads(payload)
+
+
+class Participant:
+    """One simulated student (or the presenter) in a classroom"""
+
+    def __init__(self, classroom, index):
+        self.classroom = classroom
+        self.user_id = f'c{classroom.index}-u{index}'
+        self.reader = None
+        self.writer = None
+        self.listener = None
+        self.messages = 0
+
+    async def join(self, http_port, hub_port):
+        """Verify the session, connect and join; records the join latency"""
+        started = time.perf_counter()
+        status, _ = await http_get(http_port, f'/api/verify-session/{self.classroom.session_id}')
+        if status != 200:
+            raise RuntimeError(f'verify-session answered {status}')
+        self.reader, self.writer = await asyncio.open_connection(HOST, hub_port)
+        key = base64.b64encode(os.urandom(16)).decode('ascii')
+        self.writer.write((
+            f'GET / HTTP/1.1\r\nHost: {HOST}:{hub_port}\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n'
+            f'Sec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n'
+        ).encode('ascii'))
+        await self.reader.readuntil(b'\r\n\r\n')
+        self.send('join_session', {
+            'session_id': self.classroom.session_id, 'user_id': self.user_id, 'user_name': self.user_id,
+        })
+        while True:
+            envelope = await read_event(self.reader)
+            if envelope is None:
+                raise RuntimeError('hub closed the socket during join')
+            if envelope['event'] == 'session_joined_confirmation':
+                break
+        self.classroom.results.join.append(time.perf_counter() - started)
+        self.listener = asyncio.create_task(self.listen())
+
+    def send(self, event, data):
+        self.writer.write(client_frame(event, data))
+
+    async def listen(self):
+        """Timestamp every broadcast until the socket closes"""
+        classroom = self.classroom
+        results = classroom.results
+        try:
+            while True:
+                envelope = await read_event(self.reader)
+                if envelope is None:
+                    break
+                received = time.perf_counter()
+                event, data = envelope['event'], envelope['data']
+                if event == 'message_sent' and data['user_id'] != self.user_id:
+                    self.messages += 1
+                    results.fanout.append(received - float(data['message'].split(' ', 1)[0]))
+                elif event == 'animation_update':
+                    for user_id, _, _, progress in data['steps']:
+                        if user_id != self.user_id and progress in classroom.step_times:
+                            results.animation.append(received - classroom.step_times[progress])
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        if not classroom.closing:
+            results.closed += 1
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+class Results:
+    """Samples collected by every participant of the run"""
+
+    def __init__(self):
+        self.join = []
+        self.fanout = []
+        self.animation = []
+        self.closed = 0
+        self.failed_joins = 0
+
+
+class Classroom:
+    """A session with its presenter and participants"""
+
+    def __init__(self, index, participants, results):
+        self.index = index
+        self.session_id = None
+        self.results = results
+        self.participants = [Participant(self, n) for n in range(participants)]
+        self.step_times = {}
+        self.closing = False
+
+    @property
+    def presenter(self):
+        return self.participants[0]
+
+    async def present(self, messages, message_interval, steps, step_interval, message_size):
+        """Send chat messages and animation steps from the presenter"""
+        padding = 'x' * message_size
+        for _ in range(messages):
+            self.presenter.send('send_message', {'message': f'{time.perf_counter():.6f} {padding}'})
+            await asyncio.sleep(message_interval)
+        for step in range(1, steps + 1):
+            progress = round(step / steps, 3)
+            self.step_times[progress] = time.perf_counter()
+            self.presenter.send('broadcast_animation', {'layer': 7 - step % 7, 'direction': 'down', 'progress': progress})
+            await asyncio.sleep(step_interval)
+
+
+# Run
+
+def start_server(backend, directory):
+    """Launch the app in a child process; returns (process, http port, hub port)"""
+    if backend == 'sqlite':
+        backend = f'sqlite:///{Path(directory) / "sessions.db"}'
+    process = subprocess.Popen(
+        [sys.executable, __file__, '--serve', backend], stdout=subprocess.PIPE, text=True
+    )
+    ports = json.loads(process.stdout.readline())
+    return process, ports['http_port'], ports['hub_port']
+
+
+def serve(backend):
+    """Child process: the HTTP server and session hub under test"""
+    raise_file_limit()
+    # One access-log line per request would dominate the run
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    sys.path.insert(0, str(SIMULATOR_DIR))
+    from werkzeug.serving import make_server
+    from simulator import create_app
+    from views import get_hub
+
+    app = create_app({'SESSION_HUB': True, 'SESSION_HUB_PORT': 0, 'SESSION_BACKEND': backend})
+    server = make_server(HOST, 0, app, threaded=True)
+    hub = get_hub(app)
+    print(json.dumps({'http_port': server.server_port, 'hub_port': hub.port}), flush=True)
+    server.serve_forever()
+
+
+async def run(args, pid, http_port, hub_port):
+    """One load test; returns the report"""
+    results = Results()
+    classrooms = [Classroom(index, args.participants, results) for index in range(args.classrooms)]
+    for classroom in classrooms:
+        _, payload = await http_get(http_port, '/api/create-session')
+        classroom.session_id = payload['session_id']
+    baseline_kb = resident_memory_kb(pid)
+
+    started = time.perf_counter()
+    participants = [p for classroom in classrooms for p in classroom.participants]
+    joins = await asyncio.gather(*(p.join(http_port, hub_port) for p in participants), return_exceptions=True)
+    results.failed_joins = sum(isinstance(outcome, BaseException) for outcome in joins)
+    join_seconds = time.perf_counter() - started
+    await asyncio.sleep(0.5)
+    joined = len(participants) - results.failed_joins
+    grown_kb = resident_memory_kb(pid) - baseline_kb
+
+    await asyncio.gather(*(
+        classroom.present(args.messages, args.message_interval / 1000, args.steps,
+                          args.step_interval / 1000, args.message_size)
+        for classroom in classrooms
+    ))
+    await asyncio.sleep(args.settle)
+
+    expected = sum(len(classroom.participants) - 1 for classroom in classrooms) * args.messages
+    received = sum(p.messages for p in participants)
+    for classroom in classrooms:
+        classroom.closing = True
+    for participant in participants:
+        participant.close()
+    await asyncio.gather(*(p.listener for p in participants if p.listener), return_exceptions=True)
+
+    return {
+        'classrooms': args.classrooms,
+        'participants': args.participants,
+        'connections': joined,
+        'failed_joins': results.failed_joins,
+        'joins_per_s': round(joined / join_seconds, 1) if join_seconds else None,
+        'join_ms': percentiles(results.join),
+        'fanout_ms': percentiles(results.fanout),
+        'animation_ms': percentiles(results.animation),
+        'server_rss_kb': baseline_kb + grown_kb,
+        'kb_per_connection': round(grown_kb / joined, 2) if joined else None,
+        'messages_expected': expected,
+        'messages_received': received,
+        'closed_by_hub': results.closed,
+        'dropped': expected - received + results.closed + results.failed_joins,
+    }
+
+
+def check_gates(report, args):
+    """Names of the limits the report exceeds"""
+    failures = []
+    for option, key, statistic, label in GATES:
+        limit = getattr(args, option)
+        value = report[key][statistic] if statistic else report[key]
+        if limit is not None and (value is None or value > limit):
+            failures.append(f'{label}: {value} > {limit}')
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load-test the session hub with simulated classrooms')
+    parser.add_argument('--classrooms', type=int, default=10, help='concurrent sessions')
+    parser.add_argument('--participants', type=int, default=30, help='sockets per session, presenter included')
+    parser.add_argument('--backend', choices=['memory', 'sqlite'], default='memory')
+    parser.add_argument('--messages', type=int, default=20, help='chat messages per presenter')
+    parser.add_argument('--message-interval', type=float, default=100, help='ms between chat messages')
+    parser.add_argument('--message-size', type=int, default=64, help='padding bytes per chat message')
+    parser.add_argument('--steps', type=int, default=100, help='animation steps per presenter')
+    parser.add_argument('--step-interval', type=float, default=10, help='ms between animation steps')
+    parser.add_argument('--settle', type=float, default=1.0, help='seconds to wait for stragglers')
+    parser.add_argument('--max-join-p95', type=float, help='fail above this join p95 (ms)')
+    parser.add_argument('--max-fanout-p99', type=float, help='fail above this chat fan-out p99 (ms)')
+    parser.add_argument('--max-animation-p99', type=float, help='fail above this animation p99 (ms)')
+    parser.add_argument('--max-kb-per-connection', type=float, help='fail above this server memory per socket')
+    parser.add_argument('--max-dropped', type=int, help='fail above this many dropped events')
+    parser.add_argument('--json', action='store_true', help='print machine-readable results')
+    parser.add_argument('--serve', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve)
+        return
+
+    raise_file_limit()
+    with tempfile.TemporaryDirectory() as directory:
+        process, http_port, hub_port = start_server(args.backend, directory)
+        try:
+            report = asyncio.run(run(args, process.pid, http_port, hub_port))
+        finally:
+            process.terminate()
+            process.wait()
+    report['backend'] = args.backend
+    failures = check_gates(report, args)
+    report['gate_failures'] = failures
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print("=" * 64)
+        print(f"Classroom load test: {args.classrooms} classrooms x {args.participants} participants "
+              f"({args.backend} store)")
+        print("=" * 64)
+        print(f"{'connections joined':<28}{report['connections']:>10,}   ({report['failed_joins']} failed, "
+              f"{report['joins_per_s']:,.0f} joins/s)")
+        print(f"{'':<28}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}")
+        for label, key in (('join (ms)', 'join_ms'), ('chat fan-out (ms)', 'fanout_ms'),
+                           ('animation (ms)', 'animation_ms')):
+            stats = report[key]
+            print(f'{label:<28}' + ''.join(
+                f'{stats[name]:>10.1f}' if stats[name] is not None else f'{"n/a":>10}'
+                for name in ('p50', 'p95', 'p99', 'max')
+            ))
+        print(f"{'server RSS (KB)':<28}{report['server_rss_kb']:>10,}")
+        print(f"{'KB per connection':<28}{report['kb_per_connection']:>10}")
+        print(f"{'chat messages delivered':<28}{report['messages_received']:>10,} of {report['messages_expected']:,}")
+        print(f"{'sockets closed by hub':<28}{report['closed_by_hub']:>10}")
+        print(f"{'dropped events':<28}{report['dropped']:>10}")
+        for failure in failures:
+            print(f'FAIL {failure}')
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,367 @@
+#!/usr/bin/env python
+"""
+Endpoint Benchmark - throughput, latency and payload size of every route
+
+Every route the app registers is driven two ways:
+  * inprocess   sequential requests through the Flask test client, which
+                isolates view, serialization and caching cost
+  * server      concurrent keep-alive requests against a real local server
+                in a child process, which adds sockets and threading
+
+and for each one reports requests/s, p50/p95/p99 latency, the bytes a
+browser receives (with Accept-Encoding: gzip) and the uncompressed body size.
+Each route is timed for several rounds and the best value of each metric
+is kept, so a scheduler hiccup in one round does not read as a regression.
+
+Results are compared against benchmarks/baselines/endpoints.json, and the
+exit status is 1 if any route regresses beyond the thresholds, or if a GET
+route exists that is not benchmarked (capture uploads have captures.py).
+Latency and throughput baselines are machine-specific: re-record them with
+--update-baselines on the machine that runs the comparison.
+
+Usage:
+    python benchmarks/endpoints.py
+    python benchmarks/endpoints.py --mode inprocess --only protocols
+    python benchmarks/endpoints.py --update-baselines
+    python benchmarks/endpoints.py --latency-threshold 0.3 --json
+"""
+
+import argparse
+import http.client
+import json
+import logging
+import platform
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+
+SIMULATOR_DIR = Path(__file__).resolve().parent.parent
+BASELINES = Path(__file__).resolve().parent / 'baselines' / 'endpoints.json'
+HOST = '127.0.0.1'
+# Session the QR routes encode; created with this ID by create_benchmark_app
+QR_SESSION = 'QRBNCH'
+
+# (name, path); {version}, {session} and {frame} are filled in before the run
+ENDPOINTS = (
+    ('index', '/'),
+    ('bootstrap', '/api/bootstrap'),
+    ('bootstrap-version', '/api/bootstrap/{version}'),
+    ('osi-layers', '/api/osi-layers'),
+    ('tcpip-layers', '/api/tcpip-layers'),
+    ('osi-layer', '/api/osi-layer/4'),
+    ('tcpip-layer', '/api/tcpip-layer/3'),
+    ('encapsulation', '/api/encapsulation'),
+    ('decapsulation', '/api/decapsulation'),
+    ('layer-mapping', '/api/layer-mapping'),
+    ('encapsulate', '/api/encapsulate?message=GET+%2F+HTTP%2F1.1&dst_port=80'),
+    ('decapsulate', '/api/decapsulate?fcs=1&frame={frame}'),
+    ('simulate', '/api/simulate?message=Hello%2C+network%21'),
+    ('protocols', '/api/protocols'),
+    ('protocols-page', '/api/protocols?summary=1&limit=20'),
+    ('protocol', '/api/protocol/TCP'),
+    ('protocols-layer', '/api/protocols/layer/Transport'),
+    ('protocols-osi-layer', '/api/protocols/osi-layer/7'),
+    ('protocols-port', '/api/protocols/port/443'),
+    ('protocols-port-range', '/api/protocols/ports/1-1024'),
+    ('search', '/api/search?q=reliable+transport'),
+    ('suggest', '/api/search/suggest?q=ht'),
+    ('create-session', '/api/create-session'),
+    ('verify-session', '/api/verify-session/{session}'),
+    ('participants', '/api/session/{session}/participants'),
+    # A fixed link (ID and Host) so the image, and its size, is the same every run
+    ('qrcode', f'/api/qrcode/{QR_SESSION}'),
+    ('qrcode-svg', f'/api/qrcode/{QR_SESSION}?format=svg'),
+)
+
+PLAIN_HEADERS = {'Host': 'localhost:5000'}
+BROWSER_HEADERS = {**PLAIN_HEADERS, 'Accept-Encoding': 'gzip, deflate'}
+
+# (metric, higher is better, threshold option)
+GATED_METRICS = (
+    ('rps', True, 'latency_threshold'),
+    ('p95_ms', False, 'latency_threshold'),
+    ('bytes', False, 'bytes_threshold'),
+    ('raw_bytes', False, 'bytes_threshold'),
+)
+# Latency changes smaller than this are timer noise, not regressions
+MIN_LATENCY_DELTA_MS = 0.5
+
+
+def percentile(ordered, fraction):
+    """Value at a fraction of a sorted list"""
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def summarize(latencies, elapsed, size, raw_size):
+    """Metrics for one route from per-request latencies in seconds"""
+    ordered = sorted(latencies)
+    return {
+        'requests': len(ordered),
+        'rps': round(len(ordered) / elapsed, 1),
+        'p50_ms': round(percentile(ordered, 0.50) * 1000, 3),
+        'p95_ms': round(percentile(ordered, 0.95) * 1000, 3),
+        'p99_ms': round(percentile(ordered, 0.99) * 1000, 3),
+        'bytes': size,
+        'raw_bytes': raw_size,
+    }
+
+
+def create_benchmark_app():
+    """The app under test, with the session hub on an ephemeral port"""
+    sys.path.insert(0, str(SIMULATOR_DIR))
+    from simulator import create_app
+    from views import get_hub
+    app = create_app({'SESSION_HUB': True, 'SESSION_HUB_PORT': 0, 'PRELOAD_DATA': True})
+    # QR codes are only served for existing sessions; pin the next new ID to the fixed one
+    store = get_hub(app).store
+    store.new_session_id = lambda: QR_SESSION
+    store.create()
+    del store.new_session_id
+    return app
+
+
+def uncovered_routes(app):
+    """Registered GET routes that no benchmarked path reaches (uploads are covered by captures.py)"""
+    adapter = app.url_map.bind('localhost')
+    covered = {adapter.match(path.split('?')[0].format(version='v', session='ABCDEF', frame=''))[0]
+               for _, path in ENDPOINTS}
+    return sorted(rule.rule for rule in app.url_map.iter_rules()
+                  if rule.endpoint != 'static' and 'GET' in rule.methods and rule.endpoint not in covered)
+
+
+def resolve(get):
+    """Fill in the endpoint placeholders using get(path) -> (status, headers, body)"""
+    _, headers, _ = get('/api/bootstrap/latest')
+    version = headers['Location'].rstrip('/').rsplit('/', 1)[1]
+    _, _, body = get('/api/create-session')
+    session = json.loads(body)['session_id']
+    _, _, body = get('/api/encapsulate?message=GET+%2F+HTTP%2F1.1&dst_port=80')
+    frame = json.loads(body)['frame']
+    return [(name, path.format(version=version, session=session, frame=frame)) for name, path in ENDPOINTS]
+
+
+# In-process
+
+def best_of(rounds, measure):
+    """Highest throughput and lowest latencies over several rounds"""
+    samples = [measure() for _ in range(rounds)]
+    best = dict(samples[-1])
+    best['rps'] = max(sample['rps'] for sample in samples)
+    for metric in ('p50_ms', 'p95_ms', 'p99_ms'):
+        best[metric] = min(sample[metric] for sample in samples)
+    return best
+
+
+def run_inprocess(endpoints, requests, warmup, rounds):
+    """Sequential requests through the test client"""
+    app = create_benchmark_app()
+    client = app.test_client()
+
+    def get(path, headers=PLAIN_HEADERS):
+        response = client.get(path, headers=headers)
+        return response.status_code, response.headers, response.get_data()
+
+    results = {}
+    for name, path in resolve(get) if endpoints is None else endpoints(get):
+        status, _, raw = get(path)
+        if status != 200:
+            raise SystemExit(f'{name}: {path} returned {status}')
+        for _ in range(warmup):
+            client.get(path, headers=BROWSER_HEADERS)
+        results[name] = best_of(rounds, lambda: measure(client, path, requests, len(raw)))
+    return results, app
+
+
+def measure(client, path, requests, raw_size):
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(requests):
+        sent = time.perf_counter()
+        response = client.get(path, headers=BROWSER_HEADERS)
+        body = response.get_data()
+        latencies.append(time.perf_counter() - sent)
+    return summarize(latencies, time.perf_counter() - started, len(body), raw_size)
+
+
+# Real server
+
+def serve():
+    """Child process: the threaded HTTP server under test"""
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    from werkzeug.serving import make_server
+    server = make_server(HOST, 0, create_benchmark_app(), threaded=True)
+    print(json.dumps({'port': server.server_port}), flush=True)
+    server.serve_forever()
+
+
+def server_get(connection, path, headers=PLAIN_HEADERS):
+    connection.request('GET', path, headers=headers)
+    response = connection.getresponse()
+    return response.status, response.headers, response.read()
+
+
+def run_server(endpoints, requests, warmup, concurrency, rounds):
+    """Concurrent keep-alive requests against a server in a child process"""
+    process = subprocess.Popen([sys.executable, __file__, '--serve'], stdout=subprocess.PIPE, text=True)
+    try:
+        port = json.loads(process.stdout.readline())['port']
+        setup = http.client.HTTPConnection(HOST, port)
+        get = lambda path: server_get(setup, path)
+        results = {}
+        for name, path in resolve(get) if endpoints is None else endpoints(get):
+            status, _, raw = get(path)
+            if status != 200:
+                raise SystemExit(f'{name}: {path} returned {status}')
+            results[name] = best_of(rounds, lambda: load(port, path, requests, warmup, concurrency, len(raw)))
+        setup.close()
+        return results
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def load(port, path, requests, warmup, concurrency, raw_size):
+    """One route under concurrency, each thread on its own keep-alive connection"""
+    per_thread = max(1, requests // concurrency)
+    latencies = []
+    sizes = []
+    ready = threading.Barrier(concurrency + 1)
+
+    def work():
+        connection = http.client.HTTPConnection(HOST, port)
+        for _ in range(warmup // concurrency):
+            server_get(connection, path, BROWSER_HEADERS)
+        ready.wait()
+        mine = []
+        for _ in range(per_thread):
+            sent = time.perf_counter()
+            _, _, body = server_get(connection, path, BROWSER_HEADERS)
+            mine.append(time.perf_counter() - sent)
+        connection.close()
+        latencies.extend(mine)
+        sizes.append(len(body))
+
+    workers = [threading.Thread(target=work) for _ in range(concurrency)]
+    for worker in workers:
+        worker.start()
+    ready.wait()
+    started = time.perf_counter()
+    for worker in workers:
+        worker.join()
+    return summarize(latencies, time.perf_counter() - started, max(sizes), raw_size)
+
+
+# Baselines
+
+def load_baselines():
+    if BASELINES.exists():
+        return json.loads(BASELINES.read_text())
+    return {'modes': {}}
+
+
+def save_baselines(baselines, report):
+    """Record this run's results as the baselines for the modes it ran"""
+    baselines['machine'] = {'python': platform.python_version(), 'platform': platform.platform()}
+    for mode, results in report['modes'].items():
+        baselines['modes'].setdefault(mode, {}).update(results)
+    BASELINES.parent.mkdir(exist_ok=True)
+    BASELINES.write_text(json.dumps(baselines, indent=2, sort_keys=True) + '\n')
+
+
+def compare(report, baselines, args):
+    """Regressions beyond the thresholds, as readable strings"""
+    regressions = []
+    for mode, results in report['modes'].items():
+        recorded = baselines['modes'].get(mode, {})
+        for name, metrics in results.items():
+            baseline = recorded.get(name)
+            if baseline is None:
+                continue
+            for metric, higher_is_better, option in GATED_METRICS:
+                threshold = getattr(args, option)
+                old, new = baseline[metric], metrics[metric]
+                if higher_is_better:
+                    regressed = new * (1 + threshold) < old
+                else:
+                    regressed = new > old * (1 + threshold)
+                    if metric.endswith('_ms'):
+                        regressed = regressed and new - old > MIN_LATENCY_DELTA_MS
+                if regressed:
+                    regressions.append(f'{mode} {name} {metric}: {new:,} vs baseline {old:,}')
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark every endpoint against recorded baselines')
+    parser.add_argument('--mode', choices=['inprocess', 'server', 'both'], default='both')
+    parser.add_argument('--only', action='append', metavar='NAME', help='benchmark only these endpoints')
+    parser.add_argument('--requests', type=int, default=400, help='timed requests per endpoint')
+    parser.add_argument('--warmup', type=int, default=40, help='untimed requests per endpoint')
+    parser.add_argument('--rounds', type=int, default=3, help='timed rounds per endpoint, best kept')
+    parser.add_argument('--concurrency', type=int, default=8, help='client threads in server mode')
+    parser.add_argument('--latency-threshold', type=float, default=0.5,
+                        help='allowed fractional p95 increase / throughput drop (default 0.5)')
+    parser.add_argument('--bytes-threshold', type=float, default=0.02,
+                        help='allowed fractional growth in response size (default 0.02)')
+    parser.add_argument('--update-baselines', action='store_true', help='record this run as the baselines')
+    parser.add_argument('--json', action='store_true', help='print machine-readable results')
+    parser.add_argument('--serve', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve()
+        return
+
+    endpoints = None
+    if args.only:
+        unknown = set(args.only).difference(name for name, _ in ENDPOINTS)
+        if unknown:
+            parser.error(f"unknown endpoints: {', '.join(sorted(unknown))}")
+        endpoints = lambda get: [entry for entry in resolve(get) if entry[0] in args.only]
+
+    report = {'modes': {}}
+    if args.mode in ('inprocess', 'both'):
+        report['modes']['inprocess'], app = run_inprocess(endpoints, args.requests, args.warmup, args.rounds)
+    else:
+        app = create_benchmark_app()
+    if args.mode in ('server', 'both'):
+        report['modes']['server'] = run_server(endpoints, args.requests, args.warmup, args.concurrency, args.rounds)
+
+    baselines = load_baselines()
+    report['uncovered_routes'] = uncovered_routes(app)
+    report['regressions'] = [] if args.update_baselines else compare(report, baselines, args)
+    if args.update_baselines:
+        save_baselines(baselines, report)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        for mode, results in report['modes'].items():
+            recorded = baselines['modes'].get(mode, {})
+            print("=" * 92)
+            print(f"Endpoint benchmark: {mode}"
+                  + (f" ({args.concurrency} concurrent connections)" if mode == 'server' else ''))
+            print("=" * 92)
+            print(f"{'endpoint':<22}{'req/s':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+                  f"{'bytes':>10}{'raw bytes':>11}{'vs base p95':>12}")
+            for name, m in results.items():
+                base = recorded.get(name)
+                change = f"{(m['p95_ms'] / base['p95_ms'] - 1) * 100:+.0f}%" if base and base['p95_ms'] else '-'
+                print(f"{name:<22}{m['rps']:>10,.0f}{m['p50_ms']:>9.2f}{m['p95_ms']:>9.2f}{m['p99_ms']:>9.2f}"
+                      f"{m['bytes']:>10,}{m['raw_bytes']:>11,}{change:>12}")
+        if args.update_baselines:
+            print(f'Baselines written to {BASELINES.relative_to(SIMULATOR_DIR)}')
+        elif not baselines['modes']:
+            print('No baselines recorded yet; run with --update-baselines')
+        for rule in report['uncovered_routes']:
+            print(f'FAIL route not benchmarked: {rule}')
+        for regression in report['regressions']:
+            print(f'FAIL {regression}')
+    sys.exit(1 if report['regressions'] or report['uncovered_routes'] else 0)
+
+
+if __name__ == '__main__':
+    main()
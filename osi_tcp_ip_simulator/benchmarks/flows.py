@@ -0,0 +1,168 @@
+#!/usr/bin/env python
+"""
+Flow Benchmark - flow table update rate and memory at scale
+
+Opens the requested number of concurrent TCP connections in flows.FlowTable
+(SYN, SYN/ACK, ACK), sends data both ways on every one of them in a
+shuffled order, then lets them all time out. The packets are ParsedFrame
+objects built up front, so only the table is timed; capture.py's
+benchmark covers parsing.
+
+Reports:
+  * updates/s         per phase: opening, data on a full table, expiry
+  * memory            bytes of RSS per tracked flow, and RSS after the data
+                      phase
+  * bounded           a second run with max_flows at a quarter of the
+                      connections: every data packet of an evicted
+                      connection starts a new flow and evicts another, and
+                      RSS still stays flat
+
+The --max-* / --min-* options turn it into a regression gate: the exit
+status is 1 if any limit is exceeded.
+
+Usage:
+    python benchmarks/flows.py
+    python benchmarks/flows.py --flows 500000 --max-bytes-per-flow 1024
+    python benchmarks/flows.py --json
+"""
+
+import argparse
+import collections
+import gc
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+
+SIMULATOR_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(SIMULATOR_DIR))
+
+from captures import resident_memory_kb  # noqa: E402
+from gates import check_gates  # noqa: E402
+
+DATA_ROUNDS = 4
+SERVER = bytes((10, 0, 0, 1))
+
+GATES = (
+    ('max_bytes_per_flow', 'bytes_per_flow', 'bytes per flow', 1),
+    ('min_updates_per_s', 'data_updates_per_s', 'data updates/s', -1),
+)
+
+
+def connection_frames(count):
+    """Per connection: SYN, SYN/ACK, ACK and a data segment from each side, as ParsedFrames"""
+    from decapsulation import ParsedFrame
+
+    def frame(src, dst, src_port, dst_port, flags, seq, ack, length):
+        parsed = ParsedFrame(None, 0)
+        parsed.src_ip, parsed.dst_ip, parsed.protocol, parsed.transport = src, dst, 6, 'tcp'
+        parsed.src_port, parsed.dst_port, parsed.tcp_flags = src_port, dst_port, flags
+        parsed.seq, parsed.ack, parsed.payload_offset, parsed.payload_end = seq, ack, 0, length
+        return parsed
+
+    connections = []
+    for number in range(count):
+        client = bytes((172, 16 + (number >> 16 & 15), number >> 8 & 255, number & 255))
+        port = 1024 + number % 60000
+        connections.append((
+            frame(client, SERVER, port, 443, 0x02, 1000, 0, 0),
+            frame(SERVER, client, 443, port, 0x12, 5000, 1001, 0),
+            frame(client, SERVER, port, 443, 0x10, 1001, 5001, 0),
+            frame(client, SERVER, port, 443, 0x18, 1001, 5001, 500),
+            frame(SERVER, client, 443, port, 0x18, 5001, 1501, 1400),
+        ))
+    return connections
+
+
+def run(connections, max_flows):
+    """Drive a FlowTable through the three phases; returns the measurements"""
+    from flows import FlowTable
+
+    ended = collections.Counter()
+
+    def export(record):
+        ended[record['end_reason']] += 1
+
+    table = FlowTable(export, max_flows)
+    count = len(connections)
+    gc.collect()
+    before = resident_memory_kb()
+    now = 1000.0
+    step = 1.0 / count
+
+    started = time.perf_counter()
+    for syn, syn_ack, ack, _, _ in connections:
+        table.packet(syn, now, 74)
+        table.packet(syn_ack, now + 0.001, 74)
+        table.packet(ack, now + 0.002, 66)
+        now += step
+    opening = time.perf_counter() - started
+    rss = resident_memory_kb() - before
+
+    order = list(range(count))
+    random.Random(1).shuffle(order)
+    started = time.perf_counter()
+    for _ in range(DATA_ROUNDS):
+        for index in order:
+            _, _, _, request, reply = connections[index]
+            table.packet(request, now, 566)
+            table.packet(reply, now, 1466)
+            now += step
+    data = time.perf_counter() - started
+    data_rss = resident_memory_kb() - before
+
+    tracked = len(table.flows)
+    started = time.perf_counter()
+    table.expire(now + 600)
+    expiry = time.perf_counter() - started
+    return {
+        'tracked': tracked,
+        'peak': table.peak,
+        'evicted': table.evicted,
+        'timed_out': ended['idle timeout'],
+        'open_updates_per_s': round(3 * count / opening),
+        'data_updates_per_s': round(2 * DATA_ROUNDS * count / data),
+        'expired_per_s': round(tracked / expiry) if expiry else None,
+        'rss_growth_mb': round(rss / 1024, 1),
+        'rss_growth_after_data_mb': round(data_rss / 1024, 1),
+        'bytes_per_flow': round(rss * 1024 / tracked) if tracked else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the flow table at scale')
+    parser.add_argument('--flows', type=int, default=300000, help='concurrent connections (default 300000)')
+    parser.add_argument('--max-bytes-per-flow', type=float, help='fail above this memory per flow')
+    parser.add_argument('--min-updates-per-s', type=float, help='fail below this data update rate')
+    parser.add_argument('--json', action='store_true', help='print machine-readable results')
+    args = parser.parse_args()
+
+    connections = connection_frames(args.flows)
+    report = run(connections, args.flows)
+    bounded = run(connections, max(args.flows // 4, 1))
+    report['bounded'] = bounded
+    failures = check_gates(report, args, GATES)
+    report['gate_failures'] = failures
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print("=" * 64)
+        print(f"Flow table: {args.flows:,} concurrent TCP connections")
+        print("=" * 64)
+        print(f"{'':<28}{'unbounded':>12}{'bounded':>12}")
+        for label, key in (('flows tracked', 'tracked'), ('evicted', 'evicted'), ('timed out', 'timed_out'),
+                           ('open updates/s', 'open_updates_per_s'), ('data updates/s', 'data_updates_per_s'),
+                           ('expired/s', 'expired_per_s'), ('RSS growth, opened (MB)', 'rss_growth_mb'),
+                           ('RSS growth, after data (MB)', 'rss_growth_after_data_mb'),
+                           ('bytes per flow', 'bytes_per_flow')):
+            print(f"{label:<28}{report[key]:>12,}{bounded[key]:>12,}")
+        for failure in failures:
+            print(f'FAIL {failure}')
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
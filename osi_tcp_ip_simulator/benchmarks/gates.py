@@ -0,0 +1,20 @@
+"""
+Benchmark Gates - shared --max-* / --min-* limit checks
+
+A benchmark declares its gates as (option, report key, label, direction)
+tuples: direction 1 fails above the limit, -1 fails below it.
+"""
+
+
+def check_gates(report, args, gates):
+    """Names of the limits the report exceeds"""
+    failures = []
+    for option, key, label, direction in gates:
+        limit = getattr(args, option)
+        if limit is None:
+            continue
+        value = report[key]
+        # A rate that could not be measured passes no gate
+        if value is None or (value - limit) * direction > 0:
+            failures.append(f'{label}: {value} {">" if direction > 0 else "<"} {limit}')
+    return failures
@@ -0,0 +1,172 @@
+#!/usr/bin/env python
+"""
+Memory Benchmark - bytes per model object and total model footprint
+
+Reports, for OSILayer, TCPIPLayer and Protocol:
+  * shallow size of one object next to a __dict__-based equivalent
+  * deep size of one object (everything it references)
+and for the whole model (OSI + TCP/IP + protocol catalogue):
+  * unique bytes reachable, counting shared/interned strings once, both as
+    imported (protocol details still in the content store) and after every
+    description and key point list has been loaded
+  * memory allocated while importing models.py in a fresh interpreter
+
+Usage:
+    python benchmarks/memory.py
+    python benchmarks/memory.py --json
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import types
+from pathlib import Path
+
+
+SIMULATOR_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(SIMULATOR_DIR))
+
+
+# Slots that point at shared infrastructure rather than per-object data
+SHARED_SLOTS = frozenset({'_store'})
+
+
+def slot_values(obj):
+    """Field values of a slotted model object"""
+    for cls in type(obj).__mro__:
+        for name in getattr(cls, '__slots__', ()):
+            if name not in SHARED_SLOTS and hasattr(obj, name):
+                yield getattr(obj, name)
+
+
+def deep_size(obj, seen):
+    """Size of obj and everything it references that isn't already in seen"""
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            size += deep_size(key, seen) + deep_size(value, seen)
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        for item in obj:
+            size += deep_size(item, seen)
+    elif hasattr(obj, '__dict__') and not isinstance(obj, type):
+        size += deep_size(vars(obj), seen)
+    elif hasattr(type(obj), '__slots__'):
+        for value in slot_values(obj):
+            size += deep_size(value, seen)
+    return size
+
+
+def dict_equivalent_size(obj):
+    """Shallow size of the same fields stored in a per-instance __dict__"""
+    fields = {}
+    for cls in type(obj).__mro__:
+        for name in getattr(cls, '__slots__', ()):
+            if hasattr(obj, name):
+                fields[name.lstrip('_')] = getattr(obj, name)
+    namespace = types.SimpleNamespace(**fields)
+    return sys.getsizeof(namespace) + sys.getsizeof(vars(namespace))
+
+
+def per_object_report(objects):
+    """Average shallow/deep bytes for a list of same-typed objects"""
+    count = len(objects)
+    return {
+        'count': count,
+        'shallow_bytes': sum(sys.getsizeof(obj) for obj in objects) / count,
+        'dict_equivalent_bytes': sum(dict_equivalent_size(obj) for obj in objects) / count,
+        'deep_bytes': sum(deep_size(obj, set()) for obj in objects) / count,
+    }
+
+
+def string_sharing(objects):
+    """How many string references the model holds vs distinct string objects"""
+    references = 0
+    distinct = set()
+    stack = list(objects)
+    while stack:
+        obj = stack.pop()
+        if isinstance(obj, str):
+            references += 1
+            distinct.add(id(obj))
+        elif isinstance(obj, (list, tuple)):
+            stack.extend(obj)
+        elif hasattr(type(obj), '__slots__'):
+            stack.extend(slot_values(obj))
+    return {'string_references': references, 'distinct_string_objects': len(distinct)}
+
+
+def unique_bytes(objects):
+    """Bytes reachable from objects, counting each shared object once"""
+    seen = set()
+    return sum(deep_size(obj, seen) for obj in objects)
+
+
+def import_footprint():
+    """tracemalloc bytes allocated by `import models` in a fresh interpreter"""
+    code = (
+        'import sys, tracemalloc; sys.path.insert(0, %r); tracemalloc.start(); '
+        'import models; current, peak = tracemalloc.get_traced_memory(); print(current, peak)'
+    ) % str(SIMULATOR_DIR)
+    output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    current, peak = output.stdout.split()
+    return {'import_current_bytes': int(current), 'import_peak_bytes': int(peak)}
+
+
+def run():
+    from models import OSIModel, TCPIPModel, ProtocolDatabase
+
+    osi_layers = list(OSIModel().layers)
+    tcpip_layers = list(TCPIPModel().layers)
+    protocols = list(ProtocolDatabase.get_all_protocols().values())
+    everything = osi_layers + tcpip_layers + protocols
+
+    lazy_bytes = unique_bytes(everything)
+    for protocol in protocols:
+        protocol.description, protocol.key_points
+
+    return {
+        'objects': {
+            'OSILayer': per_object_report(osi_layers),
+            'TCPIPLayer': per_object_report(tcpip_layers),
+            'Protocol': per_object_report(protocols),
+        },
+        'model_unique_bytes_lazy': lazy_bytes,
+        'model_unique_bytes': unique_bytes(everything),
+        'strings': string_sharing(everything),
+        **import_footprint(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure model object and model footprint size')
+    parser.add_argument('--json', action='store_true', help='print machine-readable results')
+    args = parser.parse_args()
+
+    results = run()
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print("=" * 72)
+    print("Model memory benchmark")
+    print("=" * 72)
+    print(f"{'Class':<12}{'count':>7}{'shallow B':>12}{'as __dict__ B':>16}{'deep B':>12}")
+    for name, report in results['objects'].items():
+        print(f"{name:<12}{report['count']:>7}{report['shallow_bytes']:>12.0f}"
+              f"{report['dict_equivalent_bytes']:>16.0f}{report['deep_bytes']:>12.0f}")
+    print("-" * 72)
+    strings = results['strings']
+    print(f"String references: {strings['string_references']}, "
+          f"distinct string objects: {strings['distinct_string_objects']}")
+    print(f"Whole model as imported (lazy):       {results['model_unique_bytes_lazy'] / 1024:8.1f} KB")
+    print(f"Whole model, all details loaded:      {results['model_unique_bytes'] / 1024:8.1f} KB")
+    print(f"Allocated by `import models`:         {results['import_current_bytes'] / 1024:8.1f} KB "
+          f"(peak {results['import_peak_bytes'] / 1024:.1f} KB)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,193 @@
+#!/usr/bin/env python
+"""
+Session Store Benchmark - create, join and verify throughput per backend
+
+For each backend this measures, against a store prefilled with sessions:
+  * create        new sessions per second
+  * join / leave  participant joins (and the matching leaves) per second
+  * verify        participant-list reads (what /api/verify-session does)
+and for the shared SQLite backend, the same joins and verifies spread over
+several worker processes hitting one database, as a multi-worker server would.
+
+Usage:
+    python benchmarks/sessions.py
+    python benchmarks/sessions.py --backend sqlite --workers 8
+    python benchmarks/sessions.py --json
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+
+SIMULATOR_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(SIMULATOR_DIR))
+
+from session_store import open_session_store
+
+
+def backend_url(backend, directory):
+    """Store URL for a backend name"""
+    return 'memory' if backend == 'memory' else f'sqlite:///{Path(directory) / "sessions.db"}'
+
+
+def rate(count, seconds):
+    """Operations per second"""
+    return count / seconds if seconds else float('inf')
+
+
+def timed(operation, count, spans=None, name=None):
+    """Run operation(i) count times, return ops/s (and record the wall-clock span)"""
+    wall_started = time.time()
+    started = time.perf_counter()
+    for index in range(count):
+        operation(index)
+    elapsed = time.perf_counter() - started
+    if spans is not None:
+        spans[name] = (wall_started, wall_started + elapsed, count)
+    return rate(count, elapsed)
+
+
+def threaded(operation, count, threads):
+    """Run count operations split over threads, return aggregate ops/s"""
+    per_thread = count // threads
+
+    def work(offset):
+        for index in range(offset, offset + per_thread):
+            operation(index)
+
+    workers = [threading.Thread(target=work, args=(n * per_thread,)) for n in range(threads)]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return rate(per_thread * threads, time.perf_counter() - started)
+
+
+def exercise(store, session_ids, joins, verifies, prefix, spans=None):
+    """Joins (each followed later by its leave) and verifies, return ops/s"""
+    count = len(session_ids)
+    results = {
+        'join_per_s': timed(
+            lambda i: store.join(session_ids[i % count], f'{prefix}{i}', f'User {i}'), joins, spans, 'join'
+        ),
+        'leave_per_s': timed(lambda i: store.leave(session_ids[i % count], f'{prefix}{i}'), joins),
+    }
+    # Verify against rooms that have a realistic handful of participants
+    for index in range(count * 5):
+        store.join(session_ids[index % count], f'{prefix}seated{index}', 'Seated')
+    results['verify_per_s'] = timed(lambda i: store.participants(session_ids[i % count]), verifies, spans, 'verify')
+    return results
+
+
+def run_backend(backend, sessions, joins, verifies, threads, workers, directory):
+    """All measurements for one backend"""
+    url = backend_url(backend, directory)
+    store = open_session_store(url)
+    try:
+        results = {'create_per_s': timed(lambda i: store.create(), sessions)}
+        session_ids = [store.create() for _ in range(sessions)]
+        results.update(exercise(store, session_ids, joins, verifies, 'u'))
+        results['verify_threads'] = threads
+        results['verify_threaded_per_s'] = threaded(
+            lambda i: store.participants(session_ids[i % len(session_ids)]), verifies, threads
+        )
+    finally:
+        store.close()
+
+    if backend != 'memory' and workers > 1:
+        results['workers'] = workers
+        results.update(run_workers(url, session_ids, joins, verifies, workers))
+    return results
+
+
+def run_workers(url, session_ids, joins, verifies, workers):
+    """Joins and verifies from several processes sharing one store"""
+    arguments = json.dumps({
+        'url': url, 'session_ids': session_ids,
+        'joins': joins // workers, 'verifies': verifies // workers,
+    })
+    processes = [
+        subprocess.Popen([sys.executable, __file__, '--probe', arguments, str(n)], stdout=subprocess.PIPE, text=True)
+        for n in range(workers)
+    ]
+    spans = [json.loads(process.communicate()[0]) for process in processes]
+
+    def aggregate(name):
+        # Total operations over the wall-clock window in which any worker ran them
+        started = min(span[name][0] for span in spans)
+        ended = max(span[name][1] for span in spans)
+        return rate(sum(span[name][2] for span in spans), ended - started)
+
+    return {'workers_join_per_s': aggregate('join'), 'workers_verify_per_s': aggregate('verify')}
+
+
+def probe(arguments, worker):
+    """Worker process: exercise a shared store and print its timing spans"""
+    options = json.loads(arguments)
+    store = open_session_store(options['url'])
+    spans = {}
+    try:
+        exercise(store, options['session_ids'], options['joins'], options['verifies'], f'w{worker}-', spans)
+    finally:
+        store.close()
+    print(json.dumps(spans))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure session store throughput')
+    parser.add_argument('--backend', choices=['memory', 'sqlite', 'all'], default='all')
+    parser.add_argument('--sessions', type=int, default=200, help='sessions to create')
+    parser.add_argument('--joins', type=int, default=5000, help='join/leave pairs')
+    parser.add_argument('--verifies', type=int, default=20000, help='participant list reads')
+    parser.add_argument('--threads', type=int, default=4, help='threads for the threaded verify run')
+    parser.add_argument('--workers', type=int, default=4, help='processes for the shared-backend run')
+    parser.add_argument('--json', action='store_true', help='print machine-readable results')
+    parser.add_argument('--probe', nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.probe:
+        probe(*args.probe)
+        return
+
+    backends = ['memory', 'sqlite'] if args.backend == 'all' else [args.backend]
+    results = {}
+    for backend in backends:
+        with tempfile.TemporaryDirectory() as directory:
+            results[backend] = run_backend(
+                backend, args.sessions, args.joins, args.verifies, args.threads, args.workers, directory
+            )
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print("=" * 64)
+    print(f"Session store benchmark: {args.sessions} sessions, {args.joins} joins, {args.verifies} verifies")
+    print("=" * 64)
+    print(f"{'':<28}" + ''.join(f'{backend:>18}' for backend in backends))
+    rows = [
+        ('create /s', 'create_per_s'),
+        ('join /s', 'join_per_s'),
+        ('leave /s', 'leave_per_s'),
+        ('verify /s', 'verify_per_s'),
+        (f'verify /s ({args.threads} threads)', 'verify_threaded_per_s'),
+        (f'join /s ({args.workers} processes)', 'workers_join_per_s'),
+        (f'verify /s ({args.workers} processes)', 'workers_verify_per_s'),
+    ]
+    for label, key in rows:
+        cells = ''.join(
+            f'{results[backend][key]:>18,.0f}' if key in results[backend] else f'{"n/a":>18}'
+            for backend in backends
+        )
+        print(f'{label:<28}{cells}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+"""
+Simulation Benchmark - discrete-event network simulation at scale
+
+Builds a campus in netsim.py: a core router, and per building an edge
+router, a switch and a floor of hosts. Every host streams UDP packets to
+hosts picked at random across the campus, and the run goes until the last
+packet is delivered. The timeline is left off (only counted), as for any
+large run.
+
+Reports:
+  * size              nodes, links and events processed
+  * throughput        events/s and packets/s on one core
+  * memory            peak RSS
+
+The --max-* / --min-* options turn it into a regression gate: the exit
+status is 1 if any limit is exceeded.
+
+Usage:
+    python benchmarks/simulation.py
+    python benchmarks/simulation.py --buildings 50 --hosts 40 --packets 100
+    python benchmarks/simulation.py --min-events-per-s 100000 --json
+"""
+
+import argparse
+import json
+import random
+import resource
+import sys
+import time
+from pathlib import Path
+
+
+SIMULATOR_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(SIMULATOR_DIR))
+
+from gates import check_gates  # noqa: E402
+
+GATES = (
+    ('min_events_per_s', 'events_per_s', 'events/s', -1),
+    ('max_rss_mb', 'rss_peak_mb', 'peak RSS (MB)', 1),
+)
+
+
+def campus(buildings, hosts, packets, seed):
+    """A Network with every host's traffic scheduled"""
+    from netsim import Network
+
+    network = Network(seed, timeline_limit=0)
+    network.add_router('core')
+    addresses = []
+    for building in range(buildings):
+        router, switch = f'edge{building}', f'switch{building}'
+        network.add_router(router)
+        network.add_switch(switch)
+        network.connect('core', router, bandwidth=10e9, delay=0.0005,
+                        a_address=f'10.255.{building}.1/30', b_address=f'10.255.{building}.2/30')
+        network.connect(router, switch, bandwidth=1e9, a_address=f'10.{building}.0.1/16')
+        for number in range(hosts):
+            name = f'host{building}.{number}'
+            address = f'10.{building}.{number // 250 + 1}.{number % 250 + 2}'
+            network.add_host(name, f'{address}/16', f'10.{building}.0.1')
+            network.connect(name, switch)
+            addresses.append((name, address))
+    network.compute_routes()
+
+    chooser = random.Random(seed)
+    for name, _ in addresses:
+        _, destination = chooser.choice(addresses)
+        network.node(name).stream(destination, bytes(512), packets, 0.001, chooser.random() * 0.001)
+    return network
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the discrete-event network simulator')
+    parser.add_argument('--buildings', type=int, default=40, help='edge routers and switches (default 40)')
+    parser.add_argument('--hosts', type=int, default=50, help='hosts per building (default 50)')
+    parser.add_argument('--packets', type=int, default=25, help='packets each host sends (default 25)')
+    parser.add_argument('--seed', type=int, default=1, help='random seed for traffic and losses')
+    parser.add_argument('--min-events-per-s', type=float, help='fail below this event rate')
+    parser.add_argument('--max-rss-mb', type=float, help='fail above this peak RSS')
+    parser.add_argument('--json', action='store_true', help='print machine-readable results')
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    network = campus(args.buildings, args.hosts, args.packets, args.seed)
+    built = time.perf_counter() - started
+    started = time.perf_counter()
+    network.run()
+    elapsed = time.perf_counter() - started
+
+    summary = network.report(topology=False)['summary']
+    report = {
+        'nodes': summary['nodes'],
+        'links': summary['links'],
+        'events': summary['events'],
+        'packets_sent': summary['packets_sent'],
+        'delivered': summary['delivered'],
+        'dropped': summary['dropped'],
+        'simulated_ms': summary['simulated_ms'],
+        'mean_latency_ms': summary['latency_ms']['mean'],
+        'build_s': round(built, 2),
+        'run_s': round(elapsed, 2),
+        'events_per_s': round(summary['events'] / elapsed),
+        'packets_per_s': round(summary['packets_sent'] / elapsed),
+        'rss_peak_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+    failures = check_gates(report, args, GATES)
+    report['gate_failures'] = failures
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print("=" * 64)
+        print(f"Campus: {report['nodes']:,} nodes, {report['links']:,} links, {report['packets_sent']:,} packets")
+        print("=" * 64)
+        for label, key in (('events', 'events'), ('delivered', 'delivered'), ('dropped', 'dropped'),
+                           ('simulated ms', 'simulated_ms'), ('mean latency (ms)', 'mean_latency_ms'),
+                           ('build (s)', 'build_s'), ('run (s)', 'run_s'), ('events/s', 'events_per_s'),
+                           ('packets/s', 'packets_per_s'), ('peak RSS (MB)', 'rss_peak_mb')):
+            print(f"{label:<28}{report[key]:>14,}")
+        for failure in failures:
+            print(f'FAIL {failure}')
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python
+"""
+Startup Benchmark - cold import time, first-request latency and resident memory
+
+Every sample runs in a fresh interpreter so nothing is warm from a previous
+run, which is what a serverless cold start or a new worker process sees.
+
+Usage:
+    python benchmarks/startup.py                  # factory, 10 runs
+    python benchmarks/startup.py --entry vercel   # api/index.py entry point
+    python benchmarks/startup.py --runs 20 --json
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+
+SIMULATOR_DIR = Path(__file__).resolve().parent.parent
+ROOT_DIR = SIMULATOR_DIR.parent
+
+ENTRY_POINTS = {
+    'factory': (SIMULATOR_DIR, 'simulator', 'create_app'),
+    'app': (SIMULATOR_DIR, 'app', 'app'),
+    'root': (ROOT_DIR, 'app', 'app'),
+    'vercel': (ROOT_DIR / 'api', 'index', 'app'),
+}
+
+FIRST_REQUEST_PATHS = ['/', '/api/bootstrap']
+
+
+def resident_memory_kb():
+    """Current resident set size of this process in KB"""
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and KB elsewhere
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+def probe(entry):
+    """Measure one cold start in the current (fresh) interpreter"""
+    directory, module_name, attribute = ENTRY_POINTS[entry]
+    sys.path.insert(0, str(directory))
+    if directory != SIMULATOR_DIR:
+        sys.path.insert(1, str(SIMULATOR_DIR))
+
+    baseline_kb = resident_memory_kb()
+    started = time.perf_counter()
+    module = __import__(module_name)
+    app = getattr(module, attribute)
+    if attribute == 'create_app':
+        app = app()
+    import_ms = (time.perf_counter() - started) * 1000
+    import_kb = resident_memory_kb()
+
+    client = app.test_client()
+    first_request_ms = {}
+    for path in FIRST_REQUEST_PATHS:
+        started = time.perf_counter()
+        response = client.get(path)
+        first_request_ms[path] = (time.perf_counter() - started) * 1000
+        if response.status_code != 200:
+            raise SystemExit(f'{path} returned {response.status_code}')
+
+    started = time.perf_counter()
+    client.get(FIRST_REQUEST_PATHS[-1])
+    warm_request_ms = (time.perf_counter() - started) * 1000
+
+    return {
+        'import_ms': import_ms,
+        'first_request_ms': first_request_ms,
+        'warm_request_ms': warm_request_ms,
+        'rss_baseline_kb': baseline_kb,
+        'rss_after_import_kb': import_kb,
+        'rss_after_first_request_kb': resident_memory_kb(),
+    }
+
+
+def run_samples(entry, runs):
+    """Run the probe in `runs` fresh interpreters"""
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, __file__, '--probe', '--entry', entry],
+            capture_output=True, text=True, check=True,
+        )
+        samples.append(json.loads(output.stdout.strip().splitlines()[-1]))
+    return samples
+
+
+def summarize(samples):
+    """Median of every metric across samples"""
+    summary = {
+        'import_ms': statistics.median(s['import_ms'] for s in samples),
+        'warm_request_ms': statistics.median(s['warm_request_ms'] for s in samples),
+        'rss_after_import_kb': statistics.median(s['rss_after_import_kb'] for s in samples),
+        'rss_after_first_request_kb': statistics.median(s['rss_after_first_request_kb'] for s in samples),
+        'first_request_ms': {},
+    }
+    for path in FIRST_REQUEST_PATHS:
+        summary['first_request_ms'][path] = statistics.median(s['first_request_ms'][path] for s in samples)
+    summary['cold_start_ms'] = summary['import_ms'] + sum(summary['first_request_ms'].values())
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure simulator cold-start cost')
+    parser.add_argument('--entry', choices=sorted(ENTRY_POINTS), default='factory')
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--json', action='store_true', help='print machine-readable results')
+    parser.add_argument('--probe', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.probe:
+        print(json.dumps(probe(args.entry)))
+        return
+
+    summary = summarize(run_samples(args.entry, args.runs))
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return
+
+    print("=" * 60)
+    print(f"Startup benchmark: entry={args.entry}, runs={args.runs} (medians)")
+    print("=" * 60)
+    print(f"Import + create_app:        {summary['import_ms']:8.1f} ms")
+    for path, value in summary['first_request_ms'].items():
+        print(f"First request {path:<14}{value:8.1f} ms")
+    print(f"Warm request:               {summary['warm_request_ms']:8.1f} ms")
+    print(f"Cold start total:           {summary['cold_start_ms']:8.1f} ms")
+    print(f"RSS after import:           {summary['rss_after_import_kb'] / 1024:8.1f} MB")
+    print(f"RSS after first request:    {summary['rss_after_first_request_kb'] / 1024:8.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,484 @@
+#!/usr/bin/env python
+"""
+Capture Reader - stream pcap and pcapng files through the decapsulation engine
+
+The file is memory-mapped and walked record by record: every packet is a
+memoryview into the mapping, parsed by decapsulation.py without copying,
+classified and then dropped. Pages already read are handed back to the
+kernel as the reader moves on, so resident memory stays flat whatever the
+capture size.
+
+analyze() turns a capture into a stream of report events:
+  * capture     format and size, first
+  * packets     per-packet summaries, in chunks (up to a limit)
+  * histogram   cumulative per-layer protocol counts, at regular intervals
+  * done        the final counts
+
+Layers are counted both ways the simulator teaches them: by OSI layer number
+and by TCP/IP layer, each protocol named as its ProtocolDatabase entry.
+
+Supported link types: Ethernet, raw IPv4/IPv6 and Linux cooked captures
+(SLL and SLL2). With dissect, HTTP, DNS, SMTP and FTP conversations are
+also parsed into messages as they stream past (see dissectors.py).
+
+Usage:
+    python capture.py lab1.pcap
+    python capture.py lab1.pcapng --packets 50 --no-verify
+    python capture.py mail.pcap --dissect
+    python capture.py big.pcap --ndjson > report.ndjson
+"""
+
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+
+from decapsulation import format_ip, parse_frame, parse_packet
+from encapsulation import TCP_FLAG_NAMES, TCP_FLAGS
+
+
+PCAP_MAGICS = {
+    b'\xd4\xc3\xb2\xa1': ('<', 1e-6),
+    b'\xa1\xb2\xc3\xd4': ('>', 1e-6),
+    b'\x4d\x3c\xb2\xa1': ('<', 1e-9),
+    b'\xa1\xb2\x3c\x4d': ('>', 1e-9),
+}
+PCAP_HEADER_SIZE = 24
+PCAPNG_SECTION_HEADER = 0x0A0D0D0A
+PCAPNG_LITTLE_ENDIAN = b'\x4d\x3c\x2b\x1a'
+PCAPNG_INTERFACE = 1
+PCAPNG_OBSOLETE_PACKET = 2
+PCAPNG_SIMPLE_PACKET = 3
+PCAPNG_ENHANCED_PACKET = 6
+PCAPNG_TSRESOL_OPTION = 9
+# Fixed fields before the packet data (or options) of each block type read
+PCAPNG_BODY_SIZES = {PCAPNG_INTERFACE: 8, PCAPNG_OBSOLETE_PACKET: 20, PCAPNG_SIMPLE_PACKET: 4,
+                     PCAPNG_ENHANCED_PACKET: 20}
+
+LINKTYPE_ETHERNET = 1
+LINKTYPES_RAW_IP = frozenset({12, 14, 101, 228, 229})
+LINKTYPE_LINUX_SLL = 113
+LINKTYPE_LINUX_SLL2 = 276
+LINKTYPE_NAMES = {1: 'Ethernet', 12: 'Raw IP', 14: 'Raw IP', 101: 'Raw IP', 228: 'Raw IPv4', 229: 'Raw IPv6',
+                  113: 'Linux cooked', 276: 'Linux cooked v2'}
+
+# Consumed pages are released every this many bytes
+RELEASE_BYTES = 8 * 1024 * 1024
+
+SUMMARY_CHUNK = 500
+HISTOGRAM_INTERVAL = 50000
+
+# ProtocolDatabase names for what the parser reports
+ETHERTYPE_PROTOCOLS = {0x0800: 'IPv4', 0x86DD: 'IPv6', 0x0806: 'ARP'}
+IP_PROTOCOLS = {1: 'ICMP', 6: 'TCP', 17: 'UDP', 58: 'ICMP'}
+
+
+# Reading
+
+def read_pcap(view):
+    """(offset, timestamp, linktype, data, original length) for each record of a pcap file"""
+    endian, resolution = PCAP_MAGICS[bytes(view[:4])]
+    record = struct.Struct(endian + 'IIII')
+    # The upper bits of the link type field describe an FCS, not the link
+    linktype = struct.unpack_from(endian + 'I', view, 20)[0] & 0xFFFF
+    size = len(view)
+    offset = PCAP_HEADER_SIZE
+    while offset + record.size <= size:
+        seconds, fraction, captured, original = record.unpack_from(view, offset)
+        start = offset + record.size
+        offset = start + captured
+        if offset > size:
+            return
+        yield offset, seconds + fraction * resolution, linktype, view[start:offset], original
+
+
+def interface_resolution(view, start, end, endian):
+    """Timestamp units of an interface, from its if_tsresol option"""
+    option = struct.Struct(endian + 'HH')
+    while start + option.size <= end:
+        code, length = option.unpack_from(view, start)
+        if code == 0:
+            break
+        if code == PCAPNG_TSRESOL_OPTION and length >= 1:
+            value = view[start + option.size]
+            return 2.0 ** -(value & 0x7F) if value & 0x80 else 10.0 ** -value
+        start += option.size + (length + 3) // 4 * 4
+    return 1e-6
+
+
+def read_pcapng(view):
+    """(offset, timestamp, linktype, data, original length) for each packet block of a pcapng file"""
+    size = len(view)
+    offset = 0
+    endian = '<'
+    interfaces = []
+    while offset + 12 <= size:
+        block_type = struct.unpack_from(endian + 'I', view, offset)[0]
+        if block_type == PCAPNG_SECTION_HEADER:
+            # Each section declares its own byte order and interfaces
+            endian = '<' if bytes(view[offset + 8:offset + 12]) == PCAPNG_LITTLE_ENDIAN else '>'
+            interfaces = []
+        length = struct.unpack_from(endian + 'I', view, offset + 4)[0]
+        if length < 12 or offset + length > size:
+            return
+        body = offset + 8
+        block_end = offset + length
+        offset = block_end
+        if body + PCAPNG_BODY_SIZES.get(block_type, 0) > block_end - 4:
+            continue
+
+        if block_type == PCAPNG_ENHANCED_PACKET:
+            interface, high, low, captured, original = struct.unpack_from(endian + 'IIIII', view, body)
+            data = body + 20
+        elif block_type == PCAPNG_SIMPLE_PACKET:
+            interface, high, low = 0, None, 0
+            original = struct.unpack_from(endian + 'I', view, body)[0]
+            data = body + 4
+            captured = min(original, block_end - 4 - data)
+        elif block_type == PCAPNG_OBSOLETE_PACKET:
+            interface, _, high, low, captured, original = struct.unpack_from(endian + 'HHIIII', view, body)
+            data = body + 20
+        else:
+            if block_type == PCAPNG_INTERFACE:
+                linktype = struct.unpack_from(endian + 'H', view, body)[0]
+                interfaces.append((linktype, interface_resolution(view, body + 8, block_end - 4, endian)))
+            continue
+
+        if interface >= len(interfaces) or data + captured > block_end:
+            continue
+        linktype, resolution = interfaces[interface]
+        timestamp = None if high is None else ((high << 32) | low) * resolution
+        yield offset, timestamp, linktype, view[data:data + captured], original
+
+
+class Capture:
+    """A memory-mapped pcap or pcapng file; use as a context manager
+
+    source is a path or an open binary file, which the capture then owns.
+    Raises ValueError for files that are neither format.
+    """
+
+    def __init__(self, source):
+        self.file = open(source, 'rb') if isinstance(source, (str, os.PathLike)) else source
+        self.size = os.fstat(self.file.fileno()).st_size
+        if self.size < 12:
+            self.file.close()
+            raise ValueError('Capture file is empty or truncated')
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        if hasattr(self.map, 'madvise'):
+            self.map.madvise(mmap.MADV_SEQUENTIAL)
+        self.view = memoryview(self.map)
+        magic = bytes(self.view[:4])
+        if magic in PCAP_MAGICS:
+            if self.size < PCAP_HEADER_SIZE:
+                self.close()
+                raise ValueError('Capture file is empty or truncated')
+            self.format, self.reader = 'pcap', read_pcap
+        elif struct.unpack_from('<I', magic)[0] == PCAPNG_SECTION_HEADER:
+            self.format, self.reader = 'pcapng', read_pcapng
+        else:
+            self.close()
+            raise ValueError('Not a pcap or pcapng file')
+        self.released = 0
+
+    def packets(self):
+        """(timestamp, linktype, data, original length) for every packet, in file order
+
+        data is a view into the mapping, valid only until the next packet.
+        """
+        for offset, timestamp, linktype, data, original in self.reader(self.view):
+            yield timestamp, linktype, data, original
+            if offset - self.released >= RELEASE_BYTES:
+                self.release(offset)
+
+    def release(self, offset):
+        """Let the kernel drop the pages before offset; they are re-read from the file if touched"""
+        end = offset - offset % mmap.PAGESIZE
+        if hasattr(self.map, 'madvise') and end > self.released:
+            self.map.madvise(mmap.MADV_DONTNEED, self.released, end - self.released)
+            self.released = end
+
+    def close(self):
+        try:
+            self.view.release()
+            self.map.close()
+        except BufferError:
+            # A caller still holds a packet view; the mapping goes when it does
+            pass
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def parse_captured(linktype, data, verify=True):
+    """ParsedFrame for a packet of any supported link type, or None"""
+    if linktype == LINKTYPE_ETHERNET:
+        return parse_frame(data, verify=verify)
+    if linktype in LINKTYPES_RAW_IP:
+        return parse_packet(data, verify=verify)
+    if linktype == LINKTYPE_LINUX_SLL and len(data) >= 16:
+        return parse_packet(data, struct.unpack_from('!H', data, 14)[0], 16, verify)
+    if linktype == LINKTYPE_LINUX_SLL2 and len(data) >= 20:
+        return parse_packet(data, struct.unpack_from('!H', data, 0)[0], 20, verify)
+    return None
+
+
+def write_pcap(file, frames, linktype=LINKTYPE_ETHERNET, start=0.0, interval=0.001, header=True):
+    """Write frames (bytes-like) as a microsecond pcap file, interval seconds apart
+
+    Pass header=False to append to a file already started.
+    """
+    if header:
+        file.write(struct.pack('<IHHiIII', 0xA1B2C3D4, 2, 4, 0, 0, 65535, linktype))
+    record = struct.Struct('<IIII')
+    for index, frame in enumerate(frames):
+        seconds, fraction = divmod(round((start + index * interval) * 1_000_000), 1_000_000)
+        file.write(record.pack(seconds, fraction, len(frame), len(frame)))
+        file.write(frame)
+
+
+# Classification
+
+class Classifier:
+    """Maps parsed packets onto OSI layers, TCP/IP layers and ProtocolDatabase entries
+
+    Lookups are cached, so a capture costs one database query per distinct
+    protocol or port; one classifier can serve any number of captures.
+    """
+
+    def __init__(self, protocols, tcpip_model):
+        self.protocols = protocols
+        self.tcpip_layers = {osi: layer.name for layer in tcpip_model.layers for osi in layer.osi_layers}
+        self.entries = {}
+        self.ports = {}
+        self.signatures = {}
+
+    def entry(self, name):
+        """(OSI layer, TCP/IP layer, protocol name) for a protocol, or None"""
+        if name not in self.entries:
+            protocol = self.protocols.get_protocol(name)
+            self.entries[name] = protocol and (
+                protocol.osi_layer_num, self.tcpip_layers.get(protocol.osi_layer_num), protocol.name
+            )
+        return self.entries[name]
+
+    def port_entry(self, port):
+        if port not in self.ports:
+            matches = self.protocols.get_protocols_by_port(port)
+            self.ports[port] = None
+            if matches:
+                self.ports[port] = self.entry(next(iter(matches)))
+        return self.ports[port]
+
+    def application(self, frame):
+        """Entry for the well-known port of a segment, server side first"""
+        low, high = sorted((frame.src_port, frame.dst_port))
+        return self.port_entry(low) or self.port_entry(high)
+
+    def classify(self, linktype, frame):
+        """Entries for every layer of a packet, lowest first"""
+        application = self.application(frame) if frame.transport is not None else None
+        signature = (linktype, frame.ethertype, frame.protocol if frame.network else None, application)
+        entries = self.signatures.get(signature)
+        if entries is None:
+            names = []
+            if linktype == LINKTYPE_ETHERNET and frame.dst_mac is not None:
+                names.append('Ethernet')
+            names.append(ETHERTYPE_PROTOCOLS.get(frame.ethertype))
+            if frame.network is not None:
+                names.append(IP_PROTOCOLS.get(frame.protocol))
+            entries = [entry for entry in map(self.entry, filter(None, names)) if entry]
+            if application is not None:
+                entries.append(application)
+            entries = self.signatures[signature] = tuple(entries)
+        return entries
+
+
+class Histogram:
+    """Per-layer protocol counts of a capture so far"""
+
+    def __init__(self):
+        self.packets = 0
+        self.bytes = 0
+        self.counts = {}
+        self.malformed = 0
+        self.invalid_checksums = 0
+        self.unsupported = 0
+        self.messages = {}
+        self.first_time = None
+        self.last_time = None
+
+    def add(self, entries):
+        counts = self.counts
+        for entry in entries:
+            counts[entry] = counts.get(entry, 0) + 1
+
+    def add_messages(self, messages):
+        for message in messages:
+            kinds = self.messages.setdefault(message['protocol'], {})
+            kinds[message['type']] = kinds.get(message['type'], 0) + 1
+
+    def report(self):
+        osi, tcpip = {}, {}
+        for (osi_layer, tcpip_layer, name), count in self.counts.items():
+            layer = osi.setdefault(osi_layer, {})
+            layer[name] = layer.get(name, 0) + count
+            layer = tcpip.setdefault(tcpip_layer, {})
+            layer[name] = layer.get(name, 0) + count
+        duration = None
+        if self.first_time is not None and self.last_time is not None:
+            duration = round(self.last_time - self.first_time, 6)
+        return {
+            'packets': self.packets,
+            'bytes': self.bytes,
+            'duration': duration,
+            'malformed': self.malformed,
+            'invalid_checksums': self.invalid_checksums,
+            'unsupported': self.unsupported,
+            'osi': {number: osi[number] for number in sorted(osi, reverse=True)},
+            'tcpip': tcpip,
+            'messages': self.messages,
+        }
+
+
+def summarize(number, timestamp, linktype, original, frame, entries):
+    """One packet as a row of the packet list"""
+    summary = {
+        'number': number,
+        'time': timestamp,
+        'length': original,
+        'layers': [name for _, _, name in entries],
+        'protocol': entries[-1][2] if entries else LINKTYPE_NAMES.get(linktype, f'link type {linktype}'),
+    }
+    if frame is None:
+        summary['error'] = 'Unsupported link type'
+        return summary
+    if frame.network is not None and frame.src_ip is not None:
+        summary['src'] = format_ip(frame, frame.src_ip)
+        summary['dst'] = format_ip(frame, frame.dst_ip)
+    if frame.transport is not None:
+        summary['info'] = f'{frame.src_port} → {frame.dst_port}'
+        if frame.transport == 'tcp':
+            flags = ', '.join(TCP_FLAG_NAMES[letter] for letter, bit in TCP_FLAGS.items() if frame.tcp_flags & bit)
+            summary['info'] += f' [{flags}] seq={frame.seq}'
+    summary['valid'] = frame.valid
+    if frame.error:
+        summary['error'] = frame.error
+    return summary
+
+
+def analyze(capture, classifier, summaries=1000, verify=True, dissect=False, chunk=SUMMARY_CHUNK,
+            interval=HISTOGRAM_INTERVAL):
+    """Report events for a capture; see the module docstring
+
+    summaries caps the per-packet rows; the histograms always cover every
+    packet. With dissect, conversations also go through dissectors.py and
+    each row lists the application messages its packet completed.
+    """
+    yield {'type': 'capture', 'format': capture.format, 'size': capture.size}
+    histogram = Histogram()
+    conversations = None
+    if dissect:
+        from dissectors import Conversations
+        conversations = Conversations()
+    rows = []
+    started = time.perf_counter()
+    for timestamp, linktype, data, original in capture.packets():
+        messages = ()
+        histogram.packets += 1
+        histogram.bytes += original
+        if timestamp is not None:
+            if histogram.first_time is None:
+                histogram.first_time = timestamp
+            histogram.last_time = timestamp
+
+        frame = parse_captured(linktype, data, verify)
+        if frame is None:
+            histogram.unsupported += 1
+            entries = ()
+        else:
+            if frame.error:
+                histogram.malformed += 1
+            elif verify and not frame.valid:
+                histogram.invalid_checksums += 1
+            entries = classifier.classify(linktype, frame)
+            histogram.add(entries)
+            if conversations is not None:
+                messages = conversations.packet(frame)
+                histogram.add_messages(messages)
+
+        if histogram.packets <= summaries:
+            row = summarize(histogram.packets, timestamp, linktype, original, frame, entries)
+            if messages:
+                row['messages'] = messages
+            rows.append(row)
+            if len(rows) == chunk:
+                yield {'type': 'packets', 'packets': rows}
+                rows = []
+        if histogram.packets % interval == 0:
+            yield {'type': 'histogram', **histogram.report()}
+        # Drop this packet's views before the reader moves on
+        frame = data = None
+
+    if conversations is not None:
+        histogram.add_messages(conversations.close())
+    if rows:
+        yield {'type': 'packets', 'packets': rows}
+    yield {'type': 'done', **histogram.report(), 'elapsed_ms': round((time.perf_counter() - started) * 1000, 1)}
+
+
+def open_classifier():
+    """A Classifier over the simulator's own protocol and TCP/IP layer models"""
+    from models import ProtocolDatabase, TCPIPModel
+    return Classifier(ProtocolDatabase, TCPIPModel())
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Classify the packets of a pcap or pcapng file by layer')
+    parser.add_argument('path', help='capture file')
+    parser.add_argument('--packets', type=int, default=20, help='packet summaries to show (default 20)')
+    parser.add_argument('--no-verify', action='store_true', help='skip checksum verification')
+    parser.add_argument('--dissect', action='store_true', help='parse HTTP, DNS, SMTP and FTP messages')
+    parser.add_argument('--ndjson', action='store_true', help='print every report event as a JSON line')
+    args = parser.parse_args()
+
+    try:
+        capture = Capture(args.path)
+    except (OSError, ValueError) as error:
+        print(f'✗ {args.path}: {error}', file=sys.stderr)
+        return 1
+
+    with capture:
+        for event in analyze(capture, open_classifier(), args.packets, not args.no_verify, args.dissect):
+            if args.ndjson:
+                print(json.dumps(event))
+            elif event['type'] == 'packets':
+                for row in event['packets']:
+                    route = f"{row.get('src', '')} → {row.get('dst', '')}" if 'src' in row else ''
+                    print(f"{row['number']:>7}  {row['length']:>6}  {row['protocol'][:40]:<40}  {route}  "
+                          f"{row.get('info', '')}{'  ' + row['error'] if 'error' in row else ''}")
+                    for message in row.get('messages', ()):
+                        print(f"{'':>17}{message['protocol']} {message['type']}: {message['summary']}")
+            elif event['type'] == 'done':
+                print(f"\n✓ {event['packets']:,} packets, {event['bytes']:,} bytes in {event['elapsed_ms'] / 1000:.2f}s "
+                      f"({event['malformed']} malformed, {event['invalid_checksums']} bad checksums, "
+                      f"{event['unsupported']} unsupported)")
+                for number, protocols in event['osi'].items():
+                    print(f'  OSI layer {number}')
+                    for name, count in sorted(protocols.items(), key=lambda item: -item[1]):
+                        print(f'    {count:>10,}  {name}')
+                for protocol, kinds in event['messages'].items():
+                    counts = ', '.join(f'{count:,} {kind}' for kind, count in kinds.items())
+                    print(f'  {protocol} messages: {counts}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
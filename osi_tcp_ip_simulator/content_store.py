@@ -0,0 +1,170 @@
+"""
+Protocol Content Store - compiled binary cache over data/protocols.json
+
+The catalogue is edited as JSON and compiled into a binary cache. Summary
+fields (name, layer, ports, use cases, alternatives) load eagerly; the long
+description and key points stay in a memory-mapped text blob and are only
+decoded when a protocol's detail is actually needed.
+
+Cache layout (little-endian):
+    header   MAGIC, source size, source digest, summary length, record count
+    summary  UTF-8 JSON list of summary records
+    offsets  per record: description offset/length, key points offset/length
+    blob     UTF-8 descriptions and JSON-encoded key point lists
+
+The cache is keyed on the source's content, not its mtime, so the copy
+committed next to protocols.json stays valid in any checkout and read-only
+deployments (Vercel) open it memory-mapped instead of compiling at start.
+
+Usage:
+    python content_store.py           # (re)compile the cache
+    python content_store.py --check   # exit 1 if the cache is stale
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+from pathlib import Path
+
+
+DATA_DIR = Path(__file__).resolve().parent / 'data'
+SOURCE_PATH = DATA_DIR / 'protocols.json'
+CACHE_PATH = DATA_DIR / 'protocols.bin'
+
+MAGIC = b'OSIPCS02'
+HEADER = struct.Struct('<8sQ8sII')
+OFFSETS = struct.Struct('<IIII')
+
+SUMMARY_FIELDS = ('key', 'name', 'layer', 'osi_layer_num', 'ports', 'use_cases', 'alternatives')
+
+
+def content_stamp(data):
+    """(size, digest) of the source bytes, used to detect a stale cache"""
+    return len(data), hashlib.blake2b(data, digest_size=8).digest()
+
+
+def source_stamp(source_path):
+    """content_stamp() of the source file"""
+    return content_stamp(Path(source_path).read_bytes())
+
+
+def compile_catalogue(source_path=SOURCE_PATH):
+    """Compile the JSON catalogue into cache bytes"""
+    data = Path(source_path).read_bytes()
+    records = json.loads(data.decode('utf-8'))['protocols']
+
+    summaries = []
+    offsets = []
+    blob = bytearray()
+    for record in records:
+        summaries.append({field: record.get(field, []) for field in SUMMARY_FIELDS})
+
+        description = record['description'].encode('utf-8')
+        description_offset = len(blob)
+        blob += description
+
+        key_points = json.dumps(record['key_points'], ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        key_points_offset = len(blob)
+        blob += key_points
+
+        offsets.append(OFFSETS.pack(description_offset, len(description), key_points_offset, len(key_points)))
+
+    summary = json.dumps(summaries, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    size, digest = content_stamp(data)
+    header = HEADER.pack(MAGIC, size, digest, len(summary), len(records))
+    return header + summary + b''.join(offsets) + bytes(blob)
+
+
+def write_cache(source_path=SOURCE_PATH, cache_path=CACHE_PATH, data=None):
+    """Atomically write the cache file, compiling it unless data is given"""
+    if data is None:
+        data = compile_catalogue(source_path)
+    temporary = Path(f'{cache_path}.{os.getpid()}.tmp')
+    try:
+        temporary.write_bytes(data)
+        os.replace(temporary, cache_path)
+    except OSError:
+        temporary.unlink(missing_ok=True)
+        raise
+    return data
+
+
+def cache_is_fresh(source_path=SOURCE_PATH, cache_path=CACHE_PATH):
+    """True if the cache exists and was compiled from the current source"""
+    try:
+        with open(cache_path, 'rb') as cache:
+            header = cache.read(HEADER.size)
+    except OSError:
+        return False
+    if len(header) < HEADER.size:
+        return False
+    magic, size, digest, _, _ = HEADER.unpack(header)
+    if magic != MAGIC:
+        return False
+    if not os.path.exists(source_path):
+        # Deployments may ship only the compiled cache
+        return True
+    return (size, digest) == source_stamp(source_path)
+
+
+class ContentStore:
+    """Read access to a compiled catalogue (memory-mapped when possible)"""
+
+    def __init__(self, buffer):
+        self.buffer = buffer
+        magic, _, _, summary_length, count = HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            raise ValueError('Not a protocol content cache')
+
+        summary_start = HEADER.size
+        offsets_start = summary_start + summary_length
+        self.blob_start = offsets_start + count * OFFSETS.size
+        self.summaries = json.loads(bytes(buffer[summary_start:offsets_start]).decode('utf-8'))
+        self.offsets = [OFFSETS.unpack_from(buffer, offsets_start + index * OFFSETS.size) for index in range(count)]
+
+    @classmethod
+    def open(cls, source_path=SOURCE_PATH, cache_path=CACHE_PATH):
+        """Open the cache, recompiling it first if the source changed"""
+        if not cache_is_fresh(source_path, cache_path):
+            data = compile_catalogue(source_path)
+            try:
+                write_cache(source_path, cache_path, data)
+            except OSError:
+                # Read-only deployment with a stale cache: serve the bytes just compiled
+                return cls(data)
+
+        with open(cache_path, 'rb') as cache:
+            return cls(mmap.mmap(cache.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def text(self, offset, length):
+        """Decode one slice of the text blob"""
+        start = self.blob_start + offset
+        return bytes(self.buffer[start:start + length]).decode('utf-8')
+
+    def description(self, index):
+        """Long description of the record at index"""
+        offset, length, _, _ = self.offsets[index]
+        return self.text(offset, length)
+
+    def key_points(self, index):
+        """Key points of the record at index"""
+        _, _, offset, length = self.offsets[index]
+        return json.loads(self.text(offset, length))
+
+
+def main():
+    if '--check' in sys.argv[1:]:
+        fresh = cache_is_fresh()
+        print(f"{CACHE_PATH.name} is {'up to date' if fresh else 'stale'}")
+        return 0 if fresh else 1
+
+    data = write_cache()
+    print(f"✓ Compiled {SOURCE_PATH.name} -> {CACHE_PATH.name} ({len(data) / 1024:.1f} KB)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,424 @@
+"""
+Decapsulation Engine - parse raw frames layer by layer: Ethernet II, IPv4/IPv6, TCP/UDP
+
+parse_frame() walks a frame the way a receiving host strips headers, over
+memoryview slices of the caller's buffer: nothing is copied, and the payload
+it hands back is a view into the original bytes. Along the way it verifies
+the IPv4 header checksum, the TCP/UDP checksum (with the IPv4 or IPv6
+pseudo-header) and, for frames captured with it, the Ethernet FCS.
+
+Malformed input never raises: parsing stops at the first layer that does
+not fit, keeps what was parsed so far and records why in ``error``, as a
+capture tool marks a packet as malformed.
+
+ParsedFrame keeps addresses as packed bytes, so batch jobs (pcap files,
+flow tables) pay for string formatting only when they ask for it through
+describe_frame(), which also ties each layer to its ProtocolDatabase entry.
+"""
+
+import socket
+import struct
+import zlib
+
+from encapsulation import ETHERNET, FCS, IPV4, TCP, TCP_FLAG_NAMES, TCP_FLAGS, UDP, fold, format_mac, hexdump
+
+
+ETHERTYPE_IPV4 = 0x0800
+ETHERTYPE_IPV6 = 0x86DD
+VLAN_ETHERTYPES = frozenset({0x8100, 0x88A8})
+ETHERTYPE_NAMES = {0x0800: 'IPv4', 0x0806: 'ARP', 0x86DD: 'IPv6', 0x8100: '802.1Q', 0x88A8: '802.1ad'}
+
+IPV6 = struct.Struct('!IHBB16s16s')
+VLAN_TAG = struct.Struct('!HH')
+PROTOCOL_TCP = 6
+PROTOCOL_UDP = 17
+IP_PROTOCOL_NAMES = {1: 'ICMP', 6: 'TCP', 17: 'UDP', 58: 'ICMPv6'}
+# IPv6 extension headers sized in 8-byte units after the first 8 bytes; AH counts 4-byte units
+IPV6_EXTENSION_HEADERS = frozenset({0, 43, 60})
+IPV6_FRAGMENT = 44
+IPV6_AUTHENTICATION = 51
+
+# Layer descriptions name the ProtocolDatabase entry each header belongs to
+DATABASE_NAMES = {'ethernet': 'Ethernet', 'ipv4': 'IPv4', 'ipv6': 'IPv6', 'tcp': 'TCP', 'udp': 'UDP'}
+
+
+class ParsedFrame:
+    """What parse_frame found in one frame; fields of layers it did not reach stay None"""
+
+    # Class-level defaults: a frame only stores the fields its layers set
+    src_mac = dst_mac = ethertype = None
+    vlans = ()
+    network = None            # 'ipv4', 'ipv6' or None
+    network_offset = None
+    ip_header_length = src_ip = dst_ip = protocol = ttl = None
+    identification = dont_fragment = more_fragments = fragment_offset = None
+    traffic_class = flow_label = None
+    ip_checksum = ip_checksum_ok = None
+    transport = None          # 'tcp', 'udp' or None
+    transport_offset = None
+    src_port = dst_port = None
+    seq = ack = tcp_flags = window = transport_header_length = None
+    transport_checksum = transport_checksum_ok = None
+    payload_offset = payload_end = None
+    fcs = fcs_ok = None
+    error = None
+
+    def __init__(self, data, end):
+        self.data = data
+        self.end = end
+
+    @property
+    def payload(self):
+        """The innermost payload as a view into the original buffer"""
+        if self.payload_offset is None:
+            return None
+        return self.data[self.payload_offset:self.payload_end]
+
+    @property
+    def valid(self):
+        """False if any checksum failed or the frame is malformed"""
+        return self.error is None and False not in (self.fcs_ok, self.ip_checksum_ok, self.transport_checksum_ok)
+
+    def five_tuple(self):
+        """(protocol, src ip, src port, dst ip, dst port) with packed addresses, or None"""
+        if self.transport is None:
+            return None
+        return self.protocol, self.src_ip, self.src_port, self.dst_ip, self.dst_port
+
+
+def parse_frame(data, fcs=False, verify=True):
+    """Parse one Ethernet II frame from bytes, bytearray or memoryview
+
+    fcs: the frame ends with its 4-byte FCS (most captures strip it)
+    verify: check checksums; batch jobs that only need fields can skip it
+    """
+    view = data if isinstance(data, memoryview) else memoryview(data)
+    end = len(view)
+    if fcs:
+        if end < ETHERNET.size + FCS.size:
+            frame = ParsedFrame(view, end)
+            frame.error = 'Truncated Ethernet frame'
+            return frame
+        end -= FCS.size
+    frame = ParsedFrame(view, end)
+    if fcs:
+        frame.fcs = FCS.unpack_from(view, end)[0]
+        if verify:
+            frame.fcs_ok = zlib.crc32(view[:end]) == frame.fcs
+    if end < ETHERNET.size:
+        frame.error = 'Truncated Ethernet header'
+        return frame
+
+    frame.dst_mac, frame.src_mac, ethertype = ETHERNET.unpack_from(view, 0)
+    offset = ETHERNET.size
+    if ethertype in VLAN_ETHERTYPES:
+        vlans = []
+        while ethertype in VLAN_ETHERTYPES:
+            if end - offset < VLAN_TAG.size:
+                # Keep the tags read so far and the EtherType that announced the missing one
+                frame.ethertype = ethertype
+                frame.vlans = tuple(vlans)
+                frame.error = 'Truncated VLAN tag'
+                return frame
+            tag, ethertype = VLAN_TAG.unpack_from(view, offset)
+            vlans.append(tag & 0x0FFF)
+            offset += VLAN_TAG.size
+        frame.vlans = tuple(vlans)
+    parse_network(frame, view, ethertype, offset, end, verify)
+    return frame
+
+
+def parse_packet(data, ethertype=None, offset=0, verify=True):
+    """Parse a packet that starts at its network header (raw IP or Linux cooked captures)
+
+    Without an EtherType the IP version is read from the first nibble.
+    """
+    view = data if isinstance(data, memoryview) else memoryview(data)
+    end = len(view)
+    frame = ParsedFrame(view, end)
+    if ethertype is None:
+        if offset >= end:
+            frame.error = 'Empty packet'
+            return frame
+        ethertype = ETHERTYPE_IPV6 if view[offset] >> 4 == 6 else ETHERTYPE_IPV4
+    parse_network(frame, view, ethertype, offset, end, verify)
+    return frame
+
+
+def parse_network(frame, view, ethertype, offset, end, verify):
+    frame.ethertype = ethertype
+    frame.network_offset = offset
+    if ethertype == ETHERTYPE_IPV4:
+        parse_ipv4(frame, view, offset, end, verify)
+    elif ethertype == ETHERTYPE_IPV6:
+        parse_ipv6(frame, view, offset, end, verify)
+    else:
+        frame.payload_offset, frame.payload_end = offset, end
+
+
+def parse_ipv4(frame, view, offset, end, verify):
+    if end - offset < IPV4.size:
+        frame.error = 'Truncated IPv4 header'
+        return
+    (version_ihl, _, total_length, identification, flags_fragment,
+     ttl, protocol, checksum, src_ip, dst_ip) = IPV4.unpack_from(view, offset)
+    header_length = (version_ihl & 0x0F) * 4
+    frame.network = 'ipv4'
+    frame.src_ip, frame.dst_ip, frame.protocol, frame.ttl = src_ip, dst_ip, protocol, ttl
+    frame.identification, frame.ip_checksum, frame.ip_header_length = identification, checksum, header_length
+    frame.dont_fragment = bool(flags_fragment & 0x4000)
+    frame.more_fragments = bool(flags_fragment & 0x2000)
+    frame.fragment_offset = (flags_fragment & 0x1FFF) * 8
+    if version_ihl >> 4 != 4 or header_length < IPV4.size:
+        frame.error = 'Bad IPv4 header length'
+        return
+    # Ethernet pads short packets, so the IP total length, not the frame, says where the packet ends
+    packet_end = offset + total_length
+    if total_length < header_length or packet_end > end:
+        frame.error = 'Truncated IPv4 packet'
+        return
+    if verify:
+        frame.ip_checksum_ok = fold(int.from_bytes(view[offset:offset + header_length], 'big')) == 0
+
+    start = offset + header_length
+    if frame.fragment_offset:
+        # Later fragments carry no transport header
+        frame.payload_offset, frame.payload_end = start, packet_end
+        return
+    # Addresses (8 contiguous bytes) and protocol; the segment length is added by the transport parser
+    pseudo = int.from_bytes(view[offset + 12:offset + 20], 'big') + protocol
+    parse_transport(frame, view, start, packet_end, protocol, pseudo, verify, frame.more_fragments)
+
+
+def parse_ipv6(frame, view, offset, end, verify):
+    if end - offset < IPV6.size:
+        frame.error = 'Truncated IPv6 header'
+        return
+    version_class_flow, payload_length, next_header, hop_limit, src_ip, dst_ip = IPV6.unpack_from(view, offset)
+    frame.network = 'ipv6'
+    frame.src_ip, frame.dst_ip, frame.ttl = src_ip, dst_ip, hop_limit
+    frame.traffic_class = (version_class_flow >> 20) & 0xFF
+    frame.flow_label = version_class_flow & 0xFFFFF
+    if version_class_flow >> 28 != 6:
+        frame.error = 'Bad IPv6 version'
+        return
+    packet_end = offset + IPV6.size + payload_length
+    if packet_end > end:
+        frame.error = 'Truncated IPv6 packet'
+        return
+
+    start = offset + IPV6.size
+    fragmented = False
+    while next_header in IPV6_EXTENSION_HEADERS or next_header in (IPV6_FRAGMENT, IPV6_AUTHENTICATION):
+        if packet_end - start < 8:
+            frame.error = 'Truncated IPv6 extension header'
+            return
+        header, length = view[start], view[start + 1]
+        if next_header == IPV6_FRAGMENT:
+            fragment = int.from_bytes(view[start + 2:start + 4], 'big')
+            frame.fragment_offset = fragment & 0xFFF8
+            frame.more_fragments = bool(fragment & 1)
+            frame.identification = int.from_bytes(view[start + 4:start + 8], 'big')
+            fragmented = True
+            size = 8
+        elif next_header == IPV6_AUTHENTICATION:
+            size = (length + 2) * 4
+        else:
+            size = (length + 1) * 8
+        next_header = header
+        start += size
+        if start > packet_end:
+            frame.error = 'Truncated IPv6 extension header'
+            return
+    frame.protocol = next_header
+    frame.ip_header_length = start - offset
+
+    if frame.fragment_offset:
+        frame.payload_offset, frame.payload_end = start, packet_end
+        return
+    # Both addresses (32 contiguous bytes) and the next header value
+    pseudo = int.from_bytes(view[offset + 8:offset + 40], 'big') + next_header
+    parse_transport(frame, view, start, packet_end, next_header, pseudo, verify, fragmented)
+
+
+def parse_transport(frame, view, offset, end, protocol, pseudo, verify, fragment):
+    """TCP or UDP header at offset; anything else becomes the payload
+
+    In a first fragment the header is whole but the segment is not, so its
+    checksum cannot be verified and the UDP length may exceed what is here.
+    """
+    verify = verify and not fragment
+    length = end - offset
+    frame.transport_offset = offset
+    if protocol == PROTOCOL_TCP:
+        if length < TCP.size:
+            frame.error = 'Truncated TCP header'
+            return
+        (frame.src_port, frame.dst_port, frame.seq, frame.ack, data_offset, frame.tcp_flags,
+         frame.window, frame.transport_checksum, _) = TCP.unpack_from(view, offset)
+        frame.transport = 'tcp'
+        header_length = (data_offset >> 4) * 4
+        frame.transport_header_length = header_length
+        if header_length < TCP.size or header_length > length:
+            frame.error = 'Bad TCP header length'
+            return
+    elif protocol == PROTOCOL_UDP:
+        if length < UDP.size:
+            frame.error = 'Truncated UDP header'
+            return
+        frame.src_port, frame.dst_port, udp_length, frame.transport_checksum = UDP.unpack_from(view, offset)
+        frame.transport = 'udp'
+        header_length = frame.transport_header_length = UDP.size
+        if udp_length < UDP.size or (udp_length > length and not fragment):
+            frame.error = 'Bad UDP length'
+            return
+        if not fragment:
+            end = offset + udp_length
+            length = udp_length
+        # Zero means the sender did not compute one (only allowed over IPv4)
+        if frame.transport_checksum == 0 and frame.network == 'ipv4':
+            verify = False
+    else:
+        frame.payload_offset, frame.payload_end = offset, end
+        return
+
+    if verify:
+        segment = int.from_bytes(view[offset:end], 'big')
+        if length & 1:
+            segment <<= 8
+        frame.transport_checksum_ok = fold(pseudo + length + segment) == 0
+    frame.payload_offset, frame.payload_end = offset + header_length, end
+
+
+def parse_frames(frames, fcs=False, verify=True):
+    """Parse an iterable of frames lazily, one ParsedFrame each"""
+    for data in frames:
+        yield parse_frame(data, fcs, verify)
+
+
+def format_ip(frame, packed):
+    return socket.inet_ntop(socket.AF_INET if frame.network == 'ipv4' else socket.AF_INET6, packed)
+
+
+def database_entry(protocols, name):
+    """Summary of a ProtocolDatabase entry, or None"""
+    protocol = protocols.get_protocol(name) if protocols is not None else None
+    if protocol is None:
+        return None
+    return {'name': protocol.name, 'layer': protocol.layer, 'osi_layer_num': protocol.osi_layer_num}
+
+
+def application_entries(protocols, frame):
+    """Database entries for the well-known port of a segment, server side first"""
+    if protocols is None or frame.transport is None:
+        return []
+    for port in sorted((frame.src_port, frame.dst_port)):
+        matches = protocols.get_protocols_by_port(port)
+        if matches:
+            return [{'name': protocol.name, 'layer': protocol.layer, 'osi_layer_num': protocol.osi_layer_num,
+                     'port': port} for protocol in matches.values()]
+    return []
+
+
+def checksum_status(ok):
+    return {True: 'valid', False: 'invalid', None: 'not checked'}[ok]
+
+
+def describe_layer(number, name, pdu, view, header_length, fields, protocol):
+    return {
+        'layer': number,
+        'name': name,
+        'pdu': pdu,
+        'length': len(view),
+        'header_length': header_length,
+        'header': bytes(view[:header_length]).hex(' '),
+        'fields': fields,
+        'protocol': protocol,
+        'hexdump': hexdump(view),
+    }
+
+
+def describe_frame(frame, protocols=None):
+    """JSON-ready layers from Data Link up to Application, each tied to its ProtocolDatabase entry
+
+    protocols is the ProtocolDatabase (or anything with get_protocol and
+    get_protocols_by_port); without it the entries are left out.
+    """
+    view = frame.data
+    layers = []
+    if frame.dst_mac is not None:
+        fields = {
+            'dst_mac': format_mac(frame.dst_mac),
+            'src_mac': format_mac(frame.src_mac),
+            'ethertype': f'0x{frame.ethertype:04x}' if frame.ethertype is not None else None,
+            'ethertype_name': ETHERTYPE_NAMES.get(frame.ethertype),
+        }
+        if frame.vlans:
+            fields['vlans'] = list(frame.vlans)
+        if frame.fcs is not None:
+            fields['fcs'] = f'0x{frame.fcs:08x}'
+            fields['fcs_status'] = checksum_status(frame.fcs_ok)
+        layers.append(describe_layer(2, 'Data Link', 'Frame', view[:frame.end], frame.network_offset, fields,
+                                     database_entry(protocols, DATABASE_NAMES['ethernet'])))
+
+    if frame.network is not None and frame.ip_header_length is not None:
+        packet_end = frame.payload_end if frame.payload_end is not None else frame.end
+        fields = {
+            'version': 4 if frame.network == 'ipv4' else 6,
+            'src_ip': format_ip(frame, frame.src_ip),
+            'dst_ip': format_ip(frame, frame.dst_ip),
+            'protocol': frame.protocol,
+            'protocol_name': IP_PROTOCOL_NAMES.get(frame.protocol),
+        }
+        if frame.network == 'ipv4':
+            fields.update({
+                'ttl': frame.ttl,
+                'identification': frame.identification,
+                'flags': [flag for flag, on in (('DF', frame.dont_fragment), ('MF', frame.more_fragments)) if on],
+                'fragment_offset': frame.fragment_offset,
+                'checksum': f'0x{frame.ip_checksum:04x}',
+                'checksum_status': checksum_status(frame.ip_checksum_ok),
+            })
+        else:
+            fields.update({
+                'hop_limit': frame.ttl,
+                'traffic_class': frame.traffic_class,
+                'flow_label': frame.flow_label,
+            })
+            if frame.fragment_offset is not None:
+                fields['fragment_offset'] = frame.fragment_offset
+        layers.append(describe_layer(3, 'Network', 'Packet', view[frame.network_offset:packet_end],
+                                     frame.ip_header_length, fields,
+                                     database_entry(protocols, DATABASE_NAMES[frame.network])))
+
+    if frame.transport is not None and frame.payload_end is not None:
+        fields = {'src_port': frame.src_port, 'dst_port': frame.dst_port}
+        if frame.transport == 'tcp':
+            fields.update({
+                'seq': frame.seq,
+                'ack': frame.ack,
+                'flags': [TCP_FLAG_NAMES[letter] for letter, bit in TCP_FLAGS.items() if frame.tcp_flags & bit],
+                'window': frame.window,
+            })
+        else:
+            fields['length'] = frame.payload_end - frame.transport_offset
+        fields['checksum'] = f'0x{frame.transport_checksum:04x}'
+        fields['checksum_status'] = checksum_status(frame.transport_checksum_ok)
+        layers.append(describe_layer(4, 'Transport', 'Segment', view[frame.transport_offset:frame.payload_end],
+                                     frame.transport_header_length, fields,
+                                     database_entry(protocols, DATABASE_NAMES[frame.transport])))
+
+    payload = frame.payload
+    if payload is not None:
+        text = bytes(payload).decode('utf-8', errors='replace')
+        candidates = application_entries(protocols, frame)
+        layers.append(describe_layer(7, 'Application', 'Data', payload, 0, {'text': text},
+                                     candidates[0] if candidates else None))
+        layers[-1]['candidates'] = candidates
+
+    return {
+        'length': len(view),
+        'valid': frame.valid,
+        'error': frame.error,
+        'layers': layers,
+    }
@@ -0,0 +1,909 @@
+"""
+Dissectors - incremental application-layer parsers for HTTP, DNS, SMTP and FTP
+
+A dissector follows one conversation. feed() takes the next in-order bytes
+of a TCP stream (or one UDP datagram) from either side and returns the
+messages they completed, so flows are parsed as they pass and never
+buffered whole: between calls a dissector holds at most a partial line, one
+length-prefixed DNS message and the few header values it reports. Bodies
+and mail data are counted, not stored.
+
+Every message is a dict whose 'protocol' is the ProtocolDatabase key of
+its protocol, with a 'type' (request, response, query, command, reply,
+data or error), a one-line 'summary' and protocol-specific fields.
+
+REGISTRY finds the dissector for a conversation with one dict lookup on
+its server port, falling back to content heuristics on the first payload
+of a conversation on any other port. New dissectors register with the
+@REGISTRY.register class decorator.
+
+Conversations drives the dissectors from parsed frames in capture order,
+putting each TCP direction back in sequence first.
+"""
+
+import collections
+import re
+import socket
+import struct
+
+from encapsulation import TCP_FLAGS
+
+
+MAX_LINE = 8192
+MAX_HEADERS = 100
+MAX_REPLY_LINES = 20
+MAX_DNS_RECORDS = 20
+# Out-of-order TCP data held per conversation before a hole is given up on
+MAX_PENDING_BYTES = 256 * 1024
+MAX_CONVERSATIONS = 10000
+SEQUENCE_MASK = 0xFFFFFFFF
+
+TCP_SYN, TCP_FIN, TCP_RST = TCP_FLAGS['S'], TCP_FLAGS['F'], TCP_FLAGS['R']
+
+# How a side of a text conversation consumes its bytes
+LINE, COUNT, REST, DOT, OPAQUE, BROKEN = range(6)
+
+
+class DissectorRegistry:
+    """Dissector classes by (transport, server port), plus content heuristics for other ports"""
+
+    def __init__(self):
+        self.ports = {}
+        self.heuristics = {'tcp': [], 'udp': []}
+
+    def register(self, dissector):
+        """Class decorator; the first dissector registered for a port keeps it"""
+        for transport in dissector.transports:
+            for port in dissector.ports:
+                self.ports.setdefault((transport, port), dissector)
+            if dissector.detect is not Dissector.detect:
+                self.heuristics[transport].append(dissector)
+        return dissector
+
+    def by_port(self, transport, src_port, dst_port):
+        """(dissector, sent by the client) for a packet to or from a registered port, or None"""
+        dissector = self.ports.get((transport, dst_port))
+        if dissector is not None:
+            return dissector, True
+        dissector = self.ports.get((transport, src_port))
+        if dissector is not None:
+            return dissector, False
+        return None
+
+    def by_content(self, transport, data):
+        """(dissector, sent by the client) for a first payload a heuristic recognizes, or None"""
+        for dissector in self.heuristics[transport]:
+            from_client = dissector.detect(data, transport)
+            if from_client is not None:
+                return dissector, from_client
+        return None
+
+
+REGISTRY = DissectorRegistry()
+
+
+class Dissector:
+    """One conversation of one protocol; subclasses implement feed()"""
+
+    protocol = None           # ProtocolDatabase key
+    transports = ('tcp',)
+    ports = ()
+
+    def __init__(self, transport='tcp'):
+        self.transport = transport
+        self.messages = []
+
+    def emit(self, kind, summary, **fields):
+        message = {'protocol': self.protocol, 'type': kind, 'summary': summary, **fields}
+        self.messages.append(message)
+        return message
+
+    def take(self):
+        """Messages completed since the last call"""
+        messages, self.messages = self.messages, []
+        return messages
+
+    def feed(self, data, from_client):
+        """Messages completed by the next bytes from one side"""
+        raise NotImplementedError
+
+    def gap(self, length, from_client):
+        """Messages completed after length bytes from one side were never captured"""
+        return []
+
+    def close(self):
+        """Messages completed by the end of the conversation"""
+        return []
+
+    @staticmethod
+    def detect(data, transport):
+        """True if a first payload is this protocol from the client, False if from the server, else None"""
+        return None
+
+
+class Side:
+    """Parser state for one direction of a text conversation"""
+
+    __slots__ = ('mode', 'buffer', 'remaining', 'counted', 'tail', 'phase', 'message', 'length', 'chunked',
+                 'headers', 'lines', 'code')
+
+    def __init__(self):
+        self.mode = LINE
+        self.buffer = bytearray()
+        self.remaining = self.counted = self.headers = 0
+        self.tail = b''
+        self.phase = 'start'
+        self.message = self.length = self.lines = self.code = None
+        self.chunked = False
+
+
+class TextDissector(Dissector):
+    """Line-based protocols whose sides switch between lines, counted bytes and dot-terminated data
+
+    Subclasses implement on_line() and, for the modes they use,
+    on_counted(), on_dot() and on_close().
+    """
+
+    def __init__(self, transport='tcp'):
+        super().__init__(transport)
+        # Indexed by from_client
+        self.sides = (Side(), Side())
+
+    def feed(self, data, from_client):
+        side = self.sides[from_client]
+        view = memoryview(data)
+        text = None
+        position, end = 0, len(view)
+        while position < end:
+            mode = side.mode
+            if mode == LINE:
+                if text is None:
+                    # Copied only when there are lines to split: body bytes never are
+                    text = bytes(view)
+                newline = text.find(b'\n', position)
+                if newline < 0:
+                    side.buffer += text[position:]
+                    position = end
+                    if len(side.buffer) > MAX_LINE:
+                        self.fail(side, 'Line too long')
+                    continue
+                line = text[position:newline]
+                position = newline + 1
+                if side.buffer:
+                    line = bytes(side.buffer) + line
+                    side.buffer.clear()
+                if len(line) > MAX_LINE:
+                    self.fail(side, 'Line too long')
+                    continue
+                self.on_line(from_client, line[:-1] if line.endswith(b'\r') else line)
+            elif mode == COUNT:
+                taken = min(side.remaining, end - position)
+                position += taken
+                side.remaining -= taken
+                side.counted += taken
+                if not side.remaining:
+                    side.mode = LINE
+                    self.on_counted(from_client)
+            elif mode == DOT:
+                if text is None:
+                    text = bytes(view)
+                position = self.scan_dot(side, text, position, from_client)
+            elif mode == REST:
+                side.counted += end - position
+                position = end
+            else:
+                break
+        return self.take()
+
+    def scan_dot(self, side, text, position, from_client):
+        """Count data up to the CRLF.CRLF that ends it, which may straddle segments"""
+        tail = side.tail
+        window = tail + text[position:]
+        found = window.find(b'\r\n.\r\n')
+        if found < 0:
+            side.counted += len(text) - position
+            side.tail = window[-4:]
+            return len(text)
+        # The final CRLF belongs to the data, the dot line does not
+        side.counted += found + 2 - len(tail)
+        side.tail = b''
+        side.mode = LINE
+        self.on_dot(from_client)
+        return position + found + 5 - len(tail)
+
+    def fail(self, side, reason):
+        """Stop parsing one direction; the rest of it is not trusted"""
+        side.mode = BROKEN
+        side.buffer.clear()
+        self.emit('error', reason)
+
+    def gap(self, length, from_client):
+        side = self.sides[from_client]
+        if side.mode == COUNT and length <= side.remaining:
+            # A hole in a body only shortens what is left of it
+            side.remaining -= length
+            side.counted += length
+            if not side.remaining:
+                side.mode = LINE
+                self.on_counted(from_client)
+        elif side.mode in (REST, DOT):
+            side.counted += length
+            side.tail = b''
+        elif side.mode not in (OPAQUE, BROKEN):
+            self.fail(side, f'{length} bytes missing from the capture')
+        return self.take()
+
+    def close(self):
+        for from_client, side in enumerate(self.sides):
+            if side.mode == REST and side.message is not None:
+                self.on_close(bool(from_client))
+        return self.take()
+
+    def on_line(self, from_client, line):
+        raise NotImplementedError
+
+    def on_counted(self, from_client):
+        pass
+
+    def on_dot(self, from_client):
+        pass
+
+    def on_close(self, from_client):
+        pass
+
+
+# HTTP
+
+HTTP_METHODS = frozenset({b'GET', b'HEAD', b'POST', b'PUT', b'DELETE', b'CONNECT', b'OPTIONS', b'TRACE', b'PATCH'})
+# Headers worth showing; the rest are only counted
+HTTP_HEADERS = frozenset({'host', 'user-agent', 'content-type', 'server', 'location'})
+
+
+@REGISTRY.register
+class HTTPDissector(TextDissector):
+    """HTTP/1.x requests and responses, with Content-Length, chunked and until-close bodies"""
+
+    protocol = 'HTTP'
+    ports = (80, 8000, 8080)
+
+    def __init__(self, transport='tcp'):
+        super().__init__(transport)
+        # Methods of requests still waiting for a response, which decide if it has a body
+        self.methods = collections.deque(maxlen=64)
+
+    @staticmethod
+    def detect(data, transport):
+        head = bytes(data[:8])
+        if head.startswith(b'HTTP/1.'):
+            return False
+        method, space, _ = head.partition(b' ')
+        if space and method in HTTP_METHODS:
+            return True
+        return None
+
+    def on_line(self, from_client, line):
+        side = self.sides[from_client]
+        phase = side.phase
+        if phase == 'start':
+            if line:
+                self.start_message(side, from_client, line)
+        elif phase == 'headers':
+            if line:
+                self.header(side, line)
+            else:
+                self.start_body(side, from_client)
+        elif phase == 'chunk-size':
+            try:
+                size = int(line.split(b';', 1)[0].strip(), 16)
+            except ValueError:
+                self.fail(side, 'Malformed HTTP chunk size')
+                return
+            if size:
+                side.mode, side.remaining, side.phase = COUNT, size, 'chunk-data'
+            else:
+                side.phase = 'trailers'
+        elif phase == 'chunk-end':
+            side.phase = 'chunk-size'
+        elif phase == 'trailers' and not line:
+            self.finish(side)
+
+    def start_message(self, side, from_client, line):
+        parts = line.decode('latin-1').split(' ', 2)
+        if from_client:
+            if len(parts) != 3 or parts[0].encode() not in HTTP_METHODS or not parts[2].startswith('HTTP/'):
+                self.fail(side, 'Not an HTTP request line')
+                return
+            side.message = {'type': 'request', 'method': parts[0], 'target': parts[1], 'version': parts[2]}
+            self.methods.append(parts[0])
+        else:
+            if len(parts) < 2 or not parts[0].startswith('HTTP/') or not parts[1].isdecimal():
+                self.fail(side, 'Not an HTTP status line')
+                return
+            side.message = {'type': 'response', 'version': parts[0], 'status': int(parts[1]),
+                            'reason': parts[2] if len(parts) > 2 else ''}
+        side.message['headers'] = {}
+        side.phase = 'headers'
+
+    def header(self, side, line):
+        name, separator, value = line.decode('latin-1').partition(':')
+        side.headers += 1
+        if not separator or side.headers > MAX_HEADERS:
+            self.fail(side, 'Malformed HTTP header')
+            return
+        name, value = name.strip().lower(), value.strip()
+        if name == 'content-length':
+            if not value.isdecimal():
+                self.fail(side, 'Malformed HTTP Content-Length')
+                return
+            side.length = int(value)
+        elif name == 'transfer-encoding':
+            side.chunked = 'chunked' in value.lower()
+        if name in HTTP_HEADERS:
+            side.message['headers'][name] = value
+
+    def start_body(self, side, from_client):
+        message = side.message
+        if not from_client:
+            status = message['status']
+            if status < 200:
+                # Interim responses answer no request; 101 hands the connection to another protocol
+                self.finish(side)
+                if status == 101:
+                    self.hand_over()
+                return
+            method = self.methods.popleft() if self.methods else None
+            if method == 'HEAD' or status in (204, 304):
+                self.finish(side)
+                return
+            if method == 'CONNECT' and status < 300:
+                self.finish(side)
+                self.hand_over()
+                return
+            if not side.chunked and side.length is None:
+                side.mode = REST
+                return
+        if side.chunked:
+            side.phase = 'chunk-size'
+        elif side.length:
+            side.mode, side.remaining = COUNT, side.length
+        else:
+            self.finish(side)
+
+    def hand_over(self):
+        for side in self.sides:
+            side.mode = OPAQUE
+
+    def on_counted(self, from_client):
+        side = self.sides[from_client]
+        if side.chunked:
+            side.phase = 'chunk-end'
+        else:
+            self.finish(side)
+
+    def on_close(self, from_client):
+        self.finish(self.sides[from_client])
+
+    def finish(self, side):
+        message = side.message
+        if message['type'] == 'request':
+            summary = f"{message['method']} {message['target']} {message['version']}"
+        else:
+            summary = f"{message['version']} {message['status']} {message['reason']}".rstrip()
+        self.emit(message.pop('type'), summary, **message, body_length=side.counted)
+        side.phase, side.message, side.length, side.chunked = 'start', None, None, False
+        side.counted = side.headers = 0
+        if side.mode == REST:
+            side.mode = LINE
+
+
+# FTP and SMTP
+
+class CommandDissector(TextDissector):
+    """Protocols where the client sends command lines and the server numbered, possibly multi-line, replies"""
+
+    # Commands whose argument is a credential
+    masked = frozenset()
+
+    def on_line(self, from_client, line):
+        if from_client:
+            if line:
+                self.command(line.decode('latin-1'))
+        else:
+            self.reply(self.sides[False], line.decode('latin-1'))
+
+    def command(self, text):
+        verb, _, argument = text.partition(' ')
+        verb = verb.upper()
+        if verb in self.masked and argument:
+            argument = '****'
+        message = self.emit('command', f'{verb} {argument}'.rstrip(), command=verb, argument=argument)
+        self.on_command(verb, argument, message)
+
+    def reply(self, side, text):
+        code, separator = text[:3], text[3:4]
+        if side.code is not None:
+            # Inside a multi-line reply, which ends at its code followed by a space
+            if len(side.lines) < MAX_REPLY_LINES:
+                side.lines.append(text[4:] if code == side.code else text)
+            if code == side.code and separator == ' ':
+                self.finish_reply(side)
+            return
+        if not code.isdecimal() or separator not in (' ', '-', ''):
+            self.fail(side, f'Malformed {self.protocol} reply')
+            return
+        side.code, side.lines = code, [text[4:]]
+        if separator != '-':
+            self.finish_reply(side)
+
+    def finish_reply(self, side):
+        code, lines = int(side.code), side.lines
+        side.code = side.lines = None
+        message = self.emit('reply', f'{code} {lines[0]}'.rstrip(), code=code, text='\n'.join(lines))
+        self.on_reply(code, message)
+
+    def on_command(self, verb, argument, message):
+        pass
+
+    def on_reply(self, code, message):
+        pass
+
+
+FTP_ADDRESS = re.compile(r'(\d{1,3}),(\d{1,3}),(\d{1,3}),(\d{1,3}),(\d{1,3}),(\d{1,3})')
+FTP_EXTENDED_PORT = re.compile(r'\|(\d+)\|\)?\s*$')
+
+
+def ftp_data_endpoint(message, text, extended):
+    """Add the data connection address and port announced by PORT/PASV or EPRT/EPSV"""
+    if extended:
+        match = FTP_EXTENDED_PORT.search(text)
+        if match:
+            message['data_port'] = int(match.group(1))
+        return
+    match = FTP_ADDRESS.search(text)
+    if match:
+        numbers = [int(value) for value in match.groups()]
+        message['data_address'] = '.'.join(map(str, numbers[:4]))
+        message['data_port'] = numbers[4] * 256 + numbers[5]
+
+
+@REGISTRY.register
+class FTPDissector(CommandDissector):
+    """FTP control connections; data connections are reported by the commands that open them"""
+
+    protocol = 'FTP'
+    ports = (21,)
+    masked = frozenset({'PASS', 'ACCT'})
+
+    @staticmethod
+    def detect(data, transport):
+        head = bytes(data[:80]).upper()
+        if head.startswith(b'USER '):
+            return True
+        if head.startswith(b'220') and b'FTP' in head:
+            return False
+        return None
+
+    def on_command(self, verb, argument, message):
+        if verb in ('PORT', 'EPRT'):
+            ftp_data_endpoint(message, argument, verb == 'EPRT')
+
+    def on_reply(self, code, message):
+        if code in (227, 229):
+            ftp_data_endpoint(message, message['text'], code == 229)
+
+
+SMTP_HEADERS = {'from': 'from', 'to': 'to', 'subject': 'subject'}
+
+
+@REGISTRY.register
+class SMTPDissector(CommandDissector):
+    """SMTP sessions, with each mail's headers and size once its DATA completes"""
+
+    protocol = 'SMTP'
+    # 465 is TLS from the first byte, so there is nothing to read
+    ports = (25, 587)
+    masked = frozenset({'AUTH'})
+
+    def __init__(self, transport='tcp'):
+        super().__init__(transport)
+        self.last_command = None
+        self.credentials = False
+
+    @staticmethod
+    def detect(data, transport):
+        head = bytes(data[:80]).upper()
+        if head.startswith((b'EHLO ', b'HELO ')):
+            return True
+        if head.startswith(b'220') and b'SMTP' in head:
+            return False
+        return None
+
+    def on_line(self, from_client, line):
+        side = self.sides[from_client]
+        if from_client and side.phase == 'mail-headers':
+            self.mail_header(side, line)
+        elif from_client and self.credentials:
+            # An AUTH exchange step, not a command
+            self.credentials = False
+            self.emit('command', 'AUTH ****', command='AUTH', argument='****')
+        else:
+            super().on_line(from_client, line)
+
+    def command(self, text):
+        if text.upper().startswith('AUTH '):
+            # Keep the mechanism, hide the initial response
+            mechanism, _, response = text[5:].partition(' ')
+            text = f"AUTH {mechanism}{' ****' if response else ''}"
+            self.emit('command', text, command='AUTH', argument=text[5:])
+            self.last_command = 'AUTH'
+            return
+        super().command(text)
+
+    def on_command(self, verb, argument, message):
+        self.last_command = verb
+
+    def on_reply(self, code, message):
+        if code == 354:
+            client = self.sides[True]
+            client.phase, client.message, client.counted = 'mail-headers', {}, 0
+        elif code == 334:
+            self.credentials = True
+        elif code == 220 and self.last_command == 'STARTTLS':
+            for side in self.sides:
+                side.mode = OPAQUE
+
+    def mail_header(self, side, line):
+        side.counted += len(line) + 2
+        if line == b'.':
+            side.counted -= 3
+            self.on_dot(True)
+        elif not line:
+            side.mode, side.tail = DOT, b'\r\n'
+        else:
+            name, separator, value = line.decode('latin-1').partition(':')
+            field = SMTP_HEADERS.get(name.strip().lower()) if separator else None
+            if field:
+                side.message[field] = value.strip()
+
+    def on_dot(self, from_client):
+        side = self.sides[True]
+        fields = side.message
+        self.emit('data', f"mail, {side.counted} bytes{': ' + fields['subject'] if 'subject' in fields else ''}",
+                  size=side.counted, **fields)
+        side.phase, side.message, side.counted = 'start', None, 0
+
+
+# DNS
+
+DNS_HEADER = struct.Struct('!HHHHHH')
+DNS_QUESTION = struct.Struct('!HH')
+DNS_RECORD = struct.Struct('!HHIH')
+DNS_LENGTH = struct.Struct('!H')
+DNS_TYPES = {1: 'A', 2: 'NS', 5: 'CNAME', 6: 'SOA', 12: 'PTR', 15: 'MX', 16: 'TXT', 28: 'AAAA', 33: 'SRV',
+             41: 'OPT', 64: 'SVCB', 65: 'HTTPS', 255: 'ANY'}
+DNS_RCODES = {0: 'NOERROR', 1: 'FORMERR', 2: 'SERVFAIL', 3: 'NXDOMAIN', 4: 'NOTIMP', 5: 'REFUSED'}
+
+
+def read_name(data, offset):
+    """(domain name at offset, offset after it), following compression pointers; raises ValueError"""
+    labels = []
+    resume = None
+    jumps = 0
+    while True:
+        length = data[offset]
+        if length >= 0xC0:
+            jumps += 1
+            if jumps > 32:
+                raise ValueError('DNS compression loop')
+            if resume is None:
+                resume = offset + 2
+            offset = ((length & 0x3F) << 8) | data[offset + 1]
+            continue
+        if length > 63:
+            raise ValueError('Bad DNS label')
+        offset += 1
+        if not length:
+            break
+        if offset + length > len(data):
+            raise ValueError('Truncated DNS name')
+        labels.append(bytes(data[offset:offset + length]).decode('ascii', 'replace'))
+        offset += length
+    return '.'.join(labels) or '.', resume if resume is not None else offset
+
+
+def record_data(data, kind, offset, length):
+    """Readable RDATA for the common record types"""
+    if kind == 1 and length == 4:
+        return socket.inet_ntop(socket.AF_INET, bytes(data[offset:offset + 4]))
+    if kind == 28 and length == 16:
+        return socket.inet_ntop(socket.AF_INET6, bytes(data[offset:offset + 16]))
+    if kind in (2, 5, 12):
+        return read_name(data, offset)[0]
+    if kind == 15:
+        return f'{DNS_LENGTH.unpack_from(data, offset)[0]} {read_name(data, offset + 2)[0]}'
+    return f'{length} bytes'
+
+
+def parse_dns(data):
+    """Fields of one DNS message; raises ValueError if it is malformed"""
+    try:
+        ident, flags, questions, answers, authority, additional = DNS_HEADER.unpack_from(data)
+        offset = DNS_HEADER.size
+        question_list = []
+        for _ in range(questions):
+            name, offset = read_name(data, offset)
+            kind, _ = DNS_QUESTION.unpack_from(data, offset)
+            offset += DNS_QUESTION.size
+            if len(question_list) < MAX_DNS_RECORDS:
+                question_list.append({'name': name, 'type': DNS_TYPES.get(kind, str(kind))})
+        answer_list = []
+        for _ in range(answers):
+            name, offset = read_name(data, offset)
+            kind, _, ttl, length = DNS_RECORD.unpack_from(data, offset)
+            offset += DNS_RECORD.size
+            if offset + length > len(data):
+                raise ValueError('Truncated DNS record')
+            if len(answer_list) < MAX_DNS_RECORDS:
+                answer_list.append({'name': name, 'type': DNS_TYPES.get(kind, str(kind)), 'ttl': ttl,
+                                    'data': record_data(data, kind, offset, length)})
+            offset += length
+    except (struct.error, IndexError):
+        raise ValueError('Truncated DNS message') from None
+    return {
+        'type': 'response' if flags & 0x8000 else 'query',
+        'id': ident,
+        'opcode': (flags >> 11) & 0xF,
+        'rcode': DNS_RCODES.get(flags & 0xF, str(flags & 0xF)),
+        'questions': question_list,
+        'answers': answer_list,
+        'authority': authority,
+        'additional': additional,
+    }
+
+
+def dns_summary(fields):
+    question = fields['questions'][0] if fields['questions'] else {'type': '', 'name': ''}
+    summary = f"{fields['type']} {question['type']} {question['name']}"
+    if fields['type'] == 'response':
+        results = ', '.join(answer['data'] for answer in fields['answers'])
+        summary += f": {results}" if results else f": {fields['rcode']}"
+    return summary
+
+
+@REGISTRY.register
+class DNSDissector(Dissector):
+    """DNS over UDP (one message per datagram) and TCP (length-prefixed messages)"""
+
+    protocol = 'DNS'
+    transports = ('udp', 'tcp')
+    ports = (53, 5353)
+
+    def __init__(self, transport='tcp'):
+        super().__init__(transport)
+        self.buffers = (bytearray(), bytearray())
+
+    @staticmethod
+    def detect(data, transport):
+        if transport != 'udp' or len(data) < DNS_HEADER.size:
+            return None
+        _, flags, questions, answers, _, _ = DNS_HEADER.unpack_from(data)
+        if questions != 1 or flags & 0x7800 or answers > MAX_DNS_RECORDS:
+            return None
+        try:
+            fields = parse_dns(data)
+        except ValueError:
+            return None
+        return fields['type'] == 'query'
+
+    def message(self, data):
+        try:
+            fields = parse_dns(data)
+        except ValueError as error:
+            self.emit('error', str(error))
+            return
+        summary = dns_summary(fields)
+        self.emit(fields.pop('type'), summary, **fields)
+
+    def feed(self, data, from_client):
+        if self.transport == 'udp':
+            self.message(data)
+            return self.take()
+        buffer = self.buffers[from_client]
+        buffer += data
+        while len(buffer) >= DNS_LENGTH.size:
+            length = DNS_LENGTH.unpack_from(buffer)[0]
+            if len(buffer) < DNS_LENGTH.size + length:
+                break
+            self.message(bytes(buffer[DNS_LENGTH.size:DNS_LENGTH.size + length]))
+            del buffer[:DNS_LENGTH.size + length]
+        return self.take()
+
+    def gap(self, length, from_client):
+        # The message boundaries are lost with the bytes
+        self.buffers[from_client].clear()
+        return []
+
+
+# Conversations
+
+class Conversation:
+    """A dissector and the TCP sequence state of both directions"""
+
+    __slots__ = ('dissector', 'decided', 'keys', 'next_seq', 'pending', 'pending_bytes', 'finished')
+
+    def __init__(self, keys):
+        self.dissector = None
+        self.decided = False
+        self.keys = keys
+        # Indexed by from_client, like the dissector sides
+        self.next_seq = [None, None]
+        self.pending = [None, None]
+        self.pending_bytes = 0
+        self.finished = [False, False]
+
+
+class Conversations:
+    """Feeds the packets of a capture to one dissector per conversation
+
+    packet(frame) takes parsed frames in capture order and returns the
+    messages they completed. TCP data is put back in sequence per direction
+    before it reaches a dissector: retransmitted bytes are trimmed, early
+    segments are held (up to MAX_PENDING_BYTES per conversation), and a hole
+    that never fills is reported to the dissector as a gap. At most
+    MAX_CONVERSATIONS are followed at once; the oldest is closed to make room.
+    """
+
+    def __init__(self, registry=REGISTRY, limit=MAX_CONVERSATIONS):
+        self.registry = registry
+        self.limit = limit
+        # five-tuple -> (conversation, packets with this tuple come from the client)
+        self.table = {}
+
+    def packet(self, frame):
+        if frame.transport is None:
+            return []
+        key = frame.five_tuple()
+        messages = []
+        found = self.table.get(key)
+        if found is None:
+            if len(self.table) >= 2 * self.limit:
+                # Close the oldest conversation; what that completes is reported with this packet
+                messages = self.finish(next(iter(self.table.values()))[0])
+            found = self.start(key, frame)
+        conversation, from_client = found
+        payload = frame.payload
+
+        if not conversation.decided and payload:
+            self.choose(conversation, frame.transport, payload, from_client)
+            conversation, from_client = self.table[key]
+        if frame.transport == 'udp':
+            if conversation.dissector and payload:
+                messages += conversation.dissector.feed(payload, from_client)
+            return messages
+
+        flags = frame.tcp_flags
+        if flags & TCP_SYN:
+            conversation.next_seq[from_client] = (frame.seq + 1) & SEQUENCE_MASK
+        elif payload and conversation.dissector is not None:
+            messages += self.deliver(conversation, from_client, frame.seq, payload)
+        if flags & TCP_FIN:
+            conversation.finished[from_client] = True
+        if flags & TCP_RST or all(conversation.finished):
+            messages += self.finish(conversation)
+        return messages
+
+    def start(self, key, frame):
+        """Track a new conversation, oriented by its server port if a dissector claims one"""
+        protocol, src_ip, src_port, dst_ip, dst_port = key
+        reverse = (protocol, dst_ip, dst_port, src_ip, src_port)
+        conversation = Conversation((key, reverse))
+        found = self.registry.by_port(frame.transport, src_port, dst_port)
+        from_client = True
+        if found is not None:
+            conversation.dissector = found[0](frame.transport)
+            conversation.decided = True
+            from_client = found[1]
+        self.table[key] = (conversation, from_client)
+        self.table[reverse] = (conversation, not from_client)
+        return conversation, from_client
+
+    def choose(self, conversation, transport, payload, from_client):
+        """Try the content heuristics on the first payload of a conversation on an unknown port"""
+        conversation.decided = True
+        found = self.registry.by_content(transport, payload)
+        if found is None:
+            return
+        conversation.dissector = found[0](transport)
+        if found[1] != from_client:
+            # The heuristic says the sides are the other way round
+            key, reverse = conversation.keys
+            self.table[key] = (conversation, not self.table[key][1])
+            self.table[reverse] = (conversation, not self.table[reverse][1])
+            for state in (conversation.next_seq, conversation.pending, conversation.finished):
+                state.reverse()
+
+    def deliver(self, conversation, from_client, seq, payload):
+        """Messages from a TCP segment, once the bytes before it have been delivered"""
+        expected = conversation.next_seq[from_client]
+        if expected is None:
+            # Joined mid-stream: take the first segment seen as the start
+            expected = seq
+        offset = (seq - expected) & SEQUENCE_MASK
+        if offset >= 0x80000000:
+            # Starts before what has been delivered: a retransmission or an overlap
+            behind = (expected - seq) & SEQUENCE_MASK
+            if behind >= len(payload):
+                return []
+            payload, seq, offset = payload[behind:], expected, 0
+
+        dissector = conversation.dissector
+        if offset:
+            pending = conversation.pending[from_client]
+            if pending is None:
+                pending = conversation.pending[from_client] = {}
+            if conversation.pending_bytes + len(payload) <= MAX_PENDING_BYTES:
+                if seq not in pending:
+                    pending[seq] = bytes(payload)
+                    conversation.pending_bytes += len(payload)
+                conversation.next_seq[from_client] = expected
+                return []
+            # The hole is not going to fill: skip over it and everything held
+            if seq not in pending:
+                pending[seq] = bytes(payload)
+                conversation.pending_bytes += len(payload)
+            return self.resume(conversation, from_client, expected)
+
+        messages = dissector.feed(payload, from_client)
+        expected = (expected + len(payload)) & SEQUENCE_MASK
+        pending = conversation.pending[from_client]
+        while pending and expected in pending:
+            data = pending.pop(expected)
+            conversation.pending_bytes -= len(data)
+            messages += dissector.feed(data, from_client)
+            expected = (expected + len(data)) & SEQUENCE_MASK
+        conversation.next_seq[from_client] = expected
+        return messages
+
+    def resume(self, conversation, from_client, expected):
+        """Deliver every held segment in sequence order, reporting the holes between them"""
+        dissector = conversation.dissector
+        pending = conversation.pending[from_client]
+        messages = []
+        for seq in sorted(pending, key=lambda seq: (seq - expected) & SEQUENCE_MASK):
+            data = pending[seq]
+            conversation.pending_bytes -= len(data)
+            offset = (seq - expected) & SEQUENCE_MASK
+            if offset >= 0x80000000:
+                behind = (expected - seq) & SEQUENCE_MASK
+                if behind >= len(data):
+                    continue
+                data, offset = data[behind:], 0
+            if offset:
+                messages += dissector.gap(offset, from_client)
+            messages += dissector.feed(data, from_client)
+            expected = (expected + offset + len(data)) & SEQUENCE_MASK
+        pending.clear()
+        conversation.next_seq[from_client] = expected
+        return messages
+
+    def finish(self, conversation):
+        """Stop following a conversation; returns the messages its end completes"""
+        for key in conversation.keys:
+            self.table.pop(key, None)
+        if conversation.dissector is None:
+            return []
+        messages = []
+        for from_client in (True, False):
+            # Whatever is still held arrived after a hole that will not fill now
+            if conversation.pending[from_client]:
+                messages += self.resume(conversation, from_client, conversation.next_seq[from_client])
+        return messages + conversation.dissector.close()
+
+    def close(self):
+        """Messages completed by the end of the capture"""
+        messages = []
+        for key in list(self.table):
+            found = self.table.get(key)
+            if found is not None:
+                messages += self.finish(found[0])
+        return messages
@@ -0,0 +1,352 @@
+"""
+Encapsulation Engine - real Ethernet II / IPv4 / TCP and UDP frames, byte for byte
+
+A FrameBuilder holds one flow's addressing and the checksum contribution
+of every header word that never changes. Building a frame writes all three
+headers with a single struct.pack_into and copies the payload once, into a
+preallocated buffer. Every layer's PDU is a memoryview slice of that one
+buffer (the segment inside the packet inside the frame), so no layer copies
+another.
+
+Checksums:
+  * IPv4 header and TCP/UDP (with the pseudo-header) use the RFC 1071 ones'
+    complement sum. Since 2**16 == 1 (mod 0xFFFF), the sum of 16-bit words
+    is the whole buffer read as one big integer, mod 0xFFFF, which runs in
+    C instead of a Python loop over words.
+  * The Ethernet FCS is CRC-32 (zlib.crc32), sent least significant byte first.
+
+encapsulate() builds one frame and describes every layer (fields, header
+bytes and a hex dump of the PDU) for /api/encapsulate.
+"""
+
+import ipaddress
+import re
+import struct
+import zlib
+
+
+ETHERNET = struct.Struct('!6s6sH')
+IPV4 = struct.Struct('!BBHHHBBH4s4s')
+TCP = struct.Struct('!HHIIBBHHH')
+UDP = struct.Struct('!HHHH')
+# All three headers of a frame, packed in one call
+TCP_FRAME = struct.Struct(ETHERNET.format + IPV4.format[1:] + TCP.format[1:])
+UDP_FRAME = struct.Struct(ETHERNET.format + IPV4.format[1:] + UDP.format[1:])
+FCS = struct.Struct('<I')
+WORD = struct.Struct('!H')
+SEQUENCE = struct.Struct('!I')
+
+ETHERTYPE_IPV4 = 0x0800
+PROTOCOL_NUMBERS = {'tcp': 6, 'udp': 17}
+TRANSPORT_HEADERS = {'tcp': TCP, 'udp': UDP}
+
+ETHERNET_MTU = 1500
+# Shortest frame before the FCS; shorter ones are zero-padded
+ETHERNET_MIN_FRAME = 60
+PREAMBLE = b'\x55' * 7 + b'\xd5'
+INTERFRAME_GAP = 12
+
+IP_OFFSET = ETHERNET.size
+IP_CHECKSUM = IP_OFFSET + 10
+TRANSPORT_OFFSET = IP_OFFSET + IPV4.size
+TCP_CHECKSUM = TRANSPORT_OFFSET + 16
+UDP_CHECKSUM = TRANSPORT_OFFSET + 6
+
+TCP_FLAGS = {'F': 0x01, 'S': 0x02, 'R': 0x04, 'P': 0x08, 'A': 0x10, 'U': 0x20, 'E': 0x40, 'C': 0x80}
+TCP_FLAG_NAMES = {'F': 'FIN', 'S': 'SYN', 'R': 'RST', 'P': 'PSH', 'A': 'ACK', 'U': 'URG', 'E': 'ECE', 'C': 'CWR'}
+IP_DONT_FRAGMENT = 0x4000
+
+MAC_PATTERN = re.compile(r'^[0-9a-fA-F]{2}([:-]?)[0-9a-fA-F]{2}(\1[0-9a-fA-F]{2}){4}$')
+
+DEFAULTS = {
+    'transport': 'tcp',
+    'src_mac': '02:00:00:00:00:01',
+    'dst_mac': '02:00:00:00:00:02',
+    'src_ip': '192.168.1.10',
+    'dst_ip': '93.184.216.34',
+    'src_port': 49152,
+    'dst_port': 80,
+    'ttl': 64,
+    'seq': 1,
+    'ack': 1,
+    'flags': 'PA',
+    'window': 64240,
+    'identification': 1,
+}
+
+
+def fold(total):
+    """Ones' complement checksum from a non-negative sum of 16-bit words"""
+    folded = total % 0xFFFF
+    # A ones' complement sum is zero only when every word is; otherwise it is 0xFFFF
+    if folded == 0 and total:
+        folded = 0xFFFF
+    return ~folded & 0xFFFF
+
+
+def word_sum(data):
+    """Sum of data as big-endian 16-bit words, odd length padded with a zero byte
+
+    Only congruent to the sum mod 0xFFFF, which is all fold() needs.
+    """
+    total = int.from_bytes(data, 'big')
+    return total << 8 if len(data) & 1 else total
+
+
+def internet_checksum(data, partial=0):
+    """RFC 1071 checksum of data, plus a precomputed partial word sum"""
+    return fold(word_sum(data) + partial)
+
+
+def parse_mac(value):
+    """6-byte MAC address from aa:bb:cc:dd:ee:ff, aa-bb-... or aabbccddeeff"""
+    if not MAC_PATTERN.match(value):
+        raise ValueError(f'Invalid MAC address: {value}')
+    return bytes.fromhex(value.replace(':', '').replace('-', ''))
+
+
+def parse_ipv4(value):
+    try:
+        return ipaddress.IPv4Address(value).packed
+    except ValueError:
+        raise ValueError(f'Invalid IPv4 address: {value}') from None
+
+
+def parse_flags(value):
+    """TCP flag bits from letters such as 'PA' or 'S'"""
+    bits = 0
+    for letter in value.upper():
+        if letter not in TCP_FLAGS:
+            raise ValueError(f'Unknown TCP flag: {letter}')
+        bits |= TCP_FLAGS[letter]
+    return bits
+
+
+def check_range(name, value, low, high):
+    if not low <= value <= high:
+        raise ValueError(f'{name} must be between {low} and {high}')
+    return value
+
+
+def format_mac(packed):
+    return ':'.join(f'{byte:02x}' for byte in packed)
+
+
+def hexdump(data, width=16):
+    """Offset, hex and ASCII columns, one line per width bytes"""
+    lines = []
+    for offset in range(0, len(data), width):
+        chunk = bytes(data[offset:offset + width])
+        text = ''.join(chr(byte) if 32 <= byte < 127 else '.' for byte in chunk)
+        lines.append(f'{offset:04x}  {chunk.hex(" "):<{width * 3 - 1}}  {text}')
+    return lines
+
+
+class FrameBuilder:
+    """Builds the frames of one flow into caller-provided or preallocated buffers
+
+    Each frame takes the next IP identification and, for TCP, a sequence
+    number advanced by the previous payload, as a real sender would.
+    Raises ValueError for invalid addressing or oversized payloads.
+    """
+
+    def __init__(self, transport='tcp', src_mac=DEFAULTS['src_mac'], dst_mac=DEFAULTS['dst_mac'],
+                 src_ip=DEFAULTS['src_ip'], dst_ip=DEFAULTS['dst_ip'], src_port=DEFAULTS['src_port'],
+                 dst_port=DEFAULTS['dst_port'], ttl=DEFAULTS['ttl'], seq=DEFAULTS['seq'], ack=DEFAULTS['ack'],
+                 flags=DEFAULTS['flags'], window=DEFAULTS['window'], identification=DEFAULTS['identification']):
+        if transport not in PROTOCOL_NUMBERS:
+            raise ValueError(f'Unknown transport: {transport}')
+        self.transport = transport
+        self.protocol = PROTOCOL_NUMBERS[transport]
+        self.src_mac, self.dst_mac = parse_mac(src_mac), parse_mac(dst_mac)
+        self.src_ip, self.dst_ip = parse_ipv4(src_ip), parse_ipv4(dst_ip)
+        self.src_port = check_range('src_port', src_port, 0, 0xFFFF)
+        self.dst_port = check_range('dst_port', dst_port, 0, 0xFFFF)
+        self.ttl = check_range('ttl', ttl, 1, 0xFF)
+        self.seq = check_range('seq', seq, 0, 0xFFFFFFFF)
+        self.ack = check_range('ack', ack, 0, 0xFFFFFFFF)
+        self.flags = parse_flags(flags) if transport == 'tcp' else 0
+        self.window = check_range('window', window, 0, 0xFFFF)
+        self.identification = check_range('identification', identification, 0, 0xFFFF)
+
+        self.transport_size = TRANSPORT_HEADERS[transport].size
+        self.header_size = TRANSPORT_OFFSET + self.transport_size
+        self.max_payload = ETHERNET_MTU - IPV4.size - self.transport_size
+
+        # Word sums of the header fields that are the same in every frame
+        addresses = word_sum(self.src_ip + self.dst_ip)
+        self.ip_partial = word_sum(IPV4.pack(0x45, 0, 0, 0, IP_DONT_FRAGMENT, self.ttl, self.protocol, 0,
+                                             self.src_ip, self.dst_ip))
+        ports = (self.src_port << 16) + self.dst_port
+        # Pseudo-header (addresses, protocol), then the constant transport header words
+        self.transport_partial = addresses + self.protocol + ports
+        if transport == 'tcp':
+            self.transport_partial += word_sum(SEQUENCE.pack(self.ack)) + ((TCP.size // 4) << 12) + self.flags + self.window
+
+    def pack_headers(self, view, offset, length, payload_sum):
+        """Write the three headers of the next frame and advance the per-frame counters"""
+        segment_length = self.transport_size + length
+        total_length = IPV4.size + segment_length
+        identification = self.identification
+        ip_checksum = fold(self.ip_partial + total_length + identification)
+        self.identification = (identification + 1) & 0xFFFF
+        if self.transport == 'tcp':
+            seq = self.seq
+            checksum = fold(self.transport_partial + segment_length + (seq >> 16) + (seq & 0xFFFF) + payload_sum)
+            TCP_FRAME.pack_into(
+                view, offset, self.dst_mac, self.src_mac, ETHERTYPE_IPV4,
+                0x45, 0, total_length, identification, IP_DONT_FRAGMENT, self.ttl, self.protocol, ip_checksum,
+                self.src_ip, self.dst_ip,
+                self.src_port, self.dst_port, seq, self.ack, (TCP.size // 4) << 4, self.flags, self.window,
+                checksum, 0,
+            )
+            self.seq = (seq + length) & 0xFFFFFFFF
+        else:
+            # The UDP length is counted twice: in the pseudo-header and in the header itself
+            checksum = fold(self.transport_partial + 2 * segment_length + payload_sum)
+            UDP_FRAME.pack_into(
+                view, offset, self.dst_mac, self.src_mac, ETHERTYPE_IPV4,
+                0x45, 0, total_length, identification, IP_DONT_FRAGMENT, self.ttl, self.protocol, ip_checksum,
+                self.src_ip, self.dst_ip,
+                # A computed zero is sent as all ones; zero means "no checksum" in UDP
+                self.src_port, self.dst_port, segment_length, checksum or 0xFFFF,
+            )
+
+    def frame_size(self, payload_length):
+        """Bytes a frame carrying payload_length bytes occupies, FCS included"""
+        return max(ETHERNET_MIN_FRAME, self.header_size + payload_length) + FCS.size
+
+    def build_into(self, view, offset, payload, zeroed=False):
+        """Write one frame into a writable memoryview at offset; returns its size
+
+        Pass zeroed=True when the buffer is known to be zero-filled, which
+        skips writing the padding of short frames.
+        """
+        length = len(payload)
+        if length > self.max_payload:
+            raise ValueError(f'Payload of {length} bytes exceeds the {self.max_payload}-byte maximum')
+        # Summed from the caller's bytes so the copy below is the only pass over the buffer before the CRC
+        self.pack_headers(view, offset, length, word_sum(payload))
+        start = offset + self.header_size
+        end = start + length
+        view[start:end] = payload
+
+        padded_end = offset + ETHERNET_MIN_FRAME
+        if end < padded_end:
+            if not zeroed:
+                view[end:padded_end] = bytes(padded_end - end)
+            end = padded_end
+        FCS.pack_into(view, end, zlib.crc32(view[offset:end]))
+        return end + FCS.size - offset
+
+    def build(self, payload):
+        """One frame in a buffer of its own"""
+        frame = bytearray(self.frame_size(len(payload)))
+        self.build_into(memoryview(frame), 0, payload)
+        return frame
+
+    def build_many(self, payloads):
+        """Frames for every payload, back to back in one preallocated buffer
+
+        Returns the buffer and a memoryview of each frame within it.
+        """
+        sizes = [self.frame_size(len(payload)) for payload in payloads]
+        buffer = bytearray(sum(sizes))
+        view = memoryview(buffer)
+        frames = []
+        offset = 0
+        build_into = self.build_into
+        for payload, size in zip(payloads, sizes):
+            build_into(view, offset, payload, True)
+            frames.append(view[offset:offset + size])
+            offset += size
+        return buffer, frames
+
+
+def describe_layer(number, name, pdu, view, header_size, fields):
+    """One layer of an encapsulation for the API"""
+    return {
+        'layer': number,
+        'name': name,
+        'pdu': pdu,
+        'length': len(view),
+        'header_length': header_size,
+        'header': bytes(view[:header_size]).hex(' ') if header_size else '',
+        'fields': fields,
+        'hexdump': hexdump(view),
+    }
+
+
+def encapsulate(payload, **options):
+    """Build one frame for payload and describe each layer from Application down to Physical
+
+    options are FrameBuilder's keyword arguments. Raises ValueError for
+    invalid options or an oversized payload.
+    """
+    builder = FrameBuilder(**options)
+    seq, identification = builder.seq, builder.identification
+    frame = memoryview(builder.build(payload))
+    length = len(payload)
+    segment_end = TRANSPORT_OFFSET + builder.transport_size + length
+    segment = frame[TRANSPORT_OFFSET:segment_end]
+    packet = frame[IP_OFFSET:segment_end]
+
+    if builder.transport == 'tcp':
+        transport_fields = {
+            'src_port': builder.src_port,
+            'dst_port': builder.dst_port,
+            'seq': seq,
+            'ack': builder.ack,
+            'data_offset': TCP.size // 4,
+            'flags': [TCP_FLAG_NAMES[letter] for letter, bit in TCP_FLAGS.items() if builder.flags & bit],
+            'window': builder.window,
+            'checksum': f'0x{WORD.unpack_from(frame, TCP_CHECKSUM)[0]:04x}',
+        }
+    else:
+        transport_fields = {
+            'src_port': builder.src_port,
+            'dst_port': builder.dst_port,
+            'length': len(segment),
+            'checksum': f'0x{WORD.unpack_from(frame, UDP_CHECKSUM)[0]:04x}',
+        }
+    padding = len(frame) - FCS.size - segment_end
+
+    return {
+        'transport': builder.transport,
+        'payload_length': length,
+        'frame_length': len(frame),
+        'frame': frame.hex(),
+        'layers': [
+            describe_layer(7, 'Application', 'Data', frame[segment_end - length:segment_end], 0, {}),
+            describe_layer(4, 'Transport', 'Segment', segment, builder.transport_size, transport_fields),
+            describe_layer(3, 'Network', 'Packet', packet, IPV4.size, {
+                'version': 4,
+                'ihl': IPV4.size // 4,
+                'total_length': len(packet),
+                'identification': identification,
+                'flags': ['DF'],
+                'ttl': builder.ttl,
+                'protocol': builder.protocol,
+                'checksum': f'0x{WORD.unpack_from(frame, IP_CHECKSUM)[0]:04x}',
+                'src_ip': str(ipaddress.IPv4Address(builder.src_ip)),
+                'dst_ip': str(ipaddress.IPv4Address(builder.dst_ip)),
+            }),
+            describe_layer(2, 'Data Link', 'Frame', frame, ETHERNET.size, {
+                'dst_mac': format_mac(builder.dst_mac),
+                'src_mac': format_mac(builder.src_mac),
+                'ethertype': f'0x{ETHERTYPE_IPV4:04x}',
+                'padding': padding,
+                'fcs': f'0x{FCS.unpack_from(frame, len(frame) - FCS.size)[0]:08x}',
+            }),
+            {
+                'layer': 1,
+                'name': 'Physical',
+                'pdu': 'Bits',
+                'length': len(PREAMBLE) + len(frame) + INTERFRAME_GAP,
+                'header_length': len(PREAMBLE),
+                'header': PREAMBLE.hex(' '),
+                'fields': {'preamble': PREAMBLE[:-1].hex(), 'sfd': PREAMBLE[-1:].hex(), 'interframe_gap': INTERFRAME_GAP},
+                'bits': ' '.join(f'{byte:08b}' for byte in PREAMBLE + bytes(frame[:8])),
+            },
+        ],
+    }
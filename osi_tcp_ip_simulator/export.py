@@ -0,0 +1,149 @@
+#!/usr/bin/env python
+"""
+Static Export - prerender the page and every read-only API route to files
+
+The output tree can be served by any CDN or static host with zero Python
+running per request. Each file gets precompressed .gz (and .br, when the
+optional brotli package is installed) siblings, and manifest.json maps every
+URL to its file, content type, ETag and sizes.
+
+Usage:
+    python export.py                 # writes ./dist
+    python export.py --out /tmp/site
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import mimetypes
+import shutil
+import sys
+from pathlib import Path
+
+from simulator import SIMULATOR_DIR, create_app
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always available
+    brotli = None
+
+
+def list_routes(data):
+    """Every read-only URL the simulator serves"""
+    routes = [
+        '/',
+        '/api/bootstrap',
+        f'/api/bootstrap/{data.bootstrap_version}',
+        '/api/osi-layers',
+        '/api/tcpip-layers',
+        '/api/encapsulation',
+        '/api/decapsulation',
+        '/api/layer-mapping',
+        '/api/protocols',
+    ]
+    routes += [f'/api/osi-layer/{layer.number}' for layer in data.osi_model.layers]
+    routes += [f'/api/tcpip-layer/{layer.number}' for layer in data.tcpip_model.layers]
+    routes += [f'/api/protocol/{name}' for name in data.protocols.get_all_protocols()]
+
+    layers = []
+    for protocol in data.protocols.get_all_protocols().values():
+        if protocol.layer not in layers:
+            layers.append(protocol.layer)
+    routes += [f'/api/protocols/layer/{layer}' for layer in layers]
+    routes += [f'/api/protocols/osi-layer/{layer.number}' for layer in data.osi_model.layers]
+    routes += [f'/api/protocols/port/{port}' for port in data.protocols.sorted_ports]
+    return routes
+
+
+def output_path(route, mimetype):
+    """File path (relative to the output root) for a route"""
+    if route == '/':
+        return 'index.html'
+    extension = '.json' if mimetype == 'application/json' else '.html'
+    return route.lstrip('/') + extension
+
+
+def write_variants(root, relative_path, body):
+    """Write a file plus its precompressed siblings, return their names"""
+    target = root / relative_path
+    target.parent.mkdir(parents=True, exist_ok=True)
+    target.write_bytes(body)
+
+    variants = {'identity': {'file': relative_path, 'bytes': len(body)}}
+    compressed = {'gzip': gzip.compress(body, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        compressed['br'] = brotli.compress(body, quality=11)
+
+    for encoding, payload in compressed.items():
+        if len(payload) >= len(body):
+            continue
+        suffix = '.gz' if encoding == 'gzip' else '.br'
+        (root / (relative_path + suffix)).write_bytes(payload)
+        variants[encoding] = {'file': relative_path + suffix, 'bytes': len(payload)}
+    return variants
+
+
+def export_site(out_dir, include_static=True):
+    """Render every route into out_dir and write manifest.json"""
+    from views import IMMUTABLE_CACHE_CONTROL, get_data
+
+    app = create_app()
+    data = get_data(app)
+    client = app.test_client()
+    root = Path(out_dir)
+    if root.exists():
+        if any(root.iterdir()) and not (root / 'manifest.json').exists():
+            raise SystemExit(f'{root} is not empty and is not a previous export, refusing to replace it')
+        shutil.rmtree(root)
+    root.mkdir(parents=True)
+
+    manifest = {'bootstrap_version': data.bootstrap_version, 'routes': {}, 'skipped': []}
+    for route in list_routes(data):
+        response = client.get(route)
+        if response.status_code != 200:
+            manifest['skipped'].append({'route': route, 'status': response.status_code})
+            continue
+
+        body = response.get_data()
+        relative_path = output_path(route, response.mimetype)
+        manifest['routes'][route] = {
+            'content_type': response.content_type,
+            'etag': response.headers.get('ETag') or '"%s"' % hashlib.sha256(body).hexdigest()[:32],
+            'cache_control': response.headers.get('Cache-Control', 'public, no-cache'),
+            'variants': write_variants(root, relative_path, body),
+        }
+
+    manifest['routes'][f'/api/bootstrap/{data.bootstrap_version}']['cache_control'] = IMMUTABLE_CACHE_CONTROL
+
+    if include_static:
+        for source in sorted((SIMULATOR_DIR / 'static').rglob('*')):
+            if source.is_file():
+                relative_path = source.relative_to(SIMULATOR_DIR).as_posix()
+                body = source.read_bytes()
+                manifest['routes']['/' + relative_path] = {
+                    'content_type': mimetypes.guess_type(source.name)[0] or 'application/octet-stream',
+                    'etag': '"%s"' % hashlib.sha256(body).hexdigest()[:32],
+                    'cache_control': 'public, no-cache',
+                    'variants': write_variants(root, relative_path, body),
+                }
+
+    (root / 'manifest.json').write_text(json.dumps(manifest, indent=2, sort_keys=True))
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Prerender the simulator into static files')
+    parser.add_argument('--out', default='dist', help='output directory (a previous export there is replaced)')
+    parser.add_argument('--no-static', action='store_true', help='skip copying static/ assets')
+    args = parser.parse_args()
+
+    manifest = export_site(args.out, include_static=not args.no_static)
+    total = sum(entry['variants']['identity']['bytes'] for entry in manifest['routes'].values())
+    print(f"✓ Exported {len(manifest['routes'])} routes ({total / 1024:.1f} KB) to {args.out}")
+    for skipped in manifest['skipped']:
+        print(f"  skipped {skipped['route']} (HTTP {skipped['status']})")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,621 @@
+#!/usr/bin/env python
+"""
+Flow Table - connection tracking for captured traffic
+
+FlowTable follows every conversation in a capture by its 5-tuple (IP
+protocol, addresses and ports), the way a router's NetFlow cache or Linux
+conntrack does. For each flow it keeps:
+  * packets and bytes in each direction
+  * TCP state, from the SYN, FIN and RST flags seen
+  * RTT: the handshake time, and data segments timed against their ACKs on
+    each side of the capture point (retransmitted segments are not timed)
+  * an idle timeout that depends on the state, enforced by a timer wheel
+
+A packet costs one dict lookup on a packed 5-tuple and a few attribute
+updates, whatever the table size. A flow is looked at once per turn of
+the wheel, not on every packet. The table holds at most max_flows; when it
+is full, the flow nearest its timeout is ended early.
+
+Ended flows are handed to an export callback as NetFlow-style records
+(bidirectional, IPFIX style). FlowReport totals them per ProtocolDatabase
+protocol, and NetFlowExporter packs them into real NetFlow v5 datagrams.
+
+Usage:
+    python flows.py lab1.pcap
+    python flows.py big.pcapng --top 50
+    python flows.py lab1.pcap --netflow lab1-netflow.pcap
+"""
+
+import argparse
+import heapq
+import socket
+import struct
+import sys
+
+from encapsulation import TCP_FLAGS, parse_flags
+
+
+FLOW_KEY_PORTS = struct.Struct('!BHH')
+SEQUENCE_MASK = 0xFFFFFFFF
+SEQUENCE_HALF = 0x80000000
+TCP_SYN, TCP_ACK, TCP_FIN, TCP_RST = TCP_FLAGS['S'], TCP_FLAGS['A'], TCP_FLAGS['F'], TCP_FLAGS['R']
+PROTOCOL_TCP = 6
+
+# Seconds a flow may stay idle in each state before it is ended
+TIMEOUTS = {
+    'SYN_SENT': 30,
+    'SYN_RECEIVED': 30,
+    'ESTABLISHED': 300,
+    'FIN_WAIT': 60,
+    'TIME_WAIT': 10,
+    'CLOSED': 10,
+    'UNREPLIED': 30,
+    'REPLIED': 120,
+}
+WHEEL_SLOTS = 512
+WHEEL_RESOLUTION = 1.0
+MAX_FLOWS = 262144
+# Weight of a new RTT sample in the smoothed RTT (RFC 6298)
+RTT_GAIN = 0.125
+
+IP_PROTOCOL_NAMES = {1: 'ICMP', 6: 'TCP', 17: 'UDP', 58: 'ICMP'}
+WELL_KNOWN_PORTS = 1024
+
+
+class Flow:
+    """One conversation; the client is the side that opened it
+
+    key is the packed 5-tuple with the lower endpoint first; client_first
+    says whether that endpoint is the client. 'reverse' counters are for
+    server-to-client packets.
+    """
+
+    __slots__ = ('key', 'client_first', 'state', 'first', 'last', 'tick',
+                 'packets', 'bytes', 'reverse_packets', 'reverse_bytes')
+
+    def __init__(self, key, client_first, now):
+        self.key = key
+        self.client_first = client_first
+        self.state = 'UNREPLIED'
+        self.first = self.last = now
+        self.tick = None
+        self.packets = self.bytes = self.reverse_packets = self.reverse_bytes = 0
+
+    def update(self, frame, now, from_client):
+        """Move the state on for a packet; returns True if the state changed"""
+        if not from_client and self.state == 'UNREPLIED':
+            self.state = 'REPLIED'
+            return True
+        return False
+
+    def endpoints(self):
+        """(protocol, client address, client port, server address, server port), addresses packed"""
+        key = self.key
+        length = (len(key) - FLOW_KEY_PORTS.size) // 2
+        protocol, first_port, second_port = FLOW_KEY_PORTS.unpack_from(key, 2 * length)
+        first, second = key[:length], key[length:2 * length]
+        if self.client_first:
+            return protocol, first, first_port, second, second_port
+        return protocol, second, second_port, first, first_port
+
+    def record(self, reason):
+        """The flow as a NetFlow-style bidirectional record"""
+        protocol, src, src_port, dst, dst_port = self.endpoints()
+        family = socket.AF_INET if len(src) == 4 else socket.AF_INET6
+        return {
+            'src_addr': socket.inet_ntop(family, src),
+            'src_port': src_port,
+            'dst_addr': socket.inet_ntop(family, dst),
+            'dst_port': dst_port,
+            'protocol': protocol,
+            'protocol_name': IP_PROTOCOL_NAMES.get(protocol, f'IP protocol {protocol}'),
+            'first_seen': self.first,
+            'last_seen': self.last,
+            'duration_ms': round((self.last - self.first) * 1000, 3),
+            'packets': self.packets,
+            'bytes': self.bytes,
+            'reverse_packets': self.reverse_packets,
+            'reverse_bytes': self.reverse_bytes,
+            'state': self.state,
+            'end_reason': reason,
+        }
+
+
+class TCPFlow(Flow):
+    """A TCP connection: state machine, flags, RTT samples and retransmissions"""
+
+    __slots__ = ('flags', 'reverse_flags', 'syn_time', 'handshake', 'retransmissions',
+                 'sent', 'probe', 'probe_time', 'reverse_sent', 'reverse_probe', 'reverse_probe_time',
+                 'server_rtt', 'server_rtt_min', 'server_samples', 'client_rtt', 'client_rtt_min', 'client_samples')
+
+    def __init__(self, key, client_first, now):
+        super().__init__(key, client_first, now)
+        self.state = 'ESTABLISHED'
+        self.flags = self.reverse_flags = self.retransmissions = 0
+        self.syn_time = self.handshake = None
+        self.sent = self.probe = self.probe_time = None
+        self.reverse_sent = self.reverse_probe = self.reverse_probe_time = None
+        self.server_rtt = self.server_rtt_min = self.client_rtt = self.client_rtt_min = None
+        self.server_samples = self.client_samples = 0
+
+    def update(self, frame, now, from_client):
+        flags = frame.tcp_flags
+        state = self.state
+        if flags & TCP_RST:
+            self.state = 'CLOSED'
+        elif flags & TCP_SYN:
+            if not flags & TCP_ACK:
+                self.state = 'SYN_SENT'
+                if self.syn_time is None:
+                    self.syn_time = now
+            elif state == 'SYN_SENT' or state == 'ESTABLISHED' and not self.packets:
+                self.state = 'SYN_RECEIVED'
+        elif flags & TCP_FIN:
+            if state == 'FIN_WAIT' and (self.flags if not from_client else self.reverse_flags) & TCP_FIN:
+                self.state = 'TIME_WAIT'
+            elif state not in ('TIME_WAIT', 'CLOSED'):
+                self.state = 'FIN_WAIT'
+        elif state == 'SYN_RECEIVED' and from_client and flags & TCP_ACK:
+            self.state = 'ESTABLISHED'
+            if self.syn_time is not None:
+                self.handshake = now - self.syn_time
+
+        # Sequence space this segment covers; SYN and FIN take one number each. A bad
+        # header length leaves no payload bounds, so only the flags count
+        length = bool(flags & TCP_SYN) + bool(flags & TCP_FIN)
+        if frame.payload_end is not None:
+            length += frame.payload_end - frame.payload_offset
+        if from_client:
+            self.flags |= flags
+            if length:
+                self.segment(frame.seq, length, now, True)
+            if flags & TCP_ACK and self.reverse_probe is not None:
+                self.acknowledge(frame.ack, now, True)
+        else:
+            self.reverse_flags |= flags
+            if length:
+                self.segment(frame.seq, length, now, False)
+            if flags & TCP_ACK and self.probe is not None:
+                self.acknowledge(frame.ack, now, False)
+        return self.state != state
+
+    def segment(self, seq, length, now, from_client):
+        """Time the first new segment in flight; a retransmission cancels the timing (Karn)"""
+        end = (seq + length) & SEQUENCE_MASK
+        sent = self.sent if from_client else self.reverse_sent
+        if sent is not None and (end - sent) & SEQUENCE_MASK >= SEQUENCE_HALF or end == sent:
+            self.retransmissions += 1
+            if from_client:
+                self.probe = None
+            else:
+                self.reverse_probe = None
+            return
+        if from_client:
+            self.sent = end
+            if self.probe is None:
+                self.probe, self.probe_time = end, now
+        else:
+            self.reverse_sent = end
+            if self.reverse_probe is None:
+                self.reverse_probe, self.reverse_probe_time = end, now
+
+    def acknowledge(self, ack, now, from_client):
+        """Take an RTT sample if this ACK covers the other side's timed segment"""
+        if from_client:
+            # The client acknowledging server data: the capture point to client leg
+            if (ack - self.reverse_probe) & SEQUENCE_MASK >= SEQUENCE_HALF:
+                return
+            sample = now - self.reverse_probe_time
+            self.reverse_probe = None
+            self.client_samples += 1
+            self.client_rtt = sample if self.client_rtt is None else self.client_rtt + RTT_GAIN * (sample - self.client_rtt)
+            self.client_rtt_min = sample if self.client_rtt_min is None else min(self.client_rtt_min, sample)
+        else:
+            if (ack - self.probe) & SEQUENCE_MASK >= SEQUENCE_HALF:
+                return
+            sample = now - self.probe_time
+            self.probe = None
+            self.server_samples += 1
+            self.server_rtt = sample if self.server_rtt is None else self.server_rtt + RTT_GAIN * (sample - self.server_rtt)
+            self.server_rtt_min = sample if self.server_rtt_min is None else min(self.server_rtt_min, sample)
+
+    def record(self, reason):
+        record = super().record(reason)
+        record['tcp_flags'] = flag_letters(self.flags)
+        record['reverse_tcp_flags'] = flag_letters(self.reverse_flags)
+        record['retransmissions'] = self.retransmissions
+        record['handshake_ms'] = milliseconds(self.handshake)
+        record['rtt'] = {
+            'server_ms': milliseconds(self.server_rtt), 'server_min_ms': milliseconds(self.server_rtt_min),
+            'server_samples': self.server_samples,
+            'client_ms': milliseconds(self.client_rtt), 'client_min_ms': milliseconds(self.client_rtt_min),
+            'client_samples': self.client_samples,
+        }
+        return record
+
+
+def flag_letters(flags):
+    return ''.join(letter for letter, bit in TCP_FLAGS.items() if flags & bit)
+
+
+def milliseconds(seconds):
+    return None if seconds is None else round(seconds * 1000, 3)
+
+
+class TimerWheel:
+    """Hashed timing wheel: O(1) to schedule, and each tick only looks at its own slot
+
+    An entry is (tick, item). Entries further than one turn away sit in
+    their slot through earlier turns, and the owner decides what is due.
+    """
+
+    def __init__(self, slots=WHEEL_SLOTS, resolution=WHEEL_RESOLUTION):
+        self.slots = [[] for _ in range(slots)]
+        self.resolution = resolution
+        self.tick = None
+
+    def tick_of(self, time):
+        return int(time // self.resolution)
+
+    def schedule(self, item, tick):
+        """Add an entry; ticks already passed go in the next slot. Returns the tick used"""
+        if self.tick is not None and tick <= self.tick:
+            tick = self.tick + 1
+        self.slots[tick % len(self.slots)].append((tick, item))
+        return tick
+
+    def advance(self, now):
+        """Entries from every slot passed since the last call, each slot at most once"""
+        target = self.tick_of(now)
+        if self.tick is None:
+            self.tick = target
+            return []
+        if target <= self.tick:
+            return []
+        due = []
+        slots = self.slots
+        for tick in range(self.tick + 1, self.tick + 1 + min(target - self.tick, len(slots))):
+            index = tick % len(slots)
+            if slots[index]:
+                due += slots[index]
+                slots[index] = []
+        self.tick = target
+        return due
+
+    def clear(self):
+        for slot in self.slots:
+            slot.clear()
+
+    def soonest(self):
+        """Pop the entry from the next non-empty slot, or None"""
+        slots = self.slots
+        start = self.tick if self.tick is not None else 0
+        for step in range(1, len(slots) + 1):
+            slot = slots[(start + step) % len(slots)]
+            if slot:
+                return slot.pop()
+        return None
+
+
+class FlowTable:
+    """Connection tracking over parsed packets in capture order
+
+    export(record) receives every ended flow. Records are built only then,
+    so the table itself holds nothing but live Flow objects.
+    """
+
+    def __init__(self, export, max_flows=MAX_FLOWS, timeouts=TIMEOUTS, wheel=None):
+        self.export = export
+        self.max_flows = max_flows
+        self.timeouts = timeouts
+        self.wheel = wheel or TimerWheel()
+        self.flows = {}
+        self.now = 0.0
+        self.started = None
+        # Time at which the wheel next has a slot to look at
+        self.horizon = float('-inf')
+        self.created = self.evicted = self.peak = 0
+        # Wheel entries superseded by an earlier one for the same flow
+        self.stale = 0
+
+    def packet(self, frame, now, length):
+        """Account one parsed packet; returns its Flow, or None for non-IP packets"""
+        src, dst, protocol = frame.src_ip, frame.dst_ip, frame.protocol
+        if src is None or protocol is None:
+            return None
+        if frame.transport is not None:
+            src_port, dst_port = frame.src_port, frame.dst_port
+        else:
+            src_port = dst_port = 0
+        if src < dst or (src == dst and src_port <= dst_port):
+            key, first = src + dst + FLOW_KEY_PORTS.pack(protocol, src_port, dst_port), True
+        else:
+            key, first = dst + src + FLOW_KEY_PORTS.pack(protocol, dst_port, src_port), False
+
+        if now is None or now < self.now:
+            now = self.now
+        if self.started is None:
+            self.started = now
+        self.now = now
+        if now >= self.horizon:
+            self.expire(now)
+
+        flow = self.flows.get(key)
+        if flow is None:
+            flow = self.start(key, first, frame, src_port, dst_port, now)
+        else:
+            flow.last = now
+        from_client = first == flow.client_first
+        if from_client:
+            flow.packets += 1
+            flow.bytes += length
+        else:
+            flow.reverse_packets += 1
+            flow.reverse_bytes += length
+        changed = flow.update(frame, now, from_client)
+        if flow.tick is None:
+            flow.tick = self.wheel.schedule(flow, self.wheel.tick_of(now + self.timeouts[flow.state]))
+        elif changed:
+            # A state with a shorter timeout needs an earlier slot; later ones are found lazily
+            tick = self.wheel.tick_of(now + self.timeouts[flow.state])
+            if tick < flow.tick:
+                flow.tick = self.wheel.schedule(flow, tick)
+                self.stale += 1
+                if self.stale > max(len(self.flows), len(self.wheel.slots)):
+                    self.compact()
+        return flow
+
+    def start(self, key, first, frame, src_port, dst_port, now):
+        if len(self.flows) >= self.max_flows:
+            self.evict()
+        # The sender opened the flow, unless its packet answers a SYN or comes from a well-known port
+        if frame.transport == 'tcp' and frame.tcp_flags & TCP_SYN:
+            sender_is_client = not frame.tcp_flags & TCP_ACK
+        else:
+            sender_is_client = not (src_port < WELL_KNOWN_PORTS <= dst_port)
+        flow_class = TCPFlow if frame.protocol == PROTOCOL_TCP and frame.transport == 'tcp' else Flow
+        flow = flow_class(key, first == sender_is_client, now)
+        self.flows[key] = flow
+        self.created += 1
+        if len(self.flows) > self.peak:
+            self.peak = len(self.flows)
+        return flow
+
+    def expire(self, now):
+        """End the flows whose idle timeout has passed; reschedule the rest of the slots' entries"""
+        wheel = self.wheel
+        for tick, flow in wheel.advance(now):
+            if flow.tick != tick:
+                # Superseded by an earlier entry
+                self.stale -= 1
+                continue
+            deadline = flow.last + self.timeouts[flow.state]
+            if deadline <= now:
+                self.end(flow, 'idle timeout')
+            else:
+                flow.tick = wheel.schedule(flow, wheel.tick_of(deadline))
+        self.horizon = (wheel.tick + 1) * wheel.resolution
+
+    def evict(self):
+        """Make room by ending the flow closest to its timeout"""
+        while True:
+            entry = self.wheel.soonest()
+            if entry is None:
+                return
+            tick, flow = entry
+            if flow.tick == tick:
+                self.evicted += 1
+                self.end(flow, 'evicted')
+                return
+            self.stale -= 1
+
+    def compact(self):
+        """Drop superseded wheel entries, which would otherwise keep ended flows in memory"""
+        slots = self.wheel.slots
+        for index, slot in enumerate(slots):
+            if slot:
+                slots[index] = [entry for entry in slot if entry[1].tick == entry[0]]
+        self.stale = 0
+
+    def end(self, flow, reason):
+        """Export a flow; its wheel entries are stale from here on"""
+        del self.flows[flow.key]
+        flow.tick = None
+        self.export(flow.record(reason))
+
+    def flush(self, reason='end of capture'):
+        """End every flow still in the table"""
+        for flow in list(self.flows.values()):
+            self.end(flow, reason)
+        self.wheel.clear()
+        self.stale = 0
+
+
+class FlowReport:
+    """Totals per ProtocolDatabase protocol and the largest flows, from exported records
+
+    The classifier is a capture.Classifier; flows are matched to the
+    protocol of their server port, or failing that their IP protocol.
+    """
+
+    def __init__(self, classifier, top=100):
+        self.classifier = classifier
+        self.top = top
+        self.flows = 0
+        self.protocols = {}
+        self.end_reasons = {}
+        self.largest = []
+
+    def add(self, record):
+        self.flows += 1
+        name = self.protocol_name(record)
+        totals = self.protocols.get(name)
+        if totals is None:
+            totals = self.protocols[name] = {'flows': 0, 'packets': 0, 'bytes': 0}
+        totals['flows'] += 1
+        totals['packets'] += record['packets'] + record['reverse_packets']
+        size = record['bytes'] + record['reverse_bytes']
+        totals['bytes'] += size
+        record['application'] = name
+        reason = record['end_reason']
+        self.end_reasons[reason] = self.end_reasons.get(reason, 0) + 1
+        # A bounded min-heap keeps the top flows by bytes; the count breaks ties in capture order
+        entry = (size, -self.flows, record)
+        if len(self.largest) < self.top:
+            heapq.heappush(self.largest, entry)
+        elif entry > self.largest[0]:
+            heapq.heapreplace(self.largest, entry)
+
+    def protocol_name(self, record):
+        if record['protocol'] in (PROTOCOL_TCP, 17):
+            entry = self.classifier.port_entry(record['dst_port']) or self.classifier.port_entry(record['src_port'])
+            if entry is not None:
+                return entry[2]
+        entry = self.classifier.entry(record['protocol_name'])
+        return entry[2] if entry is not None else record['protocol_name']
+
+    def report(self):
+        return {
+            'flows': self.flows,
+            'end_reasons': self.end_reasons,
+            'protocols': [{'protocol': name, **totals}
+                          for name, totals in sorted(self.protocols.items(), key=lambda item: -item[1]['bytes'])],
+            'largest': [record for _, _, record in sorted(self.largest, reverse=True)],
+        }
+
+
+# NetFlow v5
+
+NETFLOW_HEADER = struct.Struct('!HHIIIIBBH')
+NETFLOW_RECORD = struct.Struct('!4s4s4sHHIIIIHHBBBBHHBBH')
+NETFLOW_MAX_RECORDS = 30
+NETFLOW_PORT = 2055
+
+
+class NetFlowExporter:
+    """Packs records into NetFlow v5 datagrams and writes them to a pcap as UDP to port 2055
+
+    v5 carries one direction of an IPv4 flow per record, so a flow becomes
+    up to two records and IPv6 flows are left out. Times are milliseconds
+    of exporter uptime, counted from the first packet the table saw.
+    """
+
+    def __init__(self, file, table):
+        from encapsulation import FrameBuilder
+
+        self.file = file
+        self.table = table
+        self.builder = FrameBuilder('udp', src_port=NETFLOW_PORT, dst_port=NETFLOW_PORT)
+        self.batch = []
+        self.sequence = 0
+        self.datagrams = 0
+        self.export_time = 0.0
+
+    def add(self, record):
+        if ':' in record['src_addr']:
+            return
+        boot_time = self.table.started
+        src, dst = socket.inet_aton(record['src_addr']), socket.inet_aton(record['dst_addr'])
+        first = int((record['first_seen'] - boot_time) * 1000) & 0xFFFFFFFF
+        last = int((record['last_seen'] - boot_time) * 1000) & 0xFFFFFFFF
+        self.export_time = max(self.export_time, record['last_seen'])
+        directions = (
+            (src, dst, record['src_port'], record['dst_port'], record['packets'], record['bytes'],
+             record.get('tcp_flags', '')),
+            (dst, src, record['dst_port'], record['src_port'], record['reverse_packets'], record['reverse_bytes'],
+             record.get('reverse_tcp_flags', '')),
+        )
+        for source, destination, source_port, destination_port, packets, size, flags in directions:
+            if packets:
+                self.batch.append(NETFLOW_RECORD.pack(
+                    source, destination, bytes(4), 0, 0, packets, size & 0xFFFFFFFF, first, last,
+                    source_port, destination_port, 0, parse_flags(flags), record['protocol'], 0, 0, 0, 0, 0, 0,
+                ))
+        if len(self.batch) >= NETFLOW_MAX_RECORDS:
+            self.send(self.batch[:NETFLOW_MAX_RECORDS])
+            del self.batch[:NETFLOW_MAX_RECORDS]
+
+    def send(self, records):
+        from capture import write_pcap
+
+        # A capture without packets never started the table's clock
+        boot_time = self.export_time if self.table.started is None else self.table.started
+        # Both the header and the pcap record hold 32-bit seconds
+        export_time = self.export_time % 2 ** 32
+        seconds, fraction = divmod(export_time, 1)
+        header = NETFLOW_HEADER.pack(5, len(records), int((self.export_time - boot_time) * 1000) & 0xFFFFFFFF,
+                                     int(seconds), int(fraction * 1e9), self.sequence & 0xFFFFFFFF, 0, 0, 0)
+        frame = self.builder.build(header + b''.join(records))
+        write_pcap(self.file, [frame], start=export_time, header=self.datagrams == 0)
+        self.sequence += len(records)
+        self.datagrams += 1
+
+    def close(self):
+        """Send the last, partly filled datagram"""
+        if self.batch or not self.datagrams:
+            self.send(self.batch)
+            self.batch = []
+
+
+def track(capture, table, verify=False):
+    """Run every packet of a capture.Capture through a FlowTable; returns the packet count"""
+    from capture import parse_captured
+
+    packets = 0
+    for timestamp, linktype, data, original in capture.packets():
+        packets += 1
+        frame = parse_captured(linktype, data, verify)
+        if frame is not None:
+            table.packet(frame, timestamp, original)
+        frame = data = None
+    return packets
+
+
+def main():
+    from capture import Capture, open_classifier
+
+    parser = argparse.ArgumentParser(description='Track the flows of a pcap or pcapng file')
+    parser.add_argument('path', help='capture file')
+    parser.add_argument('--top', type=int, default=20, help='largest flows to list (default 20)')
+    parser.add_argument('--max-flows', type=int, default=MAX_FLOWS, help=f'flow table size (default {MAX_FLOWS})')
+    parser.add_argument('--netflow', metavar='PCAP', help='also write the NetFlow v5 export of every flow here')
+    args = parser.parse_args()
+
+    report = FlowReport(open_classifier(), args.top)
+    table = FlowTable(report.add, args.max_flows)
+    try:
+        capture = Capture(args.path)
+    except (OSError, ValueError) as error:
+        print(f'✗ {args.path}: {error}', file=sys.stderr)
+        return 1
+    netflow = open(args.netflow, 'wb') if args.netflow else None
+    if netflow:
+        exporter = NetFlowExporter(netflow, table)
+        table.export = lambda record: (report.add(record), exporter.add(record))
+    with capture:
+        packets = track(capture, table)
+    table.flush()
+    if netflow:
+        exporter.close()
+        netflow.close()
+
+    result = report.report()
+    print(f"✓ {packets:,} packets, {result['flows']:,} flows (peak {table.peak:,} concurrent, "
+          f"{table.evicted:,} evicted)")
+    for totals in result['protocols']:
+        print(f"  {totals['flows']:>9,} flows  {totals['packets']:>11,} packets  {totals['bytes']:>14,} bytes  "
+              f"{totals['protocol']}")
+    print()
+    for record in result['largest']:
+        rtt = record.get('rtt', {}).get('server_ms')
+        print(f"  {record['protocol_name']:<5} {record['src_addr']}:{record['src_port']} → "
+              f"{record['dst_addr']}:{record['dst_port']}  {record['packets'] + record['reverse_packets']:,} packets  "
+              f"{record['bytes'] + record['reverse_bytes']:,} bytes  {record['state']}"
+              f"{f'  rtt {rtt} ms' if rtt is not None else ''}")
+    if netflow:
+        print(f'\n✓ {exporter.datagrams:,} NetFlow v5 datagrams written to {args.netflow}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,793 @@
+#!/usr/bin/env python
+"""
+Network Simulation - discrete-event simulation of hosts, switches and routers
+
+Simulator runs events in time order from a heap of (time, sequence,
+callback, arguments) tuples; the sequence keeps events due at the same time
+in the order they were scheduled. Nothing sleeps: the clock jumps to the
+next event, so a run costs CPU per event, not per simulated second.
+
+A Network is built from:
+  * Host      one interface. Encapsulates payloads into real frames with
+              encapsulation.FrameBuilder, and parses what arrives with
+              decapsulation.parse_frame, checksums included (layers 7-1, 1-7)
+  * Switch    checks the FCS, learns source MACs per port, and forwards or
+              floods on the destination MAC (layers 1-2)
+  * Router    checks the IPv4 header checksum, decrements the TTL, looks the
+              destination up longest prefix first, rewrites both MACs and
+              recomputes the header checksum and FCS (layers 1-3)
+and links with a bandwidth, a propagation delay, a loss rate and a
+drop-tail queue in each direction. A frame holds the link for its
+serialization time (preamble and inter-frame gap included) and waits behind
+the frames queued before it.
+
+MAC addresses are resolved from the topology (static ARP), and there is no
+TCP state machine: TCP segments are sent as built. Every step goes into a
+Timeline for the frontend to play back, up to a limit; past it, events are
+only counted.
+
+Usage:
+    python netsim.py                          # the lab path: two LANs, two routers
+    python netsim.py --message "Hi" --loss 0.5
+    python netsim.py topology.json --events 2000000
+"""
+
+import argparse
+import heapq
+import ipaddress
+import itertools
+import json
+import math
+import random
+import sys
+import zlib
+
+from decapsulation import parse_frame
+from encapsulation import (DEFAULTS, ETHERNET_MTU, FCS, INTERFRAME_GAP, IP_CHECKSUM, IP_OFFSET, IPV4, PREAMBLE,
+                           TRANSPORT_HEADERS, WORD, FrameBuilder, check_range, format_mac, internet_checksum)
+
+
+BROADCAST = b'\xff' * 6
+ETHERTYPE_IPV4 = b'\x08\x00'
+TTL_OFFSET = IP_OFFSET + 8
+DESTINATION_OFFSET = IP_OFFSET + 16
+# Bytes a frame occupies on the wire besides itself
+WIRE_OVERHEAD = len(PREAMBLE) + INTERFRAME_GAP
+MASKS = [(0xFFFFFFFF << (32 - length)) & 0xFFFFFFFF for length in range(33)]
+
+DEFAULT_BANDWIDTH = 100 * 1000 * 1000     # bits/s
+DEFAULT_DELAY = 0.0001                    # seconds
+DEFAULT_QUEUE = 64 * 1518                 # bytes
+DEFAULT_PORT = 5000
+# Bounds on topology inputs, so every derived time stays finite: 1 kbit/s to 1 Tbit/s,
+# and delays, intervals and start times of up to one simulated hour
+MIN_BANDWIDTH_MBPS = 0.001
+MAX_BANDWIDTH_MBPS = 1000000
+MAX_SPEC_MS = 3600000
+# Seconds each kind of device spends on a frame before it can send it on
+PROCESSING = {'host': 10e-6, 'switch': 5e-6, 'router': 20e-6}
+TIMELINE_LIMIT = 1000
+SENDER_LAYERS = (7, 6, 5, 4, 3, 2, 1)
+RECEIVER_LAYERS = (1, 2, 3, 4, 5, 6, 7)
+LINK_LAYERS = (1,)
+
+
+class Simulator:
+    """Event loop over simulated time, in seconds"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.queue = []
+        self.sequence = itertools.count()
+        self.events = 0
+
+    def schedule(self, time, callback, *args):
+        """Run callback(*args) at time; times already passed run now"""
+        heapq.heappush(self.queue, (time if time > self.now else self.now, next(self.sequence), callback, args))
+
+    def run(self, until=None, limit=None):
+        """Run events until none are left, the next is after until, or limit have run; returns the count"""
+        queue = self.queue
+        pop = heapq.heappop
+        processed = 0
+        while queue and processed != limit:
+            if until is not None and queue[0][0] > until:
+                break
+            time, _, callback, args = pop(queue)
+            self.now = time
+            callback(*args)
+            processed += 1
+        self.events += processed
+        return processed
+
+
+class Timeline:
+    """What happened, for playback, up to limit entries
+
+    Callers check recording before building an entry's text, so a full
+    timeline costs one attribute read per event.
+    """
+
+    def __init__(self, limit=TIMELINE_LIMIT):
+        self.limit = limit
+        self.entries = []
+        self.recording = limit > 0
+        self.truncated = False
+
+    def add(self, time, event, node, packet, layers, text, **fields):
+        if len(self.entries) >= self.limit:
+            self.recording = False
+            self.truncated = True
+            return
+        self.entries.append({
+            'time_ms': round(time * 1000, 6), 'event': event, 'node': node.name, 'packet': packet[0],
+            'layers': list(layers), 'text': text, **fields,
+        })
+
+    def report(self):
+        return {
+            'timeline': sorted(self.entries, key=lambda entry: entry['time_ms']),
+            'timeline_truncated': self.truncated or not self.limit,
+        }
+
+
+class Interface:
+    """A device's port, and the transmit queue of its link in the outgoing direction"""
+
+    __slots__ = ('node', 'network', 'name', 'mac', 'address', 'peer', 'receive', 'bandwidth', 'delay', 'loss',
+                 'queue', 'byte_time', 'max_wait', 'busy_until', 'busy', 'frames', 'bytes', 'drops')
+
+    def __init__(self, node, mac, bandwidth, delay, loss, queue):
+        self.node = node
+        self.network = node.network
+        self.name = f'eth{len(node.interfaces)}'
+        self.mac = mac
+        self.address = None
+        self.peer = self.receive = None
+        self.bandwidth = bandwidth
+        self.delay = delay
+        self.loss = loss
+        self.queue = queue
+        # Seconds per byte on the wire, and the longest wait a full queue means
+        self.byte_time = 8 / bandwidth
+        self.max_wait = queue * self.byte_time
+        self.busy_until = self.busy = 0.0
+        self.frames = self.bytes = self.drops = 0
+
+    def connect(self, peer):
+        self.peer = peer
+        self.receive = peer.node.receive
+
+    def transmit(self, frame, packet, ready):
+        """Queue a frame that is ready to go at time ready; drops it if the queue is full"""
+        network = self.network
+        start = ready if ready > self.busy_until else self.busy_until
+        if start - ready > self.max_wait:
+            self.drops += 1
+            network.drop(self.node, packet, 'queue full', ready)
+            return
+        length = len(frame)
+        duration = (length + WIRE_OVERHEAD) * self.byte_time
+        self.busy_until = end = start + duration
+        self.busy += duration
+        self.frames += 1
+        self.bytes += length
+        arrival = end + self.delay
+        peer = self.peer
+        node = self.node
+        if network.timeline.recording:
+            network.timeline.add(
+                start, 'transmit', node, packet, LINK_LAYERS,
+                f'{node.name} → {peer.node.name}: {len(frame)} bytes, {duration * 1e6:.2f} µs on the wire, '
+                f'arrives at {arrival * 1000:.3f} ms',
+                to=peer.node.name, interface=self.name, bytes=len(frame), arrival_ms=round(arrival * 1000, 6),
+            )
+        if self.loss and network.random.random() < self.loss:
+            self.drops += 1
+            network.drop(peer.node, packet, 'lost on the link', arrival)
+            return
+        # Simulator.schedule inlined: this is the one event every hop makes, and arrival is never in the past
+        simulator = network.simulator
+        heapq.heappush(simulator.queue, (arrival, next(simulator.sequence), self.receive, (peer, frame, packet)))
+
+
+class Node:
+    """A device with interfaces; subclasses handle the frames that arrive"""
+
+    kind = None
+    layers = ()
+
+    def __init__(self, network, name):
+        self.network = network
+        self.name = name
+        self.interfaces = []
+        self.processing = PROCESSING[self.kind]
+
+    def receive(self, interface, frame, packet):
+        raise NotImplementedError
+
+    def fcs_ok(self, frame):
+        return zlib.crc32(frame[:-FCS.size]) == FCS.unpack_from(frame, len(frame) - FCS.size)[0]
+
+    def describe(self):
+        return {
+            'name': self.name, 'type': self.kind,
+            'interfaces': [{'name': interface.name, 'mac': format_mac(interface.mac),
+                            'address': str(interface.address) if interface.address else None,
+                            'peer': interface.peer.node.name}
+                           for interface in self.interfaces],
+        }
+
+
+class Host(Node):
+    """An end system with one interface, an address and an optional default gateway"""
+
+    kind = 'host'
+    layers = RECEIVER_LAYERS
+
+    def __init__(self, network, name, address, gateway=None):
+        super().__init__(network, name)
+        self.address = ipaddress.IPv4Interface(address)
+        self.gateway = ipaddress.IPv4Address(gateway).packed if gateway else None
+        self.subnet = int(self.address.network.network_address)
+        self.mask = MASKS[self.address.network.prefixlen]
+        self.builders = {}
+
+    def stream(self, destination, payload, count=1, interval=0.001, start=0.0, transport='udp', port=DEFAULT_PORT):
+        """Send payload count times, interval seconds apart; one send is pending at a time
+
+        Raises ValueError for an unknown transport, a payload that does not
+        fit in one frame, or a bad port.
+        """
+        check_range('port', port, 0, 0xFFFF)
+        if transport not in TRANSPORT_HEADERS:
+            raise ValueError(f'Unknown transport: {transport}')
+        max_payload = ETHERNET_MTU - IPV4.size - TRANSPORT_HEADERS[transport].size
+        if len(payload) > max_payload:
+            raise ValueError(f'Payloads are limited to {max_payload} bytes over {transport}')
+        destination = ipaddress.IPv4Address(destination).packed
+        self.network.simulator.schedule(start, self.send, destination, payload, count, interval, transport, port)
+
+    def send(self, destination, payload, remaining, interval, transport, port):
+        network = self.network
+        simulator = network.simulator
+        packet = (next(network.packets), simulator.now)
+        network.sent += 1
+        if remaining > 1:
+            simulator.schedule(simulator.now + interval, self.send, destination, payload, remaining - 1, interval,
+                               transport, port)
+        if not self.interfaces:
+            network.drop(self, packet, 'not connected')
+            return
+        interface = self.interfaces[0]
+        if int.from_bytes(destination, 'big') & self.mask == self.subnet:
+            next_hop = destination
+        else:
+            next_hop = self.gateway
+        mac = network.arp.get(next_hop)
+        if mac is None:
+            network.drop(self, packet, 'no route' if next_hop is None else 'next hop not found (ARP)')
+            return
+
+        key = (destination, transport, port, mac)
+        builder = self.builders.get(key)
+        if builder is None:
+            builder = self.builders[key] = FrameBuilder(
+                transport, src_mac=format_mac(interface.mac), dst_mac=format_mac(mac),
+                src_ip=str(self.address.ip), dst_ip=str(ipaddress.IPv4Address(destination)),
+                src_port=DEFAULTS['src_port'] + len(self.builders) % 16384, dst_port=port,
+            )
+        frame = bytes(builder.build(payload))
+        if network.timeline.recording:
+            network.timeline.add(
+                simulator.now, 'send', self, packet, SENDER_LAYERS,
+                f'{self.name} encapsulates {len(payload)} bytes for {ipaddress.IPv4Address(destination)} '
+                f'({transport.upper()} port {port}) into a {len(frame)}-byte frame',
+                bytes=len(frame),
+            )
+        interface.transmit(frame, packet, simulator.now + self.processing)
+
+    def receive(self, interface, frame, packet):
+        network = self.network
+        destination_mac = frame[:6]
+        if destination_mac != interface.mac and destination_mac != BROADCAST:
+            # Another host's frame, flooded by a switch: the NIC discards it
+            network.filtered += 1
+            return
+        parsed = parse_frame(frame, fcs=True, verify=network.verify)
+        if not parsed.valid:
+            network.drop(self, packet, parsed.error or 'bad checksum')
+            return
+        if parsed.dst_ip != self.address.packed:
+            network.drop(self, packet, 'not addressed to this host')
+            return
+        now = network.simulator.now + self.processing
+        latency = now - packet[1]
+        network.delivered += 1
+        network.latency_total += latency
+        if latency > network.latency_max:
+            network.latency_max = latency
+        if latency < network.latency_min:
+            network.latency_min = latency
+        if network.timeline.recording:
+            payload = bytes(parsed.payload)
+            network.timeline.add(
+                now, 'deliver', self, packet, RECEIVER_LAYERS,
+                f'{self.name} decapsulates {parsed.transport.upper()} port {parsed.dst_port}: '
+                f'{payload[:40].decode("utf-8", "replace")!r} after {latency * 1000:.3f} ms',
+                latency_ms=round(latency * 1000, 6), bytes=len(payload),
+            )
+
+
+class Switch(Node):
+    """A learning switch: one MAC table, store-and-forward"""
+
+    kind = 'switch'
+    layers = (1, 2)
+
+    def __init__(self, network, name):
+        super().__init__(network, name)
+        self.table = {}
+
+    def receive(self, interface, frame, packet):
+        network = self.network
+        if network.verify and not self.fcs_ok(frame):
+            network.drop(self, packet, 'bad FCS')
+            return
+        self.table[frame[6:12]] = interface
+        ready = network.simulator.now + self.processing
+        out = self.table.get(frame[:6])
+        if out is None:
+            ports = [port for port in self.interfaces if port is not interface]
+            if network.timeline.recording:
+                network.timeline.add(
+                    network.simulator.now, 'flood', self, packet, self.layers,
+                    f'{self.name} has not seen {format_mac(frame[:6])} yet: floods it out of '
+                    f'{len(ports)} port{"s" if len(ports) != 1 else ""}',
+                )
+            for port in ports:
+                port.transmit(frame, packet, ready)
+        elif out is interface:
+            # Both ends are on the port it came in on
+            network.filtered += 1
+        else:
+            if network.timeline.recording:
+                network.timeline.add(
+                    network.simulator.now, 'forward', self, packet, self.layers,
+                    f'{self.name} switches {format_mac(frame[:6])} from {interface.name} to {out.name}',
+                    interface=out.name,
+                )
+            out.transmit(frame, packet, ready)
+
+
+class Router(Node):
+    """An IPv4 router with connected and static routes"""
+
+    kind = 'router'
+    layers = (1, 2, 3)
+
+    def __init__(self, network, name):
+        super().__init__(network, name)
+        # Prefix length -> {network address: (interface, next hop or None when directly connected)}
+        self.routes = {}
+        self.lengths = []
+        self.addresses = set()
+        self.cache = {}
+
+    def add_route(self, prefix, next_hop=None, interface=None):
+        """Route prefix via next_hop, which must be on a connected network; raises ValueError"""
+        prefix = ipaddress.IPv4Network(prefix)
+        if interface is None:
+            next_hop = ipaddress.IPv4Address(next_hop)
+            interface = next((port for port in self.interfaces if port.address and next_hop in port.address.network),
+                             None)
+            if interface is None:
+                raise ValueError(f'{self.name}: next hop {next_hop} is not on a connected network')
+            next_hop = next_hop.packed
+        self.install(prefix, interface, next_hop)
+        self.lengths = sorted(self.routes, reverse=True)
+
+    def install(self, prefix, interface, next_hop):
+        self.routes.setdefault(prefix.prefixlen, {})[int(prefix.network_address)] = (interface, next_hop)
+        self.cache.clear()
+
+    def lookup(self, destination):
+        """(interface, next hop or None) for a packed address, longest prefix first; None if unroutable"""
+        if destination in self.cache:
+            return self.cache[destination]
+        value = int.from_bytes(destination, 'big')
+        route = None
+        for length in self.lengths:
+            route = self.routes[length].get(value & MASKS[length])
+            if route is not None:
+                break
+        self.cache[destination] = route
+        return route
+
+    def receive(self, interface, frame, packet):
+        network = self.network
+        if network.verify and not self.fcs_ok(frame):
+            network.drop(self, packet, 'bad FCS')
+            return
+        if frame[:6] != interface.mac:
+            network.filtered += 1
+            return
+        if frame[12:14] != ETHERTYPE_IPV4:
+            network.drop(self, packet, 'not IPv4')
+            return
+        header_end = IP_OFFSET + (frame[IP_OFFSET] & 0x0F) * 4
+        if network.verify and internet_checksum(frame[IP_OFFSET:header_end]) != 0:
+            network.drop(self, packet, 'bad IP header checksum')
+            return
+        destination = frame[DESTINATION_OFFSET:DESTINATION_OFFSET + 4]
+        if destination in self.addresses:
+            network.drop(self, packet, 'addressed to the router, which runs no services')
+            return
+        ttl = frame[TTL_OFFSET]
+        if ttl <= 1:
+            network.drop(self, packet, 'TTL expired')
+            return
+        route = self.lookup(destination)
+        if route is None:
+            network.drop(self, packet, 'no route')
+            return
+        out, next_hop = route
+        mac = network.arp.get(next_hop or destination)
+        if mac is None:
+            network.drop(self, packet, 'next hop not found (ARP)')
+            return
+
+        rewritten = bytearray(frame)
+        rewritten[0:12] = mac + out.mac
+        rewritten[TTL_OFFSET] = ttl - 1
+        WORD.pack_into(rewritten, IP_CHECKSUM, 0)
+        WORD.pack_into(rewritten, IP_CHECKSUM, internet_checksum(rewritten[IP_OFFSET:header_end]))
+        end = len(rewritten) - FCS.size
+        FCS.pack_into(rewritten, end, zlib.crc32(rewritten[:end]))
+        if network.timeline.recording:
+            via = f'via {ipaddress.IPv4Address(next_hop)}' if next_hop else 'directly'
+            network.timeline.add(
+                network.simulator.now, 'route', self, packet, self.layers,
+                f'{self.name} routes {ipaddress.IPv4Address(destination)} {via} out {out.name}, '
+                f'TTL {ttl} → {ttl - 1}',
+                interface=out.name, ttl=ttl - 1,
+            )
+        out.transmit(bytes(rewritten), packet, network.simulator.now + self.processing)
+
+
+class Network:
+    """A topology, its event loop and its results
+
+    Links are given in bits/s, seconds and bytes of queue. seed makes the
+    link losses repeatable; verify=False skips FCS and checksum checks.
+    """
+
+    def __init__(self, seed=0, timeline_limit=TIMELINE_LIMIT, verify=True):
+        self.simulator = Simulator()
+        self.timeline = Timeline(timeline_limit)
+        self.random = random.Random(seed)
+        self.verify = verify
+        self.nodes = {}
+        self.links = []
+        # Packed IPv4 address -> MAC of the interface that has it
+        self.arp = {}
+        self.macs = itertools.count(1)
+        self.packets = itertools.count(1)
+        self.sent = self.delivered = self.filtered = 0
+        self.latency_total = self.latency_max = 0.0
+        self.latency_min = float('inf')
+        self.drops = {}
+
+    def add(self, node):
+        if node.name in self.nodes:
+            raise ValueError(f'Duplicate node name: {node.name}')
+        self.nodes[node.name] = node
+        return node
+
+    def add_host(self, name, address, gateway=None):
+        return self.add(Host(self, name, address, gateway))
+
+    def add_switch(self, name):
+        return self.add(Switch(self, name))
+
+    def add_router(self, name):
+        return self.add(Router(self, name))
+
+    def connect(self, a, b, bandwidth=DEFAULT_BANDWIDTH, delay=DEFAULT_DELAY, loss=0.0, queue=DEFAULT_QUEUE,
+                a_address=None, b_address=None):
+        """Link two nodes (names or nodes); router ends take an address such as '10.0.0.1/30'"""
+        a, b = self.node(a), self.node(b)
+        if bandwidth <= 0 or delay < 0 or not 0 <= loss <= 1 or queue < 0:
+            raise ValueError('Links need a positive bandwidth, a delay of at least 0, a loss between 0 and 1 '
+                             'and a queue of at least 0 bytes')
+        ends = []
+        for node, address in ((a, a_address), (b, b_address)):
+            if isinstance(node, Host) and node.interfaces:
+                raise ValueError(f'{node.name}: hosts have one interface')
+            interface = Interface(node, b'\x02' + next(self.macs).to_bytes(5, 'big'), bandwidth, delay, loss, queue)
+            if isinstance(node, Host):
+                interface.address = node.address
+            elif isinstance(node, Router):
+                if address is None:
+                    raise ValueError(f'{node.name}: router interfaces need an address')
+                interface.address = ipaddress.IPv4Interface(address)
+                node.addresses.add(interface.address.packed)
+                node.interfaces.append(interface)
+                node.add_route(interface.address.network, interface=interface)
+                node.interfaces.pop()
+            if interface.address is not None:
+                self.arp[interface.address.packed] = interface.mac
+            node.interfaces.append(interface)
+            ends.append(interface)
+        ends[0].connect(ends[1])
+        ends[1].connect(ends[0])
+        self.links.append(tuple(ends))
+        return ends
+
+    def node(self, name):
+        if isinstance(name, Node):
+            return name
+        if name not in self.nodes:
+            raise ValueError(f'Unknown node: {name}')
+        return self.nodes[name]
+
+    def compute_routes(self):
+        """Fewest-hop routes on every router to every subnet another router is attached to
+
+        Routers are neighbours when they have interfaces on the same subnet.
+        Costs a breadth-first search per router, and one route per router
+        per subnet.
+        """
+        routers = [node for node in self.nodes.values() if isinstance(node, Router)]
+        attached = {}
+        for router in routers:
+            for interface in router.interfaces:
+                attached.setdefault(interface.address.network, []).append((router, interface))
+        neighbours = {router: [] for router in routers}
+        for members in attached.values():
+            for router, interface in members:
+                for other, other_interface in members:
+                    if other is not router:
+                        neighbours[router].append((other, interface, other_interface.address.packed))
+
+        for router in routers:
+            first_hop = {router: None}
+            frontier = [router]
+            while frontier:
+                reached = []
+                for node in frontier:
+                    for other, interface, address in neighbours[node]:
+                        if other not in first_hop:
+                            first_hop[other] = first_hop[node] or (interface, address)
+                            reached.append(other)
+                frontier = reached
+            for subnet, members in attached.items():
+                hops = [first_hop[member] for member, _ in members if member in first_hop]
+                if None in hops or not hops:
+                    # Connected, or unreachable
+                    continue
+                interface, address = hops[0]
+                router.install(subnet, interface, address)
+            router.lengths = sorted(router.routes, reverse=True)
+
+    def drop(self, node, packet, reason, time=None):
+        self.drops[reason] = self.drops.get(reason, 0) + 1
+        if self.timeline.recording:
+            self.timeline.add(time if time is not None else self.simulator.now, 'drop', node, packet, node.layers,
+                              f'{node.name} drops the packet: {reason}', reason=reason)
+
+    def run(self, until=None, limit=None):
+        return self.simulator.run(until, limit)
+
+    def report(self, topology=True):
+        duration = self.simulator.now
+        result = {
+            'summary': {
+                'events': self.simulator.events,
+                'pending_events': len(self.simulator.queue),
+                'simulated_ms': round(duration * 1000, 6),
+                'nodes': len(self.nodes),
+                'links': len(self.links),
+                'packets_sent': self.sent,
+                'delivered': self.delivered,
+                'dropped': sum(self.drops.values()),
+                'drops': self.drops,
+                'latency_ms': {
+                    'min': round(self.latency_min * 1000, 6) if self.delivered else None,
+                    'mean': round(self.latency_total / self.delivered * 1000, 6) if self.delivered else None,
+                    'max': round(self.latency_max * 1000, 6) if self.delivered else None,
+                },
+            },
+        }
+        if topology:
+            result['nodes'] = [node.describe() for node in self.nodes.values()]
+            result['links'] = [{
+                'a': a.node.name, 'b': b.node.name,
+                'bandwidth_mbps': a.bandwidth / 1e6, 'delay_ms': a.delay * 1000, 'loss': a.loss,
+                'frames': a.frames + b.frames, 'bytes': a.bytes + b.bytes, 'drops': a.drops + b.drops,
+                'utilization': round(max(a.busy, b.busy) / duration, 4) if duration else 0.0,
+            } for a, b in self.links]
+        result.update(self.timeline.report())
+        return result
+
+
+def spec_list(spec, key):
+    """spec[key] as a list of JSON objects (absent means empty); raises ValueError"""
+    entries = spec.get(key)
+    if entries is None:
+        return []
+    if not isinstance(entries, list) or not all(isinstance(entry, dict) for entry in entries):
+        raise ValueError(f'{key} must be a list of objects')
+    return entries
+
+
+def spec_string(entry, key, where, required=True):
+    """entry[key] as a non-empty string, or None if optional and absent; raises ValueError"""
+    value = entry.get(key)
+    if value is None and not required:
+        return None
+    if value is None:
+        raise ValueError(f'{where}: missing {key}')
+    if not isinstance(value, str) or not value:
+        raise ValueError(f'{where}: {key} must be a non-empty string')
+    return value
+
+
+def spec_number(entry, key, default, where, minimum=None, integer=False, maximum=None):
+    """entry[key] as a finite number between minimum and maximum, or default if absent; raises ValueError"""
+    value = entry.get(key)
+    if value is None:
+        return default
+    # bool is an int to Python, never to a JSON client
+    if isinstance(value, bool) or not isinstance(value, int if integer else (int, float)) \
+            or not math.isfinite(value):
+        raise ValueError(f'{where}: {key} must be {"an integer" if integer else "a finite number"}')
+    if minimum is not None and value < minimum:
+        raise ValueError(f'{where}: {key} must be at least {minimum}')
+    if maximum is not None and value > maximum:
+        raise ValueError(f'{where}: {key} must be at most {maximum}')
+    return value
+
+
+def build_network(spec, timeline_limit=TIMELINE_LIMIT, max_nodes=None):
+    """A Network from a JSON topology; raises ValueError
+
+    {"nodes": [{"name": "pc1", "type": "host", "ip": "10.0.1.10/24", "gateway": "10.0.1.1"},
+               {"name": "sw1", "type": "switch"}, {"name": "r1", "type": "router"}],
+     "links": [{"a": "pc1", "b": "sw1", "bandwidth_mbps": 100, "delay_ms": 0.1, "loss": 0,
+                "queue_bytes": 97152},
+               {"a": "r1", "b": "sw1", "a_ip": "10.0.1.1/24"}],
+     "routes": [{"router": "r1", "prefix": "0.0.0.0/0", "next_hop": "10.0.0.2"}],
+     "traffic": [{"src": "pc1", "dst": "pc2", "message": "Hello", "count": 1, "interval_ms": 1,
+                  "start_ms": 0, "transport": "udp", "port": 5000}],
+     "seed": 1}
+
+    Without "routes", every router gets fewest-hop routes to every subnet.
+    A traffic entry sends "message", or "size" bytes of filler.
+    """
+    if not isinstance(spec, dict):
+        raise ValueError('The topology must be a JSON object')
+    nodes, links, traffic = spec_list(spec, 'nodes'), spec_list(spec, 'links'), spec_list(spec, 'traffic')
+    if max_nodes is not None and len(nodes) > max_nodes:
+        raise ValueError(f'Topologies are limited to {max_nodes} nodes')
+    network = Network(spec_number(spec, 'seed', 0, 'topology', integer=True), timeline_limit)
+    for number, node in enumerate(nodes):
+        where = f'nodes[{number}]'
+        name, kind = spec_string(node, 'name', where), node.get('type')
+        if kind == 'host':
+            network.add_host(name, spec_string(node, 'ip', where), spec_string(node, 'gateway', where, False))
+        elif kind == 'switch':
+            network.add_switch(name)
+        elif kind == 'router':
+            network.add_router(name)
+        else:
+            raise ValueError(f'{where}: unknown node type: {kind}')
+    for number, link in enumerate(links):
+        where = f'links[{number}]'
+        network.connect(
+            spec_string(link, 'a', where), spec_string(link, 'b', where),
+            bandwidth=spec_number(link, 'bandwidth_mbps', DEFAULT_BANDWIDTH / 1e6, where, MIN_BANDWIDTH_MBPS,
+                                  maximum=MAX_BANDWIDTH_MBPS) * 1e6,
+            delay=spec_number(link, 'delay_ms', DEFAULT_DELAY * 1000, where, 0, maximum=MAX_SPEC_MS) / 1000,
+            loss=spec_number(link, 'loss', 0.0, where),
+            queue=spec_number(link, 'queue_bytes', DEFAULT_QUEUE, where, integer=True),
+            a_address=spec_string(link, 'a_ip', where, False), b_address=spec_string(link, 'b_ip', where, False),
+        )
+    if 'routes' in spec:
+        for number, route in enumerate(spec_list(spec, 'routes')):
+            where = f'routes[{number}]'
+            router = network.node(spec_string(route, 'router', where))
+            if not isinstance(router, Router):
+                raise ValueError(f'{router.name} is not a router')
+            router.add_route(spec_string(route, 'prefix', where), spec_string(route, 'next_hop', where))
+    else:
+        network.compute_routes()
+    for number, flow in enumerate(traffic):
+        where = f'traffic[{number}]'
+        source = network.node(spec_string(flow, 'src', where))
+        if not isinstance(source, Host):
+            raise ValueError(f'{source.name} is not a host')
+        destination = spec_string(flow, 'dst', where)
+        if destination in network.nodes:
+            target = network.nodes[destination]
+            if not isinstance(target, Host):
+                raise ValueError(f'{target.name} is not a host')
+            destination = str(target.address.ip)
+        if 'message' in flow:
+            if not isinstance(flow['message'], str):
+                raise ValueError(f'{where}: message must be a string')
+            payload = flow['message'].encode('utf-8')
+        else:
+            # Checked against the frame size before the filler is allocated
+            size = spec_number(flow, 'size', 64, where, minimum=0, integer=True)
+            if size > ETHERNET_MTU:
+                raise ValueError(f'{where}: payloads are limited to {ETHERNET_MTU} bytes')
+            payload = bytes(size)
+        source.stream(destination, payload, spec_number(flow, 'count', 1, where, minimum=1, integer=True),
+                      spec_number(flow, 'interval_ms', 1, where, minimum=0, maximum=MAX_SPEC_MS) / 1000,
+                      spec_number(flow, 'start_ms', 0, where, minimum=0, maximum=MAX_SPEC_MS) / 1000,
+                      spec_string(flow, 'transport', where, False) or 'udp',
+                      spec_number(flow, 'port', DEFAULT_PORT, where, integer=True))
+    return network
+
+
+def lab_network(message, loss=0.0, seed=0, timeline_limit=TIMELINE_LIMIT):
+    """The main page's path: sender - switch - router - WAN - router - switch - receiver
+
+    The sender and receiver use encapsulation's default addresses, so the
+    simulated frame is the one /api/encapsulate shows.
+    """
+    network = Network(seed, timeline_limit)
+    network.add_host('Sender', f"{DEFAULTS['src_ip']}/24", '192.168.1.1')
+    network.add_host('Receiver', f"{DEFAULTS['dst_ip']}/24", '93.184.216.1')
+    network.add_switch('LAN switch')
+    network.add_switch('Server switch')
+    network.add_router('Home router')
+    network.add_router('ISP router')
+    network.connect('Sender', 'LAN switch')
+    network.connect('Home router', 'LAN switch', a_address='192.168.1.1/24')
+    network.connect('Home router', 'ISP router', bandwidth=20 * 1000 * 1000, delay=0.015, loss=loss,
+                    a_address='10.0.0.1/30', b_address='10.0.0.2/30')
+    network.connect('ISP router', 'Server switch', bandwidth=1000 * 1000 * 1000, a_address='93.184.216.1/24')
+    network.connect('Receiver', 'Server switch', bandwidth=1000 * 1000 * 1000)
+    network.compute_routes()
+    network.node('Sender').stream(DEFAULTS['dst_ip'], message, transport='tcp', port=DEFAULTS['dst_port'])
+    return network
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run a discrete-event network simulation')
+    parser.add_argument('topology', nargs='?', help='JSON topology file (default: the lab path)')
+    parser.add_argument('--message', default='Hello, network!', help='message the lab path carries')
+    parser.add_argument('--loss', type=float, default=0.0, help='loss rate of the lab WAN link')
+    parser.add_argument('--events', type=int, help='stop after this many events')
+    parser.add_argument('--until-ms', type=float, help='stop at this simulated time')
+    parser.add_argument('--json', action='store_true', help='print the whole report as JSON')
+    args = parser.parse_args()
+
+    try:
+        if args.topology:
+            with open(args.topology) as file:
+                network = build_network(json.load(file))
+        else:
+            network = lab_network(args.message.encode('utf-8'), args.loss)
+    except (OSError, ValueError) as error:
+        print(f'✗ {error}', file=sys.stderr)
+        return 1
+    network.run(None if args.until_ms is None else args.until_ms / 1000, args.events)
+    report = network.report()
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+    for entry in report['timeline']:
+        print(f"{entry['time_ms']:>12.3f} ms  {entry['text']}")
+    summary = report['summary']
+    print(f"\n✓ {summary['events']:,} events, {summary['delivered']:,} of {summary['packets_sent']:,} packets "
+          f"delivered in {summary['simulated_ms']:.3f} simulated ms")
+    for reason, count in summary['drops'].items():
+        print(f'  {count:,} dropped: {reason}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,374 @@
+"""
+QR Code - a dependency-free QR code encoder with PNG and SVG output
+
+Encodes text in byte mode (UTF-8) at the smallest version, 1 to 40, that
+holds it at the requested error correction level, following ISO/IEC 18004:
+Reed-Solomon error correction over GF(256), block interleaving, zigzag
+module placement and the mask with the lowest penalty score. PNGs are
+written with zlib, so session links need no image library or outside
+service.
+"""
+
+import struct
+import zlib
+
+
+# Error correction levels: (format bits, table row)
+ERROR_CORRECTION = {'L': (1, 0), 'M': (0, 1), 'Q': (3, 2), 'H': (2, 3)}
+
+# Per level, indexed by version (index 0 unused)
+ECC_CODEWORDS_PER_BLOCK = (
+    (None, 7, 10, 15, 20, 26, 18, 20, 24, 30, 18, 20, 24, 26, 30, 22, 24, 28, 30, 28, 28,
+     28, 28, 30, 30, 26, 28, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30),
+    (None, 10, 16, 26, 18, 24, 16, 18, 22, 22, 26, 30, 22, 22, 24, 24, 28, 28, 26, 26, 26,
+     26, 28, 28, 28, 28, 28, 28, 28, 28, 28, 28, 28, 28, 28, 28, 28, 28, 28, 28, 28),
+    (None, 13, 22, 18, 26, 18, 24, 18, 22, 20, 24, 28, 26, 24, 20, 30, 24, 28, 28, 26, 30,
+     28, 30, 30, 30, 30, 28, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30),
+    (None, 17, 28, 22, 16, 22, 28, 26, 26, 24, 28, 24, 28, 22, 24, 24, 30, 28, 28, 26, 28,
+     30, 24, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30),
+)
+ERROR_CORRECTION_BLOCKS = (
+    (None, 1, 1, 1, 1, 1, 2, 2, 2, 2, 4, 4, 4, 4, 4, 6, 6, 6, 6, 7, 8,
+     8, 9, 9, 10, 12, 12, 12, 13, 14, 15, 16, 17, 18, 19, 19, 20, 21, 22, 24, 25),
+    (None, 1, 1, 1, 2, 2, 4, 4, 4, 5, 5, 5, 8, 9, 9, 10, 10, 11, 13, 14, 16,
+     17, 17, 18, 20, 21, 23, 25, 26, 28, 29, 31, 33, 35, 37, 38, 40, 43, 45, 47, 49),
+    (None, 1, 1, 2, 2, 4, 4, 6, 6, 8, 8, 8, 10, 12, 16, 12, 17, 16, 18, 21, 20,
+     23, 23, 25, 27, 29, 34, 34, 35, 38, 40, 43, 45, 48, 51, 53, 56, 59, 62, 65, 68),
+    (None, 1, 1, 2, 4, 4, 4, 5, 6, 8, 8, 11, 11, 16, 16, 18, 16, 19, 21, 25, 25,
+     25, 34, 30, 32, 35, 37, 40, 42, 45, 48, 51, 54, 57, 60, 63, 66, 70, 74, 77, 81),
+)
+
+MODE_BYTE = 0x4
+PAD_BYTES = (0xEC, 0x11)
+
+MASKS = (
+    lambda x, y: (x + y) % 2 == 0,
+    lambda x, y: y % 2 == 0,
+    lambda x, y: x % 3 == 0,
+    lambda x, y: (x + y) % 3 == 0,
+    lambda x, y: (x // 3 + y // 2) % 2 == 0,
+    lambda x, y: x * y % 2 + x * y % 3 == 0,
+    lambda x, y: (x * y % 2 + x * y % 3) % 2 == 0,
+    lambda x, y: ((x + y) % 2 + x * y % 3) % 2 == 0,
+)
+
+# Dark-light run lengths of a finder pattern, preceded or followed by four light modules
+FINDER_LIKE = ((1, 0, 1, 1, 1, 0, 1, 0, 0, 0, 0), (0, 0, 0, 0, 1, 0, 1, 1, 1, 0, 1))
+
+
+def gf_multiply(x, y):
+    """Product in GF(2^8) modulo x^8 + x^4 + x^3 + x^2 + 1"""
+    result = 0
+    for bit in range(7, -1, -1):
+        result = (result << 1) ^ ((result >> 7) * 0x11D)
+        result ^= ((y >> bit) & 1) * x
+    return result
+
+
+def reed_solomon_divisor(degree):
+    """Generator polynomial coefficients (highest power first, leading 1 omitted)"""
+    result = [0] * (degree - 1) + [1]
+    root = 1
+    for _ in range(degree):
+        for index in range(degree):
+            result[index] = gf_multiply(result[index], root)
+            if index + 1 < degree:
+                result[index] ^= result[index + 1]
+        root = gf_multiply(root, 0x02)
+    return result
+
+
+def reed_solomon_remainder(data, divisor):
+    """Error correction codewords for one block"""
+    result = [0] * len(divisor)
+    for byte in data:
+        factor = byte ^ result.pop(0)
+        result.append(0)
+        for index, coefficient in enumerate(divisor):
+            result[index] ^= gf_multiply(coefficient, factor)
+    return result
+
+
+def raw_data_modules(version):
+    """Modules left for data and error correction after the function patterns"""
+    result = (16 * version + 128) * version + 64
+    if version >= 2:
+        alignments = version // 7 + 2
+        result -= (25 * alignments - 10) * alignments - 55
+        if version >= 7:
+            result -= 36
+    return result
+
+
+def data_codewords(version, level):
+    """Data capacity in bytes of a version at an error correction level"""
+    row = ERROR_CORRECTION[level][1]
+    return (raw_data_modules(version) // 8
+            - ECC_CODEWORDS_PER_BLOCK[row][version] * ERROR_CORRECTION_BLOCKS[row][version])
+
+
+def alignment_positions(version):
+    """Row/column centres of the alignment patterns"""
+    if version == 1:
+        return []
+    alignments = version // 7 + 2
+    step = (version * 8 + alignments * 3 + 5) // (alignments * 4 - 4) * 2
+    size = version * 4 + 17
+    return [6] + sorted(size - 7 - index * step for index in range(alignments - 1))
+
+
+class QRCode:
+    """An encoded symbol: modules[y][x] is True for a dark module"""
+
+    def __init__(self, text, error_correction='M'):
+        if error_correction not in ERROR_CORRECTION:
+            raise ValueError(f'Unknown error correction level: {error_correction}')
+        data = text.encode('utf-8') if isinstance(text, str) else bytes(text)
+        self.error_correction = error_correction
+
+        for version in range(1, 41):
+            count_bits = 8 if version <= 9 else 16
+            if 4 + count_bits + len(data) * 8 <= data_codewords(version, error_correction) * 8:
+                break
+        else:
+            raise ValueError('Data too long for a QR code')
+        self.version = version
+        self.size = version * 4 + 17
+        self.modules = [[False] * self.size for _ in range(self.size)]
+        self.function = [[False] * self.size for _ in range(self.size)]
+
+        self.draw_function_patterns()
+        self.draw_codewords(self.add_error_correction(self.data_codewords(data, count_bits)))
+        self.mask = min(range(len(MASKS)), key=self.masked_penalty)
+        self.apply_mask(self.mask)
+        self.draw_format_bits(self.mask)
+
+    # Function patterns
+
+    def set_function(self, x, y, dark):
+        self.modules[y][x] = bool(dark)
+        self.function[y][x] = True
+
+    def draw_function_patterns(self):
+        size = self.size
+        for index in range(size):
+            self.set_function(6, index, index % 2 == 0)
+            self.set_function(index, 6, index % 2 == 0)
+
+        for x, y in ((3, 3), (size - 4, 3), (3, size - 4)):
+            for dy in range(-4, 5):
+                for dx in range(-4, 5):
+                    if 0 <= x + dx < size and 0 <= y + dy < size:
+                        self.set_function(x + dx, y + dy, max(abs(dx), abs(dy)) not in (2, 4))
+
+        positions = alignment_positions(self.version)
+        last = len(positions) - 1
+        for i, x in enumerate(positions):
+            for j, y in enumerate(positions):
+                # The three corners are taken by finder patterns
+                if (i, j) in ((0, 0), (0, last), (last, 0)):
+                    continue
+                for dy in range(-2, 3):
+                    for dx in range(-2, 3):
+                        self.set_function(x + dx, y + dy, max(abs(dx), abs(dy)) != 1)
+
+        # Reserve the format areas; the real bits are drawn once the mask is chosen
+        self.draw_format_bits(0)
+        self.draw_version_bits()
+
+    def draw_format_bits(self, mask):
+        data = ERROR_CORRECTION[self.error_correction][0] << 3 | mask
+        remainder = data
+        for _ in range(10):
+            remainder = (remainder << 1) ^ ((remainder >> 9) * 0x537)
+        bits = (data << 10 | remainder) ^ 0x5412
+
+        size = self.size
+        for index in range(6):
+            self.set_function(8, index, bits >> index & 1)
+        self.set_function(8, 7, bits >> 6 & 1)
+        self.set_function(8, 8, bits >> 7 & 1)
+        self.set_function(7, 8, bits >> 8 & 1)
+        for index in range(9, 15):
+            self.set_function(14 - index, 8, bits >> index & 1)
+
+        for index in range(8):
+            self.set_function(size - 1 - index, 8, bits >> index & 1)
+        for index in range(8, 15):
+            self.set_function(8, size - 15 + index, bits >> index & 1)
+        self.set_function(8, size - 8, True)
+
+    def draw_version_bits(self):
+        if self.version < 7:
+            return
+        remainder = self.version
+        for _ in range(12):
+            remainder = (remainder << 1) ^ ((remainder >> 11) * 0x1F25)
+        bits = self.version << 12 | remainder
+        for index in range(18):
+            dark = bits >> index & 1
+            a, b = self.size - 11 + index % 3, index // 3
+            self.set_function(a, b, dark)
+            self.set_function(b, a, dark)
+
+    # Data
+
+    def data_codewords(self, data, count_bits):
+        """Mode indicator, length, payload, terminator and padding, as bytes"""
+        bits = []
+        for value, length in ((MODE_BYTE, 4), (len(data), count_bits)):
+            bits.extend(value >> shift & 1 for shift in range(length - 1, -1, -1))
+        for byte in data:
+            bits.extend(byte >> shift & 1 for shift in range(7, -1, -1))
+
+        capacity = data_codewords(self.version, self.error_correction) * 8
+        bits.extend([0] * min(4, capacity - len(bits)))
+        bits.extend([0] * (-len(bits) % 8))
+        codewords = [int(''.join(map(str, bits[index:index + 8])), 2) for index in range(0, len(bits), 8)]
+        for index in range(capacity // 8 - len(codewords)):
+            codewords.append(PAD_BYTES[index % 2])
+        return codewords
+
+    def add_error_correction(self, data):
+        """Split into blocks, append each block's ECC and interleave"""
+        row = ERROR_CORRECTION[self.error_correction][1]
+        blocks_count = ERROR_CORRECTION_BLOCKS[row][self.version]
+        ecc_length = ECC_CODEWORDS_PER_BLOCK[row][self.version]
+        raw_codewords = raw_data_modules(self.version) // 8
+        short_blocks = blocks_count - raw_codewords % blocks_count
+        short_length = raw_codewords // blocks_count
+
+        divisor = reed_solomon_divisor(ecc_length)
+        blocks = []
+        offset = 0
+        for index in range(blocks_count):
+            length = short_length - ecc_length + (0 if index < short_blocks else 1)
+            block = data[offset:offset + length]
+            offset += length
+            ecc = reed_solomon_remainder(block, divisor)
+            if index < short_blocks:
+                block.append(None)  # keeps the columns aligned with the long blocks
+            blocks.append(block + ecc)
+
+        return [block[index] for index in range(len(blocks[0])) for block in blocks
+                if block[index] is not None]
+
+    def draw_codewords(self, codewords):
+        """Place bits in the two-column zigzag, skipping function modules"""
+        size = self.size
+        bit_count = len(codewords) * 8
+        index = 0
+        right = size - 1
+        while right >= 1:
+            if right == 6:
+                right = 5  # skip the vertical timing pattern
+            upward = (right + 1) & 2 == 0
+            for vertical in range(size):
+                y = size - 1 - vertical if upward else vertical
+                for x in (right, right - 1):
+                    if not self.function[y][x] and index < bit_count:
+                        self.modules[y][x] = bool(codewords[index >> 3] >> (7 - (index & 7)) & 1)
+                        index += 1
+            right -= 2
+
+    # Masking
+
+    def apply_mask(self, mask):
+        """XOR a mask pattern over the data modules (applying twice undoes it)"""
+        condition = MASKS[mask]
+        for y in range(self.size):
+            row, function = self.modules[y], self.function[y]
+            for x in range(self.size):
+                if not function[x] and condition(x, y):
+                    row[x] = not row[x]
+
+    def masked_penalty(self, mask):
+        """Penalty score of the symbol with a mask and its format bits applied"""
+        self.apply_mask(mask)
+        self.draw_format_bits(mask)
+        score = self.penalty()
+        self.apply_mask(mask)
+        return score
+
+    def penalty(self):
+        size = self.size
+        rows = self.modules
+        lines = [tuple(row) for row in rows] + [tuple(row[x] for row in rows) for x in range(size)]
+        score = 0
+        for line in lines:
+            # Runs of five or more modules of one colour
+            run = 1
+            for index in range(1, size):
+                if line[index] == line[index - 1]:
+                    run += 1
+                else:
+                    if run >= 5:
+                        score += run - 2
+                    run = 1
+            if run >= 5:
+                score += run - 2
+            # Patterns that look like a finder
+            bits = tuple(int(module) for module in line)
+            for index in range(size - 10):
+                if bits[index:index + 11] in FINDER_LIKE:
+                    score += 40
+
+        # 2x2 blocks of one colour
+        for y in range(size - 1):
+            for x in range(size - 1):
+                if rows[y][x] == rows[y][x + 1] == rows[y + 1][x] == rows[y + 1][x + 1]:
+                    score += 3
+
+        # Deviation from half dark, in 5% steps
+        total = size * size
+        dark = sum(map(sum, rows))
+        score += (abs(dark * 20 - total * 10) + total - 1) // total * 10 - 10
+        return score
+
+    # Output
+
+    def png(self, scale=8, border=4):
+        """A 1-bit greyscale PNG, scale pixels per module, with a quiet zone of border modules"""
+        width = (self.size + 2 * border) * scale
+        light_row = b'\x00' + b'\xff' * ((width + 7) // 8)
+        scanlines = []
+        for y in range(-border, self.size + border):
+            if not 0 <= y < self.size:
+                scanlines.extend([light_row] * scale)
+                continue
+            bits = 0
+            for x in range(-border, self.size + border):
+                dark = 0 <= x < self.size and self.modules[y][x]
+                for _ in range(scale):
+                    bits = bits << 1 | (not dark)
+            padding = -width % 8
+            row = b'\x00' + ((bits << padding) | ((1 << padding) - 1)).to_bytes((width + 7) // 8, 'big')
+            scanlines.extend([row] * scale)
+
+        def chunk(kind, data):
+            return struct.pack('!I', len(data)) + kind + data + struct.pack('!I', zlib.crc32(kind + data))
+
+        return (b'\x89PNG\r\n\x1a\n'
+                + chunk(b'IHDR', struct.pack('!IIBBBBB', width, width, 1, 0, 0, 0, 0))
+                + chunk(b'IDAT', zlib.compress(b''.join(scanlines), 9))
+                + chunk(b'IEND', b''))
+
+    def svg(self, border=4):
+        """An SVG document drawing every dark module as part of one path"""
+        parts = []
+        for y, row in enumerate(self.modules):
+            x = 0
+            while x < self.size:
+                if row[x]:
+                    start = x
+                    while x < self.size and row[x]:
+                        x += 1
+                    parts.append(f'M{start + border},{y + border}h{x - start}v1h{start - x}z')
+                else:
+                    x += 1
+        dimension = self.size + 2 * border
+        return (
+            f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {dimension} {dimension}" '
+            f'shape-rendering="crispEdges"><rect width="100%" height="100%" fill="#fff"/>'
+            f'<path d="{"".join(parts)}" fill="#000"/></svg>'
+        )
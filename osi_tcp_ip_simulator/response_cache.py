@@ -0,0 +1,121 @@
+"""
+Response Cache - pre-serialized JSON payloads with ETags and precompressed variants
+"""
+
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+
+from flask import Response, request
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always available
+    brotli = None
+
+
+# Payloads smaller than this are not worth compressing
+MIN_COMPRESS_SIZE = 512
+
+# Upper bound on query-dependent variants (projections, pages) kept in memory
+MAX_VARIANTS = 256
+
+
+class CachedResponse:
+    """A serialized payload with its encoded variants and strong ETags"""
+
+    def __init__(self, body, mimetype='application/json', cache_control='public, no-cache'):
+        self.mimetype = mimetype
+        self.cache_control = cache_control
+        self.digest = hashlib.sha256(body).hexdigest()
+        self.variants = {'identity': body}
+
+        if len(body) >= MIN_COMPRESS_SIZE:
+            gzipped = gzip.compress(body, compresslevel=9, mtime=0)
+            if len(gzipped) < len(body):
+                self.variants['gzip'] = gzipped
+            if brotli is not None:
+                compressed = brotli.compress(body, quality=11)
+                if len(compressed) < len(body):
+                    self.variants['br'] = compressed
+
+    def etag(self, encoding):
+        """Strong ETag for one encoded representation"""
+        if encoding == 'identity':
+            return self.digest[:32]
+        return f'{self.digest[:32]}-{encoding}'
+
+    def choose_encoding(self):
+        """Pick the best encoding the current request accepts"""
+        for encoding in ('br', 'gzip'):
+            if encoding in self.variants and request.accept_encodings.quality(encoding) > 0:
+                return encoding
+        return 'identity'
+
+    def to_response(self, cache_control=None):
+        """Build a 200 or 304 response for the current request"""
+        encoding = self.choose_encoding()
+        etag = self.etag(encoding)
+
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+        else:
+            response = Response(self.variants[encoding], mimetype=self.mimetype)
+            if encoding != 'identity':
+                response.headers['Content-Encoding'] = encoding
+
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = cache_control or self.cache_control
+        if len(self.variants) > 1:
+            response.vary.add('Accept-Encoding')
+        return response
+
+
+class ResponseCache:
+    """Serializes static API payloads once and serves them from memory"""
+
+    def __init__(self, app, max_variants=MAX_VARIANTS):
+        self.app = app
+        self.entries = {}
+        self.variants = OrderedDict()
+        self.max_variants = max_variants
+        self.variants_lock = threading.Lock()
+
+    def serialize(self, payload, **options):
+        """Serialize a payload the same way jsonify would"""
+        body = (self.app.json.dumps(payload, separators=(',', ':')) + '\n').encode('utf-8')
+        return CachedResponse(body, **options)
+
+    def add(self, key, payload, **options):
+        """Serialize a payload and store it"""
+        self.entries[key] = self.serialize(payload, **options)
+        return self.entries[key]
+
+    def variant(self, key, build, **options):
+        """Get a query-dependent entry, building it with build() on a miss
+
+        Variants live in a bounded LRU so arbitrary query strings cannot grow
+        the cache without limit.
+        """
+        with self.variants_lock:
+            entry = self.variants.get(key)
+            if entry is not None:
+                self.variants.move_to_end(key)
+                return entry
+
+        entry = self.serialize(build(), **options)
+        with self.variants_lock:
+            self.variants[key] = entry
+            self.variants.move_to_end(key)
+            while len(self.variants) > self.max_variants:
+                self.variants.popitem(last=False)
+        return entry
+
+    def get(self, key):
+        """Get a cached entry by key"""
+        return self.entries.get(key)
+
+    def respond(self, key, cache_control=None):
+        """Serve a cached entry for the current request"""
+        return self.entries[key].to_response(cache_control)
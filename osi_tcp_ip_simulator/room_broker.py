@@ -0,0 +1,280 @@
+"""
+Room Broker - pub/sub between session hub workers over a Unix domain socket
+
+When a server runs several worker processes, the sockets of one classroom
+can be spread across them. Every worker's hub subscribes to the rooms it
+has sockets in and publishes each already-serialized event once; the
+broker forwards it to every other subscribed worker, which frames it once
+for all of its own sockets.
+
+One worker runs the broker: whichever first takes an flock on
+``<socket path>.lock``. The lock dies with its process, so when that worker
+exits the others elect a new broker on reconnect.
+
+Wire format, both directions: ``!IB`` (length of the rest, op), then a
+one-byte room name length, the room name and the payload.
+
+Writes are batched: everything a worker publishes during one event-loop
+iteration goes out in a single write, and the broker routes each read chunk
+into one write per subscriber. A subscriber that falls too far behind is
+disconnected (it resubscribes on reconnect) rather than buffered without
+bound.
+"""
+
+import asyncio
+import contextlib
+import fcntl
+import os
+import struct
+
+
+OP_SUBSCRIBE = 1
+OP_UNSUBSCRIBE = 2
+OP_PUBLISH = 3
+
+HEADER = struct.Struct('!IB')
+READ_SIZE = 256 * 1024
+MAX_FRAME_SIZE = 1024 * 1024
+# Output a peer may have queued before it is dropped (broker) or publishes are shed (worker)
+MAX_PEER_BUFFER = 4 * 1024 * 1024
+RECONNECT_DELAY = 0.5
+
+
+def encode_message(op, room, payload=b''):
+    """Build one broker message"""
+    name = room.encode('ascii')
+    return HEADER.pack(1 + len(name) + len(payload), op) + bytes((len(name),)) + name + payload
+
+
+def parse_messages(buffer):
+    """Complete messages at the start of buffer as (op, room, payload, raw), and bytes consumed"""
+    messages = []
+    offset = 0
+    while len(buffer) - offset >= HEADER.size:
+        length, op = HEADER.unpack_from(buffer, offset)
+        if length > MAX_FRAME_SIZE:
+            raise ValueError('Broker message too large')
+        if length < 1:
+            raise ValueError('Broker message has no room name length')
+        end = offset + HEADER.size + length
+        if end > len(buffer):
+            break
+        name_start = offset + HEADER.size + 1
+        name_end = name_start + buffer[offset + HEADER.size]
+        if name_end > end:
+            raise ValueError('Broker room name runs past its message')
+        room = bytes(buffer[name_start:name_end]).decode('ascii')
+        messages.append((op, room, bytes(buffer[name_end:end]), bytes(buffer[offset:end])))
+        offset = end
+    return messages, offset
+
+
+class Peer:
+    """One worker connected to the broker"""
+
+    __slots__ = ('writer', 'rooms')
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.rooms = set()
+
+    def send(self, data):
+        """Queue data, disconnecting a peer that stopped reading"""
+        transport = self.writer.transport
+        if transport.is_closing():
+            return
+        if transport.get_write_buffer_size() > MAX_PEER_BUFFER:
+            transport.abort()
+            return
+        self.writer.write(data)
+
+
+class RoomBroker:
+    """Routes published events to every other worker subscribed to the room"""
+
+    def __init__(self):
+        self.rooms = {}
+        self.peers = set()
+        self.server = None
+
+    async def serve(self, path):
+        """Listen on a Unix socket path"""
+        self.server = await asyncio.start_unix_server(self.handle_peer, path)
+        return self
+
+    def close(self):
+        """Stop listening and drop every worker, which will elect a new broker"""
+        if self.server is not None:
+            self.server.close()
+        for peer in self.peers:
+            peer.writer.transport.abort()
+
+    async def handle_peer(self, reader, writer):
+        """Serve one worker until it disconnects"""
+        peer = Peer(writer)
+        self.peers.add(peer)
+        buffer = bytearray()
+        try:
+            while True:
+                chunk = await reader.read(READ_SIZE)
+                if not chunk:
+                    break
+                buffer += chunk
+                messages, consumed = parse_messages(buffer)
+                del buffer[:consumed]
+                self.route(peer, messages)
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            self.peers.discard(peer)
+            for room in peer.rooms:
+                self.remove(room, peer)
+            writer.close()
+
+    def route(self, peer, messages):
+        """Apply subscriptions and forward publishes, one write per subscriber"""
+        outgoing = {}
+        for op, room, _, raw in messages:
+            if op == OP_SUBSCRIBE:
+                peer.rooms.add(room)
+                self.rooms.setdefault(room, set()).add(peer)
+            elif op == OP_UNSUBSCRIBE:
+                peer.rooms.discard(room)
+                self.remove(room, peer)
+            elif op == OP_PUBLISH:
+                for subscriber in self.rooms.get(room, ()):
+                    if subscriber is not peer:
+                        outgoing.setdefault(subscriber, []).append(raw)
+        for subscriber, parts in outgoing.items():
+            subscriber.send(b''.join(parts))
+
+    def remove(self, room, peer):
+        subscribers = self.rooms.get(room)
+        if subscribers is not None:
+            subscribers.discard(peer)
+            if not subscribers:
+                del self.rooms[room]
+
+
+class BrokerClient:
+    """A worker's connection to the broker, running on the hub's event loop
+
+    on_message(room, payload) is called for every payload published by
+    another worker to a subscribed room.
+    """
+
+    def __init__(self, path, on_message):
+        self.path = path
+        self.on_message = on_message
+        self.rooms = set()
+        self.writer = None
+        self.outbox = bytearray()
+        self.flush_scheduled = False
+        self.broker = None
+        self.lock_file = None
+        self.dropped = 0
+        self.task = None
+
+    def start(self, loop):
+        """Connect (electing a broker if there is none) and keep reconnecting"""
+        self.task = loop.create_task(self.run())
+        return self
+
+    async def run(self):
+        while True:
+            try:
+                reader, self.writer = await self.connect()
+            except OSError:
+                await asyncio.sleep(RECONNECT_DELAY)
+                continue
+
+            # Subscriptions do not survive the connection
+            self.outbox = bytearray(b''.join(encode_message(OP_SUBSCRIBE, room) for room in self.rooms))
+            self.schedule_flush()
+            try:
+                await self.read(reader)
+            except (ConnectionError, ValueError):
+                pass
+            finally:
+                self.writer.close()
+                self.writer = None
+            await asyncio.sleep(RECONNECT_DELAY)
+
+    async def connect(self):
+        """Connect to the broker, starting one in this process if none is running"""
+        with contextlib.suppress(FileNotFoundError, ConnectionRefusedError):
+            return await asyncio.open_unix_connection(self.path)
+        if self.broker is None and self.acquire_lock():
+            # The lock holder owns the socket path, so a leftover file is stale
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(self.path)
+            self.broker = await RoomBroker().serve(self.path)
+        return await asyncio.open_unix_connection(self.path)
+
+    def acquire_lock(self):
+        """Try to become the broker process"""
+        lock_file = open(f'{self.path}.lock', 'a')
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self.lock_file = lock_file
+        return True
+
+    async def read(self, reader):
+        buffer = bytearray()
+        while True:
+            chunk = await reader.read(READ_SIZE)
+            if not chunk:
+                return
+            buffer += chunk
+            messages, consumed = parse_messages(buffer)
+            del buffer[:consumed]
+            for op, room, payload, _ in messages:
+                if op == OP_PUBLISH:
+                    self.on_message(room, payload)
+
+    def subscribe(self, room):
+        self.rooms.add(room)
+        self.queue(encode_message(OP_SUBSCRIBE, room))
+
+    def unsubscribe(self, room):
+        self.rooms.discard(room)
+        self.queue(encode_message(OP_UNSUBSCRIBE, room))
+
+    def publish(self, room, payload):
+        """Queue an event for the other workers; shed it if the broker is unreachable or behind"""
+        if self.writer is None or self.writer.transport.get_write_buffer_size() > MAX_PEER_BUFFER:
+            self.dropped += 1
+            return
+        self.queue(encode_message(OP_PUBLISH, room, payload))
+
+    def queue(self, message):
+        if self.writer is not None:
+            self.outbox += message
+            self.schedule_flush()
+
+    def schedule_flush(self):
+        """Write the outbox once, after everything queued in this loop iteration"""
+        if not self.flush_scheduled:
+            self.flush_scheduled = True
+            asyncio.get_running_loop().call_soon(self.flush)
+
+    def flush(self):
+        self.flush_scheduled = False
+        if self.writer is not None and self.outbox:
+            self.writer.write(bytes(self.outbox))
+        self.outbox.clear()
+
+    def close(self):
+        if self.task is not None:
+            self.task.cancel()
+        if self.writer is not None:
+            self.writer.transport.abort()
+        if self.broker is not None:
+            self.broker.close()
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(self.path)
+        if self.lock_file is not None:
+            self.lock_file.close()
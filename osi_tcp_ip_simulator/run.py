@@ -55,8 +55,9 @@ def main():
         print("\nCould not open browser automatically.")
         print("Please open http://localhost:5000 manually in your web browser")
     
-    # Run Flask app
-    from app import app
+    # Run Flask app; a long-running server builds its data before the first request
+    from simulator import create_app
+    app = create_app({'PRELOAD_DATA': True})
     app.run(debug=True, host='0.0.0.0', port=5000)
 
 
@@ -0,0 +1,218 @@
+"""
+Protocol Search - inverted index with BM25 ranking, prefix completion and snippets
+"""
+
+import heapq
+import html
+import math
+import re
+from bisect import bisect_left
+from operator import itemgetter
+
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+STOP_WORDS = frozenset("""
+a an and are as at be by can for from has in is it its of on or that the this to
+with without was were will which while who why how what when where into than then
+""".split())
+
+# Field weights: a hit in the name counts more than one in the long description
+FIELD_WEIGHTS = {
+    'name': 4.0,
+    'key_points': 1.5,
+    'use_cases': 1.2,
+    'alternatives': 1.0,
+    'description': 1.0,
+}
+
+# BM25 tuning constants
+K1 = 1.2
+B = 0.75
+
+MIN_PREFIX_LENGTH = 2
+MAX_PREFIX_EXPANSIONS = 32
+SNIPPET_LENGTH = 160
+SNIPPET_FIELDS = ('description', 'key_points', 'use_cases', 'alternatives', 'name')
+
+
+def tokenize(text):
+    """Lowercase word tokens without stop words"""
+    return [token for token in TOKEN_PATTERN.findall(text.casefold()) if token not in STOP_WORDS]
+
+
+def protocol_fields(key, protocol):
+    """Searchable text of a protocol, by field"""
+    return {
+        'name': f'{key} {protocol.name}',
+        'key_points': '\n'.join(protocol.key_points),
+        'use_cases': '\n'.join(protocol.use_cases),
+        'alternatives': ' '.join(protocol.alternatives),
+        'description': protocol.description,
+    }
+
+
+class SearchIndex:
+    """Inverted index over the protocol catalogue
+
+    Every posting stores its precomputed BM25 contribution, so answering a
+    query is a handful of dict lookups and additions per matching document.
+    """
+
+    def __init__(self, protocols):
+        self.keys = list(protocols)
+        self.protocols = protocols
+        self.fields = [protocol_fields(key, protocols[key]) for key in self.keys]
+        # Lowercased copies for fast substring search when building snippets
+        self.lowered = [
+            {field: text.lower() if len(text.lower()) == len(text) else text for field, text in fields.items()}
+            for fields in self.fields
+        ]
+        self.postings = {}
+        self.vocabulary = []
+        self.build()
+
+    def build(self):
+        """Tokenize every document and precompute per-posting scores"""
+        term_frequencies = []
+        lengths = []
+        for fields in self.fields:
+            frequencies = {}
+            length = 0.0
+            for field, text in fields.items():
+                weight = FIELD_WEIGHTS[field]
+                for token in tokenize(text):
+                    frequencies[token] = frequencies.get(token, 0.0) + weight
+                    length += weight
+            term_frequencies.append(frequencies)
+            lengths.append(length)
+
+        count = len(self.keys)
+        average_length = (sum(lengths) / count) if count else 1.0
+        document_frequency = {}
+        for frequencies in term_frequencies:
+            for token in frequencies:
+                document_frequency[token] = document_frequency.get(token, 0) + 1
+
+        postings = {}
+        for doc_id, frequencies in enumerate(term_frequencies):
+            norm = K1 * (1 - B + B * lengths[doc_id] / average_length)
+            for token, frequency in frequencies.items():
+                score = idf(count, document_frequency[token]) * frequency * (K1 + 1) / (frequency + norm)
+                postings.setdefault(token, []).append((doc_id, score))
+
+        self.postings = postings
+        self.document_frequency = document_frequency
+        self.vocabulary = sorted(postings)
+        self.sorted_names = sorted((key.casefold(), key) for key in self.keys)
+
+    def expand_prefix(self, prefix, limit=MAX_PREFIX_EXPANSIONS):
+        """Vocabulary terms starting with prefix, most common first"""
+        vocabulary = self.vocabulary
+        matches = []
+        for index in range(bisect_left(vocabulary, prefix), len(vocabulary)):
+            if not vocabulary[index].startswith(prefix):
+                break
+            matches.append(vocabulary[index])
+        matches.sort(key=lambda term: -self.document_frequency[term])
+        return matches[:limit]
+
+    def search(self, query, limit=10):
+        """Ranked results for a query; the last word also matches as a prefix unless whitespace follows it"""
+        terms = tokenize(query)
+        if not terms:
+            return []
+
+        # While typing, the last word is usually incomplete
+        expanded = [[term] for term in terms]
+        if not query[-1:].isspace() and len(terms[-1]) >= MIN_PREFIX_LENGTH:
+            expanded[-1] = [terms[-1]] + [t for t in self.expand_prefix(terms[-1]) if t != terms[-1]]
+
+        scores = {}
+        for alternatives in expanded:
+            best = {}
+            for term in alternatives:
+                # A prefix expansion scores a little below an exact match
+                factor = 1.0 if term == alternatives[0] else 0.8
+                for doc_id, score in self.postings.get(term, ()):
+                    score *= factor
+                    if score > best.get(doc_id, 0.0):
+                        best[doc_id] = score
+            for doc_id, score in best.items():
+                scores[doc_id] = scores.get(doc_id, 0.0) + score
+
+        ranked = heapq.nlargest(limit, scores.items(), key=itemgetter(1))
+        terms = [term for alternatives in expanded for term in alternatives]
+        pattern = re.compile(r'\b(' + '|'.join(map(re.escape, terms)) + r')', re.IGNORECASE)
+        return [self.result(doc_id, score, pattern, terms) for doc_id, score in ranked]
+
+    def result(self, doc_id, score, pattern, terms):
+        """Build a result entry with a highlighted snippet"""
+        key = self.keys[doc_id]
+        protocol = self.protocols[key]
+        field, snippet = self.snippet(doc_id, pattern, terms)
+        return {
+            'key': key,
+            'name': protocol.name,
+            'layer': protocol.layer,
+            'osi_layer_num': protocol.osi_layer_num,
+            'score': round(score, 4),
+            'field': field,
+            'snippet': snippet,
+        }
+
+    def snippet(self, doc_id, pattern, terms):
+        """First matching passage, HTML-escaped with matches in <mark>"""
+        fields = self.fields[doc_id]
+        lowered = self.lowered[doc_id]
+        for field in SNIPPET_FIELDS:
+            position = first_word_match(lowered[field], terms)
+            if position < 0:
+                continue
+            text = fields[field]
+            start = max(0, position - SNIPPET_LENGTH // 3)
+            end = min(len(text), start + SNIPPET_LENGTH)
+            passage = text[start:end].replace('\n', ' ')
+            highlighted = pattern.sub(lambda m: f'\0{m.group(0)}\1', passage)
+            highlighted = html.escape(highlighted).replace('\0', '<mark>').replace('\1', '</mark>')
+            prefix = '…' if start > 0 else ''
+            suffix = '…' if end < len(text) else ''
+            return field, prefix + highlighted + suffix
+        return None, html.escape(fields['description'][:SNIPPET_LENGTH])
+
+    def suggest(self, prefix, limit=8):
+        """Typeahead completions: protocol names first, then indexed words"""
+        prefix = prefix.strip().casefold()
+        if not prefix:
+            return []
+
+        suggestions = []
+        names = self.sorted_names
+        for index in range(bisect_left(names, (prefix,)), len(names)):
+            folded, key = names[index]
+            if not folded.startswith(prefix) or len(suggestions) >= limit:
+                break
+            suggestions.append({'type': 'protocol', 'value': key})
+
+        last_word = (tokenize(prefix) or [''])[-1]
+        if last_word:
+            for term in self.expand_prefix(last_word, limit):
+                suggestions.append({'type': 'term', 'value': term})
+        return suggestions[:limit]
+
+
+def first_word_match(text, terms):
+    """Offset of the earliest term occurrence that starts a word, or -1"""
+    best = -1
+    for term in terms:
+        position = text.find(term)
+        while position > 0 and text[position - 1].isalnum():
+            position = text.find(term, position + 1)
+        if position >= 0 and (best < 0 or position < best):
+            best = position
+    return best
+
+
+def idf(count, df):
+    """BM25 inverse document frequency (always positive)"""
+    return math.log(1 + (count - df + 0.5) / (df + 0.5))
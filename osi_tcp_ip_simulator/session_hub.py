@@ -0,0 +1,644 @@
+"""
+Session Hub - real-time multi-user sessions over WebSockets
+
+A single asyncio event loop, running in a background thread next to the
+Flask app, serves every socket: an idle classroom costs one coroutine and a
+few hundred bytes per client instead of one OS thread. Clients exchange
+JSON text frames shaped as ``{"event": name, "data": {...}}``.
+
+Client events:  join_session, send_message, broadcast_animation,
+                start_animation, clock_sync
+Server events:  session_joined_confirmation, user_joined, user_left,
+                message_sent, animation_update, animation_scheduled,
+                session_resumed, clock_sync, error
+
+Only the joining socket receives the full participant list; everyone else
+gets a one-participant delta, so a join costs O(room size) bytes in total
+rather than O(room size squared).
+
+Animation progress is coalesced: each room collects its senders' newest
+steps and broadcasts them as one frame per tick, so intermediate steps
+that were superseded within a tick are never sent. A step is the compact
+list [user_id, layer, direction, progress]; steps that did not change
+since the last tick are left out.
+
+Transmissions play in lockstep. Clients estimate the hub's clock NTP-style
+with clock_sync probes: t0 is the client's send time, t1 and t2 are the
+hub's receive and send times, and t3 is the client's receive time. A
+start_animation is answered to the whole room with a start time on the
+hub's clock, far enough ahead for the slowest socket in the room to hear
+of it, and every client plays each layer step against that time.
+
+Broadcasts carry a per-room sequence number ("seq" in the envelope) and
+are kept in a bounded ReplayLog. A client that reconnects passes
+{"resume": {"epoch", "seq"}} with join_session and gets only the frames
+it missed, or a session snapshot if the log no longer reaches back that far.
+
+With a broker path, hubs in several worker processes share their rooms:
+every broadcast event is also published, serialized once, through
+room_broker, and each worker numbers it in its own log and frames it once
+for its local sockets. A client that reconnects to another worker gets a
+snapshot, since that worker's log has a different epoch.
+"""
+
+import asyncio
+import base64
+import contextlib
+import hashlib
+import itertools
+import json
+import math
+import secrets
+import socket
+import struct
+import threading
+import time
+from collections import deque
+
+from session_store import SESSION_ID_LENGTH, MemorySessionStore
+
+
+WEBSOCKET_GUID = '258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+
+DEFAULT_PORT = 5001
+LISTEN_BACKLOG = 1024
+MAX_HANDSHAKE_SIZE = 8 * 1024
+MAX_MESSAGE_SIZE = 64 * 1024
+# A client this far behind on reading is dropped rather than buffered forever
+MAX_WRITE_BUFFER = 256 * 1024
+HEARTBEAT_INTERVAL = 25.0
+# Animation steps are batched into one broadcast per room this often
+ANIMATION_TICK = 0.05
+# A scheduled transmission starts this long after it is requested, plus the room's slowest round trip
+ANIMATION_LEAD = 0.3
+MAX_ANIMATION_LEAD = 3.0
+# Broadcast frames kept per room for reconnecting clients, and for how long once the room is empty
+REPLAY_LOG_SIZE = 256
+REPLAY_RETENTION = 120.0
+
+MAX_NAME_LENGTH = 40
+MAX_TEXT_LENGTH = 2000
+
+# Down the stack while encapsulating, up while decapsulating
+DIRECTIONS = {'down': 1, 'up': -1}
+
+OP_CONTINUATION = 0x0
+OP_TEXT = 0x1
+OP_BINARY = 0x2
+OP_CLOSE = 0x8
+OP_PING = 0x9
+OP_PONG = 0xA
+
+CLOSE_NORMAL = 1000
+CLOSE_PROTOCOL_ERROR = 1002
+CLOSE_UNSUPPORTED = 1003
+CLOSE_TOO_BIG = 1009
+
+
+class ProtocolError(Exception):
+    """A client broke the WebSocket protocol; carries the close code to send"""
+
+    def __init__(self, message, code=CLOSE_PROTOCOL_ERROR):
+        super().__init__(message)
+        self.code = code
+
+
+def encode_frame(payload, opcode=OP_TEXT):
+    """Build an unmasked server-to-client frame"""
+    length = len(payload)
+    if length < 126:
+        header = struct.pack('!BB', 0x80 | opcode, length)
+    elif length < 1 << 16:
+        header = struct.pack('!BBH', 0x80 | opcode, 126, length)
+    else:
+        header = struct.pack('!BBQ', 0x80 | opcode, 127, length)
+    return header + payload
+
+
+def serialize_event(event, data):
+    """An event as the JSON object clients receive"""
+    return json.dumps({'event': event, 'data': data}, separators=(',', ':')).encode('utf-8')
+
+
+def encode_event(event, data):
+    """Serialize an event into a frame for one client"""
+    return encode_frame(serialize_event(event, data))
+
+
+def encode_close(code, reason=''):
+    """Build a close frame"""
+    return encode_frame(struct.pack('!H', code) + reason.encode('utf-8')[:120], OP_CLOSE)
+
+
+def unmask(payload, mask):
+    """XOR a client payload with its 4-byte mask"""
+    if not payload:
+        return payload
+    length = len(payload)
+    key = (mask * (length // 4 + 1))[:length]
+    return (int.from_bytes(payload, 'big') ^ int.from_bytes(key, 'big')).to_bytes(length, 'big')
+
+
+def accept_key(key):
+    """Sec-WebSocket-Accept value for a client's Sec-WebSocket-Key"""
+    return base64.b64encode(hashlib.sha1((key + WEBSOCKET_GUID).encode('ascii')).digest()).decode('ascii')
+
+
+def clip(value, length):
+    """A string field from a client, truncated to length"""
+    return str(value)[:length] if value is not None else ''
+
+
+def number(value):
+    """A finite numeric field from a client, or None
+
+    json.loads accepts NaN and Infinity, which would poison every time
+    computed from them and cannot be sent back to a browser.
+    """
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+        return None
+    return value
+
+
+def server_time():
+    """The hub's clock in milliseconds, as used by clock sync and scheduled animations"""
+    return time.time() * 1000
+
+
+class Connection:
+    """One WebSocket client"""
+
+    __slots__ = ('reader', 'writer', 'session_id', 'user_id', 'user_name', 'last_seen', 'closed', 'rtt')
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.session_id = None
+        self.user_id = None
+        self.user_name = None
+        self.last_seen = time.monotonic()
+        self.closed = False
+        # Round trip in seconds, as last measured by the client's clock sync
+        self.rtt = 0.0
+
+    def send(self, frame):
+        """Queue a frame without waiting; drop the client if it stopped reading"""
+        if self.closed:
+            return
+        transport = self.writer.transport
+        if transport.is_closing() or transport.get_write_buffer_size() > MAX_WRITE_BUFFER:
+            self.abort()
+            return
+        self.writer.write(frame)
+
+    def abort(self):
+        """Drop the connection immediately"""
+        if not self.closed:
+            self.closed = True
+            self.writer.transport.abort()
+
+
+class ReplayLog:
+    """Numbered broadcast frames of one room, oldest dropped first"""
+
+    __slots__ = ('epoch', 'frames', 'next_seq')
+
+    def __init__(self, size):
+        # Sequence numbers are only meaningful within one log
+        self.epoch = secrets.token_hex(4)
+        self.frames = deque(maxlen=size)
+        self.next_seq = 1
+
+    @property
+    def seq(self):
+        """Sequence number of the newest frame (0 before the first)"""
+        return self.next_seq - 1
+
+    def append(self, body):
+        """Number a serialized {"event", "data"} object; keep and return its frame"""
+        seq = self.next_seq
+        self.next_seq += 1
+        # Splice the number into the object instead of serializing it again
+        frame = encode_frame(b'{"seq":%d,' % seq + body[1:])
+        self.frames.append(frame)
+        return frame
+
+    def since(self, seq):
+        """Frames after seq, or None if any of them is no longer kept"""
+        first = self.next_seq - len(self.frames)
+        if not first - 1 <= seq <= self.seq:
+            return None
+        return list(itertools.islice(self.frames, seq - first + 1, None))
+
+
+class SessionHub:
+    """WebSocket server that fans session events out to rooms
+
+    Session state lives in a thread-safe SessionStore shared with the Flask
+    views; the sockets in each room are only touched on the hub's own event
+    loop, so they need no locking.
+    """
+
+    def __init__(self, store=None, host='0.0.0.0', port=DEFAULT_PORT, broker_path=None):
+        self.store = store if store is not None else MemorySessionStore()
+        self.host = host
+        self.port = port
+        self.broker_path = broker_path
+        self.broker = None
+        self.rooms = {}
+        self.connections = set()
+        # Per room: newest step per user waiting for the tick, and the last step sent
+        self.pending_steps = {}
+        self.sent_steps = {}
+        # Per room ReplayLog; outlives the room's sockets for REPLAY_RETENTION
+        self.logs = {}
+        self.loop = None
+        self.server = None
+        self.thread = None
+        self.ready = threading.Event()
+        self.error = None
+        self.handlers = {
+            'join_session': self.on_join_session,
+            'send_message': self.on_send_message,
+            'broadcast_animation': self.on_broadcast_animation,
+            'start_animation': self.on_start_animation,
+            'clock_sync': self.on_clock_sync,
+        }
+
+    # Server lifecycle
+
+    def start(self, timeout=5.0):
+        """Start the event loop thread and wait until the port is bound"""
+        self.store.start_sweeper()
+        self.thread = threading.Thread(target=self.run, name='session-hub', daemon=True)
+        self.thread.start()
+        self.ready.wait(timeout)
+        if self.error is not None:
+            raise self.error
+        return self
+
+    def run(self):
+        """Thread target: serve sockets until stop() is called"""
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.server = self.loop.run_until_complete(asyncio.start_server(
+                self.handle_client, self.host, self.port,
+                backlog=LISTEN_BACKLOG, reuse_address=True, limit=MAX_HANDSHAKE_SIZE,
+                # Lets every worker process of a multi-worker server bind the hub port
+                reuse_port=hasattr(socket, 'SO_REUSEPORT')
+            ))
+        except OSError as error:
+            self.error = error
+            self.ready.set()
+            return
+        self.port = self.server.sockets[0].getsockname()[1]
+        if self.broker_path:
+            from room_broker import BrokerClient
+            self.broker = BrokerClient(self.broker_path, self.deliver).start(self.loop)
+        heartbeat = self.loop.create_task(self.heartbeat())
+        self.ready.set()
+        try:
+            self.loop.run_forever()
+        finally:
+            heartbeat.cancel()
+            self.server.close()
+            if self.broker is not None:
+                self.broker.close()
+            # Aborted sockets make their handlers finish on their own
+            for connection in list(self.connections):
+                connection.abort()
+            pending = asyncio.all_tasks(self.loop)
+            if pending:
+                self.loop.run_until_complete(asyncio.wait(pending, timeout=1.0))
+            self.loop.close()
+
+    def stop(self):
+        """Stop serving and wait for the thread to exit"""
+        if self.loop is not None and self.loop.is_running():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+        if self.thread is not None:
+            self.thread.join()
+        self.store.close()
+
+    async def heartbeat(self):
+        """Ping every client periodically and drop the ones that went silent"""
+        ping = encode_frame(b'', OP_PING)
+        while True:
+            await asyncio.sleep(HEARTBEAT_INTERVAL)
+            deadline = time.monotonic() - 2 * HEARTBEAT_INTERVAL
+            for connection in list(self.connections):
+                if connection.last_seen < deadline:
+                    connection.abort()
+                else:
+                    connection.send(ping)
+
+    # WebSocket protocol
+
+    async def handle_client(self, reader, writer):
+        """Serve one socket from handshake to close"""
+        connection = Connection(reader, writer)
+        try:
+            await self.handshake(reader, writer)
+            self.connections.add(connection)
+            while True:
+                message = await self.read_message(connection)
+                if message is None:
+                    break
+                await self.dispatch(connection, message)
+        except ProtocolError as error:
+            connection.send(encode_close(error.code, str(error)))
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError, ValueError):
+            pass
+        finally:
+            self.connections.discard(connection)
+            await self.leave(connection)
+            connection.closed = True
+            writer.close()
+            with contextlib.suppress(Exception):
+                await writer.wait_closed()
+
+    async def handshake(self, reader, writer):
+        """Answer the HTTP upgrade request"""
+        request = await reader.readuntil(b'\r\n\r\n')
+        lines = request.decode('latin-1').split('\r\n')
+        method = lines[0].split(' ', 1)[0]
+        headers = {}
+        for line in lines[1:]:
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        key = headers.get('sec-websocket-key')
+        if method != 'GET' or headers.get('upgrade', '').lower() != 'websocket' or not key:
+            writer.write(
+                b'HTTP/1.1 426 Upgrade Required\r\n'
+                b'Sec-WebSocket-Version: 13\r\nContent-Length: 0\r\nConnection: close\r\n\r\n'
+            )
+            raise ConnectionAbortedError('Not a WebSocket upgrade')
+
+        writer.write((
+            'HTTP/1.1 101 Switching Protocols\r\n'
+            'Upgrade: websocket\r\n'
+            'Connection: Upgrade\r\n'
+            f'Sec-WebSocket-Accept: {accept_key(key)}\r\n\r\n'
+        ).encode('ascii'))
+
+    async def read_message(self, connection):
+        """Next complete text message, answering control frames; None on close"""
+        reader = connection.reader
+        fragments = []
+        size = 0
+        while True:
+            first, second = await reader.readexactly(2)
+            final = first & 0x80
+            opcode = first & 0x0F
+            if not second & 0x80:
+                raise ProtocolError('Client frames must be masked')
+
+            length = second & 0x7F
+            if length == 126:
+                length, = struct.unpack('!H', await reader.readexactly(2))
+            elif length == 127:
+                length, = struct.unpack('!Q', await reader.readexactly(8))
+            if size + length > MAX_MESSAGE_SIZE:
+                raise ProtocolError('Message too big', CLOSE_TOO_BIG)
+
+            mask = await reader.readexactly(4)
+            payload = unmask(await reader.readexactly(length), mask)
+            connection.last_seen = time.monotonic()
+
+            if opcode == OP_CLOSE:
+                connection.send(encode_close(CLOSE_NORMAL))
+                return None
+            if opcode == OP_PING:
+                connection.send(encode_frame(payload, OP_PONG))
+                continue
+            if opcode == OP_PONG:
+                continue
+            if opcode == OP_BINARY:
+                raise ProtocolError('Binary messages are not supported', CLOSE_UNSUPPORTED)
+            if opcode not in (OP_TEXT, OP_CONTINUATION) or (opcode == OP_CONTINUATION) != bool(fragments):
+                raise ProtocolError('Unexpected frame')
+
+            fragments.append(payload)
+            size += length
+            if final:
+                return b''.join(fragments)
+
+    # Events
+
+    async def dispatch(self, connection, message):
+        """Route a client event to its handler"""
+        try:
+            envelope = json.loads(message)
+        except ValueError:
+            connection.send(encode_event('error', {'message': 'Invalid JSON'}))
+            return
+
+        handler = self.handlers.get(envelope.get('event')) if isinstance(envelope, dict) else None
+        data = envelope.get('data') if handler else None
+        if handler is None or not isinstance(data, dict):
+            connection.send(encode_event('error', {'message': 'Unknown event'}))
+            return
+        await handler(connection, data)
+
+    def broadcast(self, session_id, event, data):
+        """Send an event to every socket in a room (and other workers), serializing it once"""
+        body = serialize_event(event, data)
+        self.deliver(session_id, body)
+        if self.broker is not None:
+            self.broker.publish(session_id, body)
+
+    def deliver(self, session_id, body):
+        """Number a serialized event in the room's log and write it to the room's sockets
+
+        Everyone gets the same frame, senders included; clients skip their
+        own events.
+        """
+        log = self.logs.get(session_id)
+        if log is None:
+            log = self.logs[session_id] = ReplayLog(REPLAY_LOG_SIZE)
+        frame = log.append(body)
+        for connection in self.rooms.get(session_id, ()):
+            connection.send(frame)
+
+    async def on_join_session(self, connection, data):
+        """Add a socket (and its user) to a session"""
+        session_id = clip(data.get('session_id'), SESSION_ID_LENGTH * 2).upper()
+        user_id = clip(data.get('user_id'), MAX_NAME_LENGTH)
+        user_name = clip(data.get('user_name'), MAX_NAME_LENGTH) or user_id
+        if not user_id:
+            connection.send(encode_event('error', {'message': 'Missing user_id'}))
+            return
+
+        # Store calls may hit disk (SQLite backend), keep them off the event loop
+        joined = await asyncio.to_thread(self.store.join, session_id, user_id, user_name)
+        if joined is None:
+            connection.send(encode_event('error', {'message': f'Session {session_id} not found'}))
+            return
+        await self.leave(connection)
+        participant, participants, messages = joined
+        connection.session_id = session_id
+        connection.user_id = user_id
+        connection.user_name = user_name
+        room = self.rooms.get(session_id)
+        if room is None:
+            room = self.rooms[session_id] = set()
+            if self.broker is not None:
+                self.broker.subscribe(session_id)
+        room.add(connection)
+
+        log = self.logs.get(session_id)
+        if log is None:
+            log = self.logs[session_id] = ReplayLog(REPLAY_LOG_SIZE)
+        missed = self.missed_frames(log, data.get('resume'))
+        if missed is not None:
+            # A reconnect: the client's state plus the missed events is the current state
+            connection.send(encode_event('session_resumed', {
+                'session_id': session_id,
+                'replay': {'epoch': log.epoch, 'seq': log.seq},
+                'missed': len(missed),
+            }))
+            for frame in missed:
+                connection.send(frame)
+        else:
+            connection.send(encode_event('session_joined_confirmation', {
+                'session_id': session_id,
+                'participants': participants,
+                'total_count': len(participants),
+                'recent_messages': messages,
+                'replay': {'epoch': log.epoch, 'seq': log.seq},
+            }))
+        self.broadcast(session_id, 'user_joined', {
+            'session_id': session_id,
+            'participant': participant,
+            'total_count': len(participants),
+        })
+
+    @staticmethod
+    def missed_frames(log, resume):
+        """Frames a reconnecting client missed, or None if it needs a snapshot"""
+        if not isinstance(resume, dict) or resume.get('epoch') != log.epoch:
+            return None
+        seq = resume.get('seq')
+        if not isinstance(seq, int) or isinstance(seq, bool):
+            return None
+        return log.since(seq)
+
+    async def on_send_message(self, connection, data):
+        """Relay a chat message to the rest of the session and keep it in history"""
+        if self.joined(connection):
+            message = {
+                'session_id': connection.session_id,
+                'user_id': connection.user_id,
+                'user_name': connection.user_name,
+                'message': clip(data.get('message'), MAX_TEXT_LENGTH),
+                'timestamp': clip(data.get('timestamp'), MAX_NAME_LENGTH),
+            }
+            self.store.add_message(connection.session_id, message)
+            self.broadcast(connection.session_id, 'message_sent', message)
+
+    async def on_broadcast_animation(self, connection, data):
+        """Record a user's newest animation step for the room's next tick"""
+        if not self.joined(connection):
+            return
+        layer = data.get('layer')
+        progress = number(data.get('progress'))
+        step = (
+            layer if isinstance(layer, int) and not isinstance(layer, bool) else None,
+            DIRECTIONS.get(data.get('direction')),
+            # A fraction of the transmission; NaN or Infinity was already dropped by number()
+            round(min(max(progress, 0.0), 1.0), 3) if progress is not None else None,
+        )
+        session_id = connection.session_id
+        pending = self.pending_steps.get(session_id)
+        if pending is None:
+            pending = self.pending_steps[session_id] = {}
+            self.loop.call_later(ANIMATION_TICK, self.flush_steps, session_id)
+        # A newer step from the same user supersedes the queued one
+        pending[connection.user_id] = step
+
+    def flush_steps(self, session_id):
+        """Broadcast the room's changed animation steps as one frame"""
+        pending = self.pending_steps.pop(session_id, None)
+        if not pending or session_id not in self.rooms:
+            return
+        sent = self.sent_steps.setdefault(session_id, {})
+        steps = []
+        for user_id, step in pending.items():
+            if sent.get(user_id) != step:
+                sent[user_id] = step
+                steps.append([user_id, *step])
+        if steps:
+            self.store.touch(session_id)
+            # Senders get their own steps back too, so every socket shares one frame
+            self.broadcast(session_id, 'animation_update', {'session_id': session_id, 'steps': steps})
+
+    async def on_start_animation(self, connection, data):
+        """Schedule a transmission for everyone in the session at one hub time"""
+        if not self.joined(connection):
+            return
+        session_id = connection.session_id
+        slowest = max((member.rtt for member in self.rooms.get(session_id, ())), default=0.0)
+        lead = min(ANIMATION_LEAD + slowest, MAX_ANIMATION_LEAD)
+        self.store.touch(session_id)
+        # The sender plays it from this broadcast too, so its screen keeps time with the rest
+        self.broadcast(session_id, 'animation_scheduled', {
+            'session_id': session_id,
+            'user_id': connection.user_id,
+            'user_name': connection.user_name,
+            'message': clip(data.get('message'), MAX_TEXT_LENGTH),
+            'start_at': round(server_time() + lead * 1000),
+        })
+
+    async def on_clock_sync(self, connection, data):
+        """Answer a clock probe with the hub's receive and send times"""
+        received = server_time()
+        rtt = number(data.get('rtt'))
+        if rtt is not None:
+            connection.rtt = min(max(rtt / 1000, 0.0), MAX_ANIMATION_LEAD)
+        connection.send(encode_event('clock_sync', {
+            't0': number(data.get('t0')),
+            't1': received,
+            't2': server_time(),
+        }))
+
+    def expire_log(self, session_id):
+        """Drop the log of a room that stayed empty"""
+        if session_id not in self.rooms:
+            self.logs.pop(session_id, None)
+
+    def joined(self, connection):
+        """True if the socket joined a session; otherwise tell the client to join first"""
+        if connection.session_id is None:
+            connection.send(encode_event('error', {'message': 'Join a session first'}))
+            return False
+        return True
+
+    async def leave(self, connection):
+        """Remove a socket from its room; the session itself stays open"""
+        session_id = connection.session_id
+        if session_id is None:
+            return
+        connection.session_id = None
+        room = self.rooms.get(session_id)
+        if room is not None:
+            room.discard(connection)
+            if not room:
+                del self.rooms[session_id]
+                self.sent_steps.pop(session_id, None)
+                # Keep the log a while for clients that are about to reconnect
+                self.loop.call_later(REPLAY_RETENTION, self.expire_log, session_id)
+                if self.broker is not None:
+                    self.broker.unsubscribe(session_id)
+
+        # Only the user's last open socket makes them leave
+        left = await asyncio.to_thread(self.store.leave, session_id, connection.user_id)
+        if left is not None:
+            participant, total_count = left
+            self.sent_steps.get(session_id, {}).pop(participant['user_id'], None)
+            self.broadcast(session_id, 'user_left', {
+                'session_id': session_id,
+                'participant': participant,
+                'total_count': total_count,
+            })
@@ -0,0 +1,254 @@
+"""
+Session Store - multi-user session state with TTL expiry and striped locks
+
+SessionStore is the interface the session hub and the Flask views use;
+open_session_store() picks a backend:
+
+    memory                  MemorySessionStore, one process (the default)
+    sqlite:///path/to/db    SQLiteSessionStore, shared by every worker on a host
+
+In the memory backend sessions are spread over independently locked shards,
+so joins in different classrooms never wait on each other. Participants are
+keyed by user_id (O(1) join and leave), chat history is a bounded deque, and
+a background sweeper drops sessions that have been empty and idle for longer
+than the TTL, so memory stays flat on a server that runs for weeks.
+"""
+
+import secrets
+import string
+import threading
+import time
+from collections import deque
+
+
+SESSION_ID_ALPHABET = string.ascii_uppercase + string.digits
+SESSION_ID_LENGTH = 6
+
+DEFAULT_TTL = 2 * 60 * 60
+DEFAULT_HISTORY = 100
+DEFAULT_SHARDS = 16
+SWEEP_INTERVAL = 60.0
+
+
+class Session:
+    """State of one classroom"""
+
+    __slots__ = ('session_id', 'created_at', 'last_active', 'participants', 'connection_counts', 'messages')
+
+    def __init__(self, session_id, history):
+        self.session_id = session_id
+        self.created_at = self.last_active = time.time()
+        self.participants = {}
+        # Open sockets per user, so a second tab does not duplicate the user
+        self.connection_counts = {}
+        self.messages = deque(maxlen=history)
+
+
+class Shard:
+    """A slice of the session table with its own lock"""
+
+    __slots__ = ('lock', 'sessions')
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.sessions = {}
+
+
+class SessionStore:
+    """Interface of a thread-safe session table, plus the expiry sweeper
+
+    Backends implement create, exists, participants, join, leave,
+    add_message, touch, sweep and __len__.
+    """
+
+    def __init__(self, ttl=DEFAULT_TTL, history=DEFAULT_HISTORY):
+        self.ttl = ttl
+        self.history = history
+        self.sweeper = None
+        self.stopping = threading.Event()
+
+    def create(self):
+        """Create an empty session and return its ID"""
+        raise NotImplementedError
+
+    def exists(self, session_id):
+        """True if the session exists"""
+        raise NotImplementedError
+
+    def participants(self, session_id):
+        """Copy of a session's participants, or None if it does not exist"""
+        raise NotImplementedError
+
+    def join(self, session_id, user_id, user_name):
+        """Add one connection for a user
+
+        Returns (participant, participants, recent messages), or None if the
+        session does not exist.
+        """
+        raise NotImplementedError
+
+    def leave(self, session_id, user_id):
+        """Remove one connection for a user
+
+        Returns (participant, remaining count) when the user's last
+        connection closed, otherwise None.
+        """
+        raise NotImplementedError
+
+    def add_message(self, session_id, message):
+        """Append to a session's bounded chat history"""
+        raise NotImplementedError
+
+    def touch(self, session_id):
+        """Mark a session as active"""
+        raise NotImplementedError
+
+    def sweep(self, now=None):
+        """Drop sessions that are empty and idle past the TTL; return how many"""
+        raise NotImplementedError
+
+    def __len__(self):
+        raise NotImplementedError
+
+    def new_session_id(self):
+        """A random candidate session ID"""
+        return ''.join(secrets.choice(SESSION_ID_ALPHABET) for _ in range(SESSION_ID_LENGTH))
+
+    def start_sweeper(self, interval=SWEEP_INTERVAL):
+        """Run sweep() every interval seconds in a daemon thread"""
+        def run():
+            while not self.stopping.wait(interval):
+                self.sweep()
+
+        self.sweeper = threading.Thread(target=run, name='session-sweeper', daemon=True)
+        self.sweeper.start()
+        return self
+
+    def stop_sweeper(self):
+        """Stop the sweeper thread"""
+        self.stopping.set()
+        if self.sweeper is not None:
+            self.sweeper.join()
+
+    def close(self):
+        """Stop background work and release resources"""
+        self.stop_sweeper()
+
+
+class MemorySessionStore(SessionStore):
+    """Session table in this process's memory"""
+
+    def __init__(self, ttl=DEFAULT_TTL, history=DEFAULT_HISTORY, shards=DEFAULT_SHARDS):
+        super().__init__(ttl, history)
+        self.shards = [Shard() for _ in range(shards)]
+
+    def shard(self, session_id):
+        """Shard that owns a session ID"""
+        return self.shards[hash(session_id) % len(self.shards)]
+
+    def create(self):
+        """Create an empty session and return its ID"""
+        while True:
+            session_id = self.new_session_id()
+            shard = self.shard(session_id)
+            with shard.lock:
+                if session_id not in shard.sessions:
+                    shard.sessions[session_id] = Session(session_id, self.history)
+                    return session_id
+
+    def exists(self, session_id):
+        """True if the session exists"""
+        shard = self.shard(session_id)
+        with shard.lock:
+            return session_id in shard.sessions
+
+    def participants(self, session_id):
+        """Copy of a session's participants, or None if it does not exist"""
+        shard = self.shard(session_id)
+        with shard.lock:
+            session = shard.sessions.get(session_id)
+            if session is None:
+                return None
+            return [dict(participant) for participant in session.participants.values()]
+
+    def join(self, session_id, user_id, user_name):
+        """Add one connection for a user"""
+        shard = self.shard(session_id)
+        with shard.lock:
+            session = shard.sessions.get(session_id)
+            if session is None:
+                return None
+            session.last_active = time.time()
+            participant = session.participants.get(user_id)
+            if participant is None:
+                participant = session.participants[user_id] = {
+                    'user_id': user_id,
+                    'user_name': user_name,
+                    'joined_at': session.last_active,
+                }
+            participant['user_name'] = user_name
+            session.connection_counts[user_id] = session.connection_counts.get(user_id, 0) + 1
+            return dict(participant), [dict(p) for p in session.participants.values()], list(session.messages)
+
+    def leave(self, session_id, user_id):
+        """Remove one connection for a user"""
+        shard = self.shard(session_id)
+        with shard.lock:
+            session = shard.sessions.get(session_id)
+            if session is None:
+                return None
+            session.last_active = time.time()
+            remaining = session.connection_counts.get(user_id, 0) - 1
+            if remaining > 0:
+                session.connection_counts[user_id] = remaining
+                return None
+            session.connection_counts.pop(user_id, None)
+            participant = session.participants.pop(user_id, None)
+            if participant is None:
+                return None
+            return participant, len(session.participants)
+
+    def add_message(self, session_id, message):
+        """Append to a session's bounded chat history"""
+        shard = self.shard(session_id)
+        with shard.lock:
+            session = shard.sessions.get(session_id)
+            if session is not None:
+                session.last_active = time.time()
+                session.messages.append(message)
+
+    def touch(self, session_id):
+        """Mark a session as active"""
+        shard = self.shard(session_id)
+        with shard.lock:
+            session = shard.sessions.get(session_id)
+            if session is not None:
+                session.last_active = time.time()
+
+    def __len__(self):
+        return sum(len(shard.sessions) for shard in self.shards)
+
+    def sweep(self, now=None):
+        """Drop sessions that are empty and idle past the TTL; return how many"""
+        deadline = (now or time.time()) - self.ttl
+        expired = 0
+        for shard in self.shards:
+            with shard.lock:
+                stale = [
+                    session_id for session_id, session in shard.sessions.items()
+                    if not session.participants and session.last_active < deadline
+                ]
+                for session_id in stale:
+                    del shard.sessions[session_id]
+            expired += len(stale)
+        return expired
+
+
+def open_session_store(backend='memory', **options):
+    """Open a session store from a backend name or sqlite:/// URL"""
+    if backend == 'memory':
+        return MemorySessionStore(**options)
+    if backend.startswith('sqlite:///'):
+        from session_store_sqlite import SQLiteSessionStore
+        return SQLiteSessionStore(backend[len('sqlite:///'):], **options)
+    raise ValueError(f'Unknown session backend: {backend}')
@@ -0,0 +1,346 @@
+"""
+SQLite Session Store - session state shared by every worker process on a host
+
+The database runs in WAL mode, so readers (verify-session, participant
+lists) never block the writer. Creates, joins and leaves commit
+synchronously, because another worker may be asked about the session
+immediately. Chat messages and activity stamps, the high-volume writes, are
+queued and committed in batches by a background writer thread.
+
+Open sockets are counted per worker process, and each worker stamps a
+heartbeat row from its writer thread. A worker that crashed or restarted
+stops stamping, so sweep() (and a new store at startup) drops its
+connections after WORKER_TIMEOUT, and with them the participants they
+kept in the roster; their sessions then expire like any empty one.
+"""
+
+import json
+import logging
+import os
+import queue
+import secrets
+import socket
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from session_store import DEFAULT_HISTORY, DEFAULT_TTL, SessionStore
+
+
+BATCH_INTERVAL = 0.05
+BATCH_SIZE = 256
+BUSY_TIMEOUT_MS = 5000
+# Seconds between a worker's heartbeats, and without one before its connections are dropped
+WORKER_HEARTBEAT = 10.0
+WORKER_TIMEOUT = 60.0
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    created_at REAL NOT NULL,
+    last_active REAL NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS participants (
+    session_id TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    user_name TEXT NOT NULL,
+    joined_at REAL NOT NULL,
+    PRIMARY KEY (session_id, user_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS connections (
+    session_id TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    worker TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (session_id, user_id, worker)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS connections_by_worker ON connections (worker);
+CREATE TABLE IF NOT EXISTS workers (
+    worker TEXT PRIMARY KEY,
+    seen_at REAL NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id TEXT NOT NULL,
+    body TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS messages_by_session ON messages (session_id, id);
+"""
+
+
+class SQLiteSessionStore(SessionStore):
+    """Session table in a SQLite database (WAL mode, batched writes)"""
+
+    def __init__(self, path, ttl=DEFAULT_TTL, history=DEFAULT_HISTORY,
+                 batch_interval=BATCH_INTERVAL, batch_size=BATCH_SIZE, worker_timeout=WORKER_TIMEOUT):
+        super().__init__(ttl, history)
+        self.path = path
+        self.batch_interval = batch_interval
+        self.batch_size = batch_size
+        self.worker_timeout = worker_timeout
+        # Unique per process start, so a restarted worker never inherits a crashed one's rows
+        self.worker = f'{socket.gethostname()}:{os.getpid()}:{secrets.token_hex(4)}'
+        # Request threads come and go, so connections are pooled rather than per thread
+        self.pool = queue.SimpleQueue()
+
+        with self.connection() as db:
+            db.execute('PRAGMA journal_mode=WAL')
+            db.executescript(SCHEMA)
+        self.heartbeat()
+        self.write(self.reap_workers)
+
+        self.pending_messages = []
+        self.pending_touches = {}
+        self.pending_lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.writer = threading.Thread(target=self.write_batches, name='session-writer', daemon=True)
+        self.writer.start()
+
+    @contextmanager
+    def connection(self):
+        """Borrow a pooled database connection"""
+        try:
+            db = self.pool.get_nowait()
+        except queue.Empty:
+            db = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+            db.execute(f'PRAGMA busy_timeout={BUSY_TIMEOUT_MS}')
+            db.execute('PRAGMA synchronous=NORMAL')
+        try:
+            yield db
+        finally:
+            self.pool.put(db)
+
+    def read(self, statements):
+        """Run statements(db) against one consistent snapshot"""
+        with self.connection() as db:
+            db.execute('BEGIN')
+            try:
+                return statements(db)
+            finally:
+                db.execute('COMMIT')
+
+    def write(self, statements):
+        """Run statements(db) inside one immediate (write-locked) transaction"""
+        with self.connection() as db:
+            db.execute('BEGIN IMMEDIATE')
+            try:
+                result = statements(db)
+            except BaseException:
+                db.execute('ROLLBACK')
+                raise
+            db.execute('COMMIT')
+            return result
+
+    def create(self):
+        """Create an empty session and return its ID"""
+        now = time.time()
+        while True:
+            session_id = self.new_session_id()
+            try:
+                self.write(lambda db: db.execute(
+                    'INSERT INTO sessions (session_id, created_at, last_active) VALUES (?, ?, ?)',
+                    (session_id, now, now)
+                ))
+                return session_id
+            except sqlite3.IntegrityError:
+                continue
+
+    def exists(self, session_id):
+        """True if the session exists"""
+        with self.connection() as db:
+            return db.execute('SELECT 1 FROM sessions WHERE session_id = ?', (session_id,)).fetchone() is not None
+
+    def participants(self, session_id):
+        """Copy of a session's participants, or None if it does not exist"""
+        def statements(db):
+            if db.execute('SELECT 1 FROM sessions WHERE session_id = ?', (session_id,)).fetchone() is None:
+                return None
+            return self.read_participants(db, session_id)
+
+        return self.read(statements)
+
+    @staticmethod
+    def read_participants(db, session_id):
+        """Participants of a session in join order"""
+        rows = db.execute(
+            'SELECT user_id, user_name, joined_at FROM participants WHERE session_id = ? ORDER BY joined_at',
+            (session_id,)
+        )
+        return [{'user_id': user_id, 'user_name': user_name, 'joined_at': joined_at}
+                for user_id, user_name, joined_at in rows]
+
+    def join(self, session_id, user_id, user_name):
+        """Add one connection for a user"""
+        # A late joiner must see messages still waiting in the batch
+        self.flush()
+        now = time.time()
+
+        def statements(db):
+            updated = db.execute('UPDATE sessions SET last_active = ? WHERE session_id = ?', (now, session_id))
+            if updated.rowcount == 0:
+                return None
+            db.execute(
+                'INSERT INTO participants (session_id, user_id, user_name, joined_at) VALUES (?, ?, ?, ?) '
+                'ON CONFLICT (session_id, user_id) DO UPDATE SET user_name = excluded.user_name',
+                (session_id, user_id, user_name, now)
+            )
+            db.execute(
+                'INSERT INTO connections (session_id, user_id, worker, count) VALUES (?, ?, ?, 1) '
+                'ON CONFLICT (session_id, user_id, worker) DO UPDATE SET count = count + 1',
+                (session_id, user_id, self.worker)
+            )
+            participants = self.read_participants(db, session_id)
+            messages = [json.loads(body) for body, in db.execute(
+                'SELECT body FROM (SELECT id, body FROM messages WHERE session_id = ? ORDER BY id DESC LIMIT ?) '
+                'ORDER BY id', (session_id, self.history)
+            )]
+            participant = next(p for p in participants if p['user_id'] == user_id)
+            return participant, participants, messages
+
+        return self.write(statements)
+
+    def leave(self, session_id, user_id):
+        """Remove one connection for a user"""
+        now = time.time()
+
+        def statements(db):
+            key = (session_id, user_id, self.worker)
+            row = db.execute(
+                'SELECT count FROM connections WHERE session_id = ? AND user_id = ? AND worker = ?', key
+            ).fetchone()
+            if row is None:
+                return None
+            db.execute('UPDATE sessions SET last_active = ? WHERE session_id = ?', (now, session_id))
+            if row[0] > 1:
+                db.execute('UPDATE connections SET count = count - 1 '
+                           'WHERE session_id = ? AND user_id = ? AND worker = ?', key)
+                return None
+            db.execute('DELETE FROM connections WHERE session_id = ? AND user_id = ? AND worker = ?', key)
+            if db.execute('SELECT 1 FROM connections WHERE session_id = ? AND user_id = ?',
+                          (session_id, user_id)).fetchone() is not None:
+                # Still connected through another worker
+                return None
+            row = db.execute(
+                'SELECT user_name, joined_at FROM participants WHERE session_id = ? AND user_id = ?',
+                (session_id, user_id)
+            ).fetchone()
+            if row is None:
+                return None
+            user_name, joined_at = row
+            db.execute('DELETE FROM participants WHERE session_id = ? AND user_id = ?', (session_id, user_id))
+            remaining, = db.execute('SELECT COUNT(*) FROM participants WHERE session_id = ?', (session_id,)).fetchone()
+            return {'user_id': user_id, 'user_name': user_name, 'joined_at': joined_at}, remaining
+
+        return self.write(statements)
+
+    def add_message(self, session_id, message):
+        """Queue a chat message for the next batch"""
+        with self.pending_lock:
+            self.pending_messages.append((session_id, json.dumps(message, separators=(',', ':'))))
+            self.pending_touches[session_id] = time.time()
+            full = len(self.pending_messages) >= self.batch_size
+        if full:
+            self.wakeup.set()
+
+    def touch(self, session_id):
+        """Queue an activity stamp for the next batch"""
+        with self.pending_lock:
+            self.pending_touches[session_id] = time.time()
+
+    def flush(self):
+        """Commit queued messages and activity stamps in one transaction"""
+        with self.pending_lock:
+            messages, self.pending_messages = self.pending_messages, []
+            touches, self.pending_touches = self.pending_touches, {}
+        if not messages and not touches:
+            return
+
+        def statements(db):
+            db.executemany('INSERT INTO messages (session_id, body) VALUES (?, ?)', messages)
+            db.executemany(
+                'UPDATE sessions SET last_active = MAX(last_active, ?) WHERE session_id = ?',
+                [(stamp, session_id) for session_id, stamp in touches.items()]
+            )
+            # Trim each session that grew back to its newest `history` messages
+            for session_id in {session_id for session_id, _ in messages}:
+                db.execute(
+                    'DELETE FROM messages WHERE session_id = ? AND id <= '
+                    '(SELECT id FROM messages WHERE session_id = ? ORDER BY id DESC LIMIT 1 OFFSET ?)',
+                    (session_id, session_id, self.history)
+                )
+
+        self.write(statements)
+
+    def write_batches(self):
+        """Writer thread: flush every batch_interval, or sooner when a batch fills, and keep the heartbeat"""
+        beat = time.monotonic()
+        while not self.stopping.is_set():
+            self.wakeup.wait(self.batch_interval)
+            self.wakeup.clear()
+            try:
+                self.flush()
+                if time.monotonic() - beat >= WORKER_HEARTBEAT:
+                    beat = time.monotonic()
+                    self.heartbeat()
+            except Exception:
+                # A failed batch is lost, but the thread must live on for the next ones
+                logger.exception('Session store batch write failed')
+
+    def heartbeat(self):
+        """Stamp this worker as alive"""
+        self.write(lambda db: db.execute(
+            'INSERT INTO workers (worker, seen_at) VALUES (?, ?) '
+            'ON CONFLICT (worker) DO UPDATE SET seen_at = excluded.seen_at',
+            (self.worker, time.time())
+        ))
+
+    def reap_workers(self, db, now=None):
+        """Drop the connections of workers whose heartbeat stopped, and participants left with none"""
+        deadline = (now or time.time()) - self.worker_timeout
+        # The worker running this is alive, whatever its last stamp says
+        db.execute('DELETE FROM workers WHERE seen_at < ? AND worker != ?', (deadline, self.worker))
+        db.execute('DELETE FROM connections WHERE worker NOT IN (SELECT worker FROM workers)')
+        return db.execute(
+            'DELETE FROM participants WHERE NOT EXISTS (SELECT 1 FROM connections WHERE '
+            'connections.session_id = participants.session_id AND connections.user_id = participants.user_id)'
+        ).rowcount
+
+    def sweep(self, now=None):
+        """Drop dead workers' participants, then sessions that are empty and idle past the TTL; return how many"""
+        self.flush()
+        deadline = (now or time.time()) - self.ttl
+
+        def statements(db):
+            self.reap_workers(db, now)
+            expired = db.execute(
+                'DELETE FROM sessions WHERE last_active < ? AND NOT EXISTS '
+                '(SELECT 1 FROM participants WHERE participants.session_id = sessions.session_id)',
+                (deadline,)
+            ).rowcount
+            db.execute(
+                'DELETE FROM messages WHERE session_id NOT IN (SELECT session_id FROM sessions)'
+            )
+            return expired
+
+        return self.write(statements)
+
+    def __len__(self):
+        with self.connection() as db:
+            return db.execute('SELECT COUNT(*) FROM sessions').fetchone()[0]
+
+    def close(self):
+        """Stop the writer and sweeper threads, commit what is queued and retire this worker"""
+        self.stopping.set()
+        self.wakeup.set()
+        self.writer.join()
+        self.stop_sweeper()
+        self.flush()
+        self.write(lambda db: db.execute('DELETE FROM workers WHERE worker = ?', (self.worker,)))
+        while True:
+            try:
+                self.pool.get_nowait().close()
+            except queue.Empty:
+                break
@@ -0,0 +1,59 @@
+"""
+Application factory shared by every entry point (run.py, app.py, Vercel)
+"""
+
+import os
+from pathlib import Path
+
+from flask import Flask
+
+
+SIMULATOR_DIR = Path(__file__).resolve().parent
+
+
+def create_app(config=None):
+    """Create the simulator Flask app
+
+    Models and cached payloads are built on the first request that needs
+    them, so importing this module and creating the app stays cheap for
+    serverless cold starts. Long-running servers can pass
+    ``{'PRELOAD_DATA': True}`` to pay that cost up front instead.
+
+    The multi-user session hub (a WebSocket server on SESSION_HUB_PORT) is
+    likewise started by the first session request, never at import.
+    """
+    app = Flask(
+        __name__,
+        template_folder=str(SIMULATOR_DIR / 'templates'),
+        static_folder=str(SIMULATOR_DIR / 'static'),
+        static_url_path='/static'
+    )
+    app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'osi-model-simulator-secret-key')
+    app.config['PRELOAD_DATA'] = False
+    # Serverless hosts cannot keep sockets open, so the session hub is off there
+    app.config['SESSION_HUB'] = 'VERCEL' not in os.environ
+    app.config['SESSION_HUB_PORT'] = int(os.environ.get('SESSION_HUB_PORT', 5001))
+    # 'memory' for one process, 'sqlite:///path' to share sessions between workers
+    app.config['SESSION_BACKEND'] = os.environ.get('SESSION_BACKEND', 'memory')
+    # Empty sessions are dropped after this many idle seconds
+    app.config['SESSION_TTL'] = int(os.environ.get('SESSION_TTL', 2 * 60 * 60))
+    # Unix socket path through which the hubs of several workers share rooms
+    app.config['SESSION_BROKER'] = os.environ.get('SESSION_BROKER')
+    app.config['SESSION_HISTORY'] = 100
+    # Uploads to /api/captures are spooled to a temporary file, never held in memory
+    app.config['CAPTURE_MAX_BYTES'] = int(os.environ.get('CAPTURE_MAX_MB', 1024)) * 1024 * 1024
+    # Concurrent flows /api/flows tracks before it ends the ones nearest their timeout
+    app.config['FLOW_TABLE_MAX'] = int(os.environ.get('FLOW_TABLE_MAX', 262144))
+    # Bounds on one /api/simulate run, so a request cannot hold a worker indefinitely
+    app.config['SIMULATION_MAX_NODES'] = int(os.environ.get('SIMULATION_MAX_NODES', 10000))
+    app.config['SIMULATION_MAX_EVENTS'] = int(os.environ.get('SIMULATION_MAX_EVENTS', 2000000))
+    if config:
+        app.config.update(config)
+
+    from views import bp, get_data
+    app.register_blueprint(bp)
+
+    if app.config['PRELOAD_DATA']:
+        get_data(app)
+
+    return app
@@ -3,7 +3,107 @@
  * Handles WebSocket communication, session creation/joining, and QR codes
  */
 
+/**
+ * Minimal event socket for the session hub: JSON frames shaped as
+ * {event, data} over a plain WebSocket, with an on()/emit() interface.
+ */
+class HubSocket {
+    constructor(url) {
+        this.handlers = {};
+        this.socket = new WebSocket(url);
+        this.socket.onopen = () => this.dispatch('connect');
+        this.socket.onclose = () => this.dispatch('disconnect');
+        this.socket.onmessage = (message) => {
+            const envelope = JSON.parse(message.data);
+            this.dispatch(envelope.event, envelope.data);
+            // Broadcasts are numbered so a reconnect can ask for what it missed
+            if (envelope.seq !== undefined) {
+                this.dispatch('sequenced', envelope.seq);
+            }
+        };
+    }
+
+    static url() {
+        const scheme = window.location.protocol === 'https:' ? 'wss' : 'ws';
+        const port = document.body.dataset.hubPort || '5001';
+        return `${scheme}://${window.location.hostname}:${port}/`;
+    }
+
+    on(event, handler) {
+        (this.handlers[event] = this.handlers[event] || []).push(handler);
+    }
+
+    emit(event, data) {
+        if (this.socket.readyState === WebSocket.OPEN) {
+            this.socket.send(JSON.stringify({ event, data }));
+        }
+    }
+
+    dispatch(event, data) {
+        (this.handlers[event] || []).forEach(handler => handler(data));
+    }
+}
+
+/**
+ * NTP-style estimate of the session hub's clock. Each probe records the
+ * local send time t0; the hub answers with its receive and send times t1
+ * and t2, and t3 is the local receive time. Of the recent samples, the
+ * one with the shortest round trip gives the most trustworthy offset.
+ */
+class SessionClock {
+    static BURST = 5;
+    static SAMPLES = 8;
+    static RESYNC_MS = 30000;
+
+    constructor() {
+        this.offset = 0; // hub time minus local time, in ms
+        this.rtt = null;
+        this.samples = [];
+        this.timer = null;
+    }
+
+    start(socket) {
+        this.socket = socket;
+        socket.on('clock_sync', (data) => this.receive(data));
+        // A quick burst to converge, then an occasional probe to follow drift
+        for (let i = 0; i < SessionClock.BURST; i++) {
+            setTimeout(() => this.probe(), i * 200);
+        }
+        clearInterval(this.timer);
+        this.timer = setInterval(() => this.probe(), SessionClock.RESYNC_MS);
+    }
+
+    stop() {
+        clearInterval(this.timer);
+    }
+
+    probe() {
+        // The last round trip lets the hub give slow phones enough lead time
+        this.socket.emit('clock_sync', { t0: Date.now(), rtt: this.rtt });
+    }
+
+    receive(data) {
+        const t3 = Date.now();
+        const rtt = (t3 - data.t0) - (data.t2 - data.t1);
+        const offset = ((data.t1 - data.t0) + (data.t2 - t3)) / 2;
+        this.samples.push({ rtt, offset });
+        if (this.samples.length > SessionClock.SAMPLES) {
+            this.samples.shift();
+        }
+        const best = this.samples.reduce((a, b) => (b.rtt < a.rtt ? b : a));
+        this.offset = best.offset;
+        this.rtt = best.rtt;
+    }
+
+    toLocal(hubTime) {
+        return hubTime - this.offset;
+    }
+}
+
 class MultiUserManager {
+    static RECONNECT_MIN_MS = 1000;
+    static RECONNECT_MAX_MS = 15000;
+
     constructor() {
         console.log('🚀 MultiUserManager initialized');
         this.socket = null;
@@ -12,6 +112,11 @@ class MultiUserManager {
         this.userName = `User-${this.userId.substring(0, 4)}`;
         this.isConnected = false;
         this.isSessionActive = false;
+        this.participants = new Map();
+        this.remoteAnimations = new Map();
+        this.clock = new SessionClock();
+        this.replay = null; // {epoch, seq} of the last broadcast seen, for resuming
+        this.reconnectDelay = MultiUserManager.RECONNECT_MIN_MS;
         this.initializeEventListeners();
         this.checkUrlForSession();
     }
@@ -117,7 +222,7 @@ class MultiUserManager {
             
             const mobileUrlDiv = document.getElementById('mobileUrl');
             const serverIp = data.server_ip;
-            const sessionUrl = `http://${serverIp}:5000/?session=${this.sessionId}`;
+            const sessionUrl = data.url;
             mobileUrlDiv.innerHTML = `<strong>🌐 Link for Phone:</strong><br>${sessionUrl}`;
             
             // Add copy button for URL
@@ -241,42 +346,99 @@ class MultiUserManager {
     }
 
     initializeWebSocket() {
-        this.socket = io();
+        this.socket = new HubSocket(HubSocket.url());
 
         this.socket.on('connect', () => {
             console.log('✓ WebSocket connected');
             this.isConnected = true;
+            this.reconnectDelay = MultiUserManager.RECONNECT_MIN_MS;
+            this.clock.start(this.socket);
             
-            // Emit join request
+            // Emit join request; after a drop, ask only for the events we missed
             this.socket.emit('join_session', {
                 session_id: this.sessionId,
                 user_id: this.userId,
-                user_name: this.userName
+                user_name: this.userName,
+                resume: this.replay
             });
             
             // Fetch current participants to ensure sync
-            this.fetchParticipants();
+            if (!this.replay) {
+                this.fetchParticipants();
+            }
+        });
+
+        this.socket.on('sequenced', (seq) => {
+            if (this.replay) {
+                this.replay.seq = seq;
+            }
+        });
+
+        this.socket.on('session_resumed', (data) => {
+            console.log(`🔁 Session resumed, replaying ${data.missed} missed events`);
+            this.replay = data.replay;
         });
 
         this.socket.on('user_joined', (data) => {
             console.log('👥 User joined session:', data);
             console.log(`   Total participants: ${data.total_count}`);
-            this.updateParticipants(data.participants);
+            this.participants.set(data.participant.user_id, data.participant);
+            this.renderParticipants();
         });
 
         this.socket.on('session_joined_confirmation', (data) => {
             console.log('✅ Session join confirmed:', data);
+            const rejoined = this.replay !== null;
+            this.replay = data.replay;
             this.updateParticipants(data.participants);
+            // A snapshot after a reconnect replaces whatever chat we had
+            if (rejoined) {
+                const messageLog = document.getElementById('messageLog');
+                if (messageLog) messageLog.innerHTML = '';
+            }
+            (data.recent_messages || [])
+                .filter(message => message.user_id !== this.userId)
+                .forEach(message => this.displayRemoteMessage(message));
+        });
+
+        this.socket.on('user_left', (data) => {
+            console.log('👋 User left session:', data);
+            this.participants.delete(data.participant.user_id);
+            this.renderParticipants();
+            const animDiv = this.remoteAnimations.get(data.participant.user_id);
+            if (animDiv) {
+                animDiv.remove();
+                this.remoteAnimations.delete(data.participant.user_id);
+            }
         });
 
         this.socket.on('message_sent', (data) => {
+            if (data.user_id === this.userId) return;
             console.log('Remote message received:', data);
             this.displayRemoteMessage(data);
         });
 
         this.socket.on('animation_update', (data) => {
-            console.log('Animation update received:', data);
-            this.displayRemoteAnimation(data);
+            // One frame per tick with each user's newest [user_id, layer, direction, progress]
+            data.steps.forEach(([userId, layer, direction, progress]) => {
+                if (userId === this.userId) return;
+                const participant = this.participants.get(userId);
+                this.displayRemoteAnimation({
+                    user_id: userId,
+                    user_name: participant ? participant.user_name : userId,
+                    layer: layer,
+                    direction: direction,
+                    progress: progress
+                });
+            });
+        });
+
+        this.socket.on('animation_scheduled', (data) => {
+            // Every screen, the presenter's included, starts at the same hub time
+            if (typeof networkSimulator === 'undefined' || !networkSimulator) return;
+            console.log(`⏱️ ${data.user_name} scheduled a transmission (clock offset ${Math.round(this.clock.offset)} ms)`);
+            networkSimulator.playScheduledTransmission(data.message, this.clock.toLocal(data.start_at),
+                data.user_id === this.userId);
         });
 
         this.socket.on('error', (data) => {
@@ -287,9 +449,20 @@ class MultiUserManager {
         this.socket.on('disconnect', () => {
             console.warn('⚠️ WebSocket disconnected');
             this.isConnected = false;
+            this.clock.stop();
+            this.scheduleReconnect();
         });
     }
 
+    scheduleReconnect() {
+        // Reconnect in place, with backoff, instead of making the student reload the page
+        if (!this.isSessionActive) return;
+        const delay = this.reconnectDelay;
+        this.reconnectDelay = Math.min(delay * 2, MultiUserManager.RECONNECT_MAX_MS);
+        console.log(`🔌 Reconnecting in ${delay / 1000}s...`);
+        setTimeout(() => this.initializeWebSocket(), delay);
+    }
+
     async fetchParticipants() {
         // Fetch current participants from server to ensure synchronization
         try {
@@ -326,10 +499,17 @@ class MultiUserManager {
     }
 
     updateParticipants(participants) {
+        // Full roster from the server; join/leave events then arrive as deltas
+        this.participants = new Map((participants || []).map(p => [p.user_id, p]));
+        this.renderParticipants();
+    }
+
+    renderParticipants() {
+        const participants = Array.from(this.participants.values());
         const participantsList = document.getElementById('participantsList');
         participantsList.innerHTML = '';
         
-        if (!participants || participants.length === 0) {
+        if (participants.length === 0) {
             participantsList.innerHTML = '<li style="color: #999;">No participants yet</li>';
             return;
         }
@@ -362,17 +542,21 @@ class MultiUserManager {
         });
     }
 
-    broadcastAnimation(layer, progress, status) {
+    startAnimation(message) {
+        // The hub answers the whole session, this client included, with a start time
+        this.socket.emit('start_animation', { message: message });
+    }
+
+    broadcastAnimation(layer, direction, progress) {
+        // direction is 'down' (encapsulating) or 'up' (decapsulating)
         if (!this.isSessionActive || !this.socket) {
             return;
         }
 
         this.socket.emit('broadcast_animation', {
-            session_id: this.sessionId,
-            user_name: this.userName,
             layer: layer,
-            progress: progress,
-            status: status
+            direction: direction,
+            progress: progress
         });
     }
 
@@ -391,16 +575,22 @@ class MultiUserManager {
     }
 
     displayRemoteAnimation(data) {
-        // Display animation progress from other users
+        // One line per user, updated in place as their animation advances
         const animationLog = document.getElementById('animationLog');
         if (!animationLog) return;
 
-        const animDiv = document.createElement('div');
-        animDiv.className = 'remote-animation';
+        let animDiv = this.remoteAnimations.get(data.user_id);
+        if (!animDiv) {
+            animDiv = document.createElement('div');
+            animDiv.className = 'remote-animation';
+            animationLog.appendChild(animDiv);
+            this.remoteAnimations.set(data.user_id, animDiv);
+        }
+        const status = data.direction === -1 ? 'Decapsulating' : 'Encapsulating';
+        const percent = data.progress === null ? '' : ` ${Math.round(data.progress * 100)}%`;
         animDiv.innerHTML = `
-            <strong>${data.user_name}:</strong> ${data.status} (Layer ${data.layer})
+            <strong>${data.user_name}:</strong> ${status} (Layer ${data.layer})${percent}
         `;
-        animationLog.appendChild(animDiv);
     }
 }
 
@@ -378,28 +378,18 @@ class NetworkSimulator {
         this.initializeTips();
     }
 
-    // Load data from backend API
+    // Load data from backend API (single versioned bootstrap document)
     async loadData() {
         try {
-            const [osiRes, tcpipRes, encapRes, decapRes, protocolRes] = await Promise.all([
-                fetch('/api/osi-layers'),
-                fetch('/api/tcpip-layers'),
-                fetch('/api/encapsulation'),
-                fetch('/api/decapsulation'),
-                fetch('/api/protocols')
-            ]);
-
-            const osiData = await osiRes.json();
-            const tcpipData = await tcpipRes.json();
-            const encapData = await encapRes.json();
-            const decapData = await decapRes.json();
-            const protocolData = await protocolRes.json();
-
-            this.osiLayers = osiData.layers;
-            this.tcpipLayers = tcpipData.layers;
-            this.encapsulationSequence = encapData.sequence;
-            this.decapsulationSequence = decapData.sequence;
-            this.allProtocols = protocolData.protocols;
+            const bootstrapUrl = document.body.dataset.bootstrapUrl || '/api/bootstrap';
+            const response = await fetch(bootstrapUrl);
+            const data = await response.json();
+
+            this.osiLayers = data.osi_layers;
+            this.tcpipLayers = data.tcpip_layers;
+            this.encapsulationSequence = data.encapsulation;
+            this.decapsulationSequence = data.decapsulation;
+            this.allProtocols = data.protocols;
         } catch (error) {
             console.error('Error loading data:', error);
         }
@@ -1207,6 +1197,19 @@ class NetworkSimulator {
             return;
         }
 
+        // In a session the hub schedules the animation for every screen, this one included
+        const session = window.multiUserManager;
+        if (session && session.isSessionActive && session.isConnected) {
+            session.startAnimation(message);
+            return;
+        }
+
+        await this.playScheduledTransmission(message, Date.now());
+    }
+
+    // Play a transmission that starts at startAt (local ms), e.g. one scheduled by the session hub.
+    // The screen that scheduled it reports its layer steps to the session, for anyone who joined too late to play along
+    async playScheduledTransmission(message, startAt, report = false) {
         this.isAnimating = true;
         document.getElementById('sendMessageBtn').disabled = true;
 
@@ -1214,25 +1217,47 @@ class NetworkSimulator {
         document.getElementById('senderMessage').textContent = message;
 
         // Start transmission animation
-        await this.animateMessageTransmission(message);
+        const finished = await this.animateMessageTransmission(message, startAt, report);
 
+        // A newer scheduled transmission took over the display
+        if (!finished) return;
         this.isAnimating = false;
         document.getElementById('sendMessageBtn').disabled = false;
     }
 
     // Animate message transmission through layers
-    async animateMessageTransmission(message) {
+    async animateMessageTransmission(message, startAt = Date.now(), report = false) {
         const messageBubble = document.getElementById('messageBubble');
         const statusText = document.getElementById('statusText');
         const progressBar = document.getElementById('progressBar');
 
+        // Each step waits for its slot on the timeline rather than a fixed
+        // delay, so screens that started late catch up instead of drifting
+        const run = this.transmissionRun = {};
+        let at = startAt;
+        const step = async (ms) => {
+            at += ms;
+            await this.sleep(Math.max(0, at - Date.now()));
+            return this.transmissionRun === run;
+        };
+
+        if (startAt > Date.now()) {
+            statusText.textContent = '⏱️ Starting in sync with the session...';
+            if (!await step(0)) return false;
+        }
+
+        // Real headers for this message, and its simulated trip across the
+        // network, arrive while layers 7-5 play
+        this.loadFrameLayers(message, run);
+        this.loadNetworkPath(message, run);
+
         // Reset receiver
         document.getElementById('receiverMessage').textContent = 'Waiting...';
         progressBar.style.width = '0%';
 
         // Phase 1: Encapsulation (Layers 7 to 1)
         statusText.textContent = '📤 Transmission started - Encapsulating message...';
-        await this.sleep(500);
+        if (!await step(500)) return false;
 
         for (let layer = 7; layer >= 1; layer--) {
             const osiLayer = this.osiLayers.find(l => l.number === layer);
@@ -1245,17 +1270,25 @@ class NetworkSimulator {
                 const progress = ((8 - layer) / 8) * 50;
                 progressBar.style.width = progress + '%';
                 statusText.textContent = `⬇️ Processing at Layer ${layer}: ${osiLayer.name}`;
+                if (report) this.reportStep(layer, 'down', progress / 100);
             }
 
-            await this.sleep(5000);
+            if (!await step(5000)) return false;
         }
 
-        // Phase 2: Message travels across network
+        // Phase 2: Message travels across network, hop by hop once the simulation has answered.
+        // The hops share the same 2 s, so screens in a session stay in step either way
         statusText.textContent = '🌐 Message traveling across network...';
         progressBar.style.width = '50%';
         messageBubble.classList.remove('receiving');
         messageBubble.classList.add('sending');
-        await this.sleep(2000);
+        const hops = this.networkHops;
+        if (hops && hops.length) {
+            for (const hop of hops) {
+                statusText.textContent = `🌐 ${hop.text}`;
+                if (!await step(2000 / hops.length)) return false;
+            }
+        } else if (!await step(2000)) return false;
 
         // Phase 3: Decapsulation (Layers 1 to 7)
         statusText.textContent = '📥 Message received - Decapsulating...';
@@ -1273,9 +1306,10 @@ class NetworkSimulator {
                 const progress = 50 + ((layer / 7) * 50);
                 progressBar.style.width = progress + '%';
                 statusText.textContent = `⬆️ Processing at Layer ${layer}: ${osiLayer.name}`;
+                if (report) this.reportStep(layer, 'up', progress / 100);
             }
 
-            await this.sleep(5000);
+            if (!await step(5000)) return false;
         }
 
         // Phase 4: Message received
@@ -1289,11 +1323,12 @@ class NetworkSimulator {
             '🎉 Transmission Complete!',
             `<p><strong>Message:</strong> "${message}"</p>
              <p><strong>Path:</strong> Sender → Layer 7 → Layer 6 → Layer 5 → Layer 4 → Layer 3 → Layer 2 → Layer 1 → Network → Layer 1 → Layer 2 → Layer 3 → Layer 4 → Layer 5 → Layer 6 → Layer 7 → Receiver</p>
+             ${this.networkPathSummary()}
              <p><strong>Status:</strong> Message successfully transmitted and received!</p>`
         );
 
         // Re-enable button after delay
-        await this.sleep(1000);
+        return step(1000);
     }
 
     // Update layer animation display
@@ -1334,19 +1369,19 @@ class NetworkSimulator {
                     break;
                 case 4:
                     action = 'Transport Layer - Adding TCP/UDP header (Port info)';
-                    data = `Segment: [Header: Port 80] + Data + [Checksum]`;
+                    data = this.frameLayerData(4, `Segment: [Header: Port 80] + Data + [Checksum]`);
                     break;
                 case 3:
                     action = 'Network Layer - Adding IP header (Source & Destination IP)';
-                    data = `Packet: [IP Header] + Segment + [Trailer]`;
+                    data = this.frameLayerData(3, `Packet: [IP Header] + Segment + [Trailer]`);
                     break;
                 case 2:
                     action = 'Data Link Layer - Adding MAC header (Physical addresses)';
-                    data = `Frame: [MAC Header] + Packet + [MAC Trailer]`;
+                    data = this.frameLayerData(2, `Frame: [MAC Header] + Packet + [MAC Trailer]`);
                     break;
                 case 1:
                     action = 'Physical Layer - Converting to bits for transmission';
-                    data = `Bits: 11010110101011010...`;
+                    data = this.frameLayerData(1, `Bits: 11010110101011010...`);
                     break;
             }
         } else {
@@ -1357,15 +1392,15 @@ class NetworkSimulator {
                     break;
                 case 2:
                     action = 'Data Link Layer - Removing MAC header';
-                    data = `Frame → [Removed MAC Header] → Packet`;
+                    data = this.receivedLayerData(2, `Frame → [Removed MAC Header] → Packet`);
                     break;
                 case 3:
                     action = 'Network Layer - Removing IP header and routing';
-                    data = `Packet → [Removed IP Header] → Segment`;
+                    data = this.receivedLayerData(3, `Packet → [Removed IP Header] → Segment`);
                     break;
                 case 4:
                     action = 'Transport Layer - Removing TCP/UDP header';
-                    data = `Segment → [Removed Port Info] → Data`;
+                    data = this.receivedLayerData(4, `Segment → [Removed Port Info] → Data`);
                     break;
                 case 5:
                     action = 'Session Layer - Closing session connection';
@@ -1398,6 +1433,100 @@ class NetworkSimulator {
         currentLayerData.textContent = '';
     }
 
+    // Send one layer step to the session hub, which batches the room's steps per tick
+    reportStep(layer, direction, progress) {
+        const session = window.multiUserManager;
+        if (session) session.broadcastAnimation(layer, direction, progress);
+    }
+
+    // Fetch the byte-accurate frame for a message, then parse it as the receiver
+    // would (placeholders stay if either fails)
+    async loadFrameLayers(message, run) {
+        this.frameLayers = null;
+        this.receivedLayers = null;
+        try {
+            const response = await fetch(`/api/encapsulate?message=${encodeURIComponent(message)}`);
+            const data = await response.json();
+            if (!data.success || this.transmissionRun !== run) return;
+            this.frameLayers = Object.fromEntries(data.layers.map(layer => [layer.layer, layer]));
+
+            const received = await (await fetch(`/api/decapsulate?fcs=1&frame=${data.frame}`)).json();
+            if (received.success && this.transmissionRun === run) {
+                this.receivedLayers = Object.fromEntries(received.layers.map(layer => [layer.layer, layer]));
+            }
+        } catch (error) {
+            console.error('Error building frame:', error);
+        }
+    }
+
+    // Hop-by-hop timeline of the message crossing the simulated lab network
+    async loadNetworkPath(message, run) {
+        this.networkHops = null;
+        this.networkSimulation = null;
+        try {
+            const response = await fetch(`/api/simulate?message=${encodeURIComponent(message)}`);
+            const data = await response.json();
+            if (!data.success || this.transmissionRun !== run) return;
+            this.networkSimulation = data;
+            // The sender's and receiver's own steps are the layer phases around this one
+            this.networkHops = data.timeline.filter(entry => entry.event !== 'send' && entry.event !== 'deliver');
+        } catch (error) {
+            console.error('Error simulating the network path:', error);
+        }
+    }
+
+    // Devices the simulated frame crossed, for the completion panel
+    networkPathSummary() {
+        const simulation = this.networkSimulation;
+        if (!simulation || !simulation.summary.delivered) return '';
+        const devices = ['Sender', ...simulation.timeline.filter(entry => entry.event === 'transmit').map(entry => entry.to)];
+        return `<p><strong>Network:</strong> ${devices.join(' → ')} ` +
+            `(${simulation.summary.latency_ms.max.toFixed(3)} ms simulated)</p>`;
+    }
+
+    // Data state for a layer of the parsed frame, or the placeholder
+    receivedLayerData(layerNum, placeholder) {
+        const layer = this.receivedLayers && this.receivedLayers[layerNum];
+        if (!layer) return placeholder;
+        const fields = layer.fields;
+        switch (layerNum) {
+            case 2:
+                return `Frame from ${fields.src_mac}: FCS ${fields.fcs} ${fields.fcs_status}, ` +
+                    `EtherType ${fields.ethertype} (${fields.ethertype_name}) → Packet`;
+            case 3:
+                return `Packet from ${fields.src_ip}: header checksum ${fields.checksum} ${fields.checksum_status}, ` +
+                    `protocol ${fields.protocol} (${fields.protocol_name}) → Segment`;
+            case 4: {
+                const application = this.receivedLayers[7] && this.receivedLayers[7].protocol;
+                return `Segment to port ${fields.dst_port}: checksum ${fields.checksum} ${fields.checksum_status}` +
+                    (application ? ` → Data for ${application.name}` : ' → Data');
+            }
+        }
+        return placeholder;
+    }
+
+    // Data state for a layer from the real frame, or the placeholder
+    frameLayerData(layerNum, placeholder) {
+        const layer = this.frameLayers && this.frameLayers[layerNum];
+        if (!layer) return placeholder;
+        const fields = layer.fields;
+        switch (layerNum) {
+            case 4:
+                return `Segment (${layer.length} bytes): port ${fields.src_port} → ${fields.dst_port}` +
+                    (fields.seq !== undefined ? `, seq ${fields.seq}` : '') +
+                    `, checksum ${fields.checksum}<br>Header: ${layer.header}`;
+            case 3:
+                return `Packet (${layer.length} bytes): ${fields.src_ip} → ${fields.dst_ip}, TTL ${fields.ttl}, ` +
+                    `checksum ${fields.checksum}<br>Header: ${layer.header}`;
+            case 2:
+                return `Frame (${layer.length} bytes): ${fields.src_mac} → ${fields.dst_mac}, FCS ${fields.fcs}` +
+                    `<br>Header: ${layer.header}`;
+            case 1:
+                return `Bits (preamble, SFD, then the frame): ${layer.bits}...`;
+        }
+        return placeholder;
+    }
+
     // Helper function: Encrypt message (simple Caesar cipher for demo)
     encryptMessage(message) {
         return message.split('').map(char => {
@@ -1478,7 +1607,6 @@ let networkSimulator; // Global reference for protocol modal access
 document.addEventListener('DOMContentLoaded', () => {
     console.log('🌐 DOM Loaded - Initializing...');
     networkSimulator = new NetworkSimulator();
-    new MultiUserManager();
     console.log('✅ All systems initialized');
     console.log('🔗 Protocol clicks are now active - Click protocol names to view details');
 });
@@ -0,0 +1,25 @@
+"""
+Shared fixtures: the simulator modules import each other by bare name (as
+run.py and the benchmarks load them), so the package directory goes on
+sys.path first.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+
+SIMULATOR_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(SIMULATOR_DIR))
+
+
+@pytest.fixture
+def app():
+    from simulator import create_app
+    return create_app({'TESTING': True, 'SESSION_HUB': False})
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
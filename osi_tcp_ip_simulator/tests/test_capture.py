@@ -0,0 +1,190 @@
+import io
+import json
+import struct
+
+import pytest
+
+from capture import Capture, analyze, open_classifier, read_pcap, read_pcapng, write_pcap
+from encapsulation import FrameBuilder
+
+
+def frames():
+    return [
+        FrameBuilder('tcp', src_port=40000, dst_port=80).build(b'GET / HTTP/1.1\r\nHost: example.com\r\n\r\n'),
+        FrameBuilder('udp', src_port=40001, dst_port=53).build(b'query'),
+    ]
+
+
+def pcap(packets=None):
+    file = io.BytesIO()
+    write_pcap(file, frames() if packets is None else packets, start=100.0)
+    return file.getvalue()
+
+
+def block(block_type, body):
+    length = 12 + len(body)
+    return struct.pack('<II', block_type, length) + body + struct.pack('<I', length)
+
+
+def pcapng(packets=None):
+    data = block(0x0A0D0D0A, struct.pack('<IHHq', 0x1A2B3C4D, 1, 0, -1))
+    data += block(1, struct.pack('<HHI', 1, 0, 65535))
+    for frame in frames() if packets is None else packets:
+        padded = bytes(frame) + bytes(-len(frame) % 4)
+        data += block(6, struct.pack('<IIIII', 0, 0, 1_000_000, len(frame), len(frame)) + padded)
+    return data
+
+
+def test_read_pcap():
+    records = list(read_pcap(memoryview(pcap())))
+    assert [bytes(data) for _, _, _, data, _ in records] == [bytes(frame) for frame in frames()]
+    assert [(timestamp, linktype) for _, timestamp, linktype, _, _ in records] == [(100.0, 1), (100.001, 1)]
+
+
+def test_read_pcap_stops_at_truncated_record():
+    data = pcap()
+    assert len(list(read_pcap(memoryview(data[:-1])))) == 1
+    assert len(list(read_pcap(memoryview(data[:24 + 8])))) == 0
+
+
+def test_read_pcapng():
+    records = list(read_pcapng(memoryview(pcapng())))
+    assert [bytes(data) for _, _, _, data, _ in records] == [bytes(frame) for frame in frames()]
+    assert records[0][1] == pytest.approx(1.0)
+
+
+def test_read_pcapng_skips_short_blocks():
+    data = pcapng([]) + block(6, bytes(4)) + block(3, b'') + block(1, b'')
+    assert list(read_pcapng(memoryview(data))) == []
+    assert len(list(read_pcapng(memoryview(data + pcapng()[48:])))) == 2
+
+
+def test_read_pcapng_stops_at_truncated_block():
+    assert len(list(read_pcapng(memoryview(pcapng()[:-1])))) == 1
+
+
+@pytest.mark.parametrize('data, error', [
+    (b'', 'Capture file is empty or truncated'),
+    (b'\xd4\xc3\xb2\xa1' + bytes(4), 'Capture file is empty or truncated'),
+    (b'\xd4\xc3\xb2\xa1' + bytes(12), 'Capture file is empty or truncated'),
+    (b'not a capture file', 'Not a pcap or pcapng file'),
+])
+def test_capture_rejects_bad_files(tmp_path, data, error):
+    path = tmp_path / 'capture'
+    path.write_bytes(data)
+    with pytest.raises(ValueError, match=error):
+        Capture(path)
+
+
+@pytest.mark.parametrize('data, format', [(pcap, 'pcap'), (pcapng, 'pcapng')])
+def test_capture_formats(tmp_path, data, format):
+    path = tmp_path / 'capture'
+    path.write_bytes(data())
+    with Capture(path) as capture:
+        assert capture.format == format
+        assert len(list(capture.packets())) == 2
+
+
+def test_analyze_events(tmp_path):
+    path = tmp_path / 'capture.pcap'
+    path.write_bytes(pcap())
+    with Capture(path) as capture:
+        events = list(analyze(capture, open_classifier(), dissect=True))
+    assert [event['type'] for event in events] == ['capture', 'packets', 'done']
+    rows = events[1]['packets']
+    assert [row['number'] for row in rows] == [1, 2]
+    assert rows[0]['info'].startswith('40000 → 80')
+    done = events[-1]
+    assert done['packets'] == 2
+    assert done['malformed'] == done['unsupported'] == 0
+    assert done['messages']['HTTP'] == {'request': 1}
+
+
+def test_analyze_rows_only_carry_their_own_messages(tmp_path):
+    # Interface 0 is Ethernet, interface 1 is 802.11 (link type 105), which the parser does not support
+    query = FrameBuilder('udp', src_port=40000, dst_port=53).build(
+        b'\x12\x34\x01\x00\x00\x01\x00\x00\x00\x00\x00\x00\x03www\x00\x00\x01\x00\x01')
+    data = block(0x0A0D0D0A, struct.pack('<IHHq', 0x1A2B3C4D, 1, 0, -1))
+    data += block(1, struct.pack('<HHI', 1, 0, 65535)) + block(1, struct.pack('<HHI', 105, 0, 65535))
+    for interface, frame in ((0, query), (1, bytes(40))):
+        padded = bytes(frame) + bytes(-len(frame) % 4)
+        data += block(6, struct.pack('<IIIII', interface, 0, 0, len(frame), len(frame)) + padded)
+    path = tmp_path / 'capture.pcapng'
+    path.write_bytes(data)
+    with Capture(path) as capture:
+        rows = list(analyze(capture, open_classifier(), dissect=True))[1]['packets']
+    assert [message['protocol'] for message in rows[0]['messages']] == ['DNS']
+    assert rows[1]['error'] == 'Unsupported link type'
+    assert 'messages' not in rows[1]
+
+
+def test_analyze_caps_summaries(tmp_path):
+    path = tmp_path / 'capture.pcap'
+    path.write_bytes(pcap())
+    with Capture(path) as capture:
+        events = list(analyze(capture, open_classifier(), summaries=1))
+    assert len(events[1]['packets']) == 1
+    assert events[-1]['packets'] == 2
+
+
+def ndjson(response):
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+@pytest.mark.parametrize('data', [pcap, pcapng])
+def test_captures_endpoint(client, data):
+    response = client.post('/api/captures', data=data(), content_type='application/octet-stream')
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    events = ndjson(response)
+    assert events[-1]['type'] == 'done'
+    assert events[-1]['packets'] == 2
+
+
+def test_captures_endpoint_multipart(client):
+    response = client.post('/api/captures', data={'file': (io.BytesIO(pcap()), 'capture.pcap')},
+                           content_type='multipart/form-data')
+    assert response.status_code == 200
+    assert ndjson(response)[0] == {'type': 'capture', 'format': 'pcap', 'size': len(pcap())}
+
+
+@pytest.mark.parametrize('data', [
+    b'',
+    b'abc',
+    b'\x00' * 64,
+    b'GET / HTTP/1.1\r\nHost: example.com\r\n\r\n',
+    b'\xd4\xc3\xb2\xa1' + bytes(12),
+])
+def test_captures_rejects_garbage(client, data):
+    response = client.post('/api/captures', data=data, content_type='application/octet-stream')
+    assert response.status_code == 400
+    assert response.get_json()['success'] is False
+
+
+def test_captures_rejects_missing_file(client):
+    response = client.post('/api/captures', data={'other': 'x'}, content_type='multipart/form-data')
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'Missing capture file'
+
+
+def test_captures_rejects_bad_packets_param(client):
+    response = client.post('/api/captures?packets=many', data=pcap())
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'packets must be an integer'
+
+
+def test_captures_size_limit(app, client):
+    app.config['CAPTURE_MAX_BYTES'] = 32
+    response = client.post('/api/captures', data=pcap(), content_type='application/octet-stream')
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'Captures are limited to 32 bytes'
+
+
+@pytest.mark.parametrize('cut', [30, 60, 100, -1])
+def test_captures_truncated_uploads_stream(client, cut):
+    for data in (pcap(), pcapng()):
+        response = client.post('/api/captures?dissect=1', data=data[:cut],
+                               content_type='application/octet-stream')
+        assert response.status_code in (200, 400)
+        if response.status_code == 200:
+            assert ndjson(response)[-1]['type'] == 'done'
@@ -0,0 +1,45 @@
+import mmap
+
+import content_store
+from content_store import CACHE_PATH, SOURCE_PATH, ContentStore, cache_is_fresh, write_cache
+
+
+def test_committed_cache_matches_source():
+    # Deployments open the committed cache; rerun content_store.py after editing protocols.json
+    assert cache_is_fresh(SOURCE_PATH, CACHE_PATH)
+
+
+def test_fresh_cache_is_memory_mapped(tmp_path):
+    cache = tmp_path / 'protocols.bin'
+    write_cache(SOURCE_PATH, cache)
+    store = ContentStore.open(SOURCE_PATH, cache)
+    assert isinstance(store.buffer, mmap.mmap)
+    assert store.summaries
+    assert store.description(0)
+    assert isinstance(store.key_points(0), list)
+
+
+def test_cache_survives_a_new_mtime(tmp_path):
+    source = tmp_path / 'protocols.json'
+    source.write_bytes(SOURCE_PATH.read_bytes())
+    cache = tmp_path / 'protocols.bin'
+    write_cache(source, cache)
+    source.touch()
+    assert cache_is_fresh(source, cache)
+    source.write_bytes(SOURCE_PATH.read_bytes() + b'\n')
+    assert not cache_is_fresh(source, cache)
+
+
+def test_read_only_deployment_compiles_once(tmp_path, monkeypatch):
+    compiled = []
+    compile_catalogue = content_store.compile_catalogue
+
+    def counting(source_path):
+        compiled.append(source_path)
+        return compile_catalogue(source_path)
+
+    monkeypatch.setattr(content_store, 'compile_catalogue', counting)
+    store = ContentStore.open(SOURCE_PATH, tmp_path / 'missing' / 'protocols.bin')
+    assert len(compiled) == 1
+    assert isinstance(store.buffer, bytes)
+    assert not list(tmp_path.iterdir())
@@ -0,0 +1,78 @@
+import pytest
+
+from decapsulation import parse_frame
+from encapsulation import FrameBuilder
+
+
+def test_round_trip_tcp():
+    frame = FrameBuilder('tcp', src_port=40000, dst_port=80).build(b'GET / HTTP/1.1\r\n\r\n')
+    parsed = parse_frame(frame)
+    assert parsed.valid
+    assert parsed.transport == 'tcp'
+    assert (parsed.src_port, parsed.dst_port) == (40000, 80)
+    assert bytes(parsed.payload) == b'GET / HTTP/1.1\r\n\r\n'
+
+
+def test_round_trip_udp_with_fcs():
+    frame = FrameBuilder('udp', dst_port=53).build(b'query')
+    parsed = parse_frame(frame, fcs=True)
+    assert parsed.valid and parsed.fcs_ok
+    assert parsed.transport == 'udp'
+    assert bytes(parsed.payload) == b'query'
+
+
+def test_corrupted_checksum_is_reported():
+    frame = FrameBuilder('tcp').build(b'hello')
+    frame[-5] ^= 0xFF
+    parsed = parse_frame(frame, fcs=True)
+    assert parsed.error is None
+    assert not parsed.valid
+
+
+@pytest.mark.parametrize('data, error', [
+    (b'', 'Truncated Ethernet header'),
+    (bytes(13), 'Truncated Ethernet header'),
+    (bytes(12) + b'\x81\x00', 'Truncated VLAN tag'),
+    (bytes(12) + b'\x81\x00\x00\x01', 'Truncated VLAN tag'),
+    (bytes(12) + b'\x81\x00\x00\x01\x81', 'Truncated VLAN tag'),
+    (bytes(12) + b'\x08\x00' + bytes(10), 'Truncated IPv4 header'),
+])
+def test_truncated_frames_never_raise(data, error):
+    parsed = parse_frame(data)
+    assert parsed.error == error
+    assert not parsed.valid
+
+
+def test_truncated_vlan_tag_keeps_outer_ethertype():
+    parsed = parse_frame(bytes(12) + b'\x81\x00\x00\x05\x81\x00\x00')
+    assert parsed.ethertype == 0x8100
+    assert parsed.vlans == (5,)
+
+
+@pytest.mark.parametrize('frame', [
+    '00' * 5,
+    '00' * 12 + '8100',
+    '00' * 12 + '8100' + '0001',
+    '00' * 12 + '0800' + '45',
+    '00' * 12 + '86dd' + '60',
+])
+def test_decapsulate_truncated_frames(client, frame):
+    response = client.post('/api/decapsulate', data={'frame': frame})
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['success'] and not body['valid']
+    assert body['error'].startswith('Truncated')
+
+
+@pytest.mark.parametrize('frame', ['', 'zz', '0'])
+def test_decapsulate_rejects_bad_input(client, frame):
+    response = client.post('/api/decapsulate', data={'frame': frame})
+    assert response.status_code == 400
+    assert response.get_json()['success'] is False
+
+
+def test_decapsulate_round_trip(client):
+    frame = client.get('/api/encapsulate?message=hi').get_json()['frame']
+    body = client.post('/api/decapsulate?fcs=1', data={'frame': frame}).get_json()
+    assert body['valid']
+    assert [layer['layer'] for layer in body['layers']][:3] == [2, 3, 4]
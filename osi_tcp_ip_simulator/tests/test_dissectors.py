@@ -0,0 +1,125 @@
+import pytest
+
+from decapsulation import parse_frame
+from dissectors import (REGISTRY, Conversations, DNSDissector, FTPDissector, HTTPDissector, SMTPDissector,
+                        parse_dns)
+from encapsulation import FrameBuilder
+
+
+DNS_RESPONSE = (b'\x12\x34\x81\x80\x00\x01\x00\x01\x00\x00\x00\x00\x03www\x00\x00\x01\x00\x01'
+                b'\xc0\x0c\x00\x01\x00\x01\x00\x00\x00\x10\x00\x04\x01\x02\x03\x04')
+
+
+def feed_bytewise(dissector, data, from_client):
+    messages = []
+    for index in range(len(data)):
+        messages += dissector.feed(data[index:index + 1], from_client)
+    return messages
+
+
+def test_http_request_and_chunked_response():
+    dissector = HTTPDissector()
+    request, = dissector.feed(b'GET /a HTTP/1.1\r\nHost: example.com\r\nContent-Length: 5\r\n\r\nhello', True)
+    assert (request['method'], request['target'], request['body_length']) == ('GET', '/a', 5)
+    assert request['headers'] == {'host': 'example.com'}
+    response, = dissector.feed(b'HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n5\r\nhello\r\n0\r\n\r\n',
+                               False)
+    assert (response['status'], response['body_length']) == (200, 5)
+
+
+def test_http_split_at_every_byte():
+    data = b'POST / HTTP/1.1\r\nContent-Length: 3\r\n\r\nabcGET /b HTTP/1.1\r\n\r\n'
+    messages = feed_bytewise(HTTPDissector(), data, True)
+    assert [message['target'] for message in messages] == ['/', '/b']
+
+
+@pytest.mark.parametrize('data, from_client, error', [
+    (b'HTTP/1.1 \xb900 OK\r\n\r\n', False, 'Not an HTTP status line'),
+    (b'GET / HTTP/1.1\r\nContent-Length: 5\xb9\r\n\r\n', True, 'Malformed HTTP Content-Length'),
+])
+def test_http_rejects_non_ascii_digits(data, from_client, error):
+    messages = HTTPDissector().feed(data, from_client)
+    assert [message['type'] for message in messages] == ['error']
+    assert messages[0]['summary'] == error
+
+
+def test_smtp_session():
+    dissector = SMTPDissector()
+    messages = []
+    for data, from_client in [(b'220 mx\r\n', False), (b'EHLO client\r\n', True), (b'250-mx\r\n250 SIZE\r\n', False),
+                              (b'DATA\r\n', True), (b'354 go\r\n', False),
+                              (b'Subject: hi\r\nFrom: a@example.com\r\n\r\nbody\r\n.\r\n', True),
+                              (b'250 queued\r\n', False)]:
+        messages += dissector.feed(data, from_client)
+    assert [message['type'] for message in messages] == ['reply', 'command', 'reply', 'command', 'reply', 'data',
+                                                         'reply']
+    assert messages[2]['text'] == 'mx\nSIZE'
+    assert messages[5]['subject'] == 'hi'
+
+
+@pytest.mark.parametrize('dissector', [SMTPDissector, FTPDissector])
+def test_reply_with_non_ascii_digits(dissector):
+    messages = dissector().feed(b'2\xb20 ready\r\n', False)
+    assert [message['type'] for message in messages] == ['error']
+
+
+def test_ftp_passive_data_endpoint():
+    reply, = FTPDissector().feed(b'227 Entering Passive Mode (10,0,0,1,4,1)\r\n', False)
+    assert (reply['data_address'], reply['data_port']) == ('10.0.0.1', 1025)
+
+
+def test_dns_over_udp():
+    response, = DNSDissector('udp').feed(DNS_RESPONSE, False)
+    assert response['summary'] == 'response A www: 1.2.3.4'
+    assert response['answers'] == [{'name': 'www', 'type': 'A', 'ttl': 16, 'data': '1.2.3.4'}]
+
+
+def test_dns_over_tcp_is_length_prefixed():
+    data = len(DNS_RESPONSE).to_bytes(2, 'big') + DNS_RESPONSE
+    messages = feed_bytewise(DNSDissector('tcp'), data * 2, False)
+    assert [message['type'] for message in messages] == ['response', 'response']
+
+
+@pytest.mark.parametrize('data', [
+    DNS_RESPONSE[:11],
+    DNS_RESPONSE[:20],
+    DNS_RESPONSE[:-1],
+    # A name that points at itself
+    DNS_RESPONSE[:12] + b'\xc0\x0c',
+])
+def test_parse_dns_rejects_malformed(data):
+    with pytest.raises(ValueError):
+        parse_dns(data)
+
+
+def test_registry():
+    assert REGISTRY.by_port('tcp', 40000, 80) == (HTTPDissector, True)
+    assert REGISTRY.by_port('tcp', 80, 40000) == (HTTPDissector, False)
+    assert REGISTRY.by_port('tcp', 40000, 40001) is None
+    assert REGISTRY.by_content('tcp', b'GET / HTTP/1.1\r\n') == (HTTPDissector, True)
+    assert REGISTRY.by_content('tcp', b'\x00\x01\x02') is None
+
+
+def segment(seq, payload, flags='PA'):
+    return parse_frame(FrameBuilder('tcp', src_port=40000, dst_port=80, flags=flags, seq=seq).build(payload))
+
+
+def test_conversations_reorder_tcp():
+    conversations = Conversations()
+    assert conversations.packet(segment(999, b'', 'S')) == []
+    assert conversations.packet(segment(1011, b'HTTP/1.1\r\n\r\n')) == []
+    messages = conversations.packet(segment(1000, b'GET /a.txt '))
+    assert [message['target'] for message in messages] == ['/a.txt']
+    # A retransmission of delivered bytes completes nothing new
+    assert conversations.packet(segment(1000, b'GET /a.txt ')) == []
+
+
+def test_evicted_conversation_reports_its_messages():
+    conversations = Conversations(limit=1)
+    # A response without a length ends with its connection
+    response = FrameBuilder('tcp', src_port=80, dst_port=40000, flags='PA', seq=5000)
+    assert conversations.packet(parse_frame(response.build(b'HTTP/1.1 200 OK\r\n\r\nhello'))) == []
+    request = FrameBuilder('tcp', src_port=40001, dst_port=80, flags='PA', seq=1)
+    messages = conversations.packet(parse_frame(request.build(b'GET /b HTTP/1.1\r\n\r\n')))
+    assert [(message['type'], message['body_length']) for message in messages] == [('response', 5), ('request', 0)]
+    assert len(conversations.table) == 2
@@ -0,0 +1,110 @@
+import random
+import struct
+import zlib
+
+import pytest
+
+from encapsulation import ETHERNET_MIN_FRAME, FrameBuilder, encapsulate, internet_checksum
+
+
+def reference_checksum(data):
+    """RFC 1071, one 16-bit word at a time"""
+    if len(data) & 1:
+        data += b'\x00'
+    total = sum(struct.unpack(f'!{len(data) // 2}H', data))
+    while total >> 16:
+        total = (total & 0xFFFF) + (total >> 16)
+    return ~total & 0xFFFF
+
+
+def check_frame(frame, protocol):
+    frame = bytes(frame)
+    assert struct.unpack('<I', frame[-4:])[0] == zlib.crc32(frame[:-4])
+    header = frame[14:34]
+    assert reference_checksum(header) == 0
+    total_length = struct.unpack_from('!H', header, 2)[0]
+    segment = frame[34:14 + total_length]
+    pseudo = header[12:20] + struct.pack('!BBH', 0, protocol, len(segment))
+    assert reference_checksum(pseudo + segment) == 0
+    return segment
+
+
+@pytest.mark.parametrize('transport, protocol', [('tcp', 6), ('udp', 17)])
+def test_checksums_match_reference(transport, protocol):
+    chooser = random.Random(1)
+    for _ in range(200):
+        length = chooser.choice([0, 1, 2, 17, 1460 if transport == 'tcp' else 1472, chooser.randrange(1400)])
+        builder = FrameBuilder(transport, src_port=chooser.randrange(65536), dst_port=chooser.randrange(65536),
+                               seq=chooser.randrange(2 ** 32), identification=chooser.randrange(65536),
+                               src_ip='.'.join(str(chooser.randrange(256)) for _ in range(4)))
+        payload = chooser.randbytes(length)
+        segment = check_frame(builder.build(payload), protocol)
+        assert segment.endswith(payload)
+
+
+def test_internet_checksum_matches_reference():
+    chooser = random.Random(2)
+    for length in (0, 1, 2, 3, 20, 21, 1500):
+        data = chooser.randbytes(length)
+        assert internet_checksum(data) == reference_checksum(data)
+    assert internet_checksum(bytes(8)) == 0xFFFF
+    assert internet_checksum(b'\xff\xff') == 0
+
+
+def test_short_frames_are_padded():
+    frame = FrameBuilder('udp').build(b'x')
+    assert len(frame) == ETHERNET_MIN_FRAME + 4
+    assert frame[43:60] == bytes(17)
+
+
+def test_sequence_and_identification_advance():
+    builder = FrameBuilder('tcp', seq=2 ** 32 - 2, identification=0xFFFF)
+    first, second = builder.build(b'abcd'), builder.build(b'')
+    assert struct.unpack_from('!I', first, 38)[0] == 2 ** 32 - 2
+    assert struct.unpack_from('!I', second, 38)[0] == 2
+    assert struct.unpack_from('!H', first, 18)[0] == 0xFFFF
+    assert struct.unpack_from('!H', second, 18)[0] == 0
+
+
+def test_build_many_matches_build():
+    payloads = [b'', b'a', b'hello' * 100]
+    buffer, frames = FrameBuilder('tcp').build_many(payloads)
+    one_by_one = FrameBuilder('tcp')
+    assert [bytes(frame) for frame in frames] == [bytes(one_by_one.build(payload)) for payload in payloads]
+    assert len(buffer) == sum(len(frame) for frame in frames)
+
+
+def test_oversized_payload():
+    with pytest.raises(ValueError, match='exceeds the 1460-byte maximum'):
+        FrameBuilder('tcp').build(bytes(1461))
+
+
+def test_encapsulate_layers():
+    body = encapsulate(b'hello', transport='udp', dst_port=53)
+    assert [layer['layer'] for layer in body['layers']] == [7, 4, 3, 2, 1]
+    assert body['layers'][1]['fields']['length'] == 13
+    check_frame(bytes.fromhex(body['frame']), 17)
+
+
+def test_encapsulate_endpoint(client):
+    body = client.get('/api/encapsulate?message=hi&transport=tcp&flags=S&seq=100').get_json()
+    assert body['success'] is True
+    assert body['message'] == 'hi'
+    assert body['layers'][1]['fields']['flags'] == ['SYN']
+    check_frame(bytes.fromhex(body['frame']), 6)
+
+
+@pytest.mark.parametrize('query, error', [
+    ('transport=sctp', 'Unknown transport: sctp'),
+    ('src_ip=10.0.0.256', 'Invalid IPv4 address: 10.0.0.256'),
+    ('dst_mac=zz:00:00:00:00:00', 'Invalid MAC address: zz:00:00:00:00:00'),
+    ('flags=SX', 'Unknown TCP flag: X'),
+    ('src_port=65536', 'src_port must be between 0 and 65535'),
+    ('ttl=0', 'ttl must be between 1 and 255'),
+    ('seq=ten', 'seq must be an integer'),
+    ('message=' + 'x' * 1461, 'Payload of 1461 bytes exceeds the 1460-byte maximum'),
+])
+def test_encapsulate_rejects_bad_options(client, query, error):
+    response = client.get(f'/api/encapsulate?{query}')
+    assert response.status_code == 400
+    assert response.get_json() == {'success': False, 'error': error}
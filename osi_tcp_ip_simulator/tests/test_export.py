@@ -0,0 +1,57 @@
+import gzip
+import json
+
+import pytest
+
+from export import export_site, list_routes
+from views import IMMUTABLE_CACHE_CONTROL, get_data
+
+
+@pytest.fixture(scope='module')
+def exported(tmp_path_factory):
+    root = tmp_path_factory.mktemp('site') / 'dist'
+    return root, export_site(root)
+
+
+def test_manifest_covers_every_route(app, exported):
+    root, manifest = exported
+    routes = list_routes(get_data(app))
+    assert '/api/protocols/layer/Link/Data Link' in routes
+    assert manifest['skipped'] == []
+    assert set(routes) <= set(manifest['routes'])
+    assert json.loads((root / 'manifest.json').read_text()) == manifest
+    entry = manifest['routes']['/api/protocols/layer/Link/Data Link']
+    body = json.loads((root / entry['variants']['identity']['file']).read_text())
+    assert body['protocols'] and {protocol['layer'] for protocol in body['protocols'].values()} == {'Link/Data Link'}
+
+
+def test_gzip_siblings(exported):
+    root, manifest = exported
+    entry = manifest['routes']['/api/protocols']
+    plain = (root / entry['variants']['identity']['file']).read_bytes()
+    assert entry['variants']['gzip']['file'] == entry['variants']['identity']['file'] + '.gz'
+    assert gzip.decompress((root / entry['variants']['gzip']['file']).read_bytes()) == plain
+    assert entry['variants']['gzip']['bytes'] < len(plain)
+
+
+def test_cache_control(exported):
+    _, manifest = exported
+    version = manifest['bootstrap_version']
+    assert manifest['routes'][f'/api/bootstrap/{version}']['cache_control'] == IMMUTABLE_CACHE_CONTROL
+    assert manifest['routes']['/api/bootstrap']['cache_control'] == 'public, no-cache'
+
+
+def test_replaces_a_previous_export(tmp_path):
+    root = tmp_path / 'dist'
+    export_site(root, include_static=False)
+    (root / 'stale.json').write_text('{}')
+    manifest = export_site(root, include_static=False)
+    assert not (root / 'stale.json').exists()
+    assert not any(route.startswith('/static/') for route in manifest['routes'])
+
+
+def test_refuses_a_foreign_directory(tmp_path):
+    (tmp_path / 'notes.txt').write_text('keep me')
+    with pytest.raises(SystemExit, match='refusing to replace it'):
+        export_site(tmp_path)
+    assert (tmp_path / 'notes.txt').read_text() == 'keep me'
@@ -0,0 +1,202 @@
+import io
+import struct
+
+import pytest
+
+from capture import Capture, open_classifier, read_pcap, write_pcap
+from decapsulation import parse_frame
+from encapsulation import FrameBuilder
+from flows import TIMEOUTS, FlowReport, FlowTable, NetFlowExporter, track
+
+
+CLIENT, SERVER = '192.168.1.10', '10.0.0.1'
+
+
+def tcp(flags, seq, ack, payload=b'', reply=False):
+    src, dst, src_port, dst_port = (SERVER, CLIENT, 80, 40000) if reply else (CLIENT, SERVER, 40000, 80)
+    return FrameBuilder('tcp', src_ip=src, dst_ip=dst, src_port=src_port, dst_port=dst_port, flags=flags,
+                        seq=seq, ack=ack).build(payload)
+
+
+def connection():
+    """(time, frame) for a request and reply with handshake and close"""
+    return [
+        (0.000, tcp('S', 1000, 0)),
+        (0.010, tcp('SA', 5000, 1001, reply=True)),
+        (0.011, tcp('A', 1001, 5001)),
+        (0.012, tcp('PA', 1001, 5001, b'GET / HTTP/1.1\r\n\r\n')),
+        (0.030, tcp('PA', 5001, 1019, b'HTTP/1.1 200 OK\r\n\r\n', reply=True)),
+        (0.031, tcp('FA', 1019, 5020)),
+        (0.040, tcp('FA', 5020, 1020, reply=True)),
+    ]
+
+
+def run(packets, now=None):
+    records = []
+    table = FlowTable(records.append)
+    for time, frame in packets:
+        table.packet(parse_frame(frame), time, len(frame))
+    if now is not None:
+        table.expire(now)
+    return table, records
+
+
+def test_tcp_connection_record():
+    table, records = run(connection())
+    assert records == []
+    table.flush()
+    record, = records
+    endpoints = record['src_addr'], record['src_port'], record['dst_addr'], record['dst_port']
+    assert endpoints == (CLIENT, 40000, SERVER, 80)
+    assert (record['packets'], record['reverse_packets']) == (4, 3)
+    assert record['state'] == 'TIME_WAIT'
+    assert record['end_reason'] == 'end of capture'
+    assert record['handshake_ms'] == pytest.approx(11.0)
+    assert record['rtt']['server_samples'] >= 1
+    assert set(record['tcp_flags']) == set('FSPA')
+
+
+def test_idle_timeout_depends_on_state():
+    _, records = run(connection()[:1], now=TIMEOUTS['SYN_SENT'] + 2)
+    assert [record['end_reason'] for record in records] == ['idle timeout']
+    _, records = run(connection()[:4], now=TIMEOUTS['SYN_SENT'] + 2)
+    assert records == []
+    _, records = run(connection()[:4], now=TIMEOUTS['ESTABLISHED'] + 2)
+    assert records[0]['state'] == 'ESTABLISHED'
+
+
+def test_reset_closes_flow():
+    table, records = run(connection()[:4] + [(0.02, tcp('R', 5001, 0, reply=True))])
+    table.flush()
+    assert records[0]['state'] == 'CLOSED'
+
+
+def test_table_is_bounded():
+    records = []
+    table = FlowTable(records.append, max_flows=2)
+    for port in range(5):
+        frame = FrameBuilder('udp', src_port=20000 + port).build(b'x')
+        table.packet(parse_frame(frame), float(port), len(frame))
+    assert len(table.flows) == 2
+    assert table.evicted == 3
+    assert [record['end_reason'] for record in records] == ['evicted'] * 3
+
+
+def test_bad_tcp_header_length_counts_no_payload():
+    frame = tcp('PA', 1001, 5001, b'data')
+    frame[14 + 20 + 12] = 0x10
+    parsed = parse_frame(frame)
+    assert parsed.error == 'Bad TCP header length'
+    table, records = run([(0.0, frame)])
+    table.flush()
+    assert records[0]['packets'] == 1
+
+
+def test_report_totals_per_protocol():
+    report = FlowReport(open_classifier(), top=1)
+    table, _ = run(connection())
+    table.export = report.add
+    table.flush()
+    body = report.report()
+    assert body['flows'] == 1
+    assert body['protocols'][0]['protocol'].startswith('HTTP')
+    assert body['largest'][0]['application'].startswith('HTTP')
+
+
+def pcap(packets):
+    file = io.BytesIO()
+    for index, (time, frame) in enumerate(packets):
+        write_pcap(file, [frame], start=1000.0 + time, header=index == 0)
+    return file.getvalue()
+
+
+def test_track_capture(tmp_path):
+    path = tmp_path / 'capture.pcap'
+    path.write_bytes(pcap(connection()))
+    records = []
+    table = FlowTable(records.append)
+    with Capture(path) as capture:
+        assert track(capture, table) == 7
+    table.flush()
+    assert len(records) == 1
+
+
+def test_netflow_export():
+    file = io.BytesIO()
+    table, _ = run(connection())
+    exporter = NetFlowExporter(file, table)
+    table.export = exporter.add
+    table.flush()
+    exporter.close()
+    datagrams = list(read_pcap(memoryview(file.getvalue())))
+    assert len(datagrams) == 1
+    parsed = parse_frame(datagrams[0][3])
+    version, count = struct.unpack_from('!HH', parsed.payload)
+    assert (version, count) == (5, 2)
+
+
+def test_netflow_export_without_flows():
+    file = io.BytesIO()
+    exporter = NetFlowExporter(file, FlowTable(lambda record: None))
+    exporter.close()
+    assert len(list(read_pcap(memoryview(file.getvalue())))) == 1
+
+
+def test_flows_endpoint(client):
+    response = client.post('/api/flows', data=pcap(connection()), content_type='application/octet-stream')
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['success'] is True
+    assert body['capture'] == {'format': 'pcap', 'size': len(pcap(connection())), 'packets': 7}
+    assert body['flows'] == 1
+    assert body['protocols'][0]['protocol'].startswith('HTTP')
+
+
+def test_flows_endpoint_netflow(client):
+    response = client.post('/api/flows?format=netflow', data=pcap(connection()),
+                           content_type='application/octet-stream')
+    assert response.status_code == 200
+    assert response.mimetype == 'application/vnd.tcpdump.pcap'
+    assert len(list(read_pcap(memoryview(response.get_data())))) == 1
+
+
+@pytest.mark.parametrize('data', [
+    b'',
+    b'abc',
+    b'\x00' * 64,
+    b'GET / HTTP/1.1\r\nHost: example.com\r\n\r\n',
+    b'\xd4\xc3\xb2\xa1' + bytes(12),
+])
+@pytest.mark.parametrize('output', ['json', 'netflow'])
+def test_flows_rejects_garbage(client, data, output):
+    response = client.post(f'/api/flows?format={output}', data=data, content_type='application/octet-stream')
+    assert response.status_code == 400
+    assert response.get_json()['success'] is False
+
+
+@pytest.mark.parametrize('query, error', [
+    ('top=many', 'top must be an integer'),
+    ('format=ipfix', 'format must be json or netflow'),
+])
+def test_flows_rejects_bad_query(client, query, error):
+    response = client.post(f'/api/flows?{query}', data=pcap(connection()))
+    assert response.status_code == 400
+    assert response.get_json()['error'] == error
+
+
+def test_flows_header_only_capture(client):
+    header = pcap(connection())[:24]
+    for output in ('json', 'netflow'):
+        response = client.post(f'/api/flows?format={output}', data=header, content_type='application/octet-stream')
+        assert response.status_code == 200
+
+
+def test_flows_distant_timestamps(client):
+    # Microsecond fields past a million push the time beyond 32-bit seconds
+    data = bytearray(pcap(connection()))
+    offset = 24
+    while offset < len(data):
+        struct.pack_into('<II', data, offset, 0xFFFFFFFF, 0xFFFFFFFF)
+        offset += 16 + struct.unpack_from('<I', data, offset + 8)[0]
+    response = client.post('/api/flows?format=netflow', data=bytes(data), content_type='application/octet-stream')
+    assert response.status_code == 200
@@ -0,0 +1,41 @@
+import pytest
+
+import models
+from models import OSIModel, ProtocolDatabase, TCPIPModel, intern_strings, intern_value
+
+
+def records():
+    return [OSIModel().layers[0], TCPIPModel().layers[0], ProtocolDatabase.get_protocol('HTTP')]
+
+
+@pytest.mark.parametrize('record', records(), ids=lambda record: type(record).__name__)
+def test_records_are_immutable(record):
+    with pytest.raises(AttributeError, match='is immutable'):
+        record.name = 'changed'
+    with pytest.raises(AttributeError, match='is immutable'):
+        del record.name
+    with pytest.raises(AttributeError):
+        record.extra = 1
+    assert not hasattr(record, '__dict__')
+
+
+def test_lazy_fields_still_load():
+    protocol = ProtocolDatabase.get_protocol('DNS')
+    assert protocol.description and protocol.key_points
+    assert protocol.description is protocol.description
+
+
+def test_intern_shares_equal_values(monkeypatch):
+    monkeypatch.setattr(models, '_interned', {})
+    first, second = ''.join(['Trans', 'port']), ''.join(['Tran', 'sport'])
+    assert first is not second
+    assert intern_value(first) is intern_value(second)
+    names = intern_strings([first, 'Network'])
+    assert names is intern_strings((second, ''.join(['Net', 'work'])))
+    assert names[0] is first
+
+
+def test_catalogue_shares_strings():
+    application = ProtocolDatabase.get_protocols_by_layer('Application').values()
+    assert len({id(protocol.layer) for protocol in application}) == 1
+    assert ProtocolDatabase.get_protocol('SSH').ports is ProtocolDatabase.get_protocol('SFTP').ports
@@ -0,0 +1,187 @@
+import copy
+import json
+
+import pytest
+
+from netsim import Network, build_network, lab_network
+
+
+TOPOLOGY = {
+    'nodes': [
+        {'name': 'a', 'type': 'host', 'ip': '10.0.1.10/24', 'gateway': '10.0.1.1'},
+        {'name': 'b', 'type': 'host', 'ip': '10.0.2.10/24', 'gateway': '10.0.2.1'},
+        {'name': 'sw1', 'type': 'switch'},
+        {'name': 'sw2', 'type': 'switch'},
+        {'name': 'r1', 'type': 'router'},
+    ],
+    'links': [
+        {'a': 'a', 'b': 'sw1'},
+        {'a': 'b', 'b': 'sw2'},
+        {'a': 'r1', 'b': 'sw1', 'a_ip': '10.0.1.1/24'},
+        {'a': 'r1', 'b': 'sw2', 'a_ip': '10.0.2.1/24'},
+    ],
+    'traffic': [{'src': 'a', 'dst': 'b', 'message': 'Hello', 'count': 3}],
+}
+
+
+def topology(**changes):
+    spec = copy.deepcopy(TOPOLOGY)
+    spec.update(changes)
+    return spec
+
+
+def test_lab_network_delivers():
+    network = lab_network(b'Hello, network!')
+    network.run()
+    summary = network.report()['summary']
+    assert summary['packets_sent'] == summary['delivered'] == 1
+
+
+def test_routed_topology_delivers():
+    network = build_network(topology())
+    network.run()
+    summary = network.report()['summary']
+    assert summary['delivered'] == 3
+    assert summary['dropped'] == 0
+
+
+def test_full_queue_drops():
+    network = Network()
+    network.add_host('a', '10.0.0.1/24')
+    network.add_host('b', '10.0.0.2/24')
+    network.connect('a', 'b', bandwidth=1e6, queue=1518)
+    network.node('a').stream('10.0.0.2', bytes(1400), count=20, interval=0)
+    network.run()
+    summary = network.report()['summary']
+    assert summary['drops'].get('queue full')
+    assert summary['delivered'] + summary['dropped'] == 20
+
+
+def test_routing_loop_expires():
+    network = Network()
+    network.add_host('a', '10.0.1.10/24', '10.0.1.1')
+    network.add_router('r1')
+    network.add_router('r2')
+    network.connect('a', 'r1', b_address='10.0.1.1/24')
+    network.connect('r1', 'r2', a_address='10.0.0.1/30', b_address='10.0.0.2/30')
+    network.node('r1').add_route('0.0.0.0/0', '10.0.0.2')
+    network.node('r2').add_route('0.0.0.0/0', '10.0.0.1')
+    network.node('a').stream('192.0.2.1', b'x')
+    network.run()
+    summary = network.report()['summary']
+    assert summary['delivered'] == 0
+    assert summary['dropped'] == 1
+
+
+@pytest.mark.parametrize('changes, error', [
+    ({'nodes': 'x'}, 'nodes must be a list of objects'),
+    ({'nodes': ['x']}, 'nodes must be a list of objects'),
+    ({'links': {'a': 'a'}}, 'links must be a list of objects'),
+    ({'traffic': [1]}, 'traffic must be a list of objects'),
+    ({'routes': 5}, 'routes must be a list of objects'),
+    ({'seed': '1'}, 'topology: seed must be an integer'),
+    ({'nodes': [{'name': 5, 'type': 'switch'}]}, 'nodes[0]: name must be a non-empty string'),
+    ({'nodes': [{'name': 'h', 'type': 'host'}]}, 'nodes[0]: missing ip'),
+    ({'nodes': [{'name': 'x', 'type': 'hub'}]}, 'nodes[0]: unknown node type: hub'),
+    ({'links': [{'a': 'a', 'b': 'sw1', 'bandwidth_mbps': 'fast'}]}, 'links[0]: bandwidth_mbps must be a finite number'),
+    ({'links': [{'a': 'a', 'b': 'sw1', 'queue_bytes': 1.5}]}, 'links[0]: queue_bytes must be an integer'),
+    ({'links': [{'a': 'a'}]}, 'links[0]: missing b'),
+    ({'traffic': [{'src': 'a', 'dst': 'b', 'message': 3}]}, 'traffic[0]: message must be a string'),
+    ({'traffic': [{'src': 'a', 'dst': 'b', 'size': 10 ** 12}]}, 'traffic[0]: payloads are limited to 1500 bytes'),
+    ({'traffic': [{'src': 'a', 'dst': 'b', 'count': 0}]}, 'traffic[0]: count must be at least 1'),
+    ({'traffic': [{'src': 'a', 'dst': 'b', 'count': True}]}, 'traffic[0]: count must be an integer'),
+    ({'traffic': [{'src': 'sw1', 'dst': 'b'}]}, 'sw1 is not a host'),
+    ({'links': [{'a': 'a', 'b': 'sw1', 'bandwidth_mbps': 1e-320}]}, 'links[0]: bandwidth_mbps must be at least 0.001'),
+    ({'links': [{'a': 'a', 'b': 'sw1', 'bandwidth_mbps': 1e9}]}, 'links[0]: bandwidth_mbps must be at most 1000000'),
+    ({'links': [{'a': 'a', 'b': 'sw1', 'delay_ms': -1}]}, 'links[0]: delay_ms must be at least 0'),
+    ({'links': [{'a': 'a', 'b': 'sw1', 'delay_ms': 1e308}]}, 'links[0]: delay_ms must be at most 3600000'),
+    ({'traffic': [{'src': 'a', 'dst': 'b', 'interval_ms': 1e308}]}, 'traffic[0]: interval_ms must be at most 3600000'),
+    ({'traffic': [{'src': 'a', 'dst': 'b', 'start_ms': 1e308}]}, 'traffic[0]: start_ms must be at most 3600000'),
+])
+def test_build_network_rejects_malformed_specs(changes, error):
+    with pytest.raises(ValueError) as raised:
+        build_network(topology(**changes))
+    assert str(raised.value) == error
+
+
+def test_build_network_rejects_non_objects():
+    with pytest.raises(ValueError, match='JSON object'):
+        build_network([])
+
+
+def test_simulate_lab_path(client):
+    response = client.get('/api/simulate?message=Hi')
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['summary']['delivered'] == 1
+    assert body['timeline']
+
+
+def test_simulate_topology(client):
+    response = client.post('/api/simulate', json=topology())
+    assert response.status_code == 200
+    assert response.get_json()['summary']['delivered'] == 3
+
+
+@pytest.mark.parametrize('query', ['loss=2', 'loss=x', 'seed=x', 'timeline=1.5'])
+def test_simulate_rejects_bad_query(client, query):
+    response = client.get(f'/api/simulate?{query}')
+    assert response.status_code == 400
+    assert response.get_json()['success'] is False
+
+
+@pytest.mark.parametrize('spec', [
+    None, [], {'nodes': 'x'}, {'nodes': [{'name': 'h', 'type': 'host', 'ip': 'banana'}]},
+])
+def test_simulate_rejects_bad_topology(client, spec):
+    response = client.post('/api/simulate', json=spec)
+    assert response.status_code == 400
+    assert response.get_json()['success'] is False
+    assert 'object has no attribute' not in response.get_json()['error']
+
+
+def test_simulate_node_limit(app, client):
+    app.config['SIMULATION_MAX_NODES'] = 2
+    response = client.post('/api/simulate', json=topology())
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize('until_ms', [[1], '5', -1, float('nan'), float('inf')])
+def test_simulate_rejects_bad_until(client, until_ms):
+    response = client.post('/api/simulate', json=topology(until_ms=until_ms))
+    assert response.status_code == 400
+
+
+def test_simulate_until_stops_early(client):
+    body = client.post('/api/simulate', json=topology(until_ms=0.01)).get_json()
+    assert body['summary']['delivered'] == 0
+    assert body['summary']['pending_events']
+
+
+def strict_json(response):
+    def reject(constant):
+        raise AssertionError(f'{constant} in the response')
+    return json.loads(response.get_data(as_text=True), parse_constant=reject)
+
+
+@pytest.mark.parametrize('changes', [
+    {'links': [{'a': 'a', 'b': 'sw1', 'bandwidth_mbps': 1e-320}]},
+    {'traffic': [{'src': 'a', 'dst': 'b', 'interval_ms': 1e308, 'count': 3}]},
+])
+def test_simulate_rejects_overflowing_times(client, changes):
+    spec = topology()
+    for key, entries in changes.items():
+        spec[key] = [{**original, **entry} for original, entry in zip(spec[key], entries)] + spec[key][len(entries):]
+    response = client.post('/api/simulate', json=spec)
+    assert response.status_code == 400
+    assert strict_json(response)['success'] is False
+
+
+def test_simulate_extreme_bounds_stay_finite(client):
+    spec = topology()
+    spec['links'] = [{**link, 'bandwidth_mbps': 0.001, 'delay_ms': 3600000} for link in spec['links']]
+    spec['traffic'] = [{'src': 'a', 'dst': 'b', 'size': 1472, 'count': 3, 'interval_ms': 3600000,
+                        'start_ms': 3600000}]
+    response = client.post('/api/simulate', json=spec)
+    assert response.status_code == 200
+    assert strict_json(response)['summary']['delivered'] == 3
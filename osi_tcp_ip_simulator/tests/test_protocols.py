@@ -0,0 +1,105 @@
+import pytest
+
+from views import MAX_PAGE_SIZE, PROTOCOL_FIELDS, SUMMARY_FIELDS, encode_cursor
+
+
+def test_all_fields_match_the_plain_list(client):
+    protocols = client.get('/api/protocols').get_json()
+    assert client.get('/api/protocols?fields=' + ','.join(PROTOCOL_FIELDS)).get_json() == protocols
+
+
+def test_summary_projection(client):
+    body = client.get('/api/protocols?summary=1').get_json()
+    assert body['protocols']
+    for protocol in body['protocols'].values():
+        assert set(protocol) == set(SUMMARY_FIELDS)
+
+
+def test_fields_are_canonical(client):
+    first = client.get('/api/protocols?fields=ports,name')
+    second = client.get('/api/protocols?fields=name, ports,name')
+    assert first.get_data() == second.get_data()
+    assert first.headers['ETag'] == second.headers['ETag']
+
+
+def test_pages_cover_the_list(client):
+    everything = list(client.get('/api/protocols').get_json()['protocols'])
+    seen = []
+    cursor = ''
+    while True:
+        body = client.get(f'/api/protocols?summary=1&limit=7&cursor={cursor}').get_json()
+        assert len(body['protocols']) <= 7
+        seen += list(body['protocols'])
+        cursor = body['next_cursor']
+        if cursor is None:
+            break
+    assert sorted(seen) == sorted(everything)
+
+
+def test_cursor_alone_uses_the_largest_page(client):
+    first = next(iter(client.get('/api/protocols').get_json()['protocols']))
+    body = client.get(f'/api/protocols?cursor={encode_cursor(first)}').get_json()
+    assert first not in body['protocols']
+    assert len(body['protocols']) <= MAX_PAGE_SIZE
+
+
+def test_layer_list_pagination(client):
+    body = client.get('/api/protocols/layer/application?summary=1&limit=2').get_json()
+    assert len(body['protocols']) == 2
+    assert body['next_cursor'] is not None
+
+
+@pytest.mark.parametrize('query, error', [
+    ('fields=name,colour', 'Unknown fields: colour'),
+    ('fields=,', 'No fields requested'),
+    ('limit=0', 'limit must be a positive integer'),
+    ('limit=ten', 'limit must be a positive integer'),
+    ('cursor=!!!', 'Invalid cursor'),
+    ('cursor=' + encode_cursor('NOT-A-PROTOCOL'), 'Invalid cursor'),
+])
+def test_bad_queries(client, query, error):
+    response = client.get(f'/api/protocols?{query}')
+    assert response.status_code == 400
+    assert response.get_json() == {'success': False, 'error': error}
+
+
+@pytest.mark.parametrize('name', ['Telnet', 'TELNET', 'telnet'])
+def test_protocol_aliases(client, name):
+    body = client.get(f'/api/protocol/{name}').get_json()
+    assert body['success'] is True
+    assert body['protocol']['ports'] == [23]
+
+
+def test_osi_layer_index(client):
+    body = client.get('/api/protocols/osi-layer/7').get_json()
+    assert body['osi_layer'] == 7
+    assert {'HTTP', 'DNS', 'TELNET'} <= set(body['protocols'])
+    assert {protocol['osi_layer_num'] for protocol in body['protocols'].values()} == {7}
+
+
+@pytest.mark.parametrize('path, names', [
+    ('/api/protocols/port/23', {'TELNET'}),
+    ('/api/protocols/port/443', {'HTTPS', 'SSL'}),
+    ('/api/protocols/ports/20-25', {'FTP', 'SFTP', 'SSH', 'TELNET', 'SMTP'}),
+    ('/api/protocols/ports/23-23', {'TELNET'}),
+    ('/api/protocols/port/1', set()),
+    ('/api/protocols/ports/1-19', set()),
+    ('/api/protocols/osi-layer/9', set()),
+])
+def test_port_indexes(client, path, names):
+    response = client.get(path)
+    assert response.status_code == 200
+    assert set(response.get_json()['protocols']) == names
+
+
+def test_port_range_must_be_ordered(client):
+    response = client.get('/api/protocols/ports/25-20')
+    assert response.status_code == 400
+    assert response.get_json() == {'success': False, 'error': 'Invalid port range'}
+
+
+@pytest.mark.parametrize('path', ['/api/protocols/osi-layer/7', '/api/protocols/port/80', '/api/protocols/ports/1-100'])
+def test_indexes_are_cached(client, path):
+    response = client.get(path)
+    assert response.headers['Cache-Control'] == 'public, no-cache'
+    assert client.get(path, headers={'If-None-Match': response.headers['ETag']}).status_code == 304
@@ -0,0 +1,93 @@
+import struct
+import zlib
+
+import pytest
+
+from qr_code import QRCode
+
+
+LINK = 'http://192.168.1.20:5000/?session=QRBNCH'
+
+
+def test_smallest_version_that_fits():
+    assert QRCode('HELLO').version == 1
+    assert QRCode(LINK).version == 3
+    assert QRCode('x' * 200).version > QRCode(LINK).version
+
+
+def test_finder_patterns_in_three_corners():
+    code = QRCode(LINK)
+    last = code.size - 7
+    for left, top in ((0, 0), (last, 0), (0, last)):
+        ring = [code.modules[top][left + x] for x in range(7)] + [code.modules[top + 6][left + x] for x in range(7)]
+        assert all(ring)
+        assert not code.modules[top + 1][left + 1]
+        assert all(code.modules[top + y][left + x] for y in range(2, 5) for x in range(2, 5))
+
+
+def test_png_is_a_valid_image():
+    code = QRCode(LINK)
+    png = code.png(scale=4, border=4)
+    assert png[:8] == b'\x89PNG\r\n\x1a\n'
+    length, kind = struct.unpack_from('!I4s', png, 8)
+    width, height = struct.unpack_from('!II', png, 16)
+    assert kind == b'IHDR' and width == height == (code.size + 8) * 4
+    offset = 8
+    while offset < len(png):
+        length, kind = struct.unpack_from('!I4s', png, offset)
+        data = png[offset + 8:offset + 8 + length]
+        assert struct.unpack_from('!I', png, offset + 8 + length)[0] == zlib.crc32(kind + data)
+        offset += 12 + length
+    assert kind == b'IEND'
+
+
+def test_decodes_back_to_the_link():
+    cv2 = pytest.importorskip('cv2')
+    numpy = pytest.importorskip('numpy')
+    image = cv2.imdecode(numpy.frombuffer(QRCode(LINK).png(), numpy.uint8), cv2.IMREAD_GRAYSCALE)
+    text, _, _ = cv2.QRCodeDetector().detectAndDecode(image)
+    assert text == LINK
+
+
+def test_rejects_unknown_levels_and_oversized_data():
+    with pytest.raises(ValueError):
+        QRCode(LINK, 'X')
+    with pytest.raises(ValueError):
+        QRCode('x' * 3000)
+
+
+@pytest.fixture
+def hub_app(app):
+    app.config.update(SESSION_HUB=True, SESSION_HUB_PORT=0)
+    yield app
+    hub = app.extensions.get('session_hub')
+    if hub is not None:
+        hub.stop()
+
+
+def test_qrcode_for_an_existing_session(hub_app):
+    client = hub_app.test_client()
+    session_id = client.get('/api/create-session').get_json()['session_id']
+    for image_format, mimetype in (('png', 'image/png'), ('svg', 'image/svg+xml')):
+        response = client.get(f'/api/qrcode/{session_id}?format={image_format}')
+        assert response.status_code == 200
+        assert response.get_json()['qrcode'].startswith(f'data:{mimetype};base64,')
+    cache = hub_app.extensions['qr_codes']
+    client.get(f'/api/qrcode/{session_id}')
+    assert hub_app.extensions['qr_codes'] is cache
+
+
+@pytest.mark.parametrize('path, status', [
+    ('/api/qrcode/NOPE00', 404),
+    ('/api/qrcode/SHORT', 400),
+    ('/api/qrcode/ABC-12', 400),
+    ('/api/qrcode/ABCDEF?format=gif', 400),
+])
+def test_qrcode_errors(hub_app, path, status):
+    response = hub_app.test_client().get(path)
+    assert response.status_code == status
+    assert 'qr_codes' not in hub_app.extensions
+
+
+def test_qrcode_without_a_hub(client):
+    assert client.get('/api/qrcode/ABCDEF').status_code == 503
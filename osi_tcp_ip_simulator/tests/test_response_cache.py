@@ -0,0 +1,92 @@
+import gzip
+import json
+
+import pytest
+
+from response_cache import MIN_COMPRESS_SIZE, ResponseCache
+from views import IMMUTABLE_CACHE_CONTROL, get_data
+
+
+@pytest.mark.parametrize('path', ['/api/osi-layers', '/api/tcpip-layers', '/api/layer-mapping', '/api/protocols'])
+def test_cached_endpoints(client, path):
+    response = client.get(path)
+    assert response.status_code == 200
+    assert response.mimetype == 'application/json'
+    assert response.headers['Cache-Control'] == 'public, no-cache'
+    assert response.get_json() is not None
+
+
+def test_etag_revalidates(client):
+    response = client.get('/api/osi-layers')
+    etag = response.headers['ETag']
+    revalidated = client.get('/api/osi-layers', headers={'If-None-Match': etag})
+    assert revalidated.status_code == 304
+    assert revalidated.get_data() == b''
+    assert revalidated.headers['ETag'] == etag
+    assert client.get('/api/osi-layers', headers={'If-None-Match': '"other"'}).status_code == 200
+
+
+def test_gzip_variant(client):
+    plain = client.get('/api/osi-layers', headers={'Accept-Encoding': 'identity'})
+    compressed = client.get('/api/osi-layers', headers={'Accept-Encoding': 'gzip'})
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(compressed.get_data()) == plain.get_data()
+    # Each encoding is its own representation
+    assert compressed.headers['ETag'] != plain.headers['ETag']
+    assert 'Accept-Encoding' in compressed.headers['Vary']
+
+
+def test_small_payloads_are_not_compressed(app):
+    with app.test_request_context(headers={'Accept-Encoding': 'gzip'}):
+        entry = ResponseCache(app).serialize({'ok': True})
+        assert list(entry.variants) == ['identity']
+        response = entry.to_response()
+        assert 'Content-Encoding' not in response.headers
+        assert 'Vary' not in response.headers
+
+
+def test_serialize_matches_compact_json(app):
+    payload = {'layers': ['a' * MIN_COMPRESS_SIZE], 'count': 1}
+    entry = ResponseCache(app).serialize(payload)
+    assert json.loads(entry.variants['identity']) == payload
+    assert b', ' not in entry.variants['identity']
+
+
+def test_variants_are_bounded(app):
+    cache = ResponseCache(app, max_variants=2)
+    built = []
+
+    def build(number):
+        built.append(number)
+        return {'number': number}
+
+    for number in (1, 2, 1, 3, 1, 2):
+        cache.variant(number, lambda: build(number))
+    # 1 stays hot; 2 is evicted by 3 and rebuilt
+    assert built == [1, 2, 3, 2]
+    assert list(cache.variants) == [1, 2]
+
+
+def test_bootstrap_is_revalidated(client):
+    response = client.get('/api/bootstrap')
+    assert response.headers['Cache-Control'] == 'public, no-cache'
+    assert set(response.get_json()) == {'osi_layers', 'tcpip_layers', 'encapsulation', 'decapsulation', 'protocols'}
+    revalidated = client.get('/api/bootstrap', headers={'If-None-Match': response.headers['ETag']})
+    assert revalidated.status_code == 304
+    assert revalidated.get_data() == b''
+
+
+def test_versioned_bootstrap_is_immutable(app, client):
+    version = get_data(app).bootstrap_version
+    response = client.get(f'/api/bootstrap/{version}')
+    assert response.status_code == 200
+    assert response.headers['Cache-Control'] == IMMUTABLE_CACHE_CONTROL
+    assert response.get_data() == client.get('/api/bootstrap').get_data()
+    assert f'/api/bootstrap/{version}' in client.get('/').get_data(as_text=True)
+
+
+def test_stale_bootstrap_version_redirects(app, client):
+    response = client.get('/api/bootstrap/0123456789abcdef')
+    assert response.status_code == 302
+    assert response.headers['Location'].endswith(f'/api/bootstrap/{get_data(app).bootstrap_version}')
+    assert 'immutable' not in response.headers.get('Cache-Control', '')
@@ -0,0 +1,151 @@
+import asyncio
+
+import pytest
+
+import room_broker
+from room_broker import (HEADER, OP_PUBLISH, OP_SUBSCRIBE, BrokerClient, RoomBroker, encode_message,
+                         parse_messages)
+
+
+async def wait_for(condition):
+    for _ in range(500):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError('timed out')
+
+
+def receiver():
+    """An on_message callback and the (room, payload) pairs it saw"""
+    received = []
+    return lambda room, payload: received.append((room, payload)), received
+
+
+async def owner(clients):
+    """The broker one of the clients started"""
+    await wait_for(lambda: any(client.broker is not None for client in clients))
+    return next(client.broker for client in clients if client.broker is not None)
+
+
+def test_parse_messages_round_trip():
+    data = encode_message(OP_SUBSCRIBE, 'ROOM') + encode_message(OP_PUBLISH, 'ROOM', b'{"event":"e"}')
+    messages, consumed = parse_messages(bytearray(data + data[:7]))
+    assert consumed == len(data)
+    assert [message[:3] for message in messages] == [
+        (OP_SUBSCRIBE, 'ROOM', b''),
+        (OP_PUBLISH, 'ROOM', b'{"event":"e"}'),
+    ]
+    assert b''.join(message[3] for message in messages) == data
+
+
+@pytest.mark.parametrize('data, error', [
+    (HEADER.pack(room_broker.MAX_FRAME_SIZE + 1, OP_PUBLISH), 'too large'),
+    (HEADER.pack(0, OP_PUBLISH) + encode_message(OP_SUBSCRIBE, 'ROOM'), 'no room name length'),
+    (HEADER.pack(3, OP_PUBLISH) + b'\x09AB', 'runs past its message'),
+    (HEADER.pack(3, OP_PUBLISH) + b'\x02\xff\xfe', 'ascii'),
+])
+def test_parse_messages_rejects_malformed(data, error):
+    with pytest.raises(ValueError, match=error):
+        parse_messages(bytearray(data))
+
+
+def test_publish_reaches_other_subscribers_only(tmp_path):
+    async def main():
+        path = str(tmp_path / 'broker.sock')
+        loop = asyncio.get_running_loop()
+        (first_message, first), (second_message, second), (other_message, other) = receiver(), receiver(), receiver()
+        clients = [BrokerClient(path, first_message), BrokerClient(path, second_message),
+                   BrokerClient(path, other_message)]
+        try:
+            for client, room in zip(clients, ('ROOM', 'ROOM', 'OTHER')):
+                client.subscribe(room)
+                client.start(loop)
+            broker = await owner(clients)
+            await wait_for(lambda: len(broker.rooms.get('ROOM', ())) == 2 and 'OTHER' in broker.rooms)
+            clients[0].publish('ROOM', b'one')
+            clients[0].publish('ROOM', b'two')
+            clients[2].publish('OTHER', b'three')
+            await wait_for(lambda: len(second) == 2)
+            await asyncio.sleep(0.05)
+            assert second == [('ROOM', b'one'), ('ROOM', b'two')]
+            # The sender is left out, and rooms do not leak into each other
+            assert first == other == []
+        finally:
+            for client in clients:
+                client.close()
+
+    asyncio.run(main())
+
+
+def test_broker_is_elected_again_when_its_owner_closes(tmp_path):
+    async def main():
+        path = str(tmp_path / 'broker.sock')
+        loop = asyncio.get_running_loop()
+        (first_message, _), (second_message, second), (third_message, third) = receiver(), receiver(), receiver()
+        first = BrokerClient(path, first_message).start(loop)
+        await wait_for(lambda: first.writer is not None)
+        clients = [BrokerClient(path, second_message), BrokerClient(path, third_message)]
+        try:
+            for client in clients:
+                client.subscribe('ROOM')
+                client.start(loop)
+            await wait_for(lambda: len(first.broker.rooms.get('ROOM', ())) == 2)
+            first.close()
+            # One survivor takes the lock and the other reconnects to it, resubscribing
+            broker = await owner(clients)
+            await wait_for(lambda: len(broker.rooms.get('ROOM', ())) == 2)
+            await wait_for(lambda: all(client.writer is not None for client in clients))
+            clients[0].publish('ROOM', b'after')
+            await wait_for(lambda: third)
+            assert third == [('ROOM', b'after')]
+            assert second == []
+        finally:
+            for client in clients:
+                client.close()
+
+    asyncio.run(main())
+
+
+def test_slow_subscriber_is_dropped(tmp_path, monkeypatch):
+    monkeypatch.setattr(room_broker, 'MAX_PEER_BUFFER', 64 * 1024)
+
+    async def main():
+        path = str(tmp_path / 'broker.sock')
+        broker = await RoomBroker().serve(path)
+        try:
+            # Subscribes, then never reads
+            _, slow = await asyncio.open_unix_connection(path)
+            slow.write(encode_message(OP_SUBSCRIBE, 'ROOM'))
+            _, publisher = await asyncio.open_unix_connection(path)
+            await wait_for(lambda: 'ROOM' in broker.rooms)
+            message = encode_message(OP_PUBLISH, 'ROOM', bytes(64 * 1024))
+            for _ in range(1000):
+                if 'ROOM' not in broker.rooms:
+                    break
+                publisher.write(message)
+                await publisher.drain()
+            assert 'ROOM' not in broker.rooms
+            assert len(broker.peers) == 1
+            slow.close()
+            publisher.close()
+        finally:
+            broker.close()
+
+    asyncio.run(main())
+
+
+def test_malformed_message_drops_the_peer(tmp_path):
+    async def main():
+        path = str(tmp_path / 'broker.sock')
+        broker = await RoomBroker().serve(path)
+        try:
+            reader, writer = await asyncio.open_unix_connection(path)
+            writer.write(encode_message(OP_SUBSCRIBE, 'ROOM') + HEADER.pack(0, OP_PUBLISH))
+            assert await reader.read() == b''
+            assert broker.peers == set()
+            assert broker.rooms == {}
+            writer.close()
+        finally:
+            broker.close()
+
+    asyncio.run(main())
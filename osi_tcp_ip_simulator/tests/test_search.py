@@ -0,0 +1,49 @@
+import pytest
+
+
+@pytest.fixture
+def index(app):
+    from views import get_data
+    with app.app_context():
+        return get_data(app).search_index
+
+
+def keys(results):
+    return [result['key'] for result in results]
+
+
+def test_exact_name_ranks_first(index):
+    assert keys(index.search('http'))[0] == 'HTTP'
+
+
+def test_last_word_matches_as_a_prefix(index):
+    assert index.search('transm')
+    assert keys(index.search('tra'))
+
+
+def test_finished_word_is_not_expanded(index):
+    assert index.search('tra') != index.search('tra ')
+    assert index.search('tra ') == []
+
+
+def test_snippets_are_escaped_and_highlighted(index):
+    snippet = index.search('http')[0]['snippet']
+    assert '<mark>' in snippet
+    assert '<script' not in snippet
+
+
+def test_suggest(index):
+    assert index.suggest('ht')
+
+
+def test_search_endpoint_keeps_trailing_space(client):
+    typing = client.get('/api/search', query_string={'q': 'tra'}).get_json()
+    finished = client.get('/api/search', query_string={'q': 'tra '}).get_json()
+    assert typing['results'] and not finished['results']
+    assert finished['query'] == 'tra'
+
+
+@pytest.mark.parametrize('query', ['', '   '])
+def test_search_endpoint_requires_a_query(client, query):
+    response = client.get('/api/search', query_string={'q': query})
+    assert response.status_code == 400
@@ -0,0 +1,290 @@
+import base64
+import json
+import os
+import socket
+import struct
+import time
+
+import pytest
+
+import session_hub
+from session_hub import OP_PING, OP_TEXT, REPLAY_LOG_SIZE, ReplayLog, SessionHub, accept_key, encode_frame, unmask
+from session_store import MemorySessionStore
+
+
+class Client:
+    """A blocking WebSocket client, just enough to talk to the hub"""
+
+    def __init__(self, port):
+        self.socket = socket.create_connection(('127.0.0.1', port), timeout=5)
+        key = base64.b64encode(os.urandom(16)).decode('ascii')
+        self.socket.sendall((
+            'GET / HTTP/1.1\r\nHost: localhost\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n'
+            f'Sec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n'
+        ).encode('ascii'))
+        response = b''
+        while b'\r\n\r\n' not in response:
+            response += self.socket.recv(1)
+        assert f'Sec-WebSocket-Accept: {accept_key(key)}'.encode('ascii') in response
+
+    def send(self, event, data):
+        payload = json.dumps({'event': event, 'data': data}).encode('utf-8')
+        mask = os.urandom(4)
+        if len(payload) < 126:
+            header = struct.pack('!BB', 0x80 | OP_TEXT, 0x80 | len(payload))
+        else:
+            header = struct.pack('!BBH', 0x80 | OP_TEXT, 0x80 | 126, len(payload))
+        self.socket.sendall(header + mask + unmask(payload, mask))
+
+    def read(self, count):
+        data = b''
+        while len(data) < count:
+            chunk = self.socket.recv(count - len(data))
+            assert chunk, 'connection closed'
+            data += chunk
+        return data
+
+    def receive(self):
+        """Next event, skipping pings"""
+        while True:
+            first, second = self.read(2)
+            length = second & 0x7F
+            if length == 126:
+                length, = struct.unpack('!H', self.read(2))
+            elif length == 127:
+                length, = struct.unpack('!Q', self.read(8))
+            payload = self.read(length)
+            if first & 0x0F != OP_PING:
+                return json.loads(payload)
+
+    def expect(self, event):
+        while True:
+            message = self.receive()
+            if message['event'] == event:
+                return message['data']
+
+    def close(self):
+        self.socket.close()
+
+
+@pytest.fixture
+def hub():
+    hub = SessionHub(MemorySessionStore(), host='127.0.0.1', port=0).start()
+    yield hub
+    hub.stop()
+
+
+@pytest.fixture
+def room(hub):
+    session_id = hub.store.create()
+    clients = []
+    for user in ('presenter', 'student'):
+        client = Client(hub.port)
+        client.send('join_session', {'session_id': session_id, 'user_id': user, 'user_name': user.title()})
+        client.expect('session_joined_confirmation')
+        clients.append(client)
+    yield session_id, clients
+    for client in clients:
+        client.close()
+
+
+def join(hub, session_id, user_id, **data):
+    """A client that joined the session, and its first event"""
+    client = Client(hub.port)
+    client.send('join_session', {'session_id': session_id, 'user_id': user_id, **data})
+    return client, client.receive()
+
+
+def wait_for(condition):
+    deadline = time.monotonic() + 5
+    while not condition():
+        assert time.monotonic() < deadline, 'timed out'
+        time.sleep(0.01)
+
+
+def test_accept_key_matches_rfc_6455():
+    assert accept_key('dGhlIHNhbXBsZSBub25jZQ==') == 's3pPLMBiTxaQ9kYGzzhZRbK+xOo='
+
+
+@pytest.mark.parametrize('length, header', [(5, 2), (126, 4), (70000, 10)])
+def test_frame_length_encodings(length, header):
+    frame = encode_frame(bytes(length))
+    assert len(frame) == header + length
+    assert frame[0] == 0x80 | OP_TEXT
+
+
+def test_unmask_round_trip():
+    payload = b'hello, websocket'
+    assert unmask(unmask(payload, b'abcd'), b'abcd') == payload
+
+
+def test_steps_are_coalesced_per_tick(room):
+    _, (presenter, student) = room
+    for layer in (7, 6, 5):
+        presenter.send('broadcast_animation', {'layer': layer, 'direction': 'down', 'progress': (8 - layer) / 16})
+    update = student.expect('animation_update')
+    assert update['steps'] == [['presenter', 5, 1, 0.188]]
+
+
+def test_unchanged_steps_are_not_resent(room):
+    _, (presenter, student) = room
+    step = {'layer': 3, 'direction': 'up', 'progress': 0.7}
+    presenter.send('broadcast_animation', step)
+    student.expect('animation_update')
+    time.sleep(0.1)
+    presenter.send('broadcast_animation', step)
+    presenter.send('broadcast_animation', {**step, 'layer': 4})
+    assert student.expect('animation_update')['steps'] == [['presenter', 4, -1, 0.7]]
+
+
+def test_start_animation_is_scheduled_for_everyone(room):
+    _, (presenter, student) = room
+    presenter.send('start_animation', {'message': 'Hi'})
+    for client in (presenter, student):
+        scheduled = client.expect('animation_scheduled')
+        assert scheduled['user_id'] == 'presenter'
+        assert scheduled['start_at'] > time.time() * 1000
+
+
+def test_unknown_session_is_an_error(hub):
+    client = Client(hub.port)
+    try:
+        client.send('join_session', {'session_id': 'NOPE00', 'user_id': 'u1'})
+        assert 'not found' in client.expect('error')['message']
+    finally:
+        client.close()
+
+
+def test_clock_sync_answers_with_hub_times(room):
+    _, (presenter, _) = room
+    before = time.time() * 1000
+    presenter.send('clock_sync', {'t0': 12345.5, 'rtt': 40})
+    reply = presenter.expect('clock_sync')
+    assert reply['t0'] == 12345.5
+    assert before <= reply['t1'] <= reply['t2'] <= time.time() * 1000
+
+
+def test_clock_sync_rtt_delays_the_start(room):
+    _, (presenter, student) = room
+    student.send('clock_sync', {'t0': 0, 'rtt': 2000})
+    student.expect('clock_sync')
+    presenter.send('start_animation', {'message': 'Hi'})
+    # The slowest socket's two-second round trip is added to the lead
+    assert presenter.expect('animation_scheduled')['start_at'] > time.time() * 1000 + 1500
+
+
+@pytest.mark.parametrize('rtt', [float('nan'), float('inf'), float('-inf')])
+def test_clock_sync_ignores_non_finite_values(room, rtt):
+    _, (presenter, student) = room
+    student.send('clock_sync', {'t0': float('nan'), 'rtt': rtt})
+    assert student.expect('clock_sync')['t0'] is None
+    presenter.send('start_animation', {'message': 'Hi'})
+    for client in (presenter, student):
+        assert client.expect('animation_scheduled')['start_at'] > time.time() * 1000
+
+
+@pytest.mark.parametrize('progress, sent', [
+    (float('nan'), None), (float('inf'), None), (-0.5, 0.0), (7, 1.0), ('half', None),
+])
+def test_progress_is_finite_and_clamped(room, progress, sent):
+    _, (presenter, student) = room
+    presenter.send('broadcast_animation', {'layer': 2, 'direction': 'down', 'progress': progress})
+    assert student.expect('animation_update')['steps'] == [['presenter', 2, 1, sent]]
+    # The dropped value compares equal to itself, so the step is not resent every tick
+    presenter.send('broadcast_animation', {'layer': 2, 'direction': 'down', 'progress': progress})
+    time.sleep(0.1)
+    presenter.send('broadcast_animation', {'layer': 1, 'direction': 'down', 'progress': 0.9})
+    assert student.expect('animation_update')['steps'] == [['presenter', 1, 1, 0.9]]
+
+
+def test_replay_log_since():
+    log = ReplayLog(3)
+    assert log.since(0) == []
+    frames = [log.append(b'{"event":"e","data":%d}' % number) for number in range(5)]
+    assert log.seq == 5
+    assert log.since(5) == []
+    assert log.since(3) == frames[3:]
+    assert log.since(2) == frames[2:]
+    # Frame 2 fell out of the window, and 6 was never sent
+    assert log.since(1) is None
+    assert log.since(6) is None
+
+
+def test_resume_replays_only_missed_frames(hub):
+    session_id = hub.store.create()
+    presenter, _ = join(hub, session_id, 'presenter')
+    student, joined = join(hub, session_id, 'student')
+    epoch = joined['data']['replay']['epoch']
+    presenter.send('send_message', {'message': 'one'})
+    seen = student.receive()
+    while seen['event'] != 'message_sent':
+        seen = student.receive()
+    student.close()
+    presenter.expect('user_left')
+    for text in ('two', 'three'):
+        presenter.send('send_message', {'message': text})
+        presenter.expect('message_sent')
+
+    student, resumed = join(hub, session_id, 'student', resume={'epoch': epoch, 'seq': seen['seq']})
+    try:
+        assert resumed['event'] == 'session_resumed'
+        assert resumed['data']['missed'] == 3
+        assert resumed['data']['replay'] == {'epoch': epoch, 'seq': seen['seq'] + 3}
+        missed = [student.receive() for _ in range(3)]
+        assert [message['seq'] for message in missed] == [seen['seq'] + 1, seen['seq'] + 2, seen['seq'] + 3]
+        assert [message['event'] for message in missed] == ['user_left', 'message_sent', 'message_sent']
+        assert [message['data']['message'] for message in missed[1:]] == ['two', 'three']
+        assert student.receive()['event'] == 'user_joined'
+    finally:
+        presenter.close()
+        student.close()
+
+
+@pytest.mark.parametrize('resume', [{'epoch': 'other', 'seq': 0}, {'seq': 0}, 'latest'])
+def test_resume_from_another_log_gets_a_snapshot(hub, room, resume):
+    session_id, _ = room
+    client, joined = join(hub, session_id, 'late', resume=resume)
+    client.close()
+    assert joined['event'] == 'session_joined_confirmation'
+    assert joined['data']['total_count'] == 3
+
+
+def test_resume_past_the_window_gets_a_snapshot(hub, room):
+    session_id, (presenter, _) = room
+    sent = []
+    for number in range(REPLAY_LOG_SIZE + 2):
+        presenter.send('send_message', {'message': str(number)})
+        message = presenter.receive()
+        while message['event'] != 'message_sent':
+            message = presenter.receive()
+        sent.append(message['seq'])
+    # The first message is one frame older than the window
+    epoch = hub.logs[session_id].epoch
+    client, joined = join(hub, session_id, 'student', resume={'epoch': epoch, 'seq': sent[0]})
+    client.close()
+    assert joined['event'] == 'session_joined_confirmation'
+    assert joined['data']['replay'] == {'epoch': epoch, 'seq': sent[-1]}
+
+
+def test_log_outlives_an_empty_room(hub):
+    session_id = hub.store.create()
+    client, joined = join(hub, session_id, 'presenter')
+    client.close()
+    wait_for(lambda: session_id not in hub.rooms and hub.logs[session_id].seq == joined['data']['replay']['seq'] + 2)
+    client, resumed = join(hub, session_id, 'presenter', resume=joined['data']['replay'])
+    client.close()
+    # Missed: its own user_joined and user_left
+    assert resumed['event'] == 'session_resumed'
+    assert resumed['data']['missed'] == 2
+
+
+def test_log_expires_after_the_retention(hub, monkeypatch):
+    monkeypatch.setattr(session_hub, 'REPLAY_RETENTION', 0.1)
+    session_id = hub.store.create()
+    client, joined = join(hub, session_id, 'presenter')
+    client.close()
+    wait_for(lambda: session_id not in hub.logs)
+    client, rejoined = join(hub, session_id, 'presenter', resume=joined['data']['replay'])
+    client.close()
+    assert rejoined['event'] == 'session_joined_confirmation'
+    assert rejoined['data']['replay']['epoch'] != joined['data']['replay']['epoch']
@@ -0,0 +1,146 @@
+import queue
+import threading
+import time
+
+import pytest
+
+from session_store import MemorySessionStore, open_session_store
+from session_store_sqlite import WORKER_TIMEOUT, SQLiteSessionStore
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def store(request, tmp_path):
+    backend = 'memory' if request.param == 'memory' else f'sqlite:///{tmp_path / "sessions.db"}'
+    store = open_session_store(backend, ttl=60, history=3)
+    yield store
+    store.close()
+
+
+def crash(store):
+    """Stop a SQLite store's threads without retiring its worker, as a killed process would"""
+    store.stopping.set()
+    store.wakeup.set()
+    store.writer.join()
+    while True:
+        try:
+            store.pool.get_nowait().close()
+        except queue.Empty:
+            break
+
+
+def test_join_and_leave_count_connections(store):
+    session_id = store.create()
+    assert store.exists(session_id)
+    participant, participants, messages = store.join(session_id, 'u1', 'Ada')
+    assert participant['user_name'] == 'Ada'
+    assert [p['user_id'] for p in participants] == ['u1']
+    assert messages == []
+    # A second tab of the same user
+    store.join(session_id, 'u1', 'Ada')
+    assert store.leave(session_id, 'u1') is None
+    participant, remaining = store.leave(session_id, 'u1')
+    assert participant['user_id'] == 'u1'
+    assert remaining == 0
+    assert store.participants(session_id) == []
+
+
+def test_unknown_sessions(store):
+    assert not store.exists('NOPE00')
+    assert store.participants('NOPE00') is None
+    assert store.join('NOPE00', 'u1', 'Ada') is None
+    assert store.leave('NOPE00', 'u1') is None
+
+
+def test_history_is_bounded(store):
+    session_id = store.create()
+    for number in range(5):
+        store.add_message(session_id, {'text': str(number)})
+    _, _, messages = store.join(session_id, 'u1', 'Ada')
+    assert [message['text'] for message in messages] == ['2', '3', '4']
+
+
+def test_sweep_keeps_occupied_sessions(store):
+    empty, occupied = store.create(), store.create()
+    store.join(occupied, 'u1', 'Ada')
+    assert store.sweep(time.time() + 61) == 1
+    assert not store.exists(empty)
+    assert store.exists(occupied)
+
+
+def test_memory_store_is_the_default():
+    assert isinstance(open_session_store(), MemorySessionStore)
+    with pytest.raises(ValueError):
+        open_session_store('redis://localhost')
+
+
+def test_crashed_worker_participants_are_dropped(tmp_path):
+    path = tmp_path / 'sessions.db'
+    crashed = SQLiteSessionStore(path, ttl=60)
+    session_id = crashed.create()
+    crashed.join(session_id, 'ghost', 'Ghost')
+    crash(crashed)
+
+    survivor = SQLiteSessionStore(path, ttl=60)
+    try:
+        survivor.join(session_id, 'u1', 'Ada')
+        # Within the timeout the crashed worker might still be alive
+        survivor.sweep()
+        assert len(survivor.participants(session_id)) == 2
+        survivor.sweep(time.time() + WORKER_TIMEOUT + 1)
+        assert [p['user_id'] for p in survivor.participants(session_id)] == ['u1']
+        survivor.leave(session_id, 'u1')
+        assert survivor.sweep(time.time() + 61) == 1
+    finally:
+        survivor.close()
+
+
+def test_restart_drops_stale_workers_at_startup(tmp_path):
+    path = tmp_path / 'sessions.db'
+    crashed = SQLiteSessionStore(path, worker_timeout=0)
+    session_id = crashed.create()
+    crashed.join(session_id, 'ghost', 'Ghost')
+    crash(crashed)
+
+    restarted = SQLiteSessionStore(path, worker_timeout=0)
+    try:
+        assert restarted.participants(session_id) == []
+    finally:
+        restarted.close()
+
+
+def test_user_connected_through_two_workers(tmp_path):
+    path = tmp_path / 'sessions.db'
+    first, second = SQLiteSessionStore(path), SQLiteSessionStore(path)
+    try:
+        session_id = first.create()
+        first.join(session_id, 'u1', 'Ada')
+        second.join(session_id, 'u1', 'Ada')
+        assert first.leave(session_id, 'u1') is None
+        assert second.leave(session_id, 'u1')[1] == 0
+    finally:
+        first.close()
+        second.close()
+
+
+def test_writer_survives_a_failed_batch(tmp_path, monkeypatch):
+    store = SQLiteSessionStore(tmp_path / 'sessions.db', batch_interval=0.01)
+    try:
+        session_id = store.create()
+        failed = threading.Event()
+        flush = store.flush
+
+        def failing_once():
+            if not failed.is_set():
+                failed.set()
+                raise RuntimeError('disk on fire')
+            flush()
+
+        monkeypatch.setattr(store, 'flush', failing_once)
+        failed.wait(1)
+        store.add_message(session_id, {'text': 'after'})
+        time.sleep(0.2)
+        assert store.writer.is_alive()
+        assert not store.pending_messages
+    finally:
+        monkeypatch.undo()
+        store.close()
@@ -0,0 +1,12 @@
+from simulator import create_app
+
+
+def test_data_is_built_lazily_by_default(app, client):
+    assert 'simulator' not in app.extensions
+    assert client.get('/api/osi-layers').status_code == 200
+    assert 'simulator' in app.extensions
+
+
+def test_preload_builds_data_up_front():
+    app = create_app({'PRELOAD_DATA': True, 'SESSION_HUB': False})
+    assert 'simulator' in app.extensions
@@ -0,0 +1,691 @@
+"""
+Page and API routes for OSI vs TCP/IP Model Visual Simulator
+"""
+
+import base64
+import binascii
+import contextlib
+import json
+import socket
+import tempfile
+import threading
+from functools import cached_property, lru_cache
+
+from flask import Blueprint, Response, current_app, jsonify, redirect, render_template, request, send_file, url_for
+
+from response_cache import ResponseCache
+from session_store import SESSION_ID_LENGTH
+
+
+bp = Blueprint('simulator', __name__)
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+# Protocol fields in serialization order, and the subset list views need
+PROTOCOL_FIELDS = ('name', 'layer', 'osi_layer_num', 'description', 'key_points', 'ports', 'use_cases', 'alternatives')
+SUMMARY_FIELDS = ('name', 'layer', 'osi_layer_num', 'ports')
+MAX_PAGE_SIZE = 100
+QR_FORMATS = {'png': 'image/png', 'svg': 'image/svg+xml'}
+# Session links whose QR codes are kept; one class start creates a burst of them
+MAX_QR_CODES = 128
+# /api/encapsulate query parameters passed through to FrameBuilder
+FRAME_TEXT_OPTIONS = ('transport', 'src_mac', 'dst_mac', 'src_ip', 'dst_ip', 'flags')
+FRAME_INT_OPTIONS = ('src_port', 'dst_port', 'ttl', 'seq', 'ack', 'window', 'identification')
+DEFAULT_FRAME_MESSAGE = 'Hello, OSI!'
+# Largest frame /api/decapsulate accepts (a maximal IPv4 packet in a VLAN-tagged frame)
+MAX_FRAME_BYTES = 65535 + 22
+DEFAULT_CAPTURE_SUMMARIES = 1000
+MAX_CAPTURE_SUMMARIES = 100000
+CAPTURE_COPY_CHUNK = 1024 * 1024
+DEFAULT_FLOW_TOP = 100
+MAX_FLOW_TOP = 10000
+MAX_SIMULATION_TIMELINE = 100000
+
+_data_lock = threading.Lock()
+_hub_lock = threading.Lock()
+
+
+def serialize_osi_layer(layer):
+    """Convert an OSI layer to a JSON-ready dict"""
+    return {
+        'number': layer.number,
+        'name': layer.name,
+        'functions': layer.functions,
+        'protocols': layer.protocols,
+        'data_unit': layer.data_unit,
+        'color': layer.color,
+        'description': layer.description,
+        'examples': layer.examples
+    }
+
+
+def serialize_tcpip_layer(layer):
+    """Convert a TCP/IP layer to a JSON-ready dict"""
+    return {
+        'number': layer.number,
+        'name': layer.name,
+        'functions': layer.functions,
+        'protocols': layer.protocols,
+        'osi_layers': layer.osi_layers,
+        'color': layer.color,
+        'description': layer.description,
+        'examples': layer.examples
+    }
+
+
+def serialize_protocol(protocol, fields=PROTOCOL_FIELDS):
+    """Convert a protocol to a JSON-ready dict with the requested fields"""
+    return {field: getattr(protocol, field) for field in fields}
+
+
+def serialize_protocols(protocols, fields=PROTOCOL_FIELDS):
+    """Convert a {key: protocol} dict to JSON-ready dicts"""
+    return {name: serialize_protocol(protocol, fields) for name, protocol in protocols.items()}
+
+
+def encode_cursor(key):
+    """Opaque pagination cursor pointing just after a protocol key"""
+    return base64.urlsafe_b64encode(key.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Protocol key from a cursor, ValueError if it is malformed"""
+    try:
+        return base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode('utf-8')
+    except (binascii.Error, UnicodeDecodeError) as error:
+        raise ValueError('Invalid cursor') from error
+
+
+def parse_protocol_query(args):
+    """Fields, cursor position and page size from a protocol list query
+
+    Fields are returned in canonical order so equivalent queries share one
+    cached variant. Raises ValueError with a client-facing message.
+    """
+    fields = PROTOCOL_FIELDS
+    if args.get('summary', '').lower() in ('1', 'true', 'yes'):
+        fields = SUMMARY_FIELDS
+    if 'fields' in args:
+        requested = {field.strip() for field in args['fields'].split(',') if field.strip()}
+        unknown = requested.difference(PROTOCOL_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+        if not requested:
+            raise ValueError('No fields requested')
+        fields = tuple(field for field in PROTOCOL_FIELDS if field in requested)
+
+    limit = None
+    if 'limit' in args:
+        limit = args.get('limit', type=int)
+        if limit is None or limit < 1:
+            raise ValueError('limit must be a positive integer')
+        limit = min(limit, MAX_PAGE_SIZE)
+
+    after = None
+    if args.get('cursor'):
+        after = decode_cursor(args['cursor'])
+        limit = limit or MAX_PAGE_SIZE
+    return fields, after, limit
+
+
+def paginate_protocols(protocols, fields, after, limit):
+    """Build one page of a {key: protocol} dict as a JSON-ready payload"""
+    keys = list(protocols)
+    start = keys.index(after) + 1 if after is not None else 0
+    end = len(keys) if limit is None else start + limit
+    page = keys[start:end]
+
+    payload = {'protocols': {key: serialize_protocol(protocols[key], fields) for key in page}}
+    if limit is not None:
+        payload['next_cursor'] = encode_cursor(page[-1]) if page and end < len(keys) else None
+    return payload
+
+
+def respond_protocol_list(cache_key, protocols):
+    """Serve a projected, paginated protocol list from the variant cache"""
+    try:
+        fields, after, limit = parse_protocol_query(request.args)
+        if after is not None and after not in protocols:
+            raise ValueError('Invalid cursor')
+    except ValueError as error:
+        return jsonify({'success': False, 'error': str(error)}), 400
+
+    entry = get_data().response_cache.variant(
+        (cache_key, fields, after, limit),
+        lambda: paginate_protocols(protocols, fields, after, limit)
+    )
+    return entry.to_response()
+
+
+class SimulatorData:
+    """Models and pre-serialized payloads for one app, built on first use"""
+
+    def __init__(self, app):
+        # The protocol catalogue is the heaviest import, keep it off the cold-start path
+        from models import OSIModel, TCPIPModel, ProtocolDatabase, ENCAPSULATION_SEQUENCE, DECAPSULATION_SEQUENCE
+
+        self.osi_model = OSIModel()
+        self.tcpip_model = TCPIPModel()
+        self.protocols = ProtocolDatabase
+
+        # Static payloads never change after import, so serialize them once
+        osi_layers = [serialize_osi_layer(layer) for layer in self.osi_model.layers]
+        tcpip_layers = [serialize_tcpip_layer(layer) for layer in self.tcpip_model.layers]
+        all_protocols = serialize_protocols(ProtocolDatabase.get_all_protocols())
+        # The page only renders names, layers and ports; details load on click
+        protocol_summaries = serialize_protocols(ProtocolDatabase.get_all_protocols(), SUMMARY_FIELDS)
+
+        self.response_cache = ResponseCache(app)
+        self.response_cache.add('osi-layers', {'layers': osi_layers})
+        self.response_cache.add('tcpip-layers', {'layers': tcpip_layers})
+        self.response_cache.add('encapsulation', {'sequence': ENCAPSULATION_SEQUENCE})
+        self.response_cache.add('decapsulation', {'sequence': DECAPSULATION_SEQUENCE})
+        self.response_cache.add('layer-mapping', {'mapping': self.build_layer_mapping()})
+        self.response_cache.add('protocols', {'protocols': all_protocols})
+
+        # Everything the page needs on load, versioned by content hash
+        self.response_cache.add('bootstrap', {
+            'osi_layers': osi_layers,
+            'tcpip_layers': tcpip_layers,
+            'encapsulation': ENCAPSULATION_SEQUENCE,
+            'decapsulation': DECAPSULATION_SEQUENCE,
+            'protocols': protocol_summaries
+        })
+        self.bootstrap_version = self.response_cache.get('bootstrap').digest[:16]
+
+    @cached_property
+    def search_index(self):
+        """Full-text index over the protocol catalogue, built on the first search"""
+        from search import SearchIndex
+        return SearchIndex(self.protocols.get_all_protocols())
+
+    @cached_property
+    def capture_classifier(self):
+        """Packet classifier for uploaded captures; its lookup caches outlive each upload"""
+        from capture import Classifier
+        return Classifier(self.protocols, self.tcpip_model)
+
+    def build_layer_mapping(self):
+        """Build the OSI to TCP/IP layer mapping"""
+        mapping = {}
+        for tcpip_layer in self.tcpip_model.layers:
+            mapping[f'tcpip_{tcpip_layer.number}'] = {
+                'name': tcpip_layer.name,
+                'osi_layers': tcpip_layer.osi_layers
+            }
+        return mapping
+
+
+def get_data(app=None):
+    """Get the simulator data for an app, building it on first use"""
+    app = app or current_app._get_current_object()
+    data = app.extensions.get('simulator')
+    if data is None:
+        with _data_lock:
+            data = app.extensions.get('simulator')
+            if data is None:
+                data = app.extensions['simulator'] = SimulatorData(app)
+    return data
+
+
+def get_hub(app=None):
+    """Get the app's session hub, starting it on first use (None if disabled)"""
+    app = app or current_app._get_current_object()
+    if not app.config['SESSION_HUB']:
+        return None
+    hub = app.extensions.get('session_hub')
+    if hub is None:
+        with _hub_lock:
+            hub = app.extensions.get('session_hub')
+            if hub is None:
+                from session_hub import SessionHub
+                from session_store import open_session_store
+                store = open_session_store(
+                    app.config['SESSION_BACKEND'],
+                    ttl=app.config['SESSION_TTL'],
+                    history=app.config['SESSION_HISTORY']
+                )
+                hub = app.extensions['session_hub'] = SessionHub(
+                    store, port=app.config['SESSION_HUB_PORT'], broker_path=app.config['SESSION_BROKER']
+                ).start()
+    return hub
+
+
+@lru_cache(maxsize=None)
+def lan_address():
+    """This host's address on the local network, looked up once per process"""
+    with contextlib.suppress(OSError), socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as probe:
+        # Connecting a UDP socket sends nothing, it only picks the outgoing interface
+        probe.connect(('10.255.255.255', 1))
+        return probe.getsockname()[0]
+    return '127.0.0.1'
+
+
+def session_link(session_id):
+    """URL a phone on the LAN opens to join a session, on the port this request came in on"""
+    server_ip = lan_address()
+    port = request.host.rpartition(':')[2]
+    host = f'{server_ip}:{port}' if port.isdigit() else server_ip
+    return f'{request.scheme}://{host}/?session={session_id}'
+
+
+def build_qr_payload(session_id, url, image_format):
+    """QR code of a session link as a data URI"""
+    from qr_code import QRCode
+    code = QRCode(url)
+    image = code.png() if image_format == 'png' else code.svg().encode('utf-8')
+    return {
+        'success': True,
+        'session_id': session_id,
+        'url': url,
+        'server_ip': lan_address(),
+        'format': image_format,
+        'qrcode': f'data:{QR_FORMATS[image_format]};base64,{base64.b64encode(image).decode("ascii")}',
+    }
+
+
+def parse_frame_options(args):
+    """FrameBuilder keyword arguments from an /api/encapsulate query; raises ValueError"""
+    options = {name: args[name] for name in FRAME_TEXT_OPTIONS if name in args}
+    for name in FRAME_INT_OPTIONS:
+        if name in args:
+            try:
+                options[name] = int(args[name])
+            except ValueError:
+                raise ValueError(f'{name} must be an integer') from None
+    return options
+
+
+def read_frame(req):
+    """Frame bytes from a raw octet-stream body or a hex 'frame' parameter; raises ValueError"""
+    if req.mimetype == 'application/octet-stream':
+        data = req.get_data(cache=False)
+    else:
+        text = req.values.get('frame', '')
+        if not text:
+            raise ValueError('Missing frame')
+        try:
+            data = bytes.fromhex(text.replace(':', '').replace('-', ''))
+        except ValueError:
+            raise ValueError('frame must be hex bytes') from None
+    if not data:
+        raise ValueError('Missing frame')
+    if len(data) > MAX_FRAME_BYTES:
+        raise ValueError(f'Frames are limited to {MAX_FRAME_BYTES} bytes')
+    return data
+
+
+def save_capture(req, limit):
+    """Copy an uploaded capture (multipart 'file' or raw body) to a temporary file; raises ValueError"""
+    if req.mimetype == 'multipart/form-data':
+        upload = req.files.get('file')
+        if upload is None:
+            raise ValueError('Missing capture file')
+        source = upload.stream
+    else:
+        if req.content_length and req.content_length > limit:
+            raise ValueError(f'Captures are limited to {limit} bytes')
+        source = req.stream
+    target = tempfile.TemporaryFile()
+    size = 0
+    while chunk := source.read(CAPTURE_COPY_CHUNK):
+        size += len(chunk)
+        if size > limit:
+            target.close()
+            raise ValueError(f'Captures are limited to {limit} bytes')
+        target.write(chunk)
+    if not size:
+        target.close()
+        raise ValueError('Missing capture file')
+    target.flush()
+    return target
+
+
+def hub_unavailable():
+    """Error response for deployments without a session hub"""
+    return jsonify({'success': False, 'error': 'Multi-user sessions are not available on this server'}), 503
+
+
+@bp.route('/')
+def index():
+    """Serve main page"""
+    return render_template(
+        'index.html',
+        bootstrap_url=url_for('.get_bootstrap_version', version=get_data().bootstrap_version),
+        hub_port=current_app.config['SESSION_HUB_PORT'] if current_app.config['SESSION_HUB'] else None
+    )
+
+
+@bp.route('/api/bootstrap')
+def get_bootstrap():
+    """API endpoint to get all page data in a single document"""
+    return get_data().response_cache.respond('bootstrap')
+
+
+@bp.route('/api/bootstrap/<version>')
+def get_bootstrap_version(version):
+    """API endpoint to get the immutable, content-versioned bootstrap document"""
+    data = get_data()
+    if version != data.bootstrap_version:
+        return redirect(url_for('.get_bootstrap_version', version=data.bootstrap_version))
+    return data.response_cache.respond('bootstrap', cache_control=IMMUTABLE_CACHE_CONTROL)
+
+
+@bp.route('/api/osi-layers')
+def get_osi_layers():
+    """API endpoint to get OSI layers"""
+    return get_data().response_cache.respond('osi-layers')
+
+
+@bp.route('/api/tcpip-layers')
+def get_tcpip_layers():
+    """API endpoint to get TCP/IP layers"""
+    return get_data().response_cache.respond('tcpip-layers')
+
+
+@bp.route('/api/osi-layer/<int:layer_num>')
+def get_osi_layer_details(layer_num):
+    """API endpoint to get specific OSI layer details"""
+    layer = get_data().osi_model.get_layer_by_number(layer_num)
+    if layer:
+        return jsonify({
+            'success': True,
+            'layer': serialize_osi_layer(layer)
+        })
+    return jsonify({'success': False, 'error': 'Layer not found'}), 404
+
+
+@bp.route('/api/tcpip-layer/<int:layer_num>')
+def get_tcpip_layer_details(layer_num):
+    """API endpoint to get specific TCP/IP layer details"""
+    layer = get_data().tcpip_model.get_layer_by_number(layer_num)
+    if layer:
+        return jsonify({
+            'success': True,
+            'layer': serialize_tcpip_layer(layer)
+        })
+    return jsonify({'success': False, 'error': 'Layer not found'}), 404
+
+
+@bp.route('/api/encapsulation')
+def get_encapsulation():
+    """API endpoint to get encapsulation sequence"""
+    return get_data().response_cache.respond('encapsulation')
+
+
+@bp.route('/api/decapsulation')
+def get_decapsulation():
+    """API endpoint to get decapsulation sequence"""
+    return get_data().response_cache.respond('decapsulation')
+
+
+@bp.route('/api/encapsulate')
+def encapsulate_message():
+    """API endpoint to build a real Ethernet/IPv4/TCP or UDP frame for a message, layer by layer"""
+    from encapsulation import encapsulate
+    message = request.args.get('message', DEFAULT_FRAME_MESSAGE)
+    try:
+        frame = encapsulate(message.encode('utf-8'), **parse_frame_options(request.args))
+    except ValueError as error:
+        return jsonify({'success': False, 'error': str(error)}), 400
+    return jsonify({'success': True, 'message': message, **frame})
+
+
+@bp.route('/api/decapsulate', methods=['GET', 'POST'])
+def decapsulate_frame():
+    """API endpoint to parse a raw frame layer by layer, verifying its checksums"""
+    from decapsulation import describe_frame, parse_frame
+    try:
+        data = read_frame(request)
+    except ValueError as error:
+        return jsonify({'success': False, 'error': str(error)}), 400
+    fcs = request.args.get('fcs', '').lower() in ('1', 'true', 'yes')
+    return jsonify({'success': True, **describe_frame(parse_frame(data, fcs=fcs), get_data().protocols)})
+
+
+@bp.route('/api/captures', methods=['POST'])
+def analyze_capture():
+    """API endpoint to stream a pcap/pcapng upload back as NDJSON packet summaries and layer histograms"""
+    from capture import Capture, analyze
+    try:
+        summaries = int(request.args.get('packets', DEFAULT_CAPTURE_SUMMARIES))
+    except ValueError:
+        return jsonify({'success': False, 'error': 'packets must be an integer'}), 400
+    try:
+        capture = Capture(save_capture(request, current_app.config['CAPTURE_MAX_BYTES']))
+    except ValueError as error:
+        return jsonify({'success': False, 'error': str(error)}), 400
+    verify = request.args.get('verify', '1').lower() not in ('0', 'false', 'no')
+    dissect = request.args.get('dissect', '').lower() in ('1', 'true', 'yes')
+    summaries = min(max(summaries, 0), MAX_CAPTURE_SUMMARIES)
+    events = analyze(capture, get_data().capture_classifier, summaries, verify, dissect)
+    response = Response((json.dumps(event) + '\n' for event in events), mimetype='application/x-ndjson')
+    response.call_on_close(capture.close)
+    return response
+
+
+@bp.route('/api/flows', methods=['POST'])
+def track_flows():
+    """API endpoint to track the flows of a pcap/pcapng upload, totalled per protocol"""
+    from capture import Capture
+    from flows import FlowReport, FlowTable, NetFlowExporter, track
+    try:
+        top = int(request.args.get('top', DEFAULT_FLOW_TOP))
+    except ValueError:
+        return jsonify({'success': False, 'error': 'top must be an integer'}), 400
+    output = request.args.get('format', 'json')
+    if output not in ('json', 'netflow'):
+        return jsonify({'success': False, 'error': 'format must be json or netflow'}), 400
+    try:
+        capture = Capture(save_capture(request, current_app.config['CAPTURE_MAX_BYTES']))
+    except ValueError as error:
+        return jsonify({'success': False, 'error': str(error)}), 400
+    verify = request.args.get('verify', '1').lower() not in ('0', 'false', 'no')
+
+    report = FlowReport(get_data().capture_classifier, min(max(top, 0), MAX_FLOW_TOP))
+    table = FlowTable(report.add, current_app.config['FLOW_TABLE_MAX'])
+    if output == 'netflow':
+        netflow = tempfile.TemporaryFile()
+        exporter = NetFlowExporter(netflow, table)
+        table.export = exporter.add
+    with capture:
+        packets = track(capture, table, verify)
+        table.flush()
+    if output == 'netflow':
+        exporter.close()
+        netflow.seek(0)
+        return send_file(netflow, mimetype='application/vnd.tcpdump.pcap', as_attachment=True,
+                         download_name='netflow.pcap')
+    return jsonify({
+        'success': True,
+        'capture': {'format': capture.format, 'size': capture.size, 'packets': packets},
+        'table': {'created': table.created, 'peak': table.peak, 'evicted': table.evicted,
+                  'max_flows': table.max_flows},
+        **report.report(),
+    })
+
+
+@bp.route('/api/simulate', methods=['GET', 'POST'])
+def simulate_network():
+    """API endpoint to run a discrete-event simulation: the lab path (GET) or a JSON topology (POST)"""
+    from netsim import TIMELINE_LIMIT, build_network, lab_network, spec_number
+    try:
+        timeline = int(request.args.get('timeline', TIMELINE_LIMIT))
+        seed = int(request.args.get('seed', 0))
+        loss = float(request.args.get('loss', 0))
+    except ValueError:
+        return jsonify({'success': False, 'error': 'timeline and seed must be integers, and loss a number'}), 400
+    timeline = min(max(timeline, 0), MAX_SIMULATION_TIMELINE)
+    try:
+        until = None
+        if request.method == 'POST':
+            spec = request.get_json(silent=True)
+            network = build_network(spec, timeline, current_app.config['SIMULATION_MAX_NODES'])
+            until_ms = spec_number(spec, 'until_ms', None, 'topology', minimum=0)
+            if until_ms is not None:
+                until = until_ms / 1000
+        else:
+            if not 0 <= loss <= 1:
+                raise ValueError('loss must be between 0 and 1')
+            message = request.args.get('message', 'Hello, network!').encode('utf-8')
+            network = lab_network(message, loss, seed, timeline)
+    except ValueError as error:
+        return jsonify({'success': False, 'error': str(error)}), 400
+    network.run(until, current_app.config['SIMULATION_MAX_EVENTS'])
+    return jsonify({'success': True, **network.report()})
+
+
+@bp.route('/api/layer-mapping')
+def get_layer_mapping():
+    """API endpoint to get OSI to TCP/IP layer mapping"""
+    return get_data().response_cache.respond('layer-mapping')
+
+
+@bp.route('/api/protocols')
+def get_all_protocols():
+    """API endpoint to get all protocols (supports fields, summary, limit and cursor)"""
+    data = get_data()
+    if not request.args:
+        return data.response_cache.respond('protocols')
+    return respond_protocol_list('protocols', data.protocols.get_all_protocols())
+
+
+@bp.route('/api/protocol/<protocol_name>')
+def get_protocol_details(protocol_name):
+    """API endpoint to get specific protocol details"""
+    protocol = get_data().protocols.get_protocol(protocol_name)
+    if protocol:
+        return jsonify({
+            'success': True,
+            'protocol': serialize_protocol(protocol)
+        })
+    return jsonify({'success': False, 'error': 'Protocol not found'}), 404
+
+
+@bp.route('/api/protocols/layer/<path:layer_name>')
+def get_protocols_by_layer(layer_name):
+    """API endpoint to get protocols by layer (supports fields, summary, limit and cursor)"""
+    protocols = get_data().protocols.get_protocols_by_layer(layer_name)
+    return respond_protocol_list(('layer', layer_name.casefold()), protocols)
+
+
+@bp.route('/api/protocols/osi-layer/<int:layer_num>')
+def get_protocols_by_osi_layer(layer_num):
+    """API endpoint to get protocols by OSI layer number"""
+    data = get_data()
+    entry = data.response_cache.variant(('osi-layer', layer_num), lambda: {
+        'osi_layer': layer_num,
+        'protocols': serialize_protocols(data.protocols.get_protocols_by_osi_layer(layer_num)),
+    })
+    return entry.to_response()
+
+
+@bp.route('/api/protocols/port/<int:port>')
+def get_protocols_by_port(port):
+    """API endpoint to get protocols that use a port"""
+    data = get_data()
+    entry = data.response_cache.variant(('port', port), lambda: {
+        'port': port,
+        'protocols': serialize_protocols(data.protocols.get_protocols_by_port(port)),
+    })
+    return entry.to_response()
+
+
+@bp.route('/api/protocols/ports/<int:start>-<int:end>')
+def get_protocols_by_port_range(start, end):
+    """API endpoint to get protocols that use any port in a range"""
+    if start > end:
+        return jsonify({'success': False, 'error': 'Invalid port range'}), 400
+    data = get_data()
+    entry = data.response_cache.variant(('ports', start, end), lambda: {
+        'start': start,
+        'end': end,
+        'protocols': serialize_protocols(data.protocols.get_protocols_by_port_range(start, end)),
+    })
+    return entry.to_response()
+
+
+@bp.route('/api/search')
+def search_protocols():
+    """API endpoint for ranked full-text protocol search"""
+    # Unstripped: a trailing space tells search() the last word is finished
+    query = request.args.get('q', '')
+    limit = request.args.get('limit', 10, type=int)
+    if not query.strip():
+        return jsonify({'success': False, 'error': 'Missing search query'}), 400
+    results = get_data().search_index.search(query, limit=max(1, min(limit, 50)))
+    return jsonify({'query': query.strip(), 'results': results})
+
+
+@bp.route('/api/search/suggest')
+def suggest_protocols():
+    """API endpoint for search-as-you-type completions"""
+    prefix = request.args.get('q', '')
+    limit = request.args.get('limit', 8, type=int)
+    suggestions = get_data().search_index.suggest(prefix, limit=max(1, min(limit, 20)))
+    return jsonify({'query': prefix, 'suggestions': suggestions})
+
+
+@bp.route('/api/create-session')
+def create_session():
+    """API endpoint to create a multi-user session"""
+    hub = get_hub()
+    if hub is None:
+        return hub_unavailable()
+    return jsonify({'success': True, 'session_id': hub.store.create()})
+
+
+@bp.route('/api/verify-session/<session_id>')
+def verify_session(session_id):
+    """API endpoint to check that a session exists before joining it"""
+    hub = get_hub()
+    if hub is None:
+        return hub_unavailable()
+    session_id = session_id.upper()
+    participants = hub.store.participants(session_id)
+    if participants is None:
+        return jsonify({'exists': False, 'session_id': session_id, 'error': 'Session not found'}), 404
+    return jsonify({
+        'exists': True,
+        'session_id': session_id,
+        'participants_count': len(participants),
+        'participants': participants
+    })
+
+
+@bp.route('/api/session/<session_id>/participants')
+def get_session_participants(session_id):
+    """API endpoint to get the participants of a session"""
+    hub = get_hub()
+    if hub is None:
+        return hub_unavailable()
+    session_id = session_id.upper()
+    participants = hub.store.participants(session_id)
+    if participants is None:
+        return jsonify({'success': False, 'error': 'Session not found'}), 404
+    return jsonify({'session_id': session_id, 'count': len(participants), 'participants': participants})
+
+
+@bp.route('/api/qrcode/<session_id>')
+def get_session_qrcode(session_id):
+    """API endpoint to get a scannable session link as a PNG (or ?format=svg) data URI"""
+    session_id = session_id.upper()
+    image_format = request.args.get('format', 'png')
+    if image_format not in QR_FORMATS:
+        return jsonify({'success': False, 'error': f'Unknown format: {image_format}'}), 400
+    if len(session_id) != SESSION_ID_LENGTH or not session_id.isalnum():
+        return jsonify({'success': False, 'error': 'Invalid session ID'}), 400
+    hub = get_hub()
+    if hub is None:
+        return hub_unavailable()
+    if not hub.store.exists(session_id):
+        return jsonify({'success': False, 'error': 'Session not found'}), 404
+
+    url = session_link(session_id)
+    # Presenters refresh and re-create sessions, so the same link is asked for again and again
+    app = current_app._get_current_object()
+    qr_codes = app.extensions.get('qr_codes')
+    if qr_codes is None:
+        qr_codes = app.extensions.setdefault('qr_codes', ResponseCache(app, MAX_QR_CODES))
+    entry = qr_codes.variant((url, image_format), lambda: build_qr_payload(session_id, url, image_format))
+    return entry.to_response()